@@ -0,0 +1,168 @@
+"""
+SIGMA-PLI - Circuit breaker por provedor externo (ViaCEP, ReceitaWS, IBGE)
+
+Cada provedor tem uma janela móvel de chamadas. Erros, respostas 5xx e
+chamadas mais lentas que `slow_call_ms` contam como falha. Quando a taxa de
+falhas passa do limite (com um mínimo de chamadas na janela), o circuito
+abre: novas chamadas falham na hora com CircuitOpenError, sem esperar o
+timeout do provedor, e os serviços respondem com dados vencidos do cache
+(`stale: true`).
+
+Depois de `open_seconds` o circuito fica semiaberto: uma única chamada de
+teste passa; sucesso fecha o circuito, falha reabre.
+
+    breaker.acquire()          # levanta CircuitOpenError se aberto
+    ...chamada...
+    breaker.record(ok, elapsed_ms)
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada: circuito do provedor aberto"""
+
+    def __init__(self, provider: str, retry_after: float):
+        self.provider = provider
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuito de {provider} aberto (nova tentativa em {retry_after:.0f}s)"
+        )
+
+
+class CircuitBreaker:
+    """Taxa de falhas em janela móvel + estados fechado/aberto/semiaberto"""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_requests: int = 5,
+        error_rate: float = 0.5,
+        slow_call_ms: float = 3000.0,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            name: Provedor (viacep, receitaws, ibge)
+            window_seconds: Janela da taxa de falhas
+            min_requests: Chamadas mínimas na janela para abrir o circuito
+            error_rate: Fração de falhas que abre o circuito (0-1)
+            slow_call_ms: Chamadas mais lentas que isso contam como falha
+            open_seconds: Tempo aberto antes da chamada de teste
+            clock: Relógio monotônico (injetável nos testes)
+        """
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._calls: deque[tuple[float, bool]] = deque()  # (instante, falhou)
+        self._failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.transitions: dict[str, int] = {}
+        self.rejected = 0
+
+    # -------------------------------------------------
+    # Estado
+    # -------------------------------------------------
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        key = f"{self._state}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self._probe_in_flight = False
+        elif state == CLOSED:
+            self._calls.clear()
+            self._failures = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - self._clock())
+
+    def check(self):
+        """Levanta CircuitOpenError se a chamada seria recusada (não reserva o teste)"""
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probe_in_flight):
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def acquire(self):
+        """Autoriza uma chamada; no semiaberto, apenas a chamada de teste passa"""
+        try:
+            self.check()
+        except CircuitOpenError:
+            self.rejected += 1
+            raise
+        if self._state == HALF_OPEN:
+            self._probe_in_flight = True
+
+    # -------------------------------------------------
+    # Resultado das chamadas
+    # -------------------------------------------------
+
+    def _prune(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            _, failed = self._calls.popleft()
+            self._failures -= failed
+
+    def record(self, ok: Optional[bool], elapsed_ms: float = 0.0):
+        """
+        Registra o resultado de uma chamada autorizada
+
+        Args:
+            ok: True (sucesso), False (erro/5xx) ou None (abandonada/cancelada)
+            elapsed_ms: Duração; acima de slow_call_ms conta como falha
+        """
+        if ok is None:
+            # Cancelada antes do resultado: libera o teste sem contar
+            self._probe_in_flight = False
+            return
+
+        failed = not ok or elapsed_ms >= self.slow_call_ms
+        if self._state == HALF_OPEN:
+            self._probe_in_flight = False
+            self._transition(OPEN if failed else CLOSED)
+            return
+        if self._state == OPEN:
+            return  # chamada autorizada antes de abrir
+
+        now = self._clock()
+        self._calls.append((now, failed))
+        self._failures += failed
+        self._prune(now)
+        total = len(self._calls)
+        if total >= self.min_requests and self._failures / total >= self.error_rate:
+            self._transition(OPEN)
+
+    def stats(self) -> dict:
+        state = self.state
+        self._prune(self._clock())
+        return {
+            "state": state,
+            "window_requests": len(self._calls),
+            "window_failures": self._failures,
+            "failure_rate": round(self._failures / len(self._calls), 4) if self._calls else 0.0,
+            "retry_after_seconds": round(self.retry_after(), 1) if state == OPEN else 0.0,
+            "rejected": self.rejected,
+            "transitions": dict(sorted(self.transitions.items())),
+        }
@@ -24,6 +24,12 @@ class Settings(BaseSettings):
     postgres_user: str = Field(default="sigma_admin")
     postgres_password: SecretStr = Field(default=SecretStr(""))
     postgres_sslmode: str = Field(default="prefer")
+    postgres_pool_min_size: int = Field(default=2)
+    postgres_pool_max_size: int = Field(default=10)
+    postgres_statement_cache_size: int = Field(default=256)  # >= statements registrados
+    postgres_lease_warn_seconds: float = Field(
+        default=10.0
+    )  # Lease acima disso gera alerta de possível vazamento
 
     # Neo4j
     neo4j_uri: str = Field(default="bolt://localhost:7687")
@@ -44,6 +50,104 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
 
+    # Hash de senhas (executor fora do event loop)
+    password_hash_scheme: str = Field(
+        default="pbkdf2_sha256"
+    )  # pbkdf2_sha256 | bcrypt - hashes em outro esquema são migrados no login
+    password_hash_workers: int = Field(default=4)
+    password_hash_max_pending: int = Field(default=64)  # acima disso: HTTP 503
+
+    # Auditoria de login em lote (usuarios.tentativa_login)
+    enable_login_audit_buffer: bool = Field(default=True)
+    login_audit_batch_size: int = Field(default=200)
+    login_audit_flush_interval_ms: int = Field(default=500)
+    login_audit_max_queue: int = Field(default=10000)
+
+    # Manutenção periódica (partições de usuarios.sessao/token_recuperacao)
+    enable_maintenance_scheduler: bool = Field(default=True)
+    maintenance_interval_minutes: int = Field(default=60)
+    session_partition_months_ahead: int = Field(default=2)
+    session_retention_months: int = Field(default=1)  # após o vencimento
+    session_drop_detached_partitions: bool = Field(default=True)
+
+    # Índice cego de CPF/telefone (cadastro.pessoa, migration 013)
+    blind_index_batch_size: int = Field(default=1000)  # backfill
+    blind_index_match_max: int = Field(default=10000)  # itens por busca em lote
+
+    # Cache de sessões autenticadas (por worker; TTL 0 desativa)
+    auth_session_cache_ttl_seconds: float = Field(default=60.0)
+    auth_session_cache_max_entries: int = Field(default=10000)
+
+    # Cache de nível de acesso (PermissionChecker)
+    permission_cache_ttl_seconds: float = Field(default=30.0)
+    permission_cache_max_entries: int = Field(default=10000)
+
+    # Endereços dos provedores externos (apontar para scripts/mock_providers.py em testes de carga)
+    viacep_base_url: str = Field(default="https://viacep.com.br/ws")
+    receitaws_base_url: str = Field(default="https://www.receitaws.com.br/v1")
+    ibge_localidades_url: str = Field(
+        default="https://servicodados.ibge.gov.br/api/v1/localidades"
+    )
+
+    # Cliente HTTP compartilhado (ViaCEP, ReceitaWS, IBGE, keep-alive)
+    http_client_limit: int = Field(default=100)
+    http_client_limit_per_host: int = Field(default=10)
+    http_client_keepalive_seconds: float = Field(default=30.0)
+    http_client_dns_ttl_seconds: int = Field(default=300)
+    http_client_connect_timeout_seconds: float = Field(default=3.0)
+    http_client_timeout_seconds: float = Field(default=10.0)  # provedores sem timeout próprio
+    http_provider_timeouts: dict = Field(
+        default={"viacep": 5.0, "receitaws": 5.0, "ibge": 10.0, "keepalive": 30.0}
+    )  # env: HTTP_PROVIDER_TIMEOUTS='{"viacep": 3}'
+
+    # Circuit breaker por provedor (janela móvel de falhas; aberto = responde do cache)
+    circuit_breaker_providers: list = Field(default=["viacep", "receitaws", "ibge"])
+    circuit_breaker_window_seconds: float = Field(default=60.0)
+    circuit_breaker_min_requests: int = Field(default=5)
+    circuit_breaker_error_rate: float = Field(default=0.5)
+    circuit_breaker_slow_call_ms: float = Field(default=3000.0)  # lenta conta como falha
+    circuit_breaker_open_seconds: float = Field(default=30.0)  # depois: uma chamada de teste
+    cache_stale_grace_hours: float = Field(default=168)  # vencidos servidos com circuito aberto
+
+    # Cache de CEP (memória + cadastro.cep_cache, ou SQLite sem PostgreSQL)
+    cep_cache_memory_entries: int = Field(default=5000)
+    cep_cache_ttl_hours: float = Field(default=720)  # CEP encontrado (30 dias)
+    cep_cache_negative_ttl_hours: float = Field(default=24)  # CEP não encontrado
+    cep_cache_sqlite_path: str = Field(default="data/cep_cache.sqlite3")
+
+    # Consultas de CNPJ (ReceitaWS gratuita: poucas consultas por minuto)
+    receitaws_rate_per_minute: float = Field(default=3)
+    receitaws_burst: int = Field(default=3)
+    cnpj_cache_ttl_hours: float = Field(default=720)  # CNPJ encontrado (30 dias)
+    cnpj_cache_negative_ttl_hours: float = Field(default=24)  # CNPJ não encontrado
+    cnpj_lookup_wait_seconds: float = Field(default=8.0)  # acima disso: 202 + polling
+
+    # Validação em lote de CPF/CNPJ/CEP (resposta NDJSON)
+    validacao_lote_max_itens: int = Field(default=5000)
+    validacao_lote_concorrencia_cep: int = Field(default=8)  # consultas ViaCEP em andamento
+    validacao_lote_concorrencia_cnpj: int = Field(default=4)  # a fila da ReceitaWS limita a taxa
+    validacao_lote_cnpj_wait_seconds: float = Field(default=10.0)  # depois: pendente
+
+    # Base offline de UFs/municípios do IBGE (cópia local atualizada em segundo plano)
+    ibge_dataset_path: str = Field(default="data/ibge_localidades.json")
+    ibge_refresh_on_startup: bool = Field(default=True)
+    ibge_refresh_max_age_days: float = Field(default=30)
+    ibge_refresh_timeout_seconds: float = Field(default=60.0)
+    ibge_refresh_check_minutes: float = Field(default=60)  # snapshot de outro worker / vencimento
+    ibge_warmup_concurrency: int = Field(default=6)  # UFs baixadas em paralelo no aquecimento
+    ibge_warmup_timeout_seconds: float = Field(default=5.0)  # depois: continua em segundo plano
+
+    # Cache HTTP de dados de referência (ETag/304 + respostas serializadas em memória)
+    http_response_cache_max_entries: int = Field(default=512)
+    http_cache_localidades_max_age_seconds: int = Field(default=86400)  # 1 dia
+    http_cache_feriados_max_age_seconds: int = Field(default=604800)  # 7 dias
+
+    # Eventos do calendário (calendario.evento, migration 016)
+    calendario_eventos_store: str = Field(default="postgres")  # postgres | memoria
+    feriados_cache_anos: int = Field(default=32)  # tabelas de feriados/dias úteis em memória
+    calendario_ics_cache_max_entries: int = Field(default=20000)  # VEVENTs renderizados
+    calendario_ics_max_age_seconds: int = Field(default=300)  # assinaturas (Outlook/Thunderbird)
+
     # Upload
     upload_max_size: int = 100 * 1024 * 1024  # 100MB
     upload_allowed_extensions: list = [
@@ -3,9 +3,19 @@ SIGMA-PLI - Conexões de Banco de Dados
 PostgreSQL + Neo4j
 """
 
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import AsyncIterator, Optional
+
 import asyncpg
 from neo4j import GraphDatabase
 from app.config import settings
+from app.query_registry import queries
+
+logger = logging.getLogger(__name__)
 
 # PostgreSQL
 postgres_pool: asyncpg.Pool = None
@@ -22,9 +32,11 @@ async def init_postgres():
         if settings.database_url:
             postgres_pool = await asyncpg.create_pool(
                 dsn=settings.database_url,
-                min_size=2,
-                max_size=10,
+                min_size=settings.postgres_pool_min_size,
+                max_size=settings.postgres_pool_max_size,
                 command_timeout=60,
+                statement_cache_size=settings.postgres_statement_cache_size,
+                init=queries.init_connection,
             )
         else:
             # Senão, usa as credenciais individuais
@@ -39,9 +51,11 @@ async def init_postgres():
                     else settings.postgres_password
                 ),
                 ssl="require" if settings.postgres_sslmode == "require" else None,
-                min_size=2,
-                max_size=10,
+                min_size=settings.postgres_pool_min_size,
+                max_size=settings.postgres_pool_max_size,
                 command_timeout=60,
+                statement_cache_size=settings.postgres_statement_cache_size,
+                init=queries.init_connection,
             )
         print("✅ PostgreSQL conectado com sucesso")
     except Exception as e:
@@ -132,10 +146,305 @@ async def get_pg_pool():
 
 
 async def get_postgres_connection():
-    """Obter conexão PostgreSQL do pool"""
+    """
+    Obter conexão PostgreSQL do pool (legado)
+
+    A conexão retornada precisa ser devolvida com ``release_postgres_connection``.
+    Prefira ``postgres_connection()``, que garante a devolução ao pool.
+    """
+    return await _acquire_connection()
+
+
+async def release_postgres_connection(conn: asyncpg.Connection):
+    """Devolver ao pool uma conexão obtida com ``get_postgres_connection``"""
+    await _release_connection(conn)
+
+
+# =====================================================
+# LEASE DE CONEXÕES POR REQUEST
+# =====================================================
+
+
+class PoolMetrics:
+    """Métricas de uso do pool PostgreSQL (acquire e duração dos leases)"""
+
+    def __init__(self):
+        self.waiters = 0
+        self.acquire_count = 0
+        self.acquire_total_ms = 0.0
+        self.acquire_max_ms = 0.0
+        self.acquire_errors = 0
+        self.lease_count = 0
+        self.lease_total_ms = 0.0
+        self.lease_max_ms = 0.0
+        self.leak_warnings = 0
+        self.active_leases: dict[int, float] = {}
+
+    def record_acquire(self, elapsed_ms: float):
+        self.acquire_count += 1
+        self.acquire_total_ms += elapsed_ms
+        self.acquire_max_ms = max(self.acquire_max_ms, elapsed_ms)
+
+    def record_lease(self, elapsed_ms: float):
+        self.lease_count += 1
+        self.lease_total_ms += elapsed_ms
+        self.lease_max_ms = max(self.lease_max_ms, elapsed_ms)
+
+    def reset(self):
+        self.__init__()
+
+    def snapshot(self) -> dict:
+        now = time.perf_counter()
+        warn_seconds = settings.postgres_lease_warn_seconds
+        return {
+            "waiters": self.waiters,
+            "active_leases": len(self.active_leases),
+            "suspected_leaks": sum(
+                1
+                for started in self.active_leases.values()
+                if now - started > warn_seconds
+            ),
+            "acquire": {
+                "count": self.acquire_count,
+                "errors": self.acquire_errors,
+                "avg_ms": round(self.acquire_total_ms / self.acquire_count, 3)
+                if self.acquire_count
+                else 0.0,
+                "max_ms": round(self.acquire_max_ms, 3),
+            },
+            "lease": {
+                "count": self.lease_count,
+                "avg_ms": round(self.lease_total_ms / self.lease_count, 3)
+                if self.lease_count
+                else 0.0,
+                "max_ms": round(self.lease_max_ms, 3),
+                "leak_warnings": self.leak_warnings,
+                "warn_seconds": warn_seconds,
+            },
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+async def _acquire_connection() -> asyncpg.Connection:
+    """Adquire conexão do pool registrando latência e lease ativo"""
     if not postgres_pool:
         await init_postgres()
-    return await postgres_pool.acquire()
+    if not postgres_pool:
+        raise RuntimeError("Pool PostgreSQL indisponível")
+
+    pool_metrics.waiters += 1
+    started = time.perf_counter()
+    try:
+        conn = await postgres_pool.acquire()
+    except Exception:
+        pool_metrics.acquire_errors += 1
+        raise
+    finally:
+        pool_metrics.waiters -= 1
+
+    acquired = time.perf_counter()
+    pool_metrics.record_acquire((acquired - started) * 1000)
+    pool_metrics.active_leases[id(conn)] = acquired
+    return conn
+
+
+async def _release_connection(conn: asyncpg.Connection):
+    """Devolve conexão ao pool registrando duração do lease"""
+    started = pool_metrics.active_leases.pop(id(conn), None)
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        pool_metrics.record_lease(elapsed * 1000)
+        if elapsed > settings.postgres_lease_warn_seconds:
+            pool_metrics.leak_warnings += 1
+            logger.warning(
+                f"⚠️ Conexão PostgreSQL mantida por {elapsed:.1f}s "
+                f"(limite {settings.postgres_lease_warn_seconds}s) - possível vazamento"
+            )
+    if postgres_pool:
+        await postgres_pool.release(conn)
+
+
+class RequestConnectionLease:
+    """
+    Lease de uma única conexão compartilhada por todas as chamadas de um request
+
+    A conexão é adquirida sob demanda (primeiro uso) e devolvida ao pool quando
+    o escopo do request termina; depois de ``close()`` o lease fica encerrado e
+    não adquire mais conexões.
+
+    Uma conexão asyncpg executa uma operação por vez: enquanto uma task usa a
+    conexão do request (blocos ``postgres_connection`` aninhados na mesma task
+    a reaproveitam), outras tasks do mesmo request (``gather``, ``create_task``)
+    recebem leases avulsos em vez de sobrepor operações nela.
+    """
+
+    def __init__(self):
+        self.conn: Optional[asyncpg.Connection] = None
+        self.closed = False
+        self._lock = asyncio.Lock()
+        self._owner: Optional[asyncio.Task] = None
+        self._depth = 0
+
+    def claim(self) -> bool:
+        """Reserva a conexão para a task atual (False se outra task a está usando)"""
+        task = asyncio.current_task()
+        if self._owner is not None and self._owner is not task:
+            return False
+        self._owner = task
+        self._depth += 1
+        return True
+
+    def unclaim(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+
+    async def get_connection(self) -> asyncpg.Connection:
+        if self.conn is not None:
+            return self.conn
+        async with self._lock:
+            if self.closed:
+                raise RuntimeError("Lease de conexão do request já encerrado")
+            if self.conn is None:
+                self.conn = await _acquire_connection()
+            return self.conn
+
+    async def close(self):
+        self.closed = True
+        # Aguarda um acquire em andamento para devolver a conexão resultante
+        async with self._lock:
+            if self.conn is not None:
+                conn, self.conn = self.conn, None
+                await _release_connection(conn)
+
+
+_request_lease: ContextVar[Optional[RequestConnectionLease]] = ContextVar(
+    "postgres_request_lease", default=None
+)
+
+
+@asynccontextmanager
+async def request_connection_scope() -> AsyncIterator[RequestConnectionLease]:
+    """
+    Abre o escopo de lease do request atual
+
+    Escopos aninhados reaproveitam o lease já aberto.
+    """
+    current = _request_lease.get()
+    if current is not None:
+        yield current
+        return
+
+    lease = RequestConnectionLease()
+    token = _request_lease.set(lease)
+    try:
+        yield lease
+    finally:
+        try:
+            _request_lease.reset(token)
+        except ValueError:
+            # Escopo encerrado em outro contexto (ex.: dependency finalizada pelo FastAPI)
+            _request_lease.set(None)
+        await lease.close()
+
+
+def context_without_request_lease() -> Context:
+    """
+    Cópia do contexto atual sem o lease do request
+
+    Para tarefas que podem sobreviver ao request (``asyncio.create_task``): cada
+    uma faz seus próprios leases avulsos em vez de herdar a conexão do request.
+
+    Usage:
+        asyncio.create_task(coro, context=context_without_request_lease())
+    """
+    context = copy_context()
+    context.run(_request_lease.set, None)
+    return context
+
+
+@asynccontextmanager
+async def postgres_connection(
+    standalone: bool = False,
+) -> AsyncIterator[asyncpg.Connection]:
+    """
+    Obter conexão PostgreSQL com devolução garantida ao pool
+
+    Dentro de um request (ver ``PostgresLeaseMiddleware``) retorna a conexão do
+    request; fora dele, com o lease do request já encerrado ou em uso por outra
+    task, faz um lease avulso devolvido ao sair do bloco.
+
+    Args:
+        standalone: Sempre faz um lease avulso. Para caches consultados em
+            requests que depois aguardam serviços externos: a conexão do
+            request só volta ao pool quando o request termina.
+
+    Usage:
+        async with postgres_connection() as conn:
+            row = await conn.fetchrow("SELECT 1")
+    """
+    lease = None if standalone else _request_lease.get()
+    if lease is not None and not lease.closed and lease.claim():
+        try:
+            yield await lease.get_connection()
+        finally:
+            lease.unclaim()
+        return
+
+    conn = await _acquire_connection()
+    try:
+        yield conn
+    finally:
+        await _release_connection(conn)
+
+
+async def get_db_connection() -> AsyncIterator[asyncpg.Connection]:
+    """
+    Dependency FastAPI que injeta a conexão do request
+
+    Usage:
+        @router.get("/itens")
+        async def listar(conn: asyncpg.Connection = Depends(get_db_connection)):
+            ...
+    """
+    async with request_connection_scope():
+        async with postgres_connection() as conn:
+            yield conn
+
+
+class PostgresLeaseMiddleware:
+    """Middleware ASGI que abre um escopo de lease de conexão por request HTTP"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        async with request_connection_scope():
+            await self.app(scope, receive, send)
+
+
+def get_pool_stats() -> dict:
+    """Estatísticas do pool PostgreSQL (tamanho, ociosas, espera e latências)"""
+    stats = {
+        "enabled": settings.enable_postgres,
+        "initialized": postgres_pool is not None,
+        "min_size": settings.postgres_pool_min_size,
+        "max_size": settings.postgres_pool_max_size,
+        "size": 0,
+        "idle": 0,
+    }
+    if postgres_pool is not None:
+        stats["min_size"] = postgres_pool.get_min_size()
+        stats["max_size"] = postgres_pool.get_max_size()
+        stats["size"] = postgres_pool.get_size()
+        stats["idle"] = postgres_pool.get_idle_size()
+    stats.update(pool_metrics.snapshot())
+    return stats
 
 
 async def get_neo4j_session(database: str = None):
@@ -0,0 +1,270 @@
+"""
+SIGMA-PLI - Cliente HTTP compartilhado para APIs externas (aiohttp)
+
+Uma única `aiohttp.ClientSession`, criada no startup e fechada no shutdown,
+atende ViaCEP, ReceitaWS, IBGE e o keep-alive. O connector mantém conexões
+keep-alive por host (sem refazer TCP/TLS a cada consulta), limita conexões
+simultâneas por host e guarda as resoluções DNS em cache.
+
+    async with http_client.get("viacep", url) as response:
+        data = await response.json()
+
+Cada chamada informa o provedor, que define o timeout (settings
+`http_provider_timeouts`) e agrupa as métricas de latência e erros.
+Provedores em `circuit_breaker_providers` passam por um circuit breaker:
+com o circuito aberto a chamada levanta CircuitOpenError na hora.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+from app.circuit_breaker import CircuitBreaker
+from app.config import settings
+
+
+class ProviderStats:
+    """Contadores de um provedor externo"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.status: dict[int, int] = {}
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    def record(self, elapsed_ms: float):
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "status": dict(sorted(self.status.items())),
+            "avg_ms": round(self.total_ms / self.requests, 3) if self.requests else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_error": self.last_error,
+        }
+
+
+class SharedHTTPClient:
+    """Sessão aiohttp de longa duração com métricas por provedor"""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_seconds: float = 30.0,
+        dns_ttl_seconds: int = 300,
+        connect_timeout_seconds: float = 3.0,
+        default_timeout_seconds: float = 10.0,
+        provider_timeouts: Optional[dict[str, float]] = None,
+        breakers: Optional[dict[str, CircuitBreaker]] = None,
+    ):
+        """
+        Args:
+            limit: Conexões simultâneas no total
+            limit_per_host: Conexões simultâneas por host
+            keepalive_seconds: Tempo que uma conexão ociosa fica aberta
+            dns_ttl_seconds: Validade do cache de DNS
+            connect_timeout_seconds: Timeout de conexão (inclui espera por vaga)
+            default_timeout_seconds: Timeout total de provedores sem configuração
+            provider_timeouts: Timeout total por provedor
+            breakers: Circuit breaker por provedor (provedores ausentes não têm)
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_seconds = keepalive_seconds
+        self.dns_ttl_seconds = dns_ttl_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.default_timeout_seconds = default_timeout_seconds
+        self.provider_timeouts = dict(provider_timeouts or {})
+        self.breakers = dict(breakers or {})
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._providers: dict[str, ProviderStats] = {}
+        self.sessions_created = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "SharedHTTPClient":
+        return cls(
+            limit=settings.http_client_limit,
+            limit_per_host=settings.http_client_limit_per_host,
+            keepalive_seconds=settings.http_client_keepalive_seconds,
+            dns_ttl_seconds=settings.http_client_dns_ttl_seconds,
+            connect_timeout_seconds=settings.http_client_connect_timeout_seconds,
+            default_timeout_seconds=settings.http_client_timeout_seconds,
+            provider_timeouts=settings.http_provider_timeouts,
+            breakers={
+                name: CircuitBreaker(
+                    name,
+                    window_seconds=settings.circuit_breaker_window_seconds,
+                    min_requests=settings.circuit_breaker_min_requests,
+                    error_rate=settings.circuit_breaker_error_rate,
+                    slow_call_ms=settings.circuit_breaker_slow_call_ms,
+                    open_seconds=settings.circuit_breaker_open_seconds,
+                )
+                for name in settings.circuit_breaker_providers
+            },
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Sessão compartilhada (criada no primeiro uso se start() não rodou)"""
+        if self._session is None or self._session.closed:
+            self.start()
+        return self._session
+
+    def start(self):
+        """Cria a sessão (precisa de event loop ativo: chamar no startup)"""
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_seconds,
+            ttl_dns_cache=self.dns_ttl_seconds,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=self.default_timeout_seconds,
+                connect=self.connect_timeout_seconds,
+            ),
+            trace_configs=[self._trace_config()],
+        )
+        self.sessions_created += 1
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """Conta conexões novas x reaproveitadas e acertos do cache de DNS"""
+        trace = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, context, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, context, params):
+            self.dns_cache_misses += 1
+
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    async def close(self):
+        """Fecha a sessão e as conexões abertas (shutdown)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def timeout_for(self, provider: str) -> aiohttp.ClientTimeout:
+        total = self.provider_timeouts.get(provider, self.default_timeout_seconds)
+        return aiohttp.ClientTimeout(
+            total=total, connect=min(self.connect_timeout_seconds, total)
+        )
+
+    def provider(self, name: str) -> ProviderStats:
+        stats = self._providers.get(name)
+        if stats is None:
+            stats = self._providers[name] = ProviderStats(name)
+        return stats
+
+    @asynccontextmanager
+    async def request(
+        self, provider: str, method: str, url: str, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Executa uma requisição registrando latência, status e erros do provedor
+
+        A latência inclui a leitura do corpo feita dentro do bloco `async with`.
+
+        Raises:
+            CircuitOpenError: circuito do provedor aberto (sem chamada de rede)
+        """
+        stats = self.provider(provider)
+        breaker = self.breakers.get(provider)
+        if breaker is not None:
+            breaker.acquire()
+        kwargs.setdefault("timeout", self.timeout_for(provider))
+        ok: Optional[bool] = None
+        started = time.perf_counter()
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                stats.status[response.status] = stats.status.get(response.status, 0) + 1
+                ok = response.status < 500
+                yield response
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            stats.last_error = "timeout"
+            ok = False if ok is None else ok
+            raise
+        except Exception as e:
+            stats.errors += 1
+            stats.last_error = f"{type(e).__name__}: {e}"
+            ok = False if ok is None else ok
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats.record(elapsed_ms)
+            if breaker is not None:
+                breaker.record(ok, elapsed_ms)
+
+    def check_circuit(self, provider: str):
+        """Levanta CircuitOpenError se o circuito do provedor recusaria a chamada"""
+        breaker = self.breakers.get(provider)
+        if breaker is not None:
+            breaker.check()
+
+    def circuit_stats(self) -> dict:
+        return {name: breaker.stats() for name, breaker in sorted(self.breakers.items())}
+
+    def get(self, provider: str, url: str, **kwargs):
+        return self.request(provider, "GET", url, **kwargs)
+
+    def reset_stats(self):
+        self._providers.clear()
+        self.connections_created = self.connections_reused = 0
+        self.dns_cache_hits = self.dns_cache_misses = 0
+
+    def get_stats(self) -> dict:
+        return {
+            "active": self._session is not None and not self._session.closed,
+            "sessions_created": self.sessions_created,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "keepalive_seconds": self.keepalive_seconds,
+            "dns_ttl_seconds": self.dns_ttl_seconds,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+            "providers": {
+                name: stats.stats() for name, stats in sorted(self._providers.items())
+            },
+            "circuit_breakers": self.circuit_stats(),
+        }
+
+
+# Instância global (configurada pelas settings; sessão criada no startup)
+http_client = SharedHTTPClient.from_settings()
@@ -3,16 +3,31 @@ SIGMA-PLI - Sistema de Gestão de Metadados e Repositório Interativo
 Backend FastAPI - Aplicação Principal (apenas composição e bootstrap)
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 import uvicorn
 
-from app.database import init_db
+from app.database import init_db, close_db, PostgresLeaseMiddleware
 from app.routers import router
 from app.config import settings
+from app.security.password_hashing import (
+    PasswordHashingBusyError,
+    shutdown_password_hashing,
+)
+from app.http_client import http_client
 from app.services.service_keepalive import init_keepalive_service, get_keepalive_service
+from app.services.service_maintenance import (
+    init_maintenance_scheduler,
+    get_maintenance_scheduler,
+)
+from app.services.M01_auth.service_auth_audit import login_audit_sink
+from app.services.M01_auth.service_auth_maintenance import run_session_maintenance
+from app.services.M01_auth.service_pessoa_blind_index import backfill_blind_index
+from app.services.M01_auth.service_cep_cache import cep_cache
+from app.services.M01_auth.service_cnpj_lookup import cnpj_lookup
+from app.services.M01_auth.service_localidades_ibge import localidades_ibge
 
 
 app = FastAPI(
@@ -33,6 +48,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Lease de conexão PostgreSQL por request (uma conexão compartilhada pelos serviços)
+app.add_middleware(PostgresLeaseMiddleware)
+
 
 # Legacy PLI assets (images) - mount the original PLI-CADASTRO assets so templates
 # that reference /static/assets/* continue to work without copying binaries.
@@ -49,6 +67,16 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+# Backpressure do executor de hash de senhas
+@app.exception_handler(PasswordHashingBusyError)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Favicon
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
@@ -67,6 +95,33 @@ async def startup_event():
         print(f"⚠️ Aviso: Falha na inicialização do banco de dados: {e}")
         print("Continuando sem conexões de banco para desenvolvimento...")
 
+    # Cliente HTTP compartilhado (ViaCEP, ReceitaWS, IBGE, keep-alive)
+    http_client.start()
+
+    # Base offline de UFs/municípios do IBGE: snapshot local, aquecimento das UFs
+    # sem municípios e verificação periódica (snapshot de outro worker/vencimento)
+    localidades_ibge.load()
+    if settings.ibge_refresh_on_startup:
+        await localidades_ibge.warm_up(
+            settings.ibge_warmup_timeout_seconds, settings.ibge_warmup_concurrency
+        )
+        localidades_ibge.start(settings.ibge_refresh_check_minutes)
+
+    # Buffer de auditoria de login (gravação em lote)
+    if settings.enable_login_audit_buffer:
+        login_audit_sink.start()
+
+    # Agendador de manutenção (partições de sessões/tokens, índice cego, caches)
+    if settings.enable_maintenance_scheduler and settings.enable_postgres:
+        maintenance = init_maintenance_scheduler(
+            interval_minutes=settings.maintenance_interval_minutes
+        )
+        maintenance.register_job("sessoes_tokens", run_session_maintenance)
+        maintenance.register_job("pessoa_indice_cego", backfill_blind_index)
+        maintenance.register_job("cep_cache", cep_cache.purge_expired)
+        maintenance.register_job("cnpj_cache", cnpj_lookup.purge_expired)
+        maintenance.start()
+
     # Inicializar Keep-Alive se habilitado
     if settings.enable_keepalive and settings.keepalive_url:
         print(f"🔄 Inicializando Keep-Alive Service...")
@@ -86,6 +141,18 @@ async def shutdown_event():
     if keepalive:
         await keepalive.stop()
 
+    maintenance = get_maintenance_scheduler()
+    if maintenance:
+        await maintenance.stop()
+
+    # Gravar auditoria pendente antes de fechar o pool
+    await login_audit_sink.stop()
+
+    await localidades_ibge.stop()
+    await http_client.close()
+    shutdown_password_hashing()
+    await close_db()
+
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
@@ -9,7 +9,8 @@ from fastapi import Depends, HTTPException, status
 
 from app.dependencies import get_current_user
 from app.schemas.M01_auth.schema_auth import AuthenticatedUser
-from app.database import get_pg_pool
+from app.database import get_pg_pool, postgres_connection
+from app.utils.permission_cache import permission_cache
 
 
 class PermissionChecker:
@@ -18,7 +19,7 @@ class PermissionChecker:
     @staticmethod
     async def get_user_permission_level(usuario_id: UUID) -> Optional[int]:
         """
-        Busca o nivel_acesso do usuário no banco de dados
+        Busca o nivel_acesso do usuário (cache com TTL curto, depois banco de dados)
 
         Args:
             usuario_id: UUID do usuário
@@ -26,6 +27,14 @@ class PermissionChecker:
         Returns:
             nivel_acesso (1-5) ou None se não encontrado
         """
+        cached = permission_cache.get(usuario_id)
+        if cached is not None:
+            if not cached.ativo:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo"
+                )
+            return cached.nivel_acesso
+
         pool = await get_pg_pool()
         if not pool:
             raise HTTPException(
@@ -33,7 +42,7 @@ class PermissionChecker:
                 detail="Serviço de banco de dados indisponível",
             )
 
-        async with pool.acquire() as conn:
+        async with postgres_connection() as conn:
             row = await conn.fetchrow(
                 """
                 SELECT nivel_acesso, tipo_usuario, ativo
@@ -46,6 +55,8 @@ class PermissionChecker:
             if not row:
                 return None
 
+            permission_cache.set(usuario_id, row["nivel_acesso"], row["ativo"])
+
             if not row["ativo"]:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo"
@@ -53,6 +64,15 @@ class PermissionChecker:
 
             return row["nivel_acesso"]
 
+    @staticmethod
+    def invalidate_user(usuario_id: UUID) -> None:
+        """
+        Descarta o nível de acesso em cache do usuário
+
+        Deve ser chamado sempre que tipo_usuario ou ativo forem alterados.
+        """
+        permission_cache.invalidate(usuario_id)
+
     @staticmethod
     async def verify_permission(usuario_id: UUID, nivel_minimo: int) -> bool:
         """
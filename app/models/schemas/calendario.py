@@ -129,6 +129,9 @@ class EventosList(BaseModel):
     eventos: List[EventoResponse]
     total: int
     filtered: Optional[int] = None
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor da próxima página (None na última)"
+    )
 
     class Config:
         from_attributes = True
@@ -144,6 +147,13 @@ class EventoSearchParams(BaseModel):
     date_end: Optional[date_type] = None
     limit: int = Field(100, ge=1, le=500)
     offset: int = Field(0, ge=0)
+    cursor: Optional[str] = Field(
+        None, description="Continua após o último evento da página anterior (next_cursor)"
+    )
+
+    @property
+    def has_filters(self) -> bool:
+        return any([self.type, self.user, self.module, self.date_start, self.date_end])
 
     class Config:
         from_attributes = True
@@ -0,0 +1,165 @@
+"""
+SIGMA-PLI - Registro central de statements SQL (asyncpg)
+
+Cada statement é declarado uma única vez, no nível do módulo do serviço:
+
+    SESSION_BY_TOKEN = queries.register("auth.session_by_token", "SELECT ...")
+    row = await SESSION_BY_TOKEN.fetchrow(conn, token)
+
+O texto SQL é fixo, então o cache de statements do asyncpg (por conexão física)
+prepara cada statement uma vez, no primeiro uso em cada conexão do pool, e o
+reutiliza nos leases seguintes. O hook `init` do pool (`init_connection`)
+reinicia o controle de statements preparados de cada conexão nova e o descarta
+quando a conexão é fechada (reciclagem do pool ou falha).
+
+Os helpers retornam `Row` (asyncpg.Record com acesso por atributo), sem cópia
+para dict, e acumulam contagem, erros e latência por statement.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Generic, Optional, Type, TypeVar
+
+import asyncpg
+
+
+class Row(asyncpg.Record):
+    """Record com acesso por atributo (`row.username`) além de `row["username"]`"""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+R = TypeVar("R", bound=Row)
+
+
+class Statement(Generic[R]):
+    """Statement nomeado com métricas de execução"""
+
+    def __init__(self, registry: "QueryRegistry", name: str, sql: str, record_class: Type[R]):
+        self.registry = registry
+        self.name = name
+        self.sql = sql
+        self.record_class = record_class
+        self.calls = 0
+        self.errors = 0
+        self.prepares = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @asynccontextmanager
+    async def _measure(self, conn: asyncpg.Connection) -> AsyncIterator[None]:
+        self.registry.track_prepare(conn, self)
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.calls += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    async def fetchrow(self, conn: asyncpg.Connection, *args) -> Optional[R]:
+        async with self._measure(conn):
+            return await conn.fetchrow(self.sql, *args, record_class=self.record_class)
+
+    async def fetch(self, conn: asyncpg.Connection, *args) -> list[R]:
+        async with self._measure(conn):
+            return await conn.fetch(self.sql, *args, record_class=self.record_class)
+
+    async def fetchval(self, conn: asyncpg.Connection, *args) -> Any:
+        async with self._measure(conn):
+            return await conn.fetchval(self.sql, *args)
+
+    async def execute(self, conn: asyncpg.Connection, *args) -> str:
+        async with self._measure(conn):
+            return await conn.execute(self.sql, *args)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "prepares": self.prepares,
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "total_ms": round(self.total_ms, 3),
+        }
+
+
+class QueryRegistry:
+    """Registro de statements nomeados e controle de preparo por conexão"""
+
+    def __init__(self):
+        self._statements: dict[str, Statement] = {}
+        # pid do backend -> nomes dos statements já preparados naquela conexão
+        self._prepared: dict[int, set[str]] = {}
+        self.connections_initialized = 0
+
+    def register(
+        self, name: str, sql: str, record_class: Type[R] = Row
+    ) -> Statement[R]:
+        """Declara um statement (nomes duplicados são erro de programação)"""
+        if name in self._statements:
+            raise ValueError(f"Statement '{name}' já registrado")
+        statement = Statement(self, name, sql, record_class)
+        self._statements[name] = statement
+        return statement
+
+    def get(self, name: str) -> Statement:
+        return self._statements[name]
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    async def init_connection(self, conn: asyncpg.Connection) -> None:
+        """Hook `init` do pool: conexão física nova, nada preparado ainda"""
+        pid = conn.get_server_pid()
+        prepared: set[str] = set()
+        self._prepared[pid] = prepared
+        self.connections_initialized += 1
+
+        def forget(_conn: asyncpg.Connection) -> None:
+            # O pid pode já ter sido reutilizado por uma conexão nova
+            if self._prepared.get(pid) is prepared:
+                del self._prepared[pid]
+
+        conn.add_termination_listener(forget)
+
+    def track_prepare(self, conn: asyncpg.Connection, statement: Statement) -> None:
+        prepared = self._prepared.setdefault(conn.get_server_pid(), set())
+        if statement.name not in prepared:
+            prepared.add(statement.name)
+            statement.prepares += 1
+
+    def reset_stats(self) -> None:
+        for statement in self._statements.values():
+            statement.calls = statement.errors = statement.prepares = 0
+            statement.total_ms = statement.max_ms = 0.0
+        self._prepared.clear()
+        self.connections_initialized = 0
+
+    def stats(self) -> dict:
+        statements = sorted(
+            (s.stats() for s in self._statements.values()),
+            key=lambda s: s["total_ms"],
+            reverse=True,
+        )
+        return {
+            "registered": len(self._statements),
+            "connections_initialized": self.connections_initialized,
+            "connections_tracked": len(self._prepared),
+            "statements": statements,
+        }
+
+
+# Instância global
+queries = QueryRegistry()
@@ -11,6 +11,8 @@ import asyncio
 import time
 from datetime import datetime
 
+from app.http_client import http_client
+
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
@@ -455,6 +457,17 @@ async def check_services_health() -> Dict[str, Dict[str, Any]]:
             "last_check": datetime.now(),
         }
 
+    # Provedores externos: circuito aberto/semiaberto = degradado (respostas do cache)
+    for provider, circuit in http_client.circuit_stats().items():
+        services[provider] = {
+            "status": "healthy" if circuit["state"] == "closed" else "degraded",
+            "circuit": circuit["state"],
+            "failure_rate": circuit["failure_rate"],
+            "retry_after_seconds": circuit["retry_after_seconds"],
+            "transitions": circuit["transitions"],
+            "last_check": datetime.now(),
+        }
+
     return services
 
 
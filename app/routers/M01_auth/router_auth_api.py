@@ -12,7 +12,8 @@ from app.services.M01_auth.service_auth import AuthService
 from app.services.M01_auth.service_auth_user import UserService
 from app.services.M01_auth import service_auth_tokens
 from app.schemas.M01_auth.schema_auth import AuthenticatedUser
-from app.database import get_postgres_connection
+from app.database import postgres_connection
+from app.security.password_hashing import PasswordHashingBusyError
 
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Autenticação"])
@@ -263,7 +264,7 @@ async def register(request: RegisterRequest):
 
         return RegisterResponse(success=True, message=message)
 
-    except HTTPException:
+    except (HTTPException, PasswordHashingBusyError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -319,8 +320,7 @@ async def request_password_reset(request: PasswordResetRequest):
         token = secrets.token_urlsafe(32)
 
         # Salvar token no banco
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             # Invalidar tokens anteriores
             await service_auth_tokens.invalidate_previous_tokens(
                 conn, conta_id, "password_reset"
@@ -330,8 +330,6 @@ async def request_password_reset(request: PasswordResetRequest):
             await service_auth_tokens.create_recovery_token(
                 conn, conta_id, token, expires_hours=2
             )
-        finally:
-            await conn.close()
 
         # TODO: Enviar email com link de reset
         # O link seria: https://seu-dominio.com/auth/reset-password?token={token}
@@ -363,8 +361,7 @@ async def reset_password(request: PasswordResetConfirm):
     Returns:
         Confirmação de reset
     """
-    conn = await get_postgres_connection()
-    try:
+    async with postgres_connection() as conn:
         # Validar token
         token_data = await service_auth_tokens.fetch_valid_recovery_token(
             conn, request.token
@@ -379,7 +376,9 @@ async def reset_password(request: PasswordResetConfirm):
         conta_id = token_data["conta_usuario_id"]
 
         # Hash da nova senha
-        password_hash, salt = AuthService.hash_password(request.new_password)
+        password_hash, salt = await AuthService.hash_password_async(
+            request.new_password
+        )
 
         # Atualizar senha
         await UserService.update_password(conta_id, password_hash, salt)
@@ -388,8 +387,6 @@ async def reset_password(request: PasswordResetConfirm):
         await service_auth_tokens.mark_token_used(conn, token_data["id"])
 
         return MessageResponse(success=True, message="Senha alterada com sucesso")
-    finally:
-        await conn.close()
 
 
 @router.get("/verify-email", response_model=MessageResponse)
@@ -403,8 +400,7 @@ async def verify_email(token: str):
     Returns:
         Confirmação de verificação
     """
-    conn = await get_postgres_connection()
-    try:
+    async with postgres_connection() as conn:
         # Validar token
         token_data = await service_auth_tokens.fetch_valid_verification_token(
             conn, token
@@ -428,5 +424,3 @@ async def verify_email(token: str):
             success=True,
             message="Email verificado com sucesso! Você já pode fazer login.",
         )
-    finally:
-        await conn.close()
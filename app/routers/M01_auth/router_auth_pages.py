@@ -12,8 +12,12 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
 
+from app.database import postgres_connection
 from app.schemas.M01_auth.schema_auth import AuthenticatedUser
+from app.services.M01_auth import service_auth_sessions
 from app.utils.auth_session import require_authenticated_user
+from app.utils.auth_session_cache import session_cache
+from app.utils.auth_tokens import decode_token
 
 
 templates = Jinja2Templates(directory="templates")
@@ -89,6 +93,23 @@ async def recuperar_senha_page(request: Request):
 @router.get("/auth/logout")
 async def logout_page(request: Request) -> RedirectResponse:
     """Executa logout e redireciona para a página de login."""
+    token = request.cookies.get("auth_token")
+    if token:
+        try:
+            payload = decode_token(token)
+        except ValueError:
+            payload = {}
+        session_token = payload.get("stk")
+        if session_token:
+            session_cache.invalidate_token(session_token)
+            try:
+                async with postgres_connection() as conn:
+                    await service_auth_sessions.revoke_session_by_token(
+                        conn, session_token
+                    )
+            except Exception as exc:
+                print(f"⚠️ Falha ao revogar sessão no logout: {exc}")
+
     redirect = RedirectResponse(
         url="/auth/login",
         status_code=302,
@@ -4,9 +4,17 @@ Endpoints públicos para validação e consulta de dados.
 """
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
+import json
 import logging
+import math
+import re
+
+from app.config import settings
+from app.services.M01_auth.service_cnpj_lookup import cnpj_lookup
+from app.services.M01_auth.service_validacao_lote import validar_lote
 
 from app.services.M01_auth.service_external_apis import (
     CPFService,
@@ -64,6 +72,7 @@ class CEPConsultaResponse(BaseModel):
     complemento: Optional[str] = None
     erro: bool = False
     mensagem: Optional[str] = None
+    stale: bool = False  # dados vencidos do cache (ViaCEP indisponível)
 
 
 class CNPJValidationRequest(BaseModel):
@@ -90,9 +99,20 @@ class CNPJValidationResponse(BaseModel):
     cep: Optional[str] = None
     telefone: Optional[str] = None
     email: Optional[str] = None
+    pendente: bool = False
+    stale: bool = False  # dados vencidos do cache (ReceitaWS indisponível)
     mensagem: str
 
 
+class ValidacaoLoteRequest(BaseModel):
+    """Requisição de validação em lote (CPF, CNPJ ou CEP)"""
+
+    valores: List[str] = Field(..., min_length=1, description="Documentos com ou sem formatação")
+    consultar: bool = Field(
+        default=True, description="Consultar ViaCEP/ReceitaWS para os válidos"
+    )
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -143,6 +163,7 @@ async def consultar_cep(request: CEPConsultaRequest):
     - `uf`: Estado (sigla)
     - `complemento`: Informações adicionais
     - `erro`: True se CEP não encontrado
+    - `stale`: True se o ViaCEP está indisponível e os dados vieram do cache vencido
 
     Exemplo de requisição:
     ```json
@@ -163,7 +184,9 @@ async def consultar_cep(request: CEPConsultaRequest):
         # Se houve erro na consulta
         if resultado.get("erro"):
             return CEPConsultaResponse(
-                erro=True, mensagem=resultado.get("mensagem", "CEP não encontrado")
+                erro=True,
+                mensagem=resultado.get("mensagem", "CEP não encontrado"),
+                stale=resultado.get("stale", False),
             )
 
         # Sucesso na consulta
@@ -175,6 +198,7 @@ async def consultar_cep(request: CEPConsultaRequest):
             uf=resultado.get("uf"),
             complemento=resultado.get("complemento"),
             erro=False,
+            stale=resultado.get("stale", False),
         )
 
     except Exception as e:
@@ -242,6 +266,8 @@ async def validar_cnpj(request: CNPJValidationRequest):
             telefone=resultado.get("telefone"),
             email=resultado.get("email"),
             mensagem=resultado.get("mensagem", ""),
+            pendente=resultado.get("pendente", False),
+            stale=resultado.get("stale", False),
         )
 
     except Exception as e:
@@ -250,3 +276,116 @@ async def validar_cnpj(request: CNPJValidationRequest):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Erro ao validar CNPJ: {str(e)}",
         )
+
+
+def _resposta_pendente(cnpj_limpo: str) -> JSONResponse:
+    """202 Accepted com o endereço para acompanhar a consulta"""
+    fila = cnpj_lookup.queue_position()
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "valido": True,
+            "cnpj": cnpj_limpo,
+            "pendente": True,
+            "mensagem": "Consulta na fila da Receita. Acompanhe pelo endereço informado.",
+            "status_url": f"{router.prefix}/cnpj/consultas/{cnpj_limpo}",
+            **fila,
+        },
+        headers={"Retry-After": str(max(1, math.ceil(fila["espera_estimada_segundos"])))},
+    )
+
+
+@router.post(
+    "/cnpj/consultar",
+    response_model=CNPJValidationResponse,
+    responses={202: {"description": "Consulta na fila; acompanhar por status_url"}},
+)
+async def consultar_cnpj(request: CNPJValidationRequest):
+    """
+    Consulta um CNPJ na ReceitaWS pela fila com limite de taxa.
+
+    - `200`: resultado (do cache ou da Receita) dentro do tempo de espera
+    - `202 Accepted`: a fila excedeu `cnpj_lookup_wait_seconds`; a consulta
+      continua e o resultado é obtido em `status_url` (header `Retry-After`)
+
+    Consultas simultâneas do mesmo CNPJ compartilham a mesma requisição.
+    """
+    cnpj_limpo = re.sub(r"\D", "", request.cnpj)
+    if not CNPJService.validar_cnpj_formato(cnpj_limpo):
+        return CNPJValidationResponse(valido=False, mensagem="CNPJ inválido")
+
+    resultado = await cnpj_lookup.lookup(
+        cnpj_limpo, wait_seconds=settings.cnpj_lookup_wait_seconds
+    )
+    if resultado is None:
+        return _resposta_pendente(cnpj_limpo)
+    return CNPJValidationResponse(**CNPJService.resposta_consulta(cnpj_limpo, resultado))
+
+
+@router.get(
+    "/cnpj/consultas/{cnpj}",
+    response_model=CNPJValidationResponse,
+    responses={202: {"description": "Consulta ainda na fila"}},
+)
+async def acompanhar_consulta_cnpj(cnpj: str):
+    """
+    Acompanha uma consulta de CNPJ iniciada em `/cnpj/consultar`.
+
+    - `200`: resultado disponível
+    - `202`: ainda na fila
+    - `404`: nenhuma consulta em andamento ou resultado em cache
+    """
+    cnpj_limpo = re.sub(r"\D", "", cnpj)
+    situacao, resultado = await cnpj_lookup.poll(cnpj_limpo)
+    if situacao == "pendente":
+        return _resposta_pendente(cnpj_limpo)
+    if resultado is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhuma consulta deste CNPJ em andamento",
+        )
+    return CNPJValidationResponse(**CNPJService.resposta_consulta(cnpj_limpo, resultado))
+
+
+async def _ndjson_lote(tipo: str, payload: ValidacaoLoteRequest):
+    resumo: dict = {}
+    async for item in validar_lote(tipo, payload.valores, payload.consultar, resumo=resumo):
+        yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+    yield json.dumps({"resumo": resumo}) + "\n"
+
+
+@router.post(
+    "/{tipo}/validar-lote",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def validar_lote_documentos(
+    tipo: Literal["cpf", "cnpj", "cep"], payload: ValidacaoLoteRequest
+):
+    """
+    Valida até `validacao_lote_max_itens` CPFs, CNPJs ou CEPs numa requisição.
+
+    A resposta é NDJSON (uma linha JSON por documento), na ordem enviada,
+    transmitida à medida que os resultados ficam prontos:
+
+    ```
+    {"indice": 0, "valor": "01310-100", "documento": "01310100", "valido": true, "encontrado": true, "dados": {...}}
+    {"indice": 1, "valor": "123", "documento": "123", "valido": false, "mensagem": "CEP inválido"}
+    {"resumo": {"total": 2, "validos": 1, "invalidos": 1, ...}}
+    ```
+
+    - Dígitos verificadores são calculados localmente
+    - Com `consultar: true`, CEPs e CNPJs válidos são consultados (com cache e
+      concorrência limitada); CNPJs fora da janela de espera saem como
+      `pendente: true` e seguem na fila da ReceitaWS
+    """
+    if len(payload.valores) > settings.validacao_lote_max_itens:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.validacao_lote_max_itens} valores por requisição",
+        )
+    return StreamingResponse(
+        _ndjson_lote(tipo, payload),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Itens": str(len(payload.valores))},
+    )
@@ -4,15 +4,22 @@ Endpoints para obter UFs e Municípios via IBGE
 
 Endpoints:
 - GET /api/v1/localizacao/ufs - Lista todas as UFs
+- GET /api/v1/localizacao/municipios/buscar?q= - Autocompletar de municípios
 - GET /api/v1/localizacao/municipios/{uf} - Lista municípios de um UF
+
+UFs e listas de municípios saem com Cache-Control/ETag e respondem 304 a
+requisições condicionais; a versão da base IBGE em uso entra na chave do cache.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 import logging
 
+from app.config import settings
+from app.services.M01_auth.service_localidades_ibge import localidades_ibge
 from app.services.M01_auth.service_localizacao_br import LocalizacaoBRService
+from app.utils.http_cache import cache_response
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +41,23 @@ class MunicipioResponse(BaseModel):
     nome: str
 
 
+class MunicipioBuscaItem(BaseModel):
+    """Município encontrado na busca"""
+
+    id: int
+    nome: str
+    uf: str
+
+
+class MunicipioBuscaResponse(BaseModel):
+    """Resposta da busca de municípios por prefixo"""
+
+    q: str
+    uf: Optional[str] = None
+    total: int
+    municipios: List[MunicipioBuscaItem]
+
+
 class UFListResponse(BaseModel):
     """Resposta com lista de UFs"""
 
@@ -54,7 +78,12 @@ class MunicipioListResponse(BaseModel):
 # Endpoints
 
 
+def _versao_base() -> int:
+    return localidades_ibge.versao
+
+
 @router.get("/ufs", response_model=UFListResponse)
+@cache_response(settings.http_cache_localidades_max_age_seconds, versao=_versao_base)
 async def obter_ufs():
     """
     Retorna lista de todas as UFs brasileiras
@@ -91,7 +120,33 @@ async def obter_ufs():
         raise HTTPException(status_code=500, detail="Erro ao carregar UFs")
 
 
+@router.get("/municipios/buscar", response_model=MunicipioBuscaResponse)
+async def buscar_municipios(
+    q: str = Query(..., min_length=1, max_length=100, description="Início do nome"),
+    uf: Optional[str] = Query(None, min_length=2, max_length=2),
+    limite: int = Query(10, ge=1, le=50),
+):
+    """
+    Autocompletar de municípios (sem acento e sem diferenciar maiúsculas)
+
+    Casa o início do nome ou de qualquer palavra do nome: `sao jo` encontra
+    "São José dos Campos" e `campos` também. Usa a base offline do IBGE em
+    memória, sem baixar a lista inteira do UF.
+
+    Exemplo:
+        `GET /api/v1/localizacao/municipios/buscar?q=sao%20jo&uf=SP&limite=5`
+    """
+    municipios = LocalizacaoBRService.buscar_municipios(q, uf=uf, limite=limite)
+    return MunicipioBuscaResponse(
+        q=q,
+        uf=uf.upper() if uf else None,
+        total=len(municipios),
+        municipios=[MunicipioBuscaItem(**m) for m in municipios],
+    )
+
+
 @router.get("/municipios/{uf}", response_model=MunicipioListResponse)
+@cache_response(settings.http_cache_localidades_max_age_seconds, versao=_versao_base)
 async def obter_municipios(uf: str):
     """
     Retorna lista de municípios de um UF específico
@@ -3,7 +3,8 @@ SIGMA-PLI - M04: Calendário
 Router para gerenciamento de eventos do calendário
 """
 
-from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
 from datetime import date, datetime
@@ -20,7 +21,10 @@ from app.models.schemas.calendario import (
 from app.services.M04_calendario.service_calendario_eventos import (
     get_calendario_service,
 )
+from app.services.M04_calendario import service_calendario_ics as ics
+from app.config import settings
 from app.services.service_feriados import FeriadoService
+from app.utils.http_cache import cache_response, etag_match
 
 
 router = APIRouter()
@@ -63,6 +67,9 @@ async def get_all_eventos(
     date_end: Optional[date] = Query(None, description="Data final (YYYY-MM-DD)"),
     limit: int = Query(100, ge=1, le=500, description="Limite de resultados"),
     offset: int = Query(0, ge=0, description="Offset para paginação"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor da próxima página (next_cursor da resposta anterior)"
+    ),
 ):
     """
     Retorna lista de eventos do calendário com suporte a filtros e paginação.
@@ -74,18 +81,16 @@ async def get_all_eventos(
     - `date_start`: Data inicial para filtro de período
     - `date_end`: Data final para filtro de período
 
-    **Paginação:**
+    **Paginação (ordem por data, hora e id):**
     - `limit`: Máximo de eventos retornados (padrão: 100, máx: 500)
-    - `offset`: Posição inicial (padrão: 0)
+    - `cursor`: Continua após a página anterior (`next_cursor`; ausente na última página)
+    - `offset`: Posição inicial (padrão: 0); prefira `cursor` para percorrer a lista
+
+    `total` é o total de eventos cadastrados e `filtered` (com filtros) o total
+    que atende aos filtros, independente da página.
     """
     service = get_calendario_service()
 
-    # Se não há filtros, retorna todos
-    if not any([type, user, module, date_start, date_end]):
-        eventos = service.get_all_eventos()
-        return EventosList(eventos=eventos, total=len(eventos))
-
-    # Aplica filtros via search
     search_params = EventoSearchParams(
         type=type,
         user=user,
@@ -94,13 +99,20 @@ async def get_all_eventos(
         date_end=date_end,
         limit=limit,
         offset=offset,
+        cursor=cursor,
     )
 
-    eventos_filtered = service.search_eventos(search_params)
-    total_eventos = len(service.get_all_eventos())
+    try:
+        eventos, next_cursor = await service.page_eventos(search_params)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    total, filtrados = await service.count_eventos(search_params)
 
     return EventosList(
-        eventos=eventos_filtered, total=total_eventos, filtered=len(eventos_filtered)
+        eventos=eventos,
+        total=total,
+        filtered=filtrados if search_params.has_filters else None,
+        next_cursor=next_cursor,
     )
 
 
@@ -126,7 +138,7 @@ async def create_evento(evento: EventoCreate):
     service = get_calendario_service()
 
     try:
-        novo_evento = service.create_evento(evento)
+        novo_evento = await service.create_evento(evento)
         return novo_evento
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -149,7 +161,7 @@ async def get_evento_by_id(evento_id: str):
     **Formato do ID:** evt-{hash}-{timestamp}
     """
     service = get_calendario_service()
-    evento = service.get_evento_by_id(evento_id)
+    evento = await service.get_evento_by_id(evento_id)
 
     if not evento:
         raise HTTPException(
@@ -174,7 +186,7 @@ async def update_evento(evento_id: str, evento_update: EventoUpdate):
     service = get_calendario_service()
 
     try:
-        updated_evento = service.update_evento(evento_id, evento_update)
+        updated_evento = await service.update_evento(evento_id, evento_update)
 
         if not updated_evento:
             raise HTTPException(
@@ -207,7 +219,7 @@ async def delete_evento(evento_id: str):
     """
     service = get_calendario_service()
 
-    deleted = service.delete_evento(evento_id)
+    deleted = await service.delete_evento(evento_id)
 
     if not deleted:
         raise HTTPException(
@@ -235,7 +247,7 @@ async def get_eventos_by_date(target_date: date):
     **Formato da data:** YYYY-MM-DD
     """
     service = get_calendario_service()
-    eventos = service.get_eventos_by_date(target_date)
+    eventos = await service.get_eventos_by_date(target_date)
     return eventos
 
 
@@ -253,7 +265,7 @@ async def get_upcoming_eventos(
     Útil para notificações e alertas de eventos iminentes.
     """
     service = get_calendario_service()
-    eventos = service.get_upcoming_eventos(days)
+    eventos = await service.get_upcoming_eventos(days)
     return eventos
 
 
@@ -270,7 +282,7 @@ async def get_statistics():
     - `thisMonth`: Eventos no mês atual
     """
     service = get_calendario_service()
-    stats = service.get_statistics()
+    stats = await service.get_statistics()
     return stats
 
 
@@ -286,7 +298,7 @@ async def generate_share_link(evento_id: str):
     **Nota:** Implementação placeholder. Em produção, deve gerar token único e armazenar no banco.
     """
     service = get_calendario_service()
-    evento = service.get_evento_by_id(evento_id)
+    evento = await service.get_evento_by_id(evento_id)
 
     if not evento:
         raise HTTPException(
@@ -304,12 +316,53 @@ async def generate_share_link(evento_id: str):
     )
 
 
+@router.get("/api/v1/calendario/ics", tags=["Calendário"])
+async def calendario_ics(
+    request: Request,
+    type: Optional[EventType] = Query(None, description="Filtrar por tipo de evento"),
+    user: Optional[str] = Query(
+        None, description="Filtrar por responsável (busca parcial)"
+    ),
+    module: Optional[str] = Query(None, description="Filtrar por módulo"),
+    feriados: bool = Query(True, description="Incluir feriados (ano anterior, atual e próximo)"),
+):
+    """
+    Feed iCalendar (.ics) para assinatura no Outlook, Thunderbird e Google Agenda.
+
+    Aceita os mesmos filtros da listagem de eventos. O corpo é enviado em
+    partes (streaming) e o `ETag` acompanha a versão do calendário: clientes
+    que repetem o `If-None-Match` recebem 304 enquanto nada mudar.
+    """
+    service = get_calendario_service()
+    params = EventoSearchParams(type=type, user=user, module=module)
+    anos = ics.anos_feriados() if feriados else range(0)
+
+    etag = ics.etag_calendario(await service.versao_calendario(), params, feriados, anos)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.calendario_ics_max_age_seconds}",
+    }
+    if etag_match(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    headers["Content-Disposition"] = 'inline; filename="calendario-sigma-pli.ics"'
+    return StreamingResponse(
+        ics.gerar_ics(service, params, anos), media_type=ics.MEDIA_TYPE, headers=headers
+    )
+
+
 # ========================================
 # ENDPOINTS DE FERIADOS (ordem importante!)
 # ========================================
+# Feriados são calculados (não mudam): respostas com Cache-Control/ETag
+
+
+def _hoje() -> str:
+    return date.today().isoformat()
 
 
 @router.get("/api/v1/calendario/feriados/proximo", tags=["Calendário", "Feriados"])
+@cache_response(3600, versao=_hoje)
 async def get_proximo_feriado():
     """
     Retorna o próximo feriado a partir da data atual.
@@ -336,6 +389,7 @@ async def get_proximo_feriado():
 @router.get(
     "/api/v1/calendario/feriados/verificar/{data}", tags=["Calendário", "Feriados"]
 )
+@cache_response(settings.http_cache_feriados_max_age_seconds)
 async def verificar_feriado(data: str):
     """
     Verifica se uma data específica é feriado.
@@ -366,6 +420,7 @@ async def verificar_feriado(data: str):
 
 
 @router.get("/api/v1/calendario/feriados/{ano}", tags=["Calendário", "Feriados"])
+@cache_response(settings.http_cache_feriados_max_age_seconds)
 async def get_feriados_ano(ano: int):
     """
     Retorna todos os feriados de um ano específico.
@@ -394,6 +449,7 @@ async def get_feriados_ano(ano: int):
 
 
 @router.get("/api/v1/calendario/feriados/{ano}/{mes}", tags=["Calendário", "Feriados"])
+@cache_response(settings.http_cache_feriados_max_age_seconds)
 async def get_feriados_mes(ano: int, mes: int):
     """
     Retorna feriados de um mês específico.
@@ -420,3 +476,82 @@ async def get_feriados_mes(ano: int, mes: int):
             for f in feriados
         ],
     }
+
+
+# ========================================
+# ENDPOINTS DE DIAS ÚTEIS (prazos)
+# ========================================
+# Dias úteis: segunda a sexta, exceto feriados nacionais, SP e município de SP
+
+
+def _fora_do_calendario() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Data fora do intervalo suportado",
+    )
+
+
+@router.get("/api/v1/calendario/dias-uteis/contar", tags=["Calendário", "Feriados"])
+@cache_response(settings.http_cache_feriados_max_age_seconds)
+async def contar_dias_uteis(
+    inicio: date = Query(..., description="Data inicial (YYYY-MM-DD), inclusive"),
+    fim: date = Query(..., description="Data final (YYYY-MM-DD), inclusive"),
+):
+    """
+    Conta os dias úteis entre duas datas (inclusive).
+    """
+    if (fim - inicio).days > 366 * 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Intervalo máximo de 100 anos",
+        )
+
+    try:
+        dias_uteis = FeriadoService.dias_uteis_entre(inicio, fim)
+    except (ValueError, OverflowError):
+        raise _fora_do_calendario()
+
+    return {"inicio": inicio.isoformat(), "fim": fim.isoformat(), "dias_uteis": dias_uteis}
+
+
+@router.get("/api/v1/calendario/dias-uteis/adicionar", tags=["Calendário", "Feriados"])
+@cache_response(settings.http_cache_feriados_max_age_seconds)
+async def adicionar_dias_uteis(
+    data: date = Query(..., description="Data de referência (YYYY-MM-DD)"),
+    dias: int = Query(
+        ..., ge=-3650, le=3650, description="Dias úteis a somar (negativo: antes da data)"
+    ),
+):
+    """
+    Calcula o prazo de N dias úteis a partir de uma data.
+
+    A data de referência não conta; com `dias=0` retorna a própria data ou,
+    se ela não for dia útil, o próximo dia útil.
+    """
+    try:
+        resultado = FeriadoService.adicionar_dias_uteis(data, dias)
+    except (ValueError, OverflowError):
+        raise _fora_do_calendario()
+
+    return {
+        "data": data.isoformat(),
+        "dias": dias,
+        "resultado": resultado.isoformat(),
+    }
+
+
+@router.get("/api/v1/calendario/dias-uteis/proximo", tags=["Calendário", "Feriados"])
+@cache_response(3600, versao=_hoje)
+async def proximo_dia_util(
+    data: Optional[date] = Query(None, description="Data de referência (padrão: hoje)"),
+):
+    """
+    Retorna o primeiro dia útil depois da data de referência.
+    """
+    referencia = data or date.today()
+    try:
+        proximo = FeriadoService.proximo_dia_util(referencia)
+    except (ValueError, OverflowError):
+        raise _fora_do_calendario()
+
+    return {"data": referencia.isoformat(), "proximo_dia_util": proximo.isoformat()}
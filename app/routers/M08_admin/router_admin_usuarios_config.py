@@ -3,18 +3,33 @@ SIGMA-PLI - M08: Administração
 Router para gestão de usuários, hierarquia e configurações (PROTEGIDO COM PERMISSÕES)
 """
 
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel
 
 from app.middleware.auth_middleware import (
+    PermissionChecker,
     require_admin,
     require_admin_or_gestor,
     require_analista_or_above,
 )
 from app.schemas.M01_auth.schema_auth import AuthenticatedUser
-from app.database import get_pg_pool
+from app.security.password_hashing import password_hashing_executor
+from app.services.M01_auth.service_auth_audit import login_audit_sink
+from app.services.service_maintenance import get_maintenance_scheduler
+from app.services.M01_auth.service_pessoa_blind_index import match_by_blind_index
+from app.services.M01_auth.service_cep_cache import cep_cache
+from app.services.M01_auth.service_cnpj_lookup import cnpj_lookup
+from app.services.M01_auth.service_localidades_ibge import localidades_ibge
+from app.services.M04_calendario.service_calendario_ics import fragmentos_ics
+from app.utils.auth_session_cache import session_cache
+from app.utils.http_cache import response_cache
+from app.utils.permission_cache import permission_cache
+from app.config import settings
+from app.http_client import http_client
+from app.database import get_pg_pool, get_pool_stats, postgres_connection
+from app.query_registry import queries
 
 
 router = APIRouter(
@@ -57,6 +72,13 @@ class UpdateUserTypeRequest(BaseModel):
     tipo_usuario: str  # ADMIN, GESTOR, ANALISTA, OPERADOR, VISUALIZADOR
 
 
+class PessoaMatchRequest(BaseModel):
+    """Request de busca em lote por CPF/telefone (índice cego)"""
+
+    valores: List[str]
+    tipo: Literal["cpf", "telefone"] = "cpf"
+
+
 # =====================================================
 # ENDPOINTS - LISTAGEM E ESTATÍSTICAS (ANALISTA+)
 # =====================================================
@@ -109,7 +131,7 @@ async def listar_usuarios_hierarquia(
 
     where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
-    async with pool.acquire() as conn:
+    async with postgres_connection() as conn:
         rows = await conn.fetch(
             f"""
             SELECT * FROM usuarios.v_usuarios_hierarquia
@@ -156,7 +178,7 @@ async def estatisticas_usuarios(
             detail="Serviço de banco de dados indisponível",
         )
 
-    async with pool.acquire() as conn:
+    async with postgres_connection() as conn:
         rows = await conn.fetch("SELECT * FROM usuarios.v_estatisticas_tipo_usuario")
 
         return [
@@ -214,7 +236,7 @@ async def atualizar_tipo_usuario(
             detail=f"Tipo de usuário inválido. Use: {', '.join(tipos_validos)}",
         )
 
-    async with pool.acquire() as conn:
+    async with postgres_connection() as conn:
         # Verificar se usuário existe
         usuario_existe = await conn.fetchrow(
             "SELECT id, username FROM usuarios.usuario WHERE id = $1", usuario_id
@@ -238,6 +260,7 @@ async def atualizar_tipo_usuario(
             data.tipo_usuario,
             usuario_id,
         )
+        PermissionChecker.invalidate_user(usuario_id)
 
         # Buscar descrição
         descricao = {
@@ -283,7 +306,7 @@ async def deletar_usuario(
             detail="Serviço de banco de dados indisponível",
         )
 
-    async with pool.acquire() as conn:
+    async with postgres_connection() as conn:
         # Verificar se usuário existe
         usuario = await conn.fetchrow(
             "SELECT id, username FROM usuarios.usuario WHERE id = $1", usuario_id
@@ -298,6 +321,8 @@ async def deletar_usuario(
         await conn.execute(
             "UPDATE usuarios.usuario SET ativo = false WHERE id = $1", usuario_id
         )
+        PermissionChecker.invalidate_user(usuario_id)
+        session_cache.invalidate_account(usuario_id)
 
         return {
             "message": f"Usuário '{usuario['username']}' desativado com sucesso",
@@ -321,7 +346,7 @@ async def reativar_usuario(
             detail="Serviço de banco de dados indisponível",
         )
 
-    async with pool.acquire() as conn:
+    async with postgres_connection() as conn:
         # Verificar se usuário existe
         usuario = await conn.fetchrow(
             "SELECT id, username FROM usuarios.usuario WHERE id = $1", usuario_id
@@ -336,6 +361,7 @@ async def reativar_usuario(
         await conn.execute(
             "UPDATE usuarios.usuario SET ativo = true WHERE id = $1", usuario_id
         )
+        PermissionChecker.invalidate_user(usuario_id)
 
         return {
             "message": f"Usuário '{usuario['username']}' reativado com sucesso",
@@ -343,6 +369,249 @@ async def reativar_usuario(
         }
 
 
+# =====================================================
+# ENDPOINTS - MONITORAMENTO (ADMIN ONLY)
+# =====================================================
+
+
+@router.get("/database/pool", summary="Estatísticas do pool PostgreSQL")
+async def estatisticas_pool_postgres(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna tamanho, conexões ociosas, requisições aguardando conexão,
+    latência de acquire e duração dos leases do pool PostgreSQL
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return get_pool_stats()
+
+
+@router.get("/database/statements", summary="Estatísticas dos statements SQL")
+async def estatisticas_statements(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna execuções, preparos por conexão e latência de cada statement
+    registrado (ordenado pelo tempo total)
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return queries.stats()
+
+
+@router.get("/auth/session-cache", summary="Estatísticas do cache de sessões")
+async def estatisticas_cache_sessoes(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna entradas, hits, misses e invalidações do cache de sessões
+    autenticadas deste worker
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return session_cache.stats()
+
+
+@router.get("/auth/permission-cache", summary="Estatísticas do cache de permissões")
+async def estatisticas_cache_permissoes(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna entradas, hits, misses e invalidações do cache de níveis de acesso
+    deste worker
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return permission_cache.stats()
+
+
+@router.get("/auth/password-hashing", summary="Estatísticas do executor de hash")
+async def estatisticas_hash_senhas(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna esquema configurado, fila e latência do executor de hash de senhas
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return password_hashing_executor.get_stats()
+
+
+@router.get("/auth/login-audit", summary="Estatísticas do buffer de auditoria de login")
+async def estatisticas_auditoria_login(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna fila, lotes gravados e registros descartados da auditoria de login
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return login_audit_sink.get_stats()
+
+
+@router.get("/external-apis", summary="Estatísticas do cliente HTTP de APIs externas")
+async def estatisticas_apis_externas(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna conexões criadas/reaproveitadas, cache de DNS e, por provedor
+    (ViaCEP, ReceitaWS, IBGE, keep-alive), requisições, status, erros,
+    timeouts e latência
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return http_client.get_stats()
+
+
+@router.get("/cache/cep", summary="Estatísticas do cache de CEP")
+async def estatisticas_cache_cep(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna acertos em memória e no armazenamento persistente, misses,
+    gravações e falhas do cache de CEP deste worker
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return cep_cache.stats()
+
+
+@router.get("/cache/http", summary="Estatísticas do cache HTTP de dados de referência")
+async def estatisticas_cache_http(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna entradas, bytes, acertos e respostas 304 do cache de respostas
+    serializadas (localidades e feriados) deste worker
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return response_cache.stats()
+
+
+@router.get("/cache/ics", summary="Estatísticas do cache do feed iCalendar")
+async def estatisticas_cache_ics(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna entradas, acertos e invalidações do cache de VEVENTs renderizados
+    do feed /api/v1/calendario/ics deste worker
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return fragmentos_ics.stats()
+
+
+@router.get("/external-apis/cnpj", summary="Estatísticas das consultas de CNPJ")
+async def estatisticas_consultas_cnpj(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna acertos de cache, consultas agrupadas (single-flight), chamadas à
+    ReceitaWS, respostas 429 e a fila do limitador de taxa
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return cnpj_lookup.stats()
+
+
+@router.get("/localidades", summary="Estado da base offline de localidades do IBGE")
+async def estatisticas_localidades(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna a origem da base de UFs/municípios em uso (local, empacotada ou
+    IBGE), data de extração, UFs obtidas ao vivo e a atualização em segundo plano
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    return localidades_ibge.stats()
+
+
+@router.post("/localidades/atualizar", summary="Atualiza a base de localidades do IBGE")
+async def atualizar_localidades(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Baixa UFs e municípios da API do IBGE e troca a base em uso
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    resultado = await localidades_ibge.refresh()
+    if not resultado["atualizado"]:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"IBGE indisponível: {resultado['erro']}",
+        )
+    return resultado
+
+
+@router.get("/maintenance", summary="Estatísticas do agendador de manutenção")
+async def estatisticas_manutencao(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Retorna execuções, linhas removidas e duração das tarefas de manutenção
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    scheduler = get_maintenance_scheduler()
+    if not scheduler:
+        return {"is_running": False, "message": "Agendador de manutenção não inicializado"}
+    return scheduler.get_stats()
+
+
+@router.post("/maintenance/run", summary="Executar manutenção agora")
+async def executar_manutencao(
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Executa imediatamente todas as tarefas de manutenção registradas
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    scheduler = get_maintenance_scheduler()
+    if not scheduler:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Agendador de manutenção não inicializado",
+        )
+    await scheduler.run_all()
+    return scheduler.get_stats()
+
+
+# =====================================================
+# ENDPOINTS - DEDUPLICAÇÃO DE PESSOAS (ADMIN)
+# =====================================================
+
+
+@router.post("/pessoas/match", summary="Buscar pessoas em lote por CPF/telefone")
+async def buscar_pessoas_em_lote(
+    payload: PessoaMatchRequest,
+    current_user: AuthenticatedUser = Depends(require_admin),
+):
+    """
+    Localiza em cadastro.pessoa milhares de CPFs (ou telefones) de uma vez,
+    pelo índice cego, sem descriptografar. Usado para deduplicar importações
+    de bases legadas.
+
+    Retorna, por posição na lista enviada, as pessoas encontradas, além dos
+    valores inválidos e não encontrados.
+
+    **Permissão requerida:** ADMIN (nível 5)
+    """
+    if len(payload.valores) > settings.blind_index_match_max:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.blind_index_match_max} valores por requisição",
+        )
+    try:
+        return await match_by_blind_index(payload.valores, payload.tipo)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+
 # =====================================================
 # ENDPOINT DE STATUS (PÚBLICO PARA TESTES)
 # =====================================================
@@ -366,6 +635,17 @@ async def admin_status():
             "Atualização de tipo de usuário (com cálculo automático de nível)",
             "Soft delete de usuários (apenas ADMIN)",
             "Reativação de usuários (apenas ADMIN)",
+            "Estatísticas do pool PostgreSQL e dos statements SQL (apenas ADMIN)",
+            "Estatísticas dos caches de sessões e permissões (apenas ADMIN)",
+            "Estatísticas do buffer de auditoria de login (apenas ADMIN)",
+            "Agendador de manutenção de sessões/tokens (apenas ADMIN)",
+            "Estatísticas das APIs externas por provedor (apenas ADMIN)",
+            "Estatísticas do cache de CEP (apenas ADMIN)",
+            "Estatísticas do cache HTTP de localidades/feriados (apenas ADMIN)",
+            "Estatísticas do cache do feed iCalendar do calendário (apenas ADMIN)",
+            "Estatísticas da fila de consultas de CNPJ (apenas ADMIN)",
+            "Base offline de localidades do IBGE e atualização (apenas ADMIN)",
+            "Busca em lote de pessoas por CPF/telefone via índice cego (apenas ADMIN)",
         ],
         "permissions": {
             "ADMIN": "Nível 5 - Acesso total",
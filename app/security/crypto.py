@@ -5,11 +5,59 @@ Envelope Encryption para dados sensíveis (CPF, Telefone, CNPJ)
 
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from concurrent.futures import Executor
+from functools import lru_cache
 import hashlib
+import hmac
 import base64
 import os
-from typing import Tuple
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+KDF_SALT = b"sigma-pli-2025"  # Salt fixo (em produção, considerar rotação)
+KDF_ITERATIONS = 100000
+
+# Tokens de versões > 1 são gravados como "v<versão>:<token Fernet>".
+# Tokens sem prefixo são da versão 1 (formato original).
+_VERSION_PREFIX = re.compile(r"^v(\d+):")
+_BATCH_CHUNK_SIZE = 2048
+
+# Domínio da chave do índice cego quando derivada da chave mestra. A derivação
+# usa sempre a versão 1 da chave: rotações não alteram os índices gravados
+_BLIND_INDEX_CONTEXT = b"sigma-pli-blind-index"
+_BLIND_INDEX_KEY_VERSION = 1
+BLIND_INDEX_KINDS = ("cpf", "telefone", "cnpj")
+
+
+@lru_cache(maxsize=16)
+def _derive_fernet_key(master_key: str) -> bytes:
+    """Deriva a chave Fernet da chave mestra (PBKDF2, uma vez por chave)"""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=KDF_SALT,
+        iterations=KDF_ITERATIONS,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(master_key.encode()))
+
+
+def normalize_digits(value: Optional[str]) -> Optional[str]:
+    """Mantém apenas dígitos ASCII (None se não sobrar nenhum)"""
+    if value is None:
+        return None
+    digits = re.sub(r"[^0-9]", "", value)
+    return digits or None
+
+
+def _load_previous_keys() -> Dict[int, str]:
+    """Chaves antigas do ambiente: MASTER_KEY_V1, MASTER_KEY_V2, ..."""
+    keys = {}
+    for name, value in os.environ.items():
+        match = re.fullmatch(r"MASTER_KEY_V(\d+)", name)
+        if match and value:
+            keys[int(match.group(1))] = value
+    return keys
 
 
 class CryptographyManager:
@@ -18,14 +66,33 @@ class CryptographyManager:
 
     Padrão: Fernet (AES 128 em modo CBC)
     Hash: SHA256 para buscas sem descriptografar
+    Índice cego: HMAC-SHA256 com chave própria (colunas *_bidx), para buscas
+    e deduplicação sem descriptografar e sem hash reversível por dicionário
+
+    A derivação PBKDF2 roda uma vez por chave mestra; o Fernet resultante fica
+    em memória. Várias versões de chave podem coexistir: cifra sempre com a
+    versão atual e decifra qualquer versão conhecida (rotação sem re-derivar
+    por linha).
     """
 
-    def __init__(self, master_key: str = None):
+    def __init__(
+        self,
+        master_key: str = None,
+        key_version: int = None,
+        previous_keys: Optional[Dict[int, str]] = None,
+        blind_index_key: str = None,
+    ):
         """
         Inicializa com chave mestra.
 
         Args:
             master_key: Chave mestra (sensível). Se None, tenta carregar de env.
+            key_version: Versão da chave mestra (env MASTER_KEY_VERSION, padrão 1)
+            previous_keys: Chaves antigas por versão (env MASTER_KEY_V<n>)
+            blind_index_key: Chave do índice cego (env BLIND_INDEX_KEY). Se
+                ausente, é derivada da chave mestra da versão 1 (nunca da atual),
+                que então precisa estar disponível. Precisa ser estável:
+                trocá-la exige recalcular as colunas *_bidx (backfill)
         """
         if master_key is None:
             master_key = os.getenv("MASTER_KEY", "")
@@ -34,20 +101,58 @@ class CryptographyManager:
                     "MASTER_KEY não configurada. "
                     "Configure em .env ou passe como argumento."
                 )
+            if previous_keys is None:
+                previous_keys = _load_previous_keys()
+
+        if key_version is None:
+            key_version = int(os.getenv("MASTER_KEY_VERSION", "1"))
 
         self.master_key = master_key
+        self.key_version = key_version
+        self._keys: Dict[int, str] = dict(previous_keys or {})
+        self._keys[key_version] = master_key
+        self._fernets: Dict[int, Fernet] = {}
 
-    def _derive_key(self) -> bytes:
-        """Deriva chave criptográfica da chave mestra usando PBKDF2"""
-        salt = b"sigma-pli-2025"  # Salt fixo (em produção, considerar rotação)
-        kdf = PBKDF2(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(self.master_key.encode()))
-        return key
+        if blind_index_key is None:
+            blind_index_key = os.getenv("BLIND_INDEX_KEY", "")
+        if blind_index_key:
+            self._blind_index_key = blind_index_key.encode()
+        elif _BLIND_INDEX_KEY_VERSION in self._keys:
+            self._blind_index_key = hmac.new(
+                self._keys[_BLIND_INDEX_KEY_VERSION].encode(),
+                _BLIND_INDEX_CONTEXT,
+                hashlib.sha256,
+            ).digest()
+        else:
+            raise ValueError(
+                "BLIND_INDEX_KEY não configurada e MASTER_KEY_V1 ausente. "
+                "Configure uma delas para manter os índices cegos estáveis."
+            )
+
+    def __getstate__(self):
+        # Fernets não vão para os workers de processo; são recriados lá
+        state = self.__dict__.copy()
+        state["_fernets"] = {}
+        return state
+
+    def _derive_key(self, version: int = None) -> bytes:
+        """Chave Fernet derivada da chave mestra da versão (cacheada)"""
+        return _derive_fernet_key(self._keys[version or self.key_version])
+
+    def _fernet(self, version: int) -> Fernet:
+        fernet = self._fernets.get(version)
+        if fernet is None:
+            if version not in self._keys:
+                raise ValueError(f"Versão de chave desconhecida: {version}")
+            fernet = Fernet(self._derive_key(version))
+            self._fernets[version] = fernet
+        return fernet
+
+    @staticmethod
+    def token_version(encrypted_data: str) -> int:
+        """Versão da chave usada num token"""
+        match = _VERSION_PREFIX.match(encrypted_data)
+        return int(match.group(1)) if match else 1
 
     def encrypt(self, data: str) -> str:
         """
@@ -60,12 +165,12 @@ class CryptographyManager:
             Dados criptografados em base64
         """
         try:
-            key = self._derive_key()
-            cipher = Fernet(key)
-            encrypted = cipher.encrypt(data.encode())
-            return encrypted.decode()
+            token = self._fernet(self.key_version).encrypt(data.encode()).decode()
         except Exception as e:
             raise ValueError(f"Erro ao criptografar: {e}")
+        if self.key_version == 1:
+            return token
+        return f"v{self.key_version}:{token}"
 
     def decrypt(self, encrypted_data: str) -> str:
         """
@@ -80,13 +185,23 @@ class CryptographyManager:
             Dados descriptografados
         """
         try:
-            key = self._derive_key()
-            cipher = Fernet(key)
-            decrypted = cipher.decrypt(encrypted_data.encode())
+            version = self.token_version(encrypted_data)
+            token = _VERSION_PREFIX.sub("", encrypted_data, count=1)
+            decrypted = self._fernet(version).decrypt(token.encode())
             return decrypted.decode()
         except Exception as e:
             raise ValueError(f"Erro ao descriptografar: {e}")
 
+    def needs_rotation(self, encrypted_data: str) -> bool:
+        """Indica se o token foi cifrado com versão diferente da atual"""
+        return self.token_version(encrypted_data) != self.key_version
+
+    def rotate(self, encrypted_data: str) -> str:
+        """Recifra o token com a versão atual (sem efeito se já estiver nela)"""
+        if not self.needs_rotation(encrypted_data):
+            return encrypted_data
+        return self.encrypt(self.decrypt(encrypted_data))
+
     def hash_data(self, data: str) -> str:
         """
         Gera hash SHA256 para buscas rápidas sem descriptografar.
@@ -126,6 +241,92 @@ class CryptographyManager:
         """
         return self.hash_data(data) == hash_value
 
+    def blind_index(self, data: Optional[str], kind: str) -> Optional[bytes]:
+        """
+        Índice cego (HMAC-SHA256) de um documento, para busca por igualdade.
+
+        O valor é normalizado para dígitos, então "123.456.789-00" e
+        "12345678900" geram o mesmo índice. `kind` separa os domínios: o mesmo
+        número como CPF e como telefone gera índices diferentes.
+
+        Args:
+            data: Valor em texto plano (ex: CPF)
+            kind: "cpf", "telefone" ou "cnpj"
+
+        Returns:
+            32 bytes (coluna bytea) ou None se o valor for vazio
+        """
+        if kind not in BLIND_INDEX_KINDS:
+            raise ValueError(f"Tipo de índice cego desconhecido: {kind}")
+        digits = normalize_digits(data)
+        if digits is None:
+            return None
+        message = f"{kind}:{digits}".encode()
+        return hmac.new(self._blind_index_key, message, hashlib.sha256).digest()
+
+    def blind_index_many(
+        self, values: Iterable[Optional[str]], kind: str
+    ) -> List[Optional[bytes]]:
+        """Índices cegos de vários valores, na ordem de entrada"""
+        return [self.blind_index(v, kind) for v in values]
+
+    # =====================================================
+    # LOTES (migrações, importações)
+    # =====================================================
+
+    def _encrypt_chunk(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        return [None if v is None else self.encrypt(v) for v in values]
+
+    def _decrypt_chunk(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        return [None if v is None else self.decrypt(v) for v in values]
+
+    def _encrypt_and_hash_chunk(
+        self, values: Sequence[Optional[str]]
+    ) -> List[Optional[Tuple[str, str]]]:
+        return [None if v is None else self.encrypt_and_hash(v) for v in values]
+
+    def _run_batch(self, func, values: Iterable[Optional[str]], executor: Optional[Executor]):
+        values = list(values)
+        if executor is None or len(values) <= _BATCH_CHUNK_SIZE:
+            return func(values)
+
+        chunks = [
+            values[i : i + _BATCH_CHUNK_SIZE]
+            for i in range(0, len(values), _BATCH_CHUNK_SIZE)
+        ]
+        results = []
+        for chunk_result in executor.map(func, chunks):
+            results.extend(chunk_result)
+        return results
+
+    def encrypt_many(
+        self, values: Iterable[Optional[str]], executor: Optional[Executor] = None
+    ) -> List[Optional[str]]:
+        """
+        Criptografa vários valores (None é preservado), na ordem de entrada.
+
+        Args:
+            values: Valores em texto plano
+            executor: Pool opcional (Thread/ProcessPoolExecutor) para dividir
+                o lote em blocos
+
+        Returns:
+            Lista de tokens
+        """
+        return self._run_batch(self._encrypt_chunk, values, executor)
+
+    def decrypt_many(
+        self, values: Iterable[Optional[str]], executor: Optional[Executor] = None
+    ) -> List[Optional[str]]:
+        """Descriptografa vários tokens (qualquer versão de chave conhecida)"""
+        return self._run_batch(self._decrypt_chunk, values, executor)
+
+    def encrypt_and_hash_many(
+        self, values: Iterable[Optional[str]], executor: Optional[Executor] = None
+    ) -> List[Optional[Tuple[str, str]]]:
+        """Criptografa e gera hash de vários valores: [(token, hash) | None]"""
+        return self._run_batch(self._encrypt_and_hash_chunk, values, executor)
+
 
 # Instância global (será inicializada na startup da app)
 _crypto_manager = None
@@ -0,0 +1,206 @@
+"""
+SIGMA-PLI - Executor de Hash de Senhas
+Executa PBKDF2/bcrypt fora do event loop, com fila limitada e backpressure
+"""
+
+import asyncio
+import hashlib
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from app.config import settings
+from app.services.M01_auth import service_auth_security
+
+T = TypeVar("T")
+
+SCHEME_PBKDF2 = "pbkdf2_sha256"
+SCHEME_BCRYPT = "bcrypt"
+PBKDF2_ITERATIONS = 100000
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Fila do executor de hash cheia (deve virar HTTP 503)"""
+
+
+# =====================================================
+# IMPLEMENTAÇÕES SÍNCRONAS (executadas nas threads do pool)
+# =====================================================
+
+
+def pbkdf2_hash(password: str, salt: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Hash PBKDF2-SHA256 no formato legado (hash hex + salt separado)
+
+    Returns:
+        tuple (password_hash, salt)
+    """
+    if not salt:
+        salt = secrets.token_hex(16)
+
+    password_hash = hashlib.pbkdf2_hmac(
+        "sha256",
+        password.encode("utf-8"),
+        salt.encode("utf-8"),
+        PBKDF2_ITERATIONS,
+    ).hex()
+
+    return password_hash, salt
+
+
+def detect_scheme(password_hash: Optional[str], salt: Optional[str]) -> Optional[str]:
+    """Identifica o esquema de um hash armazenado"""
+    if not password_hash:
+        return None
+    if password_hash.startswith("$2"):
+        return SCHEME_BCRYPT
+    if salt:
+        return SCHEME_PBKDF2
+    return None
+
+
+def hash_password_sync(
+    password: str, scheme: Optional[str] = None
+) -> Tuple[str, Optional[str]]:
+    """
+    Gera hash no esquema configurado
+
+    Returns:
+        tuple (password_hash, salt) - salt é None para bcrypt
+    """
+    scheme = scheme or settings.password_hash_scheme
+    if scheme == SCHEME_BCRYPT:
+        return service_auth_security.hash_password(password), None
+    return pbkdf2_hash(password)
+
+
+def verify_password_sync(
+    password: str, password_hash: Optional[str], salt: Optional[str]
+) -> bool:
+    """Verifica senha contra hash armazenado em qualquer esquema suportado"""
+    scheme = detect_scheme(password_hash, salt)
+    if scheme == SCHEME_BCRYPT:
+        return service_auth_security.verify_password(password, password_hash)
+    if scheme == SCHEME_PBKDF2:
+        computed_hash, _ = pbkdf2_hash(password, salt)
+        return secrets.compare_digest(computed_hash, password_hash)
+    return False
+
+
+def needs_rehash(password_hash: Optional[str], salt: Optional[str]) -> bool:
+    """Indica se o hash armazenado está em esquema diferente do configurado"""
+    scheme = detect_scheme(password_hash, salt)
+    return scheme is not None and scheme != settings.password_hash_scheme
+
+
+# =====================================================
+# EXECUTOR
+# =====================================================
+
+
+class PasswordHashingExecutor:
+    """
+    Pool de threads dedicado ao hash de senhas.
+
+    hashlib.pbkdf2_hmac e bcrypt liberam o GIL durante o cálculo, então as
+    threads rodam em paralelo sem bloquear o event loop. O número de tarefas
+    pendentes (em execução + na fila) é limitado: acima do limite a chamada
+    falha imediatamente com PasswordHashingBusyError.
+
+    A pendência só é liberada quando a tarefa termina na thread (ou é
+    cancelada antes de começar), não quando quem aguarda é cancelado: um
+    cliente que desconecta não abre vaga enquanto o hash ainda ocupa o pool.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Executa `func(*args)` no pool respeitando o limite de pendências"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashingBusyError(
+                    "Serviço de autenticação sobrecarregado. Tente novamente em instantes."
+                )
+            self.pending += 1
+
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._finish(started)
+            raise
+        future.add_done_callback(lambda _: self._finish(started))
+        return await asyncio.wrap_future(future)
+
+    def _finish(self, started: float):
+        """Libera a pendência (callback do future, na thread que o concluiu)"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> dict:
+        return {
+            "scheme": settings.password_hash_scheme,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.completed, 3) if self.completed else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+# Instância global
+password_hashing_executor = PasswordHashingExecutor(
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
+
+
+async def hash_password_async(
+    password: str, scheme: Optional[str] = None
+) -> Tuple[str, Optional[str]]:
+    """Versão assíncrona de hash_password_sync (fora do event loop)"""
+    return await password_hashing_executor.run(hash_password_sync, password, scheme)
+
+
+async def verify_password_async(
+    password: str, password_hash: Optional[str], salt: Optional[str]
+) -> bool:
+    """Versão assíncrona de verify_password_sync (fora do event loop)"""
+    return await password_hashing_executor.run(
+        verify_password_sync, password, password_hash, salt
+    )
+
+
+def shutdown_password_hashing():
+    """Encerra as threads do executor (shutdown da aplicação)"""
+    password_hashing_executor.shutdown()
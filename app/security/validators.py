@@ -1,10 +1,31 @@
 """
 SIGMA-PLI - Validadores de Dados Sensíveis
 Validação de CPF, CNPJ e Telefone
+
+Módulo único de validação de documentos: API escalar (validar_cpf,
+validar_cnpj) para formulários e schemas, e caminho vetorizado com NumPy
+(validar_cpfs, validar_cnpjs) para importações em lote: os dígitos viram uma
+matriz uint8, os verificadores saem de um produto com o vetor de pesos e a
+comparação é feita de uma vez para todas as linhas. Os dois caminhos
+consideram apenas dígitos ASCII (outros dígitos Unicode são descartados).
 """
 
 import re
-from typing import Optional
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+# Pesos do Módulo 11 (o segundo dígito inclui o primeiro verificador)
+PESOS_CPF_DV1 = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_CPF_DV2 = (11, 10, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_CNPJ_DV1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_CNPJ_DV2 = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+
+def _digito_verificador(digitos: str, pesos: Sequence[int]) -> int:
+    """Dígito verificador Módulo 11 sobre os primeiros len(pesos) dígitos"""
+    resto = sum(int(d) * p for d, p in zip(digitos, pesos)) % 11
+    return 0 if resto < 2 else 11 - resto
 
 
 def validar_cpf(cpf: str) -> bool:
@@ -18,7 +39,7 @@ def validar_cpf(cpf: str) -> bool:
         True se CPF válido, False caso contrário
     """
     # Remover formatação
-    cpf = re.sub(r"\D", "", cpf)
+    cpf = re.sub(r"[^0-9]", "", cpf)
 
     # Validações básicas
     if len(cpf) != 11:
@@ -27,40 +48,14 @@ def validar_cpf(cpf: str) -> bool:
     if not cpf.isdigit():
         return False
 
-    # CPFs conhecidos como inválidos
-    cpfs_invalidos = [
-        "00000000000",
-        "11111111111",
-        "22222222222",
-        "33333333333",
-        "44444444444",
-        "55555555555",
-        "66666666666",
-        "77777777777",
-        "88888888888",
-        "99999999999",
-    ]
-
-    if cpf in cpfs_invalidos:
+    # CPFs com todos os dígitos iguais são inválidos
+    if cpf == cpf[0] * 11:
         return False
 
-    # Validar primeiro dígito verificador
-    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
-    resto = soma % 11
-    dv1 = 0 if resto < 2 else 11 - resto
-
-    if int(cpf[9]) != dv1:
-        return False
-
-    # Validar segundo dígito verificador
-    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
-    resto = soma % 11
-    dv2 = 0 if resto < 2 else 11 - resto
-
-    if int(cpf[10]) != dv2:
-        return False
-
-    return True
+    # Validar os dígitos verificadores
+    return _digito_verificador(cpf, PESOS_CPF_DV1) == int(cpf[9]) and (
+        _digito_verificador(cpf, PESOS_CPF_DV2) == int(cpf[10])
+    )
 
 
 def validar_cnpj(cnpj: str) -> bool:
@@ -74,7 +69,7 @@ def validar_cnpj(cnpj: str) -> bool:
         True se CNPJ válido, False caso contrário
     """
     # Remover formatação
-    cnpj = re.sub(r"\D", "", cnpj)
+    cnpj = re.sub(r"[^0-9]", "", cnpj)
 
     # Validações básicas
     if len(cnpj) != 14:
@@ -83,42 +78,99 @@ def validar_cnpj(cnpj: str) -> bool:
     if not cnpj.isdigit():
         return False
 
-    # CNPJs conhecidos como inválidos
-    cnpjs_invalidos = [
-        "00000000000000",
-        "11111111111111",
-        "22222222222222",
-        "33333333333333",
-        "44444444444444",
-        "55555555555555",
-        "66666666666666",
-        "77777777777777",
-        "88888888888888",
-        "99999999999999",
-    ]
-
-    if cnpj in cnpjs_invalidos:
+    # CNPJs com todos os dígitos iguais são inválidos
+    if cnpj == cnpj[0] * 14:
         return False
 
-    # Validar primeiro dígito verificador
-    multiplicador = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
-    soma = sum(int(cnpj[i]) * multiplicador[i] for i in range(12))
-    resto = soma % 11
-    dv1 = 0 if resto < 2 else 11 - resto
+    # Validar os dígitos verificadores
+    return _digito_verificador(cnpj, PESOS_CNPJ_DV1) == int(cnpj[12]) and (
+        _digito_verificador(cnpj, PESOS_CNPJ_DV2) == int(cnpj[13])
+    )
 
-    if int(cnpj[12]) != dv1:
-        return False
 
-    # Validar segundo dígito verificador
-    multiplicador = [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3]
-    soma = sum(int(cnpj[i]) * multiplicador[i] for i in range(12))
-    resto = (soma + dv1 * 2) % 11
-    dv2 = 0 if resto < 2 else 11 - resto
+# =====================================================
+# VALIDAÇÃO VETORIZADA (LOTES)
+# =====================================================
 
-    if int(cnpj[13]) != dv2:
-        return False
+_SEPARADOR = "\x00"
 
-    return True
+
+def matriz_digitos(valores: Sequence[str], tamanho: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Converte documentos (com ou sem formatação) numa matriz de dígitos
+
+    A limpeza é feita de uma vez sobre os bytes do texto concatenado; só
+    dígitos ASCII são considerados.
+
+    Args:
+        valores: Documentos
+        tamanho: Quantidade de dígitos esperada (11 para CPF, 14 para CNPJ)
+
+    Returns:
+        (matriz uint8 [linhas com `tamanho` dígitos, tamanho],
+         máscara bool [len(valores)] indicando essas linhas)
+    """
+    n = len(valores)
+    if n == 0:
+        return np.empty((0, tamanho), dtype=np.uint8), np.zeros(0, dtype=bool)
+
+    texto = _SEPARADOR.join(valores)
+    buffer = np.frombuffer(texto.encode("utf-8"), dtype=np.uint8)
+    buffer = buffer[((buffer >= ord("0")) & (buffer <= ord("9"))) | (buffer == 0)]
+    fins = np.flatnonzero(buffer == 0)
+    if len(fins) != n - 1:
+        # Algum valor contém o separador: remove-o valor a valor
+        return matriz_digitos([v.replace(_SEPARADOR, "") for v in valores], tamanho)
+
+    inicios = np.concatenate(([0], fins + 1))
+    fins = np.concatenate((fins, [len(buffer)]))
+    mascara = (fins - inicios) == tamanho
+    indices = inicios[mascara, None] + np.arange(tamanho)
+    return buffer[indices] - ord("0"), mascara
+
+
+def _verificadores_validos(
+    matriz: np.ndarray, pesos_dv1: Sequence[int], pesos_dv2: Sequence[int]
+) -> np.ndarray:
+    """Compara os dois últimos dígitos de cada linha com os verificadores calculados"""
+    n1, n2 = len(pesos_dv1), len(pesos_dv2)
+    digitos = matriz.astype(np.int32)
+    resto = (digitos[:, :n1] @ np.asarray(pesos_dv1, dtype=np.int32)) % 11
+    dv1 = np.where(resto < 2, 0, 11 - resto)
+    resto = (digitos[:, :n2] @ np.asarray(pesos_dv2, dtype=np.int32)) % 11
+    dv2 = np.where(resto < 2, 0, 11 - resto)
+    repetidos = matriz.min(axis=1) == matriz.max(axis=1)
+    return (digitos[:, n1] == dv1) & (digitos[:, n2] == dv2) & ~repetidos
+
+
+def _validar_lote(
+    valores: Iterable[str], tamanho: int, pesos_dv1: Sequence[int], pesos_dv2: Sequence[int]
+) -> np.ndarray:
+    valores = valores if isinstance(valores, (list, tuple)) else list(valores)
+    matriz, mascara = matriz_digitos(valores, tamanho)
+    validos = np.zeros(len(valores), dtype=bool)
+    validos[mascara] = _verificadores_validos(matriz, pesos_dv1, pesos_dv2)
+    return validos
+
+
+def validar_cpfs(valores: Iterable[str]) -> np.ndarray:
+    """
+    Valida muitos CPFs de uma vez (importações de CSV)
+
+    Returns:
+        Array bool, na ordem de entrada (mesmo resultado de validar_cpf)
+    """
+    return _validar_lote(valores, 11, PESOS_CPF_DV1, PESOS_CPF_DV2)
+
+
+def validar_cnpjs(valores: Iterable[str]) -> np.ndarray:
+    """
+    Valida muitos CNPJs de uma vez (importações de CSV)
+
+    Returns:
+        Array bool, na ordem de entrada (mesmo resultado de validar_cnpj)
+    """
+    return _validar_lote(valores, 14, PESOS_CNPJ_DV1, PESOS_CNPJ_DV2)
 
 
 def validar_telefone(telefone: str) -> bool:
@@ -132,7 +184,7 @@ def validar_telefone(telefone: str) -> bool:
         True se telefone válido, False caso contrário
     """
     # Remover formatação
-    telefone = re.sub(r"\D", "", telefone)
+    telefone = re.sub(r"[^0-9]", "", telefone)
 
     # Deve ter 10 ou 11 dígitos
     if len(telefone) not in [10, 11]:
@@ -152,17 +204,17 @@ def validar_telefone(telefone: str) -> bool:
 
 def limpar_cpf(cpf: str) -> str:
     """Remove formatação do CPF"""
-    return re.sub(r"\D", "", cpf)
+    return re.sub(r"[^0-9]", "", cpf)
 
 
 def limpar_cnpj(cnpj: str) -> str:
     """Remove formatação do CNPJ"""
-    return re.sub(r"\D", "", cnpj)
+    return re.sub(r"[^0-9]", "", cnpj)
 
 
 def limpar_telefone(telefone: str) -> str:
     """Remove formatação do telefone"""
-    return re.sub(r"\D", "", telefone)
+    return re.sub(r"[^0-9]", "", telefone)
 
 
 def formatar_cpf(cpf: str) -> str:
@@ -3,16 +3,17 @@ Serviço principal de autenticação
 Orquestra login, logout e verificação de sessão
 """
 
-import hashlib
-import secrets
 from typing import Optional
 
+from app.database import postgres_connection
+from app.security import password_hashing
 from app.services.M01_auth.service_auth_user import UserService
 from app.services.M01_auth.service_auth_session import SessionService
 from app.services.M01_auth.service_auth_audit import LoginAuditService
 from app.services.M01_auth.service_email import EmailService
 from app.services.M01_auth.service_pessoa import PessoaService
 from app.schemas.M01_auth.schema_auth import AuthenticatedUser
+from app.utils.permission_cache import permission_cache
 
 
 class AuthService:
@@ -21,7 +22,9 @@ class AuthService:
     @staticmethod
     def hash_password(password: str, salt: Optional[str] = None) -> tuple[str, str]:
         """
-        Hash de senha usando PBKDF2
+        Hash de senha usando PBKDF2 (síncrono - bloqueia o event loop)
+
+        Prefira ``hash_password_async`` dentro de handlers assíncronos.
 
         Args:
             password: Senha em texto plano
@@ -30,23 +33,12 @@ class AuthService:
         Returns:
             tuple (password_hash, salt)
         """
-        if not salt:
-            salt = secrets.token_hex(16)
-
-        # PBKDF2 com SHA256
-        password_hash = hashlib.pbkdf2_hmac(
-            "sha256",
-            password.encode("utf-8"),
-            salt.encode("utf-8"),
-            100000,  # iterações
-        ).hex()
-
-        return password_hash, salt
+        return password_hashing.pbkdf2_hash(password, salt)
 
     @staticmethod
     def verify_password(password: str, password_hash: str, salt: str) -> bool:
         """
-        Verificar se senha está correta
+        Verificar se senha está correta (síncrono - bloqueia o event loop)
 
         Args:
             password: Senha em texto plano
@@ -56,8 +48,37 @@ class AuthService:
         Returns:
             True se senha correta, False caso contrário
         """
-        computed_hash, _ = AuthService.hash_password(password, salt)
-        return computed_hash == password_hash
+        return password_hashing.verify_password_sync(password, password_hash, salt)
+
+    @staticmethod
+    async def hash_password_async(password: str) -> tuple[str, Optional[str]]:
+        """
+        Hash de senha no esquema configurado, executado fora do event loop
+
+        Args:
+            password: Senha em texto plano
+
+        Returns:
+            tuple (password_hash, salt) - salt é None para bcrypt
+
+        Raises:
+            PasswordHashingBusyError: se a fila do executor estiver cheia
+        """
+        return await password_hashing.hash_password_async(password)
+
+    @staticmethod
+    async def verify_password_async(
+        password: str, password_hash: str, salt: Optional[str]
+    ) -> bool:
+        """
+        Verificar senha (PBKDF2 legado ou bcrypt) fora do event loop
+
+        Raises:
+            PasswordHashingBusyError: se a fila do executor estiver cheia
+        """
+        return await password_hashing.verify_password_async(
+            password, password_hash, salt
+        )
 
     @staticmethod
     async def authenticate(
@@ -78,83 +99,66 @@ class AuthService:
         Returns:
             tuple (AuthenticatedUser, session_token, refresh_token) ou None se falhar
         """
-        # Buscar usuário
-        user_data = await UserService.get_user_by_identifier(identifier)
-
-        if not user_data:
-            # Registrar tentativa falhada
-            await LoginAuditService.log_login_attempt(
-                username=identifier,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                sucesso=False,
-                motivo_falha="Usuário não encontrado",
-            )
-            return None
-
-        conta_id = user_data["conta_id"]
-
-        # Verificar se conta está ativa
-        if not user_data.get("ativo", True):
-            await LoginAuditService.log_login_attempt(
-                username=identifier,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                sucesso=False,
-                motivo_falha="Conta desativada",
-                conta_usuario_id=conta_id,
-            )
-            return None
+        # Pipeline em uma conexão: busca (com bloqueio) + um único statement
+        # de escrita. A auditoria vai para o buffer e é gravada em lote.
+        motivo_falha = None
+        conta_id = None
+
+        async with postgres_connection() as conn:
+            user_data = await UserService.get_user_for_login(conn, identifier)
+
+            if not user_data:
+                motivo_falha = "Usuário não encontrado"
+            else:
+                conta_id = user_data["conta_id"]
+
+                if not user_data.get("ativo", True):
+                    motivo_falha = "Conta desativada"
+                elif user_data["bloqueado"]:
+                    motivo_falha = "Conta temporariamente bloqueada"
+                elif not await AuthService.verify_password_async(
+                    password, user_data["password_hash"], user_data["salt"]
+                ):
+                    await UserService.register_failed_attempt(conn, conta_id)
+                    motivo_falha = "Senha incorreta"
+                else:
+                    # Migrar hash legado para o esquema configurado
+                    new_password = None
+                    if password_hashing.needs_rehash(
+                        user_data["password_hash"], user_data["salt"]
+                    ):
+                        try:
+                            new_password = await AuthService.hash_password_async(
+                                password
+                            )
+                        except password_hashing.PasswordHashingBusyError:
+                            pass  # Tenta novamente no próximo login
+
+                    # Último login + sessão (+ hash migrado) num único statement
+                    session_token, refresh_token = (
+                        await SessionService.create_login_session(
+                            conn,
+                            conta_id,
+                            ip_address=ip_address,
+                            user_agent=user_agent,
+                            expires_in_hours=24,
+                            new_password=new_password,
+                        )
+                    )
 
-        # Verificar se conta está bloqueada
-        if await UserService.is_account_locked(conta_id):
-            await LoginAuditService.log_login_attempt(
-                username=identifier,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                sucesso=False,
-                motivo_falha="Conta temporariamente bloqueada",
-                conta_usuario_id=conta_id,
-            )
-            return None
-
-        # Verificar senha
-        if not AuthService.verify_password(
-            password, user_data["password_hash"], user_data["salt"]
-        ):
-            # Incrementar tentativas falhadas
-            await UserService.increment_failed_attempts(conta_id)
-
-            # Registrar tentativa falhada
-            await LoginAuditService.log_login_attempt(
-                username=identifier,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                sucesso=False,
-                motivo_falha="Senha incorreta",
-                conta_usuario_id=conta_id,
-            )
-            return None
-
-        # Login bem-sucedido!
-
-        # Atualizar último login
-        await UserService.update_last_login(conta_id, ip_address)
-
-        # Criar sessão
-        session_token, refresh_token = await SessionService.create_session(
-            conta_id, ip_address=ip_address, user_agent=user_agent, expires_in_hours=24
-        )
-
-        # Registrar tentativa bem-sucedida
         await LoginAuditService.log_login_attempt(
             username=identifier,
             ip_address=ip_address,
             user_agent=user_agent,
-            sucesso=True,
+            sucesso=motivo_falha is None,
+            motivo_falha=motivo_falha,
             conta_usuario_id=conta_id,
+            durable=motivo_falha == "Conta temporariamente bloqueada",
         )
 
+        if motivo_falha:
+            return None
+
         # Criar objeto AuthenticatedUser
         authenticated_user = AuthenticatedUser(
             conta_id=str(conta_id),
@@ -194,6 +198,13 @@ class AuthService:
         if not session:
             return None
 
+        # Sessão e nível de acesso vêm da mesma consulta: alimenta o cache de permissões
+        permission_cache.set(
+            session["conta_usuario_id"],
+            session.get("nivel_acesso"),
+            session.get("usuario_ativo", True),
+        )
+
         # Criar objeto AuthenticatedUser
         authenticated_user = AuthenticatedUser(
             conta_id=str(session["conta_usuario_id"]),
@@ -256,7 +267,7 @@ class AuthService:
             return False, "Email já cadastrado"
 
         # Hash da senha
-        password_hash, salt = AuthService.hash_password(senha)
+        password_hash, salt = await AuthService.hash_password_async(senha)
 
         # Criar usuário
         try:
@@ -3,11 +3,195 @@ Serviço de auditoria de tentativas de login
 Registra todas as tentativas de login (sucesso e falha)
 """
 
+import asyncio
+import logging
 from typing import Optional
 from datetime import datetime
 import uuid
 
-from app.database import get_postgres_connection
+from app.config import settings
+from app.database import postgres_connection
+
+logger = logging.getLogger(__name__)
+
+AUDIT_COLUMNS = [
+    "username",
+    "email",
+    "ip_address",
+    "user_agent",
+    "sucesso",
+    "motivo_falha",
+    "conta_usuario_id",
+    "created_at",
+]
+
+INSERT_ATTEMPT_SQL = """
+    INSERT INTO usuarios.tentativa_login
+    (username, email, ip_address, user_agent, sucesso, motivo_falha, conta_usuario_id, created_at)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+"""
+
+
+# Marcador de fim da fila: o loop grava o que recebeu antes dele e termina
+_STOP = object()
+
+
+class LoginAuditSink:
+    """
+    Buffer assíncrono de tentativas de login.
+
+    Os registros entram numa fila limitada em memória e uma tarefa em background
+    grava em lote com COPY (copy_records_to_table) a cada `batch_size` registros
+    ou `flush_interval_ms` milissegundos, o que ocorrer primeiro. Com a fila
+    cheia o registro é descartado e contabilizado em `dropped`.
+    """
+
+    def __init__(self, batch_size: int, flush_interval_ms: int, max_queue: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.is_running = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: list[tuple] = []
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.sync_writes = 0
+        self.flush_errors = 0
+
+    def start(self):
+        """Inicia a tarefa de gravação em background."""
+        if not self.is_running:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self.is_running = True
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """
+        Para a tarefa e grava tudo que ainda estiver em memória.
+
+        A tarefa não é cancelada: recebe o marcador de fim pela fila, termina o
+        lote em andamento e sai. O que sobrar (tarefa cancelada por fora no
+        meio de um COPY, por exemplo) é gravado aqui.
+        """
+        if not self.is_running:
+            return
+        self.is_running = False
+        if self._task:
+            if not self._task.done():
+                await self._queue.put(_STOP)
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            self._task = None
+
+        pending = self._batch
+        self._batch = []
+        while not self._queue.empty():
+            record = self._queue.get_nowait()
+            if record is not _STOP:
+                pending.append(record)
+        for start in range(0, len(pending), self.batch_size):
+            await self._flush(pending[start : start + self.batch_size])
+
+    def offer(self, record: tuple) -> bool:
+        """Enfileira registro sem bloquear. Retorna False se não aceito."""
+        if not self.is_running:
+            return False
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _run_loop(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            try:
+                record = await self._queue.get()
+                if record is _STOP:
+                    stopping = True
+                else:
+                    self._batch.append(record)
+                deadline = loop.time() + self.flush_interval
+                while not stopping and len(self._batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        record = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if record is _STOP:
+                        stopping = True
+                    else:
+                        self._batch.append(record)
+
+                # O lote só sai de self._batch depois de gravado
+                await self._flush(self._batch)
+                self._batch = []
+            except Exception as e:
+                logger.error(f"❌ Erro no loop de auditoria de login: {e}")
+                await asyncio.sleep(1)
+
+    async def _flush(self, batch: list[tuple]):
+        if not batch:
+            return
+        try:
+            async with postgres_connection() as conn:
+                await conn.copy_records_to_table(
+                    "tentativa_login",
+                    schema_name="usuarios",
+                    columns=AUDIT_COLUMNS,
+                    records=batch,
+                )
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            # Um registro inválido (ex.: IP malformado) derruba o COPY inteiro:
+            # regrava linha a linha para preservar os demais
+            self.flush_errors += 1
+            logger.warning(f"⚠️ COPY de auditoria falhou ({e}); gravando linha a linha")
+            for record in batch:
+                try:
+                    await _insert_attempt(record)
+                    self.written += 1
+                except Exception as row_error:
+                    self.dropped += 1
+                    logger.error(f"❌ Tentativa de login descartada: {row_error}")
+
+    def get_stats(self) -> dict:
+        return {
+            "is_running": self.is_running,
+            "queue_size": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "sync_writes": self.sync_writes,
+            "flush_errors": self.flush_errors,
+        }
+
+
+async def _insert_attempt(record: tuple):
+    async with postgres_connection() as conn:
+        await conn.execute(INSERT_ATTEMPT_SQL, *record)
+
+
+# Instância global (iniciada no startup da aplicação)
+login_audit_sink = LoginAuditSink(
+    batch_size=settings.login_audit_batch_size,
+    flush_interval_ms=settings.login_audit_flush_interval_ms,
+    max_queue=settings.login_audit_max_queue,
+)
 
 
 class LoginAuditService:
@@ -22,10 +206,15 @@ class LoginAuditService:
         sucesso: bool = False,
         motivo_falha: Optional[str] = None,
         conta_usuario_id: Optional[uuid.UUID] = None,
+        durable: bool = False,
     ):
         """
         Registrar tentativa de login
 
+        Por padrão o registro vai para o buffer assíncrono (login_audit_sink)
+        e é gravado em lote. Grava na hora quando `durable=True` ou quando o
+        buffer não está ativo.
+
         Args:
             username: Nome de usuário utilizado
             email: Email utilizado
@@ -34,27 +223,29 @@ class LoginAuditService:
             sucesso: Se o login foi bem-sucedido
             motivo_falha: Motivo da falha (se aplicável)
             conta_usuario_id: ID da conta (se identificada)
+            durable: Gravar de forma síncrona (não pode ser descartado)
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                INSERT INTO usuarios.tentativa_login
-                (username, email, ip_address, user_agent, sucesso, motivo_falha, conta_usuario_id)
-                VALUES ($1, $2, $3, $4, $5, $6, $7)
-            """
+        record = (
+            username,
+            email,
+            ip_address,
+            user_agent,
+            sucesso,
+            motivo_falha,
+            conta_usuario_id,
+            datetime.utcnow(),
+        )
 
-            await conn.execute(
-                query,
-                username,
-                email,
-                ip_address,
-                user_agent,
-                sucesso,
-                motivo_falha,
-                conta_usuario_id,
-            )
-        finally:
-            await conn.close()
+        if not durable and login_audit_sink.offer(record):
+            return
+
+        if not durable and login_audit_sink.is_running:
+            # Fila cheia: descarta para não acoplar o login à escrita
+            login_audit_sink.dropped += 1
+            return
+
+        login_audit_sink.sync_writes += 1
+        await _insert_attempt(record)
 
     @staticmethod
     async def get_recent_attempts(
@@ -70,8 +261,7 @@ class LoginAuditService:
         Returns:
             Lista de tentativas de login
         """
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             query = """
                 SELECT
                     id,
@@ -90,8 +280,6 @@ class LoginAuditService:
 
             rows = await conn.fetch(query, conta_usuario_id, limit)
             return [dict(row) for row in rows]
-        finally:
-            await conn.close()
 
     @staticmethod
     async def get_failed_attempts_count(
@@ -108,8 +296,7 @@ class LoginAuditService:
         Returns:
             Número de tentativas falhadas
         """
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             from datetime import timedelta
 
             time_threshold = datetime.utcnow() - timedelta(minutes=minutes)
@@ -137,5 +324,3 @@ class LoginAuditService:
                 count = await conn.fetchval(query, identifier, time_threshold)
 
             return count or 0
-        finally:
-            await conn.close()
@@ -0,0 +1,275 @@
+"""
+Manutenção das tabelas de sessões e tokens de recuperação
+Partições mensais por expires_at: criação antecipada e remoção das vencidas
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import asyncpg
+
+from app.config import settings
+from app.database import postgres_connection
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SCHEMA = "usuarios"
+MAINTAINED_TABLES = ("sessao", "token_recuperacao")
+
+# pg_try_advisory_lock: cada worker tem seu agendador; só um varre por vez
+SWEEP_LOCK_KEY = 4_012_001
+
+_PARTITION_RE = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + (month.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def parse_partition_month(table: str, name: str) -> Optional[date]:
+    """Mês de uma partição criada por esta rotina (None se fora do padrão)."""
+    match = _PARTITION_RE.match(name)
+    if not match or match.group("table") != table:
+        return None
+    return date(int(match.group("year")), int(match.group("month")), 1)
+
+
+async def is_partitioned(conn: asyncpg.Connection, table: str) -> bool:
+    """Indica se a migration 012 já foi aplicada à tabela."""
+    return await conn.fetchval(
+        """
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = $1 AND c.relname = $2
+        )
+        """,
+        SCHEMA,
+        table,
+    )
+
+
+async def list_partitions(conn: asyncpg.Connection, table: str) -> list[str]:
+    rows = await conn.fetch(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_namespace n ON n.oid = p.relnamespace
+        WHERE n.nspname = $1 AND p.relname = $2
+        """,
+        SCHEMA,
+        table,
+    )
+    return [row["relname"] for row in rows]
+
+
+async def ensure_partitions(
+    conn: asyncpg.Connection,
+    table: str,
+    months_ahead: int,
+    today: Optional[date] = None,
+) -> list[str]:
+    """
+    Cria as partições do mês corrente até `months_ahead` meses à frente
+
+    Returns:
+        Nomes das partições criadas
+    """
+    current = month_start(today or datetime.utcnow().date())
+    existing = set(await list_partitions(conn, table))
+    created = []
+
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        await create_partition(conn, table, month)
+        created.append(name)
+
+    return created
+
+
+async def create_partition(conn: asyncpg.Connection, table: str, month: date) -> None:
+    await conn.execute(
+        f'CREATE TABLE IF NOT EXISTS {SCHEMA}."{partition_name(table, month)}" '
+        f"PARTITION OF {SCHEMA}.{table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+async def insert_partitioned(
+    conn: asyncpg.Connection,
+    table: str,
+    expires_at: datetime,
+    insert: Callable[[], Awaitable[T]],
+) -> T:
+    """
+    Executa um INSERT na tabela particionada, criando a partição que faltar
+
+    Fallback para quando o agendador de manutenção está desligado ou falhando:
+    sem ele as partições futuras acabam e todo INSERT de sessão falharia com
+    "no partition of relation ... found for row". A partição do mês de
+    `expires_at` (e a vizinha, se o fuso do banco mudar o mês) é criada e o
+    INSERT repetido. Dentro de uma transação o erro é repassado: ela já está
+    abortada.
+    """
+    try:
+        return await insert()
+    except asyncpg.CheckViolationError as e:
+        if "no partition" not in str(e) or conn.is_in_transaction():
+            raise
+        logger.warning(f"Partição de {SCHEMA}.{table} ausente para {expires_at}; criando")
+
+    day = expires_at.date()
+    months = {month_start(day - timedelta(days=1)), month_start(day + timedelta(days=1))}
+    for month in sorted(months):
+        try:
+            await create_partition(conn, table, month)
+        except (asyncpg.DuplicateTableError, asyncpg.UniqueViolationError):
+            pass  # criada ao mesmo tempo por outro worker
+    return await insert()
+
+
+async def prune_partitions(
+    conn: asyncpg.Connection,
+    table: str,
+    retention_months: int,
+    drop: bool = True,
+    today: Optional[date] = None,
+) -> int:
+    """
+    Destaca (e opcionalmente remove) partições totalmente vencidas
+
+    Uma partição é removida quando todo o seu intervalo de expires_at terminou
+    há mais de `retention_months` meses.
+
+    Returns:
+        Número de linhas removidas junto com as partições
+    """
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -retention_months)
+    pruned = 0
+
+    for name in await list_partitions(conn, table):
+        month = parse_partition_month(table, name)
+        if month is None or add_months(month, 1) > cutoff:
+            continue
+
+        rows = await conn.fetchval(f'SELECT count(*) FROM {SCHEMA}."{name}"')
+        await conn.execute(f'ALTER TABLE {SCHEMA}.{table} DETACH PARTITION {SCHEMA}."{name}"')
+        if drop:
+            await conn.execute(f'DROP TABLE {SCHEMA}."{name}"')
+        pruned += rows
+        logger.info(f"Partição {SCHEMA}.{name} destacada ({rows} linhas)")
+
+    return pruned
+
+
+async def purge_expired_rows(
+    conn: asyncpg.Connection,
+    table: str,
+    retention_months: int,
+    batch_size: int = 5000,
+    today: Optional[date] = None,
+) -> int:
+    """
+    Remove em lotes as linhas vencidas de uma tabela não particionada
+
+    Mesmo corte de ``prune_partitions``; usado enquanto a migration 012 não
+    tiver sido aplicada.
+    """
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -retention_months)
+    cutoff_at = datetime.combine(cutoff, datetime.min.time())
+    pruned = 0
+
+    while True:
+        deleted = await conn.fetchval(
+            f"""
+            WITH alvo AS (
+                SELECT ctid FROM {SCHEMA}.{table}
+                WHERE expires_at < $1
+                LIMIT $2
+            ), removidas AS (
+                DELETE FROM {SCHEMA}.{table}
+                WHERE ctid IN (SELECT ctid FROM alvo)
+                RETURNING 1
+            )
+            SELECT count(*) FROM removidas
+            """,
+            cutoff_at,
+            batch_size,
+        )
+        pruned += deleted
+        if deleted < batch_size:
+            return pruned
+
+
+async def sweep_table(table: str) -> dict:
+    """Executa a manutenção completa de uma tabela."""
+    started = time.perf_counter()
+    created: list[str] = []
+
+    async with postgres_connection() as conn:
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", SWEEP_LOCK_KEY):
+            logger.info(f"Manutenção de {SCHEMA}.{table} em andamento em outro worker")
+            return {
+                "table": f"{SCHEMA}.{table}",
+                "skipped": True,
+                "rows_pruned": 0,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+        try:
+            partitioned = await is_partitioned(conn, table)
+            if partitioned:
+                created = await ensure_partitions(
+                    conn, table, settings.session_partition_months_ahead
+                )
+                pruned = await prune_partitions(
+                    conn,
+                    table,
+                    settings.session_retention_months,
+                    drop=settings.session_drop_detached_partitions,
+                )
+            else:
+                pruned = await purge_expired_rows(conn, table, settings.session_retention_months)
+        finally:
+            await conn.fetchval("SELECT pg_advisory_unlock($1)", SWEEP_LOCK_KEY)
+
+    return {
+        "table": f"{SCHEMA}.{table}",
+        "skipped": False,
+        "partitioned": partitioned,
+        "partitions_created": created,
+        "rows_pruned": pruned,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+async def run_session_maintenance() -> dict:
+    """Job do agendador: sessões e tokens de recuperação."""
+    results = [await sweep_table(table) for table in MAINTAINED_TABLES]
+    return {
+        "rows_pruned": sum(r["rows_pruned"] for r in results),
+        "tables": results,
+    }
@@ -8,7 +8,125 @@ from datetime import datetime, timedelta
 import uuid
 import secrets
 
-from app.database import get_postgres_connection
+import asyncpg
+
+from app.database import postgres_connection
+from app.query_registry import Row, queries
+from app.services.M01_auth.service_auth_maintenance import insert_partitioned
+from app.utils.auth_session_cache import session_cache
+
+CREATE_SESSION = queries.register(
+    "auth.create_session",
+    """
+    INSERT INTO usuarios.sessao
+    (conta_usuario_id, token, refresh_token, ip_address, user_agent, expires_at)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING id
+    """,
+)
+
+CREATE_LOGIN_SESSION = queries.register(
+    "auth.create_login_session",
+    """
+    WITH conta AS (
+        UPDATE usuarios.usuario
+        SET ultimo_login = $1,
+            ultimo_ip = $2,
+            tentativas_falha = 0,
+            password_hash = COALESCE($8, password_hash),
+            salt = CASE WHEN $8::text IS NULL THEN salt ELSE $9 END
+        WHERE id = $3
+        RETURNING id
+    )
+    INSERT INTO usuarios.sessao
+    (conta_usuario_id, token, refresh_token, ip_address, user_agent, expires_at)
+    SELECT id, $4, $5, $2, $6, $7 FROM conta
+    RETURNING id
+    """,
+)
+
+SESSION_BY_TOKEN = queries.register(
+    "auth.session_by_token",
+    """
+    SELECT
+        s.id as session_id,
+        s.conta_usuario_id,
+        s.token,
+        s.refresh_token,
+        s.ip_address,
+        s.user_agent,
+        s.expires_at,
+        s.created_at,
+        s.revoked,
+        cu.username,
+        cu.email,
+        cu.nivel_acesso,
+        cu.ativo AS usuario_ativo,
+        p.nome_completo,
+        COALESCE(p.nome_completo, '') AS primeiro_nome,
+        COALESCE(p.nome_completo, '') AS ultimo_nome
+    FROM usuarios.sessao s
+    JOIN usuarios.usuario cu ON s.conta_usuario_id = cu.id
+    LEFT JOIN cadastro.pessoa p ON cu.pessoa_id = p.id
+    WHERE s.token = $1
+      AND s.revoked = FALSE
+      AND s.expires_at > $2
+    """,
+)
+
+SESSION_BY_REFRESH_TOKEN = queries.register(
+    "auth.session_by_refresh_token",
+    """
+    SELECT
+        s.id as session_id,
+        s.conta_usuario_id,
+        s.token,
+        s.refresh_token,
+        s.expires_at,
+        s.revoked
+    FROM usuarios.sessao s
+    WHERE s.refresh_token = $1
+      AND s.revoked = FALSE
+    """,
+)
+
+REVOKE_SESSION_BY_TOKEN = queries.register(
+    "auth.revoke_session_by_token",
+    """
+    UPDATE usuarios.sessao
+    SET revoked = TRUE,
+        revoked_at = $1
+    WHERE token = $2
+    """,
+)
+
+REVOKE_ALL_USER_SESSIONS = queries.register(
+    "auth.revoke_all_user_sessions",
+    """
+    UPDATE usuarios.sessao
+    SET revoked = TRUE,
+        revoked_at = $1
+    WHERE conta_usuario_id = $2
+      AND revoked = FALSE
+    """,
+)
+
+ACTIVE_SESSIONS_BY_ACCOUNT = queries.register(
+    "auth.active_sessions_by_account",
+    """
+    SELECT
+        id as session_id,
+        ip_address,
+        user_agent,
+        created_at,
+        expires_at
+    FROM usuarios.sessao
+    WHERE conta_usuario_id = $1
+      AND revoked = FALSE
+      AND expires_at > $2
+    ORDER BY created_at DESC
+    """,
+)
 
 
 class SessionService:
@@ -33,83 +151,103 @@ class SessionService:
         Returns:
             tuple (session_token, refresh_token)
         """
-        conn = await get_postgres_connection()
-        try:
-            # Gerar tokens seguros
-            session_token = secrets.token_urlsafe(32)
-            refresh_token = secrets.token_urlsafe(32)
-
-            # Calcular expiração
-            expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
-
-            query = """
-                INSERT INTO usuarios.sessao 
-                (conta_usuario_id, token, refresh_token, ip_address, user_agent, expires_at)
-                VALUES ($1, $2, $3, $4, $5, $6)
-                RETURNING id
-            """
-
-            await conn.execute(
-                query,
+        # Gerar tokens seguros
+        session_token = secrets.token_urlsafe(32)
+        refresh_token = secrets.token_urlsafe(32)
+
+        # Calcular expiração
+        expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
+
+        async with postgres_connection() as conn:
+            await insert_partitioned(
+                conn,
+                "sessao",
+                expires_at,
+                lambda: CREATE_SESSION.execute(
+                    conn,
+                    conta_usuario_id,
+                    session_token,
+                    refresh_token,
+                    ip_address,
+                    user_agent,
+                    expires_at,
+                ),
+            )
+
+        return session_token, refresh_token
+
+    @staticmethod
+    async def create_login_session(
+        conn: asyncpg.Connection,
+        conta_usuario_id: uuid.UUID,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        expires_in_hours: int = 24,
+        new_password: Optional[tuple[str, Optional[str]]] = None,
+    ) -> tuple[str, str]:
+        """
+        Registrar login bem-sucedido e criar a sessão num único statement
+
+        Atualiza último login/IP, zera tentativas falhadas (e opcionalmente
+        grava o hash migrado) e insere a sessão via CTE: uma ida ao banco,
+        atômica.
+
+        Args:
+            conn: Conexão do pipeline de login
+            conta_usuario_id: ID da conta do usuário
+            ip_address: Endereço IP (opcional)
+            user_agent: User agent do navegador (opcional)
+            expires_in_hours: Horas até expiração (padrão 24h)
+            new_password: (password_hash, salt) para migração de esquema
+
+        Returns:
+            tuple (session_token, refresh_token)
+        """
+        session_token = secrets.token_urlsafe(32)
+        refresh_token = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+        expires_at = now + timedelta(hours=expires_in_hours)
+        new_hash, new_salt = new_password or (None, None)
+
+        await insert_partitioned(
+            conn,
+            "sessao",
+            expires_at,
+            lambda: CREATE_LOGIN_SESSION.execute(
+                conn,
+                now,
+                ip_address,
                 conta_usuario_id,
                 session_token,
                 refresh_token,
-                ip_address,
                 user_agent,
                 expires_at,
-            )
+                new_hash,
+                new_salt,
+            ),
+        )
 
-            return session_token, refresh_token
-        finally:
-            await conn.close()
+        return session_token, refresh_token
 
     @staticmethod
-    async def get_session_by_token(token: str) -> Optional[dict]:
+    async def get_session_by_token(token: str) -> Optional[Row]:
         """
         Buscar sessão por token
 
+        Retorna também nivel_acesso/ativo do usuário para evitar uma segunda
+        consulta na verificação de permissões.
+
         Args:
             token: Token da sessão
 
         Returns:
-            dict com dados da sessão ou None se não encontrada/expirada
+            Row com dados da sessão ou None se não encontrada/expirada
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                SELECT 
-                    s.id as session_id,
-                    s.conta_usuario_id,
-                    s.token,
-                    s.refresh_token,
-                    s.ip_address,
-                    s.user_agent,
-                    s.expires_at,
-                    s.created_at,
-                    s.revoked,
-                    cu.username,
-                    cu.email,
-                    p.nome_completo,
-                    COALESCE(p.nome_completo, '') AS primeiro_nome,
-                    COALESCE(p.nome_completo, '') AS ultimo_nome
-                FROM usuarios.sessao s
-                JOIN usuarios.usuario cu ON s.conta_usuario_id = cu.id
-                LEFT JOIN cadastro.pessoa p ON cu.pessoa_id = p.id
-                WHERE s.token = $1 
-                  AND s.revoked = FALSE
-                  AND s.expires_at > $2
-            """
-
-            row = await conn.fetchrow(query, token, datetime.utcnow())
-
-            if row:
-                return dict(row)
-            return None
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            return await SESSION_BY_TOKEN.fetchrow(conn, token, datetime.utcnow())
 
     @staticmethod
-    async def get_session_by_refresh_token(refresh_token: str) -> Optional[dict]:
+    async def get_session_by_refresh_token(refresh_token: str) -> Optional[Row]:
         """
         Buscar sessão por refresh token
 
@@ -117,30 +255,10 @@ class SessionService:
             refresh_token: Refresh token da sessão
 
         Returns:
-            dict com dados da sessão ou None se não encontrada
+            Row com dados da sessão ou None se não encontrada
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                SELECT 
-                    s.id as session_id,
-                    s.conta_usuario_id,
-                    s.token,
-                    s.refresh_token,
-                    s.expires_at,
-                    s.revoked
-                FROM usuarios.sessao s
-                WHERE s.refresh_token = $1
-                  AND s.revoked = FALSE
-            """
-
-            row = await conn.fetchrow(query, refresh_token)
-
-            if row:
-                return dict(row)
-            return None
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            return await SESSION_BY_REFRESH_TOKEN.fetchrow(conn, refresh_token)
 
     @staticmethod
     async def revoke_session(token: str):
@@ -150,17 +268,9 @@ class SessionService:
         Args:
             token: Token da sessão a ser revogada
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                UPDATE usuarios.sessao
-                SET revoked = TRUE,
-                    revoked_at = $1
-                WHERE token = $2
-            """
-            await conn.execute(query, datetime.utcnow(), token)
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            await REVOKE_SESSION_BY_TOKEN.execute(conn, datetime.utcnow(), token)
+        session_cache.invalidate_token(token)
 
     @staticmethod
     async def revoke_all_user_sessions(conta_usuario_id: uuid.UUID):
@@ -170,18 +280,11 @@ class SessionService:
         Args:
             conta_usuario_id: ID da conta do usuário
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                UPDATE usuarios.sessao
-                SET revoked = TRUE,
-                    revoked_at = $1
-                WHERE conta_usuario_id = $2
-                  AND revoked = FALSE
-            """
-            await conn.execute(query, datetime.utcnow(), conta_usuario_id)
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            await REVOKE_ALL_USER_SESSIONS.execute(
+                conn, datetime.utcnow(), conta_usuario_id
+            )
+        session_cache.invalidate_account(conta_usuario_id)
 
     @staticmethod
     async def refresh_session(
@@ -214,7 +317,7 @@ class SessionService:
         return new_token, new_refresh
 
     @staticmethod
-    async def get_active_sessions(conta_usuario_id: uuid.UUID) -> list[dict]:
+    async def get_active_sessions(conta_usuario_id: uuid.UUID) -> list[Row]:
         """
         Listar sessões ativas de um usuário
 
@@ -222,49 +325,26 @@ class SessionService:
             conta_usuario_id: ID da conta do usuário
 
         Returns:
-            Lista de dicts com dados das sessões ativas
+            Lista de Rows com dados das sessões ativas
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                SELECT 
-                    id as session_id,
-                    ip_address,
-                    user_agent,
-                    created_at,
-                    expires_at
-                FROM usuarios.sessao
-                WHERE conta_usuario_id = $1
-                  AND revoked = FALSE
-                  AND expires_at > $2
-                ORDER BY created_at DESC
-            """
-
-            rows = await conn.fetch(query, conta_usuario_id, datetime.utcnow())
-            return [dict(row) for row in rows]
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            return await ACTIVE_SESSIONS_BY_ACCOUNT.fetch(
+                conn, conta_usuario_id, datetime.utcnow()
+            )
 
     @staticmethod
     async def cleanup_expired_sessions():
         """
         Limpar sessões expiradas (tarefa de manutenção)
 
+        Remove as sessões vencidas há mais de `session_retention_months`
+        (destacando partições quando a tabela é particionada). Executada
+        periodicamente pelo agendador de manutenção.
+
         Returns:
-            Número de sessões limpas
+            Número de sessões removidas
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                UPDATE usuarios.sessao
-                SET revoked = TRUE,
-                    revoked_at = $1
-                WHERE expires_at < $1
-                  AND revoked = FALSE
-                RETURNING id
-            """
-
-            result = await conn.fetch(query, datetime.utcnow())
-            return len(result)
-        finally:
-            await conn.close()
+        from app.services.M01_auth.service_auth_maintenance import sweep_table
+
+        result = await sweep_table("sessao")
+        return result["rows_pruned"]
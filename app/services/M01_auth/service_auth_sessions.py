@@ -8,6 +8,56 @@ from uuid import uuid4
 
 import asyncpg
 
+from app.query_registry import Row, queries
+from app.services.M01_auth.service_auth_maintenance import insert_partitioned
+from app.utils.auth_session_cache import session_cache
+
+CREATE_SESSION = queries.register(
+    "sessions.create",
+    """
+    INSERT INTO usuarios.sessao (
+        id,
+        conta_usuario_id,
+        token,
+        ip_address,
+        user_agent,
+        expires_at
+    )
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING id, conta_usuario_id, token, expires_at, created_at
+    """,
+)
+
+REVOKE_SESSION = queries.register(
+    "sessions.revoke",
+    """
+    UPDATE usuarios.sessao
+    SET revoked = TRUE,
+        revoked_at = CURRENT_TIMESTAMP
+    WHERE id = $1
+    """,
+)
+
+REVOKE_SESSION_BY_TOKEN = queries.register(
+    "sessions.revoke_by_token",
+    """
+    UPDATE usuarios.sessao
+    SET revoked = TRUE,
+        revoked_at = CURRENT_TIMESTAMP
+    WHERE token = $1
+    """,
+)
+
+ACTIVE_SESSION = queries.register(
+    "sessions.active",
+    """
+    SELECT id, conta_usuario_id, token, expires_at, revoked
+    FROM usuarios.sessao
+    WHERE id = $1 AND token = $2 AND revoked = FALSE
+      AND expires_at > CURRENT_TIMESTAMP
+    """,
+)
+
 
 def _now_utc() -> datetime:
     # Retornar datetime UTC *sem* tzinfo para compatibilidade com colunas TIMESTAMP
@@ -25,47 +75,32 @@ async def create_session(
     ip_address: Optional[str],
     user_agent: Optional[str],
     expiration_hours: int,
-) -> asyncpg.Record:
+) -> Row:
     """Cria registro em `usuarios.sessao` e retorna linha criada."""
 
     expires_at = _expires_at(expiration_hours)
-    sql = """
-        INSERT INTO usuarios.sessao (
-            id,
-            conta_usuario_id,
+    session_id = uuid4()
+    return await insert_partitioned(
+        conn,
+        "sessao",
+        expires_at,
+        lambda: CREATE_SESSION.fetchrow(
+            conn,
+            session_id,
+            conta_id,
             token,
             ip_address,
             user_agent,
-            expires_at
-        )
-        VALUES ($1, $2, $3, $4, $5, $6)
-        RETURNING id, conta_usuario_id, token, expires_at, created_at
-    """
-
-    session_id = uuid4()
-    return await conn.fetchrow(
-        sql,
-        session_id,
-        conta_id,
-        token,
-        ip_address,
-        user_agent,
-        expires_at,
+            expires_at,
+        ),
     )
 
 
 async def revoke_session(conn: asyncpg.Connection, session_id: Any) -> None:
     """Marca sessão como revogada."""
 
-    await conn.execute(
-        """
-        UPDATE usuarios.sessao
-        SET revoked = TRUE,
-            revoked_at = CURRENT_TIMESTAMP
-        WHERE id = $1
-        """,
-        session_id,
-    )
+    await REVOKE_SESSION.execute(conn, session_id)
+    session_cache.invalidate_session(session_id)
 
 
 async def revoke_session_by_token(
@@ -74,29 +109,15 @@ async def revoke_session_by_token(
 ) -> None:
     """Revoga sessão a partir do token armazenado."""
 
-    await conn.execute(
-        """
-        UPDATE usuarios.sessao
-        SET revoked = TRUE,
-            revoked_at = CURRENT_TIMESTAMP
-        WHERE token = $1
-        """,
-        token,
-    )
+    await REVOKE_SESSION_BY_TOKEN.execute(conn, token)
+    session_cache.invalidate_token(token)
 
 
 async def get_active_session(
     conn: asyncpg.Connection,
     session_id: Any,
     token: str,
-) -> Optional[asyncpg.Record]:
+) -> Optional[Row]:
     """Obtém sessão ativa e não expirada."""
 
-    sql = """
-        SELECT id, conta_usuario_id, token, expires_at, revoked
-        FROM usuarios.sessao
-        WHERE id = $1 AND token = $2 AND revoked = FALSE
-          AND expires_at > CURRENT_TIMESTAMP
-    """
-
-    return await conn.fetchrow(sql, session_id, token)
+    return await ACTIVE_SESSION.fetchrow(conn, session_id, token)
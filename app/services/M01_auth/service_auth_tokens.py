@@ -8,6 +8,73 @@ from uuid import uuid4
 
 import asyncpg
 
+from app.query_registry import Row, queries
+from app.services.M01_auth.service_auth_maintenance import insert_partitioned
+
+_TOKEN_COLUMNS = "id, conta_usuario_id, token, tipo, expires_at, usado"
+
+CREATE_RECOVERY_TOKEN = queries.register(
+    "tokens.create_recovery",
+    f"""
+    INSERT INTO usuarios.token_recuperacao (
+        id, conta_usuario_id, token, tipo, expires_at
+    ) VALUES ($1, $2, $3, 'password_reset', $4)
+    RETURNING {_TOKEN_COLUMNS}
+    """,
+)
+
+VALID_RECOVERY_TOKEN = queries.register(
+    "tokens.valid_recovery",
+    f"""
+    SELECT {_TOKEN_COLUMNS}
+    FROM usuarios.token_recuperacao
+    WHERE token = $1 AND usado = FALSE AND expires_at > CURRENT_TIMESTAMP
+    """,
+)
+
+MARK_TOKEN_USED = queries.register(
+    "tokens.mark_used",
+    """
+    UPDATE usuarios.token_recuperacao
+    SET usado = TRUE, usado_em = CURRENT_TIMESTAMP
+    WHERE id = $1
+    """,
+)
+
+CREATE_VERIFICATION_TOKEN = queries.register(
+    "tokens.create_verification",
+    f"""
+    INSERT INTO usuarios.token_recuperacao (
+        id, conta_usuario_id, token, tipo, expires_at
+    ) VALUES ($1, $2, $3, 'email_verification', $4)
+    RETURNING {_TOKEN_COLUMNS}
+    """,
+)
+
+VALID_VERIFICATION_TOKEN = queries.register(
+    "tokens.valid_verification",
+    f"""
+    SELECT {_TOKEN_COLUMNS}
+    FROM usuarios.token_recuperacao
+    WHERE token = $1
+      AND tipo = 'email_verification'
+      AND usado = FALSE
+      AND expires_at > CURRENT_TIMESTAMP
+    """,
+)
+
+INVALIDATE_PREVIOUS_TOKENS = queries.register(
+    "tokens.invalidate_previous",
+    """
+    UPDATE usuarios.token_recuperacao
+    SET usado = TRUE, usado_em = CURRENT_TIMESTAMP
+    WHERE conta_usuario_id = $1
+      AND tipo = $2
+      AND usado = FALSE
+      AND expires_at > CURRENT_TIMESTAMP
+    """,
+)
+
 
 def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
@@ -22,45 +89,30 @@ async def create_recovery_token(
     conta_id: Any,
     token: str,
     expires_hours: int = 2,
-) -> asyncpg.Record:
+) -> Row:
     """Insere um token de recuperação na tabela `usuarios.token_recuperacao`."""
 
     expires = _expires_at(expires_hours)
-    sql = """
-        INSERT INTO usuarios.token_recuperacao (
-            id, conta_usuario_id, token, tipo, expires_at
-        ) VALUES ($1, $2, $3, 'password_reset', $4)
-        RETURNING id, conta_usuario_id, token, tipo, expires_at, usado
-    """
-
     token_id = uuid4()
-    return await conn.fetchrow(sql, token_id, conta_id, token, expires)
+    return await insert_partitioned(
+        conn,
+        "token_recuperacao",
+        expires,
+        lambda: CREATE_RECOVERY_TOKEN.fetchrow(conn, token_id, conta_id, token, expires),
+    )
 
 
 async def fetch_valid_recovery_token(
     conn: asyncpg.Connection,
     token: str,
-) -> Optional[asyncpg.Record]:
+) -> Optional[Row]:
     """Retorna token válido (não usado e não expirado) ou None."""
 
-    sql = """
-        SELECT id, conta_usuario_id, token, tipo, expires_at, usado
-        FROM usuarios.token_recuperacao
-        WHERE token = $1 AND usado = FALSE AND expires_at > CURRENT_TIMESTAMP
-    """
-
-    return await conn.fetchrow(sql, token)
+    return await VALID_RECOVERY_TOKEN.fetchrow(conn, token)
 
 
 async def mark_token_used(conn: asyncpg.Connection, token_id: Any) -> None:
-    await conn.execute(
-        """
-        UPDATE usuarios.token_recuperacao
-        SET usado = TRUE, usado_em = CURRENT_TIMESTAMP
-        WHERE id = $1
-        """,
-        token_id,
-    )
+    await MARK_TOKEN_USED.execute(conn, token_id)
 
 
 async def create_email_verification_token(
@@ -68,37 +120,26 @@ async def create_email_verification_token(
     conta_id: Any,
     token: str,
     expires_hours: int = 24,
-) -> asyncpg.Record:
+) -> Row:
     """Insere um token de verificação de email."""
 
     expires = _expires_at(expires_hours)
-    sql = """
-        INSERT INTO usuarios.token_recuperacao (
-            id, conta_usuario_id, token, tipo, expires_at
-        ) VALUES ($1, $2, $3, 'email_verification', $4)
-        RETURNING id, conta_usuario_id, token, tipo, expires_at, usado
-    """
-
     token_id = uuid4()
-    return await conn.fetchrow(sql, token_id, conta_id, token, expires)
+    return await insert_partitioned(
+        conn,
+        "token_recuperacao",
+        expires,
+        lambda: CREATE_VERIFICATION_TOKEN.fetchrow(conn, token_id, conta_id, token, expires),
+    )
 
 
 async def fetch_valid_verification_token(
     conn: asyncpg.Connection,
     token: str,
-) -> Optional[asyncpg.Record]:
+) -> Optional[Row]:
     """Retorna token de verificação válido ou None."""
 
-    sql = """
-        SELECT id, conta_usuario_id, token, tipo, expires_at, usado
-        FROM usuarios.token_recuperacao
-        WHERE token = $1
-          AND tipo = 'email_verification'
-          AND usado = FALSE
-          AND expires_at > CURRENT_TIMESTAMP
-    """
-
-    return await conn.fetchrow(sql, token)
+    return await VALID_VERIFICATION_TOKEN.fetchrow(conn, token)
 
 
 async def invalidate_previous_tokens(
@@ -106,15 +147,4 @@ async def invalidate_previous_tokens(
 ) -> None:
     """Invalida tokens anteriores do mesmo tipo para uma conta."""
 
-    await conn.execute(
-        """
-        UPDATE usuarios.token_recuperacao
-        SET usado = TRUE, usado_em = CURRENT_TIMESTAMP
-        WHERE conta_usuario_id = $1
-          AND tipo = $2
-          AND usado = FALSE
-          AND expires_at > CURRENT_TIMESTAMP
-        """,
-        conta_id,
-        tipo,
-    )
+    await INVALIDATE_PREVIOUS_TOKENS.execute(conn, conta_id, tipo)
@@ -4,17 +4,175 @@ Interage com PostgreSQL para CRUD de usuários
 """
 
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 
-from app.database import get_postgres_connection
+import asyncpg
+
+from app.database import postgres_connection
+from app.query_registry import Row, queries
+
+# Bloqueio temporário após tentativas de senha incorreta
+MAX_FAILED_ATTEMPTS = 5
+LOCK_MINUTES = 30
+
+_USER_COLUMNS = """
+    u.id as conta_id,
+    u.username,
+    u.email,
+    u.password_hash,
+    u.salt,
+    u.email_verificado,
+    u.dois_fatores_habilitado,
+    u.ativo,
+    u.bloqueado_ate,
+    u.tentativas_falha,
+    u.ultimo_login,
+    p.nome_completo,
+    COALESCE(p.nome_completo, '') as primeiro_nome,
+    COALESCE(p.nome_completo, '') as ultimo_nome,
+    p.telefone,
+    p.cpf
+"""
+
+USER_BY_USERNAME = queries.register(
+    "auth.user_by_username",
+    f"""
+    SELECT {_USER_COLUMNS}
+    FROM usuarios.usuario u
+    LEFT JOIN cadastro.pessoa p ON u.pessoa_id = p.id
+    WHERE u.username = $1
+    """,
+)
+
+USER_BY_EMAIL = queries.register(
+    "auth.user_by_email",
+    f"""
+    SELECT {_USER_COLUMNS}
+    FROM usuarios.usuario u
+    LEFT JOIN cadastro.pessoa p ON u.pessoa_id = p.id
+    WHERE u.email = $1
+    """,
+)
+
+USER_BY_IDENTIFIER = queries.register(
+    "auth.user_by_identifier",
+    f"""
+    SELECT {_USER_COLUMNS}
+    FROM usuarios.usuario u
+    LEFT JOIN cadastro.pessoa p ON u.pessoa_id = p.id
+    WHERE u.username = $1 OR u.email = $1
+    """,
+)
+
+USER_FOR_LOGIN = queries.register(
+    "auth.user_for_login",
+    f"""
+    SELECT {_USER_COLUMNS},
+        COALESCE(u.bloqueado_ate > $2, FALSE) as bloqueado
+    FROM usuarios.usuario u
+    LEFT JOIN cadastro.pessoa p ON u.pessoa_id = p.id
+    WHERE u.username = $1 OR u.email = $1
+    """,
+)
+
+REGISTER_FAILED_ATTEMPT = queries.register(
+    "auth.register_failed_attempt",
+    """
+    UPDATE usuarios.usuario
+    SET tentativas_falha = tentativas_falha + 1,
+        bloqueado_ate = CASE
+            WHEN tentativas_falha + 1 >= $3 THEN $4
+            ELSE bloqueado_ate
+        END,
+        atualizado_em = $1
+    WHERE id = $2
+    RETURNING tentativas_falha
+    """,
+)
+
+CREATE_USER = queries.register(
+    "auth.create_user",
+    """
+    INSERT INTO usuarios.usuario
+    (pessoa_id, instituicao_id, username, email,
+     password_hash, salt, email_institucional,
+     telefone_institucional, email_verificado)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    RETURNING id
+    """,
+)
+
+UPDATE_LAST_LOGIN = queries.register(
+    "auth.update_last_login",
+    """
+    UPDATE usuarios.usuario
+    SET ultimo_login = $1,
+        ultimo_ip = $2,
+        tentativas_falha = 0
+    WHERE id = $3
+    """,
+)
+
+INCREMENT_FAILED_ATTEMPTS = queries.register(
+    "auth.increment_failed_attempts",
+    """
+    UPDATE usuarios.usuario
+    SET tentativas_falha = tentativas_falha + 1,
+        atualizado_em = $1
+    WHERE id = $2
+    RETURNING tentativas_falha
+    """,
+)
+
+LOCK_ACCOUNT = queries.register(
+    "auth.lock_account",
+    """
+    UPDATE usuarios.usuario
+    SET bloqueado_ate = $1,
+        atualizado_em = $2
+    WHERE id = $3
+    """,
+)
+
+ACCOUNT_LOCKED_UNTIL = queries.register(
+    "auth.account_locked_until",
+    """
+    SELECT bloqueado_ate
+    FROM usuarios.usuario
+    WHERE id = $1
+    """,
+)
+
+VERIFY_EMAIL = queries.register(
+    "auth.verify_email",
+    """
+    UPDATE usuarios.usuario
+    SET email_verificado = TRUE,
+        atualizado_em = $1
+    WHERE id = $2
+    """,
+)
+
+UPDATE_PASSWORD = queries.register(
+    "auth.update_password",
+    """
+    UPDATE usuarios.usuario
+    SET password_hash = $1,
+        salt = $2,
+        atualizado_em = $3,
+        tentativas_falha = 0,
+        bloqueado_ate = NULL
+    WHERE id = $4
+    """,
+)
 
 
 class UserService:
     """Serviço para operações de usuário no banco de dados"""
 
     @staticmethod
-    async def get_user_by_username(username: str) -> Optional[dict]:
+    async def get_user_by_username(username: str) -> Optional[Row]:
         """
         Buscar usuário por username
 
@@ -22,42 +180,13 @@ class UserService:
             username: Nome de usuário
 
         Returns:
-            dict com dados do usuário ou None se não encontrado
+            Row com dados do usuário ou None se não encontrado
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                SELECT
-                    u.id as conta_id,
-                    u.username,
-                    u.email,
-                    u.password_hash,
-                    u.salt,
-                    u.email_verificado,
-                    u.dois_fatores_habilitado,
-                    u.ativo,
-                    u.bloqueado_ate,
-                    u.tentativas_falha,
-                    u.ultimo_login,
-                    p.nome_completo,
-                    COALESCE(p.nome_completo, '') as primeiro_nome,
-                    COALESCE(p.nome_completo, '') as ultimo_nome,
-                    p.telefone,
-                    p.cpf
-                FROM usuarios.usuario u
-                LEFT JOIN cadastro.pessoa p ON u.pessoa_id = p.id
-                WHERE u.username = $1
-            """
-            row = await conn.fetchrow(query, username)
-
-            if row:
-                return dict(row)
-            return None
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            return await USER_BY_USERNAME.fetchrow(conn, username)
 
     @staticmethod
-    async def get_user_by_email(email: str) -> Optional[dict]:
+    async def get_user_by_email(email: str) -> Optional[Row]:
         """
         Buscar usuário por email
 
@@ -65,42 +194,13 @@ class UserService:
             email: Email do usuário
 
         Returns:
-            dict com dados do usuário ou None se não encontrado
+            Row com dados do usuário ou None se não encontrado
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                SELECT
-                    u.id as conta_id,
-                    u.username,
-                    u.email,
-                    u.password_hash,
-                    u.salt,
-                    u.email_verificado,
-                    u.dois_fatores_habilitado,
-                    u.ativo,
-                    u.bloqueado_ate,
-                    u.tentativas_falha,
-                    u.ultimo_login,
-                    p.nome_completo,
-                    COALESCE(p.nome_completo, '') as primeiro_nome,
-                    COALESCE(p.nome_completo, '') as ultimo_nome,
-                    p.telefone,
-                    p.cpf
-                FROM usuarios.usuario u
-                LEFT JOIN cadastro.pessoa p ON u.pessoa_id = p.id
-                WHERE u.email = $1
-            """
-            row = await conn.fetchrow(query, email)
-
-            if row:
-                return dict(row)
-            return None
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            return await USER_BY_EMAIL.fetchrow(conn, email)
 
     @staticmethod
-    async def get_user_by_identifier(identifier: str) -> Optional[dict]:
+    async def get_user_by_identifier(identifier: str) -> Optional[Row]:
         """
         Buscar usuário por username OU email
 
@@ -108,39 +208,54 @@ class UserService:
             identifier: Username ou email
 
         Returns:
-            dict com dados do usuário ou None se não encontrado
+            Row com dados do usuário ou None se não encontrado
+        """
+        async with postgres_connection() as conn:
+            return await USER_BY_IDENTIFIER.fetchrow(conn, identifier)
+
+    @staticmethod
+    async def get_user_for_login(
+        conn: asyncpg.Connection, identifier: str
+    ) -> Optional[Row]:
+        """
+        Buscar usuário para login (username OU email) já com o status de bloqueio
+
+        Mesmo resultado de ``get_user_by_identifier`` mais a coluna ``bloqueado``,
+        dispensando a consulta separada de ``is_account_locked``.
+
+        Args:
+            conn: Conexão do pipeline de login
+            identifier: Username ou email
+
+        Returns:
+            Row com dados do usuário ou None se não encontrado
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                SELECT
-                    u.id as conta_id,
-                    u.username,
-                    u.email,
-                    u.password_hash,
-                    u.salt,
-                    u.email_verificado,
-                    u.dois_fatores_habilitado,
-                    u.ativo,
-                    u.bloqueado_ate,
-                    u.tentativas_falha,
-                    u.ultimo_login,
-                    p.nome_completo,
-                    COALESCE(p.nome_completo, '') as primeiro_nome,
-                    COALESCE(p.nome_completo, '') as ultimo_nome,
-                    p.telefone,
-                    p.cpf
-                FROM usuarios.usuario u
-                LEFT JOIN cadastro.pessoa p ON u.pessoa_id = p.id
-                WHERE u.username = $1 OR u.email = $1
-            """
-            row = await conn.fetchrow(query, identifier)
-
-            if row:
-                return dict(row)
-            return None
-        finally:
-            await conn.close()
+        return await USER_FOR_LOGIN.fetchrow(conn, identifier, datetime.utcnow())
+
+    @staticmethod
+    async def register_failed_attempt(
+        conn: asyncpg.Connection, conta_id: uuid.UUID
+    ) -> int:
+        """
+        Incrementar tentativas falhadas e bloquear a conta num único UPDATE
+
+        Equivale a ``increment_failed_attempts`` + ``lock_account``.
+
+        Args:
+            conn: Conexão do pipeline de login
+            conta_id: ID da conta do usuário
+
+        Returns:
+            Número de tentativas falhadas após o incremento
+        """
+        now = datetime.utcnow()
+        return await REGISTER_FAILED_ATTEMPT.fetchval(
+            conn,
+            now,
+            conta_id,
+            MAX_FAILED_ATTEMPTS,
+            now + timedelta(minutes=LOCK_MINUTES),
+        )
 
     @staticmethod
     async def create_user(
@@ -171,18 +286,9 @@ class UserService:
         Returns:
             UUID do usuário criado
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                INSERT INTO usuarios.usuario
-                (pessoa_id, instituicao_id, username, email,
-                 password_hash, salt, email_institucional,
-                 telefone_institucional, email_verificado)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                RETURNING id
-            """
-            user_id = await conn.fetchval(
-                query,
+        async with postgres_connection() as conn:
+            return await CREATE_USER.fetchval(
+                conn,
                 pessoa_id,
                 instituicao_id,
                 username,
@@ -193,9 +299,6 @@ class UserService:
                 telefone_institucional,
                 email_verificado,
             )
-            return user_id
-        finally:
-            await conn.close()
 
     @staticmethod
     async def update_last_login(conta_id: uuid.UUID, ip_address: Optional[str] = None):
@@ -206,18 +309,8 @@ class UserService:
             conta_id: ID da conta do usuário
             ip_address: Endereço IP (opcional)
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                UPDATE usuarios.usuario
-                SET ultimo_login = $1,
-                    ultimo_ip = $2,
-                    tentativas_falha = 0
-                WHERE id = $3
-            """
-            await conn.execute(query, datetime.utcnow(), ip_address, conta_id)
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            await UPDATE_LAST_LOGIN.execute(conn, datetime.utcnow(), ip_address, conta_id)
 
     @staticmethod
     async def increment_failed_attempts(conta_id: uuid.UUID):
@@ -227,27 +320,19 @@ class UserService:
         Args:
             conta_id: ID da conta do usuário
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                UPDATE usuarios.usuario
-                SET tentativas_falha = tentativas_falha + 1,
-                    atualizado_em = $1
-                WHERE id = $2
-                RETURNING tentativas_falha
-            """
-            attempts = await conn.fetchval(query, datetime.utcnow(), conta_id)
-
-            # Bloquear conta após 5 tentativas
-            if attempts >= 5:
-                await UserService.lock_account(conta_id, minutes=30)
+        async with postgres_connection() as conn:
+            attempts = await INCREMENT_FAILED_ATTEMPTS.fetchval(
+                conn, datetime.utcnow(), conta_id
+            )
+
+            # Bloquear conta após MAX_FAILED_ATTEMPTS tentativas
+            if attempts >= MAX_FAILED_ATTEMPTS:
+                await UserService.lock_account(conta_id, minutes=LOCK_MINUTES)
 
             return attempts
-        finally:
-            await conn.close()
 
     @staticmethod
-    async def lock_account(conta_id: uuid.UUID, minutes: int = 30):
+    async def lock_account(conta_id: uuid.UUID, minutes: int = LOCK_MINUTES):
         """
         Bloquear conta temporariamente
 
@@ -255,21 +340,10 @@ class UserService:
             conta_id: ID da conta do usuário
             minutes: Minutos de bloqueio
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                UPDATE usuarios.usuario
-                SET bloqueado_ate = $1,
-                    atualizado_em = $2
-                WHERE id = $3
-            """
-            from datetime import timedelta
-
-            bloqueado_ate = datetime.utcnow() + timedelta(minutes=minutes)
-
-            await conn.execute(query, bloqueado_ate, datetime.utcnow(), conta_id)
-        finally:
-            await conn.close()
+        bloqueado_ate = datetime.utcnow() + timedelta(minutes=minutes)
+
+        async with postgres_connection() as conn:
+            await LOCK_ACCOUNT.execute(conn, bloqueado_ate, datetime.utcnow(), conta_id)
 
     @staticmethod
     async def is_account_locked(conta_id: uuid.UUID) -> bool:
@@ -282,20 +356,12 @@ class UserService:
         Returns:
             True se conta está bloqueada, False caso contrário
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                SELECT bloqueado_ate
-                FROM usuarios.usuario
-                WHERE id = $1
-            """
-            bloqueado_ate = await conn.fetchval(query, conta_id)
-
-            if bloqueado_ate and bloqueado_ate > datetime.utcnow():
-                return True
-            return False
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            bloqueado_ate = await ACCOUNT_LOCKED_UNTIL.fetchval(conn, conta_id)
+
+        if bloqueado_ate and bloqueado_ate > datetime.utcnow():
+            return True
+        return False
 
     @staticmethod
     async def verify_email(conta_id: uuid.UUID):
@@ -305,17 +371,8 @@ class UserService:
         Args:
             conta_id: ID da conta do usuário
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                UPDATE usuarios.usuario
-                SET email_verificado = TRUE,
-                    atualizado_em = $1
-                WHERE id = $2
-            """
-            await conn.execute(query, datetime.utcnow(), conta_id)
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            await VERIFY_EMAIL.execute(conn, datetime.utcnow(), conta_id)
 
     @staticmethod
     async def update_password(conta_id: uuid.UUID, password_hash: str, salt: str):
@@ -327,17 +384,7 @@ class UserService:
             password_hash: Novo hash da senha
             salt: Novo salt
         """
-        conn = await get_postgres_connection()
-        try:
-            query = """
-                UPDATE usuarios.usuario
-                SET password_hash = $1,
-                    salt = $2,
-                    atualizado_em = $3,
-                    tentativas_falha = 0,
-                    bloqueado_ate = NULL
-                WHERE id = $4
-            """
-            await conn.execute(query, password_hash, salt, datetime.utcnow(), conta_id)
-        finally:
-            await conn.close()
+        async with postgres_connection() as conn:
+            await UPDATE_PASSWORD.execute(
+                conn, password_hash, salt, datetime.utcnow(), conta_id
+            )
@@ -8,7 +8,8 @@ cadastro.pessoa (modelo simples de cadastro).
 from typing import Optional
 import uuid
 
-from app.database import get_postgres_connection
+from app.database import postgres_connection
+from app.services.M01_auth.service_pessoa_blind_index import blind_index_pair
 
 
 class CadastroPessoaService:
@@ -28,10 +29,10 @@ class CadastroPessoaService:
         Insere uma pessoa na tabela cadastro.pessoa e retorna o UUID gerado.
                         Campos presentes em cadastro.pessoa (DDL simplificada):
                             id, nome_completo, cpf, email, telefone, cargo,
-                            instituicao_id, departamento_id, ativa, created_at
+                            instituicao_id, departamento_id, ativa, created_at,
+                            cpf_bidx, telefone_bidx (migration 013)
         """
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             pessoa_id = uuid.uuid4()
 
             # Garantir CPF apenas dígitos
@@ -52,14 +53,18 @@ class CadastroPessoaService:
                 # Retornar o id existente para manter idempotência do cadastro público
                 return exists["id"]
 
+            cpf_bidx, telefone_bidx = blind_index_pair(cpf_limpo, telefone)
+
             await conn.execute(
                 """
                 INSERT INTO cadastro.pessoa (
                     id, nome_completo, cpf, email, telefone, cargo,
-                    instituicao_id, departamento_id, ativa, created_at
+                    instituicao_id, departamento_id, ativa, created_at,
+                    cpf_bidx, telefone_bidx
                 ) VALUES (
                     $1, $2, $3, $4, $5, $6,
-                    $7, $8, TRUE, NOW()
+                    $7, $8, TRUE, NOW(),
+                    $9, $10
                 )
                 """,
                 pessoa_id,
@@ -70,17 +75,16 @@ class CadastroPessoaService:
                 cargo,
                 instituicao_id,
                 departamento_id,
+                cpf_bidx,
+                telefone_bidx,
             )
 
             return pessoa_id
-        finally:
-            await conn.close()
 
     @staticmethod
     async def get_by_cpf(cpf: str) -> Optional[dict]:
         """Busca pessoa em cadastro.pessoa por CPF"""
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             import re
 
             cpf_limpo = re.sub(r"[^\d]", "", cpf or "")
@@ -89,18 +93,13 @@ class CadastroPessoaService:
                 cpf_limpo or None,
             )
             return dict(row) if row else None
-        finally:
-            await conn.close()
 
     @staticmethod
     async def get_by_email(email: str) -> Optional[dict]:
         """Busca pessoa em cadastro.pessoa por Email"""
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             row = await conn.fetchrow(
                 "SELECT * FROM cadastro.pessoa WHERE email = $1",
                 email,
             )
             return dict(row) if row else None
-        finally:
-            await conn.close()
@@ -0,0 +1,395 @@
+"""
+Cache de CEP em dois níveis: LRU em processo + tabela persistente
+
+- Memória: LRU limitado por worker, sem ida ao banco nas consultas repetidas
+- Persistente: cadastro.cep_cache (PostgreSQL, migration 014) ou arquivo
+  SQLite local quando o PostgreSQL está desativado (enable_postgres=False)
+
+CEPs encontrados e "não encontrados" têm TTLs separados; cada entrada guarda
+o provedor de origem (viacep, dump...). Falhas do armazenamento persistente
+nunca interrompem a consulta: o CEP segue para o provedor ao vivo.
+
+Entradas vencidas continuam guardadas por `stale_grace_hours`: com o
+provedor fora do ar (circuito aberto, timeout) são servidas como `stale`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+from app.config import settings
+from app.database import postgres_connection
+from app.query_registry import queries
+
+logger = logging.getLogger(__name__)
+
+
+class CEPCacheEntry(NamedTuple):
+    """Resultado cacheado de um CEP (dados None quando não encontrado)"""
+
+    cep: str
+    dados: Optional[dict]
+    encontrado: bool
+    provedor: str
+    expira_em: datetime
+
+
+# =====================================================
+# ARMAZENAMENTO PERSISTENTE
+# =====================================================
+
+CEP_CACHE_GET = queries.register(
+    "cep_cache.get",
+    """
+    SELECT cep, dados, encontrado, provedor, expira_em
+    FROM cadastro.cep_cache
+    WHERE cep = $1 AND expira_em > $2
+    """,
+)
+
+CEP_CACHE_UPSERT = queries.register(
+    "cep_cache.upsert",
+    """
+    INSERT INTO cadastro.cep_cache (cep, dados, encontrado, provedor, expira_em)
+    SELECT v.cep, v.dados::jsonb, v.encontrado, v.provedor, v.expira_em
+    FROM unnest($1::text[], $2::text[], $3::boolean[], $4::text[], $5::timestamp[])
+        AS v(cep, dados, encontrado, provedor, expira_em)
+    ON CONFLICT (cep) DO UPDATE SET
+        dados = EXCLUDED.dados,
+        encontrado = EXCLUDED.encontrado,
+        provedor = EXCLUDED.provedor,
+        consultado_em = NOW(),
+        expira_em = EXCLUDED.expira_em
+    """,
+)
+
+CEP_CACHE_PURGE = queries.register(
+    "cep_cache.purge",
+    """
+    WITH alvo AS (
+        SELECT cep FROM cadastro.cep_cache WHERE expira_em <= $1 LIMIT $2
+    ), removidas AS (
+        DELETE FROM cadastro.cep_cache
+        WHERE cep IN (SELECT cep FROM alvo)
+        RETURNING 1
+    )
+    SELECT count(*) FROM removidas
+    """,
+)
+
+
+def _load_dados(value: Any) -> Optional[dict]:
+    if value is None or isinstance(value, dict):
+        return value
+    return json.loads(value)
+
+
+class PostgresCEPStore:
+    """
+    cadastro.cep_cache no PostgreSQL
+
+    Leases avulsos: entre a leitura e a gravação há a chamada ao ViaCEP, que
+    não deve prender a conexão do request.
+    """
+
+    name = "postgres"
+
+    async def get(self, cep: str, valido_apos: datetime) -> Optional[CEPCacheEntry]:
+        async with postgres_connection(standalone=True) as conn:
+            row = await CEP_CACHE_GET.fetchrow(conn, cep, valido_apos)
+        if row is None:
+            return None
+        return CEPCacheEntry(
+            row["cep"], _load_dados(row["dados"]), row["encontrado"], row["provedor"], row["expira_em"]
+        )
+
+    async def put_many(self, entries: list[CEPCacheEntry]) -> int:
+        if not entries:
+            return 0
+        async with postgres_connection(standalone=True) as conn:
+            await CEP_CACHE_UPSERT.execute(
+                conn,
+                [e.cep for e in entries],
+                [None if e.dados is None else json.dumps(e.dados) for e in entries],
+                [e.encontrado for e in entries],
+                [e.provedor for e in entries],
+                [e.expira_em for e in entries],
+            )
+        return len(entries)
+
+    async def purge_expired(self, vencido_antes: datetime, batch_size: int = 5000) -> int:
+        pruned = 0
+        while True:
+            async with postgres_connection(standalone=True) as conn:
+                deleted = await CEP_CACHE_PURGE.fetchval(conn, vencido_antes, batch_size)
+            pruned += deleted
+            if deleted < batch_size:
+                return pruned
+
+
+class SQLiteCEPStore:
+    """Arquivo SQLite local (desenvolvimento sem PostgreSQL)"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cep_cache (
+                    cep TEXT PRIMARY KEY,
+                    dados TEXT,
+                    encontrado INTEGER NOT NULL,
+                    provedor TEXT NOT NULL,
+                    consultado_em TEXT NOT NULL,
+                    expira_em TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cep_cache_expira ON cep_cache (expira_em)")
+            self._initialized = True
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _get(self, cep: str, valido_apos: datetime) -> Optional[CEPCacheEntry]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT cep, dados, encontrado, provedor, expira_em FROM cep_cache "
+                "WHERE cep = ? AND expira_em > ?",
+                (cep, valido_apos.isoformat()),
+            ).fetchone()
+        if row is None:
+            return None
+        return CEPCacheEntry(
+            row[0], _load_dados(row[1]), bool(row[2]), row[3], datetime.fromisoformat(row[4])
+        )
+
+    def _put_many(self, entries: list[CEPCacheEntry]) -> int:
+        now = datetime.utcnow().isoformat()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cep_cache "
+                "(cep, dados, encontrado, provedor, consultado_em, expira_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        e.cep,
+                        None if e.dados is None else json.dumps(e.dados),
+                        int(e.encontrado),
+                        e.provedor,
+                        now,
+                        e.expira_em.isoformat(),
+                    )
+                    for e in entries
+                ],
+            )
+        return len(entries)
+
+    def _purge_expired(self, vencido_antes: datetime) -> int:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM cep_cache WHERE expira_em <= ?", (vencido_antes.isoformat(),)
+            )
+            return cursor.rowcount
+
+    async def get(self, cep: str, valido_apos: datetime) -> Optional[CEPCacheEntry]:
+        return await asyncio.to_thread(self._get, cep, valido_apos)
+
+    async def put_many(self, entries: list[CEPCacheEntry]) -> int:
+        if not entries:
+            return 0
+        return await asyncio.to_thread(self._put_many, entries)
+
+    async def purge_expired(self, vencido_antes: datetime, batch_size: int = 5000) -> int:
+        return await asyncio.to_thread(self._purge_expired, vencido_antes)
+
+
+# =====================================================
+# CACHE EM DOIS NÍVEIS
+# =====================================================
+
+
+class CEPCache:
+    """LRU em memória na frente do armazenamento persistente"""
+
+    def __init__(
+        self,
+        store,
+        max_entries: int = 5000,
+        ttl_hours: float = 720,
+        negative_ttl_hours: float = 24,
+        stale_grace_hours: float = 168,
+    ):
+        """
+        Args:
+            store: PostgresCEPStore ou SQLiteCEPStore
+            max_entries: Entradas no LRU em memória (0 desativa a memória)
+            ttl_hours: Validade de CEPs encontrados
+            negative_ttl_hours: Validade de CEPs não encontrados
+            stale_grace_hours: Tempo que entradas vencidas ficam disponíveis
+                como `stale` (provedor indisponível)
+        """
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl = timedelta(hours=ttl_hours)
+        self.negative_ttl = timedelta(hours=negative_ttl_hours)
+        self.stale_grace = timedelta(hours=stale_grace_hours)
+        self._memory: OrderedDict[str, CEPCacheEntry] = OrderedDict()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.writes = 0
+        self.store_errors = 0
+        self.store_ms = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "CEPCache":
+        if settings.enable_postgres:
+            store = PostgresCEPStore()
+        else:
+            store = SQLiteCEPStore(settings.cep_cache_sqlite_path)
+        return cls(
+            store,
+            max_entries=settings.cep_cache_memory_entries,
+            ttl_hours=settings.cep_cache_ttl_hours,
+            negative_ttl_hours=settings.cep_cache_negative_ttl_hours,
+            stale_grace_hours=settings.cache_stale_grace_hours,
+        )
+
+    def entry(
+        self, cep: str, dados: Optional[dict], encontrado: bool, provedor: str
+    ) -> CEPCacheEntry:
+        ttl = self.ttl if encontrado else self.negative_ttl
+        return CEPCacheEntry(cep, dados, encontrado, provedor, datetime.utcnow() + ttl)
+
+    def _remember(self, entry: CEPCacheEntry):
+        if self.max_entries <= 0:
+            return
+        self._memory[entry.cep] = entry
+        self._memory.move_to_end(entry.cep)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, cep: str, stale: bool = False) -> Optional[CEPCacheEntry]:
+        """
+        Entrada válida do CEP (8 dígitos) ou None
+
+        Com stale=True aceita entradas vencidas há menos de stale_grace_hours
+        (usado quando o provedor está indisponível).
+        """
+        now = datetime.utcnow()
+        valido_apos = now - self.stale_grace if stale else now
+        entry = self._memory.get(cep)
+        if entry is not None:
+            if entry.expira_em > valido_apos:
+                self._memory.move_to_end(cep)
+                if entry.expira_em > now:
+                    self.memory_hits += 1
+                else:
+                    self.stale_hits += 1
+                return entry
+            if entry.expira_em <= now - self.stale_grace:
+                del self._memory[cep]
+
+        started = time.perf_counter()
+        try:
+            entry = await self.store.get(cep, valido_apos)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Cache de CEP indisponível ({self.store.name}): {e}")
+            entry = None
+        finally:
+            self.store_ms += (time.perf_counter() - started) * 1000
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expira_em > now:
+            self.store_hits += 1
+        else:
+            self.stale_hits += 1
+        self._remember(entry)
+        return entry
+
+    async def put(
+        self, cep: str, dados: Optional[dict], encontrado: bool, provedor: str
+    ) -> CEPCacheEntry:
+        """Grava o resultado de uma consulta ao vivo nos dois níveis"""
+        entry = self.entry(cep, dados, encontrado, provedor)
+        self._remember(entry)
+        await self.put_many([entry])
+        return entry
+
+    async def put_many(self, entries: Iterable[CEPCacheEntry]) -> int:
+        """Grava entradas só no armazenamento persistente (carga em lote)"""
+        entries = list(entries)
+        try:
+            written = await self.store.put_many(entries)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Falha ao gravar cache de CEP ({self.store.name}): {e}")
+            return 0
+        self.writes += written
+        return written
+
+    async def purge_expired(self) -> dict:
+        """Job do agendador: remove entradas vencidas além da carência de stale"""
+        vencido_antes = datetime.utcnow() - self.stale_grace
+        for cep in [c for c, e in self._memory.items() if e.expira_em <= vencido_antes]:
+            del self._memory[cep]
+        pruned = await self.store.purge_expired(vencido_antes)
+        return {"rows_pruned": pruned, "store": self.store.name}
+
+    def clear_memory(self):
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            "store": self.store.name,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl_hours": self.ttl.total_seconds() / 3600,
+            "negative_ttl_hours": self.negative_ttl.total_seconds() / 3600,
+            "stale_grace_hours": self.stale_grace.total_seconds() / 3600,
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "hit_rate": round((self.memory_hits + self.store_hits) / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "store_errors": self.store_errors,
+            "store_avg_ms": round(self.store_ms / (self.store_hits + self.misses), 3)
+            if self.store_hits + self.misses
+            else 0.0,
+        }
+
+
+# Instância global
+cep_cache = CEPCache.from_settings()
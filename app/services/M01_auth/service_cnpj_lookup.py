@@ -0,0 +1,512 @@
+"""
+Motor de consultas de CNPJ na ReceitaWS
+
+A ReceitaWS gratuita aceita poucas consultas por minuto. Para não gastar a
+cota com consultas repetidas:
+
+- Cache de resultados com TTL: memória + cadastro.cnpj_consulta (migration 015);
+  "não encontrado" também é cacheado, com validade menor
+- Single-flight: consultas simultâneas do mesmo CNPJ aguardam a mesma
+  requisição em andamento
+- Token bucket: quando a cota acaba as consultas esperam na fila (FIFO) em vez
+  de falhar
+- Modo assíncrono: quem não pode esperar recebe "pendente" e consulta o
+  resultado depois (ver POST /api/v1/externas/cnpj/consultar → 202)
+- Circuito aberto ou erro da ReceitaWS: serve o resultado vencido do cache
+  (dentro de `cache_stale_grace_hours`) com `stale=True`, sem ocupar a fila
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from app.circuit_breaker import CircuitOpenError
+from app.config import settings
+from app.database import context_without_request_lease, postgres_connection
+from app.http_client import http_client
+from app.query_registry import queries
+
+logger = logging.getLogger(__name__)
+
+PROVEDOR = "receitaws"
+RECEITAWS_URL = settings.receitaws_base_url.rstrip("/") + "/cnpj/{cnpj}"
+
+# Resultado de consultas que falharam (não cacheado): fica disponível para
+# polling por alguns minutos
+_FAILED_RESULT_SECONDS = 300
+_FAILED_RESULT_MAX = 1000
+
+
+class CNPJLookupResult(NamedTuple):
+    """Resultado de uma consulta de CNPJ"""
+
+    cnpj: str
+    status: str  # encontrado | nao_encontrado | erro
+    dados: Optional[dict]
+    origem: str  # cache | receitaws
+    mensagem: str
+    stale: bool = False  # vencido, servido com a ReceitaWS indisponível
+
+    @property
+    def cacheable(self) -> bool:
+        return self.status != "erro" and not self.stale
+
+
+def normalize_receitaws(data: dict) -> dict:
+    """Campos da ReceitaWS usados no cadastro de instituição"""
+    atividade = data.get("atividade_principal") or [{}]
+    return {
+        "nome": data.get("nome", ""),
+        "nome_fantasia": data.get("fantasia", ""),
+        "logradouro": data.get("logradouro", ""),
+        "numero": data.get("numero", ""),
+        "complemento": data.get("complemento", ""),
+        "bairro": data.get("bairro", ""),
+        "municipio": data.get("municipio", ""),
+        "uf": data.get("uf", ""),
+        "cep": data.get("cep", ""),
+        "telefone": data.get("telefone", ""),
+        "email": data.get("email", ""),
+        "abertura": data.get("abertura", ""),
+        "porte": data.get("porte", ""),
+        "natureza_juridica": data.get("natureza_juridica", ""),
+        "situacao": data.get("situacao", ""),
+        "atividade_principal": atividade[0].get("text", ""),
+    }
+
+
+# =====================================================
+# TOKEN BUCKET
+# =====================================================
+
+
+class TokenBucket:
+    """
+    Limitador de taxa que enfileira em vez de recusar
+
+    `acquire()` espera a vez (ordem de chegada) e o próximo token disponível.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waiting = 0
+        self.acquired = 0
+        self.total_wait_seconds = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate_per_second)
+        self.updated = now
+
+    def penalize(self):
+        """Zera os tokens (o provedor respondeu 429)"""
+        self._refill()
+        self.tokens = 0.0
+
+    def estimated_wait_seconds(self) -> float:
+        """Espera estimada de quem entrar na fila agora"""
+        self._refill()
+        missing = self.waiting + 1 - self.tokens
+        return max(0.0, missing / self.rate_per_second)
+
+    async def acquire(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    await asyncio.sleep((1 - self.tokens) / self.rate_per_second)
+        finally:
+            self.waiting -= 1
+        self.acquired += 1
+        self.total_wait_seconds += time.monotonic() - started
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            "rate_per_minute": round(self.rate_per_second * 60, 3),
+            "burst": self.capacity,
+            "tokens": round(self.tokens, 3),
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.acquired, 3)
+            if self.acquired
+            else 0.0,
+        }
+
+
+# =====================================================
+# CACHE PERSISTENTE
+# =====================================================
+
+CNPJ_CACHE_GET = queries.register(
+    "cnpj_cache.get",
+    """
+    SELECT dados, encontrado, expira_em
+    FROM cadastro.cnpj_consulta
+    WHERE cnpj = $1 AND expira_em > $2
+    """,
+)
+
+CNPJ_CACHE_UPSERT = queries.register(
+    "cnpj_cache.upsert",
+    """
+    INSERT INTO cadastro.cnpj_consulta (cnpj, dados, encontrado, provedor, expira_em)
+    VALUES ($1, $2::jsonb, $3, $4, $5)
+    ON CONFLICT (cnpj) DO UPDATE SET
+        dados = EXCLUDED.dados,
+        encontrado = EXCLUDED.encontrado,
+        provedor = EXCLUDED.provedor,
+        consultado_em = NOW(),
+        expira_em = EXCLUDED.expira_em
+    """,
+)
+
+CNPJ_CACHE_PURGE = queries.register(
+    "cnpj_cache.purge",
+    "DELETE FROM cadastro.cnpj_consulta WHERE expira_em <= $1",
+)
+
+
+class PostgresCNPJStore:
+    """
+    cadastro.cnpj_consulta no PostgreSQL
+
+    Leases avulsos: a consulta pode esperar segundos pela fila da ReceitaWS e
+    não deve prender a conexão do request nesse meio-tempo.
+    """
+
+    name = "postgres"
+
+    async def get(
+        self, cnpj: str, valido_apos: datetime
+    ) -> Optional[tuple[Optional[dict], bool, datetime]]:
+        async with postgres_connection(standalone=True) as conn:
+            row = await CNPJ_CACHE_GET.fetchrow(conn, cnpj, valido_apos)
+        if row is None:
+            return None
+        dados = row["dados"]
+        if isinstance(dados, str):
+            dados = json.loads(dados)
+        return dados, row["encontrado"], row["expira_em"]
+
+    async def put(self, cnpj: str, dados: Optional[dict], encontrado: bool, expira_em: datetime):
+        async with postgres_connection(standalone=True) as conn:
+            await CNPJ_CACHE_UPSERT.execute(
+                conn,
+                cnpj,
+                None if dados is None else json.dumps(dados),
+                encontrado,
+                PROVEDOR,
+                expira_em,
+            )
+
+    async def purge_expired(self, vencido_antes: datetime) -> int:
+        async with postgres_connection(standalone=True) as conn:
+            status = await CNPJ_CACHE_PURGE.execute(conn, vencido_antes)
+        return int(status.split()[-1])
+
+
+# =====================================================
+# MOTOR DE CONSULTAS
+# =====================================================
+
+
+class CNPJLookupEngine:
+    """Cache + single-flight + fila com limite de taxa para a ReceitaWS"""
+
+    def __init__(
+        self,
+        store=None,
+        rate_per_minute: float = 3,
+        burst: int = 3,
+        ttl_hours: float = 720,
+        negative_ttl_hours: float = 24,
+        max_memory_entries: int = 2000,
+        max_retries: int = 2,
+        stale_grace_hours: float = 168,
+    ):
+        """
+        Args:
+            store: Armazenamento persistente (None: apenas memória)
+            rate_per_minute: Consultas por minuto liberadas para a ReceitaWS
+            burst: Consultas permitidas de uma vez após período ocioso
+            ttl_hours: Validade de CNPJs encontrados
+            negative_ttl_hours: Validade de CNPJs não encontrados
+            max_memory_entries: Entradas no cache em memória
+            max_retries: Novas tentativas após HTTP 429 (voltam para a fila)
+            stale_grace_hours: Tempo que resultados vencidos ficam disponíveis
+                para servir com a ReceitaWS indisponível
+        """
+        self.store = store
+        self.bucket = TokenBucket(rate_per_minute, burst)
+        self.ttl = timedelta(hours=ttl_hours)
+        self.negative_ttl = timedelta(hours=negative_ttl_hours)
+        self.max_memory_entries = max_memory_entries
+        self.max_retries = max_retries
+        self.stale_grace = timedelta(hours=stale_grace_hours)
+        self._memory: OrderedDict[str, tuple[CNPJLookupResult, datetime]] = OrderedDict()
+        self._failed: OrderedDict[str, tuple[CNPJLookupResult, float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.stale_served = 0
+        self.store_errors = 0
+
+    @classmethod
+    def from_settings(cls) -> "CNPJLookupEngine":
+        return cls(
+            store=PostgresCNPJStore() if settings.enable_postgres else None,
+            rate_per_minute=settings.receitaws_rate_per_minute,
+            burst=settings.receitaws_burst,
+            ttl_hours=settings.cnpj_cache_ttl_hours,
+            negative_ttl_hours=settings.cnpj_cache_negative_ttl_hours,
+            stale_grace_hours=settings.cache_stale_grace_hours,
+        )
+
+    # -------------------------------------------------
+    # Cache
+    # -------------------------------------------------
+
+    def _remember(self, result: CNPJLookupResult, expira_em: datetime):
+        self._memory[result.cnpj] = (result, expira_em)
+        self._memory.move_to_end(result.cnpj)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    async def cached(self, cnpj: str, stale: bool = False) -> Optional[CNPJLookupResult]:
+        """
+        Resultado em cache (memória ou persistente), sem chamar a ReceitaWS
+
+        Com stale=True aceita resultados vencidos há menos de stale_grace_hours.
+        """
+        now = datetime.utcnow()
+        valido_apos = now - self.stale_grace if stale else now
+        entry = self._memory.get(cnpj)
+        if entry is not None:
+            result, expira_em = entry
+            if expira_em > valido_apos:
+                self._memory.move_to_end(cnpj)
+                return result
+            if expira_em <= now - self.stale_grace:
+                del self._memory[cnpj]
+
+        if self.store is None:
+            return None
+        try:
+            stored = await self.store.get(cnpj, valido_apos)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Cache de CNPJ indisponível: {e}")
+            return None
+        if stored is None:
+            return None
+
+        dados, encontrado, expira_em = stored
+        result = self._result(cnpj, dados if encontrado else None, "cache")
+        self._remember(result, expira_em)
+        return result
+
+    async def _store(self, result: CNPJLookupResult):
+        ttl = self.ttl if result.status == "encontrado" else self.negative_ttl
+        expira_em = datetime.utcnow() + ttl
+        self._remember(result._replace(origem="cache"), expira_em)
+        if self.store is None:
+            return
+        try:
+            await self.store.put(
+                result.cnpj, result.dados, result.status == "encontrado", expira_em
+            )
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Falha ao gravar cache de CNPJ: {e}")
+
+    @staticmethod
+    def _result(cnpj: str, dados: Optional[dict], origem: str) -> CNPJLookupResult:
+        if dados is None:
+            return CNPJLookupResult(
+                cnpj,
+                "nao_encontrado",
+                None,
+                origem,
+                "Formato válido, mas não encontrado. Preencha os dados manualmente.",
+            )
+        return CNPJLookupResult(cnpj, "encontrado", dados, origem, "Dados carregados com sucesso")
+
+    # -------------------------------------------------
+    # Consulta
+    # -------------------------------------------------
+
+    async def _fetch(self, cnpj: str) -> CNPJLookupResult:
+        """Consulta a ReceitaWS respeitando o limite de taxa"""
+        url = RECEITAWS_URL.format(cnpj=cnpj)
+        for _ in range(self.max_retries + 1):
+            http_client.check_circuit(PROVEDOR)  # circuito aberto: não ocupa a fila
+            await self.bucket.acquire()
+            self.upstream_calls += 1
+            async with http_client.get(PROVEDOR, url) as response:
+                if response.status == 429:
+                    self.rate_limited += 1
+                    self.bucket.penalize()
+                    continue
+                if response.status != 200:
+                    logger.error(f"Erro na API ReceitaWS: {response.status}")
+                    return CNPJLookupResult(
+                        cnpj,
+                        "erro",
+                        None,
+                        PROVEDOR,
+                        "Não foi possível consultar dados. Preencha manualmente.",
+                    )
+                data = await response.json(content_type=None)
+
+            if data.get("status") == "ERROR":
+                logger.warning(f"CNPJ não encontrado na RF: {cnpj}")
+                return self._result(cnpj, None, PROVEDOR)
+            logger.info(f"CNPJ consultado com sucesso: {cnpj}")
+            return self._result(cnpj, normalize_receitaws(data), PROVEDOR)
+
+        return CNPJLookupResult(
+            cnpj, "erro", None, PROVEDOR, "Limite de consultas da Receita atingido. Tente novamente."
+        )
+
+    async def _resolve(self, cnpj: str) -> CNPJLookupResult:
+        try:
+            result = await self._fetch(cnpj)
+        except CircuitOpenError as e:
+            logger.warning(str(e))
+            result = CNPJLookupResult(
+                cnpj, "erro", None, PROVEDOR, "Receita indisponível. Tente novamente mais tarde."
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout ao consultar CNPJ: {cnpj}")
+            result = CNPJLookupResult(
+                cnpj, "erro", None, PROVEDOR, "Timeout na consulta. Tente novamente."
+            )
+        except Exception as e:
+            logger.error(f"Erro ao consultar CNPJ: {str(e)}")
+            result = CNPJLookupResult(
+                cnpj, "erro", None, PROVEDOR, f"Erro na consulta: {str(e)}"
+            )
+
+        if result.cacheable:
+            await self._store(result)
+            return result
+
+        stale = await self.cached(cnpj, stale=True)
+        if stale is not None:
+            logger.warning(f"ReceitaWS indisponível, CNPJ {cnpj} servido do cache vencido")
+            self.stale_served += 1
+            result = stale._replace(stale=True)
+        else:
+            self.failures += 1
+        self._failed[cnpj] = (result, time.monotonic())
+        while len(self._failed) > _FAILED_RESULT_MAX:
+            self._failed.popitem(last=False)
+        return result
+
+    def _task(self, cnpj: str) -> asyncio.Task:
+        """Consulta em andamento do CNPJ (cria uma se não houver)"""
+        task = self._inflight.get(cnpj)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        self._failed.pop(cnpj, None)
+        # A consulta pode terminar depois do request (202): não herda o lease dele
+        task = asyncio.create_task(self._resolve(cnpj), context=context_without_request_lease())
+        self._inflight[cnpj] = task
+        task.add_done_callback(lambda _: self._inflight.pop(cnpj, None))
+        return task
+
+    async def lookup(
+        self, cnpj: str, wait_seconds: Optional[float] = None
+    ) -> Optional[CNPJLookupResult]:
+        """
+        Consulta um CNPJ (14 dígitos)
+
+        Args:
+            cnpj: CNPJ só com dígitos
+            wait_seconds: Espera máxima pelo resultado (None: espera a fila toda)
+
+        Returns:
+            Resultado, ou None se a espera acabou antes; a consulta continua em
+            background e o resultado pode ser obtido com `poll`.
+        """
+        result = await self.cached(cnpj)
+        if result is not None:
+            self.cache_hits += 1
+            return result
+
+        task = self._task(cnpj)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), wait_seconds)
+        except asyncio.TimeoutError:
+            return None
+
+    async def poll(self, cnpj: str) -> tuple[str, Optional[CNPJLookupResult]]:
+        """
+        Situação de uma consulta: ("concluida", resultado), ("pendente", None)
+        ou ("desconhecida", None)
+        """
+        if cnpj in self._inflight:
+            return "pendente", None
+        result = await self.cached(cnpj)
+        if result is not None:
+            return "concluida", result
+        failed = self._failed.get(cnpj)
+        if failed is not None and time.monotonic() - failed[1] < _FAILED_RESULT_SECONDS:
+            return "concluida", failed[0]
+        return "desconhecida", None
+
+    def queue_position(self) -> dict:
+        return {
+            "fila": self.bucket.waiting,
+            "espera_estimada_segundos": round(self.bucket.estimated_wait_seconds(), 1),
+        }
+
+    async def purge_expired(self) -> dict:
+        """Job do agendador: remove resultados vencidos além da carência de stale"""
+        vencido_antes = datetime.utcnow() - self.stale_grace
+        vencidos = [c for c, (_, expira_em) in self._memory.items() if expira_em <= vencido_antes]
+        for cnpj in vencidos:
+            del self._memory[cnpj]
+        pruned = await self.store.purge_expired(vencido_antes) if self.store else 0
+        return {"rows_pruned": pruned}
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "inflight": len(self._inflight),
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.upstream_calls,
+            "rate_limited": self.rate_limited,
+            "failures": self.failures,
+            "stale_served": self.stale_served,
+            "store_errors": self.store_errors,
+            "bucket": self.bucket.stats(),
+        }
+
+
+# Instância global
+cnpj_lookup = CNPJLookupEngine.from_settings()
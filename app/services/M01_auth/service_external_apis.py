@@ -3,12 +3,18 @@ Serviço para integração com APIs externas de CPF e CEP.
 Responsável por validar CPF e buscar dados de endereço.
 """
 
-import aiohttp
 import asyncio
 import logging
 from typing import Optional, Dict, Any
 import re
 
+from app.circuit_breaker import CircuitOpenError
+from app.config import settings
+from app.http_client import http_client
+from app.security.validators import validar_cnpj, validar_cpf
+from app.services.M01_auth.service_cnpj_lookup import CNPJLookupResult, cnpj_lookup
+from app.services.M01_auth.service_cep_cache import cep_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,37 +23,8 @@ class CPFService:
 
     @staticmethod
     def validar_cpf_formato(cpf: str) -> bool:
-        """Valida o formato básico do CPF"""
-        # Remove caracteres não numéricos
-        cpf_limpo = re.sub(r"\D", "", cpf)
-
-        # Verifica se tem 11 dígitos
-        if len(cpf_limpo) != 11:
-            return False
-
-        # Verifica se todos os dígitos são iguais
-        if cpf_limpo == cpf_limpo[0] * 11:
-            return False
-
-        # Validação do primeiro dígito verificador
-        soma = sum(int(d) * (10 - i) for i, d in enumerate(cpf_limpo[:9]))
-        primeiro_verificador = 11 - (soma % 11)
-        if primeiro_verificador >= 10:
-            primeiro_verificador = 0
-
-        if int(cpf_limpo[9]) != primeiro_verificador:
-            return False
-
-        # Validação do segundo dígito verificador
-        soma = sum(int(d) * (11 - i) for i, d in enumerate(cpf_limpo[:10]))
-        segundo_verificador = 11 - (soma % 11)
-        if segundo_verificador >= 10:
-            segundo_verificador = 0
-
-        if int(cpf_limpo[10]) != segundo_verificador:
-            return False
-
-        return True
+        """Valida o formato e os dígitos verificadores do CPF (Módulo 11)"""
+        return validar_cpf(cpf)
 
     @staticmethod
     async def consultar_cpf(cpf: str) -> Optional[Dict[str, Any]]:
@@ -81,8 +58,9 @@ class CPFService:
 class CEPService:
     """Serviço para consulta de CEP e dados de endereço"""
 
-    # API ViaCEP - gratuita e confiável
-    VIACEP_BASE_URL = "https://viacep.com.br/ws"
+    # API ViaCEP - gratuita e confiável (settings.viacep_base_url)
+    VIACEP_BASE_URL = settings.viacep_base_url.rstrip("/")
+    PROVEDOR = "viacep"
 
     @staticmethod
     def validar_cep_formato(cep: str) -> bool:
@@ -90,11 +68,32 @@ class CEPService:
         cep_limpo = re.sub(r"\D", "", cep)
         return len(cep_limpo) == 8
 
+    @staticmethod
+    async def _stale_ou_erro(cep_limpo: str, mensagem: str) -> Dict[str, Any]:
+        """Provedor indisponível: entrada vencida do cache (stale) ou erro"""
+        try:
+            cached = await cep_cache.get(cep_limpo, stale=True)
+        except Exception as e:
+            logger.warning(f"Cache de CEP indisponível: {e}")
+            cached = None
+        if cached is None:
+            return {"erro": True, "mensagem": mensagem}
+        logger.warning(f"ViaCEP indisponível, CEP {cep_limpo} servido do cache vencido")
+        if not cached.encontrado:
+            return {"erro": True, "mensagem": "CEP não encontrado", "stale": True}
+        return {**cached.dados, "stale": True}
+
     @staticmethod
     async def consultar_cep(cep: str) -> Optional[Dict[str, Any]]:
         """
         Consulta dados de endereço pelo CEP usando a API ViaCEP.
 
+        Lê através do cache de CEP (memória + persistente): CEPs encontrados e
+        não encontrados são reaproveitados até vencer; timeouts e erros do
+        provedor não são cacheados. Com o ViaCEP indisponível (circuito
+        aberto, timeout, 5xx) a entrada vencida do cache é servida com
+        `"stale": True`.
+
         Retorna:
         {
             "cep": "01310100",
@@ -106,41 +105,48 @@ class CEPService:
             "erro": False
         }
         """
+        cep_limpo = re.sub(r"\D", "", cep)
         try:
-            cep_limpo = re.sub(r"\D", "", cep)
-
             if not CEPService.validar_cep_formato(cep):
                 logger.warning(f"CEP inválido: {cep}")
                 return {"erro": True, "mensagem": "CEP inválido"}
 
-            url = f"{CEPService.VIACEP_BASE_URL}/{cep_limpo}/json/"
+            cached = await cep_cache.get(cep_limpo)
+            if cached is not None:
+                if not cached.encontrado:
+                    return {"erro": True, "mensagem": "CEP não encontrado"}
+                return dict(cached.dados)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url, timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        if data.get("erro"):
-                            logger.warning(f"CEP não encontrado: {cep_limpo}")
-                            return {"erro": True, "mensagem": "CEP não encontrado"}
-
-                        logger.info(f"CEP consultado com sucesso: {cep_limpo}")
-                        return data
-                    else:
-                        logger.error(f"Erro na API ViaCEP: {response.status}")
-                        return {
-                            "erro": True,
-                            "mensagem": f"Erro na consulta: {response.status}",
-                        }
+            url = f"{CEPService.VIACEP_BASE_URL}/{cep_limpo}/json/"
 
+            async with http_client.get(CEPService.PROVEDOR, url) as response:
+                if response.status == 200:
+                    data = await response.json()
+
+                    if data.get("erro"):
+                        logger.warning(f"CEP não encontrado: {cep_limpo}")
+                        await cep_cache.put(cep_limpo, None, False, CEPService.PROVEDOR)
+                        return {"erro": True, "mensagem": "CEP não encontrado"}
+
+                    logger.info(f"CEP consultado com sucesso: {cep_limpo}")
+                    await cep_cache.put(cep_limpo, data, True, CEPService.PROVEDOR)
+                    return data
+                else:
+                    logger.error(f"Erro na API ViaCEP: {response.status}")
+                    mensagem = f"Erro na consulta: {response.status}"
+                    if response.status >= 500:
+                        return await CEPService._stale_ou_erro(cep_limpo, mensagem)
+                    return {"erro": True, "mensagem": mensagem}
+
+        except CircuitOpenError as e:
+            logger.warning(str(e))
+            return await CEPService._stale_ou_erro(cep_limpo, "Serviço de CEP indisponível")
         except asyncio.TimeoutError:
             logger.error(f"Timeout ao consultar CEP: {cep}")
-            return {"erro": True, "mensagem": "Timeout na consulta"}
+            return await CEPService._stale_ou_erro(cep_limpo, "Timeout na consulta")
         except Exception as e:
             logger.error(f"Erro ao consultar CEP: {str(e)}")
-            return {"erro": True, "mensagem": f"Erro: {str(e)}"}
+            return await CEPService._stale_ou_erro(cep_limpo, f"Erro: {str(e)}")
 
 
 class AddressService:
@@ -151,7 +157,7 @@ class AddressService:
         cep: str, endereco_manual: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Valida e consulta endereço pelo CEP.
+        Valida e consulta endereço pelo CEP (através do cache de CEP).
         Se não encontrar, permite entrada manual.
         """
         resultado = await CEPService.consultar_cep(cep)
@@ -173,45 +179,18 @@ class CNPJService:
 
     @staticmethod
     def validar_cnpj_formato(cnpj: str) -> bool:
-        """Valida o formato básico do CNPJ"""
-        # Remove caracteres não numéricos
-        cnpj_limpo = re.sub(r"\D", "", cnpj)
-
-        # Verifica se tem 14 dígitos
-        if len(cnpj_limpo) != 14:
-            return False
-
-        # Verifica se todos os dígitos são iguais
-        if cnpj_limpo == cnpj_limpo[0] * 14:
-            return False
-
-        # Validação do primeiro dígito verificador
-        soma = sum(int(d) * (5 - i % 8) for i, d in enumerate(cnpj_limpo[:8]))
-        soma += sum(int(d) * (10 - i % 8) for i, d in enumerate(cnpj_limpo[8:12]))
-        primeiro_verificador = 11 - (soma % 11)
-        if primeiro_verificador >= 10:
-            primeiro_verificador = 0
-
-        if int(cnpj_limpo[12]) != primeiro_verificador:
-            return False
-
-        # Validação do segundo dígito verificador
-        soma = sum(int(d) * (6 - i % 8) for i, d in enumerate(cnpj_limpo[:9]))
-        soma += sum(int(d) * (10 - i % 8) for i, d in enumerate(cnpj_limpo[9:13]))
-        segundo_verificador = 11 - (soma % 11)
-        if segundo_verificador >= 10:
-            segundo_verificador = 0
-
-        if int(cnpj_limpo[13]) != segundo_verificador:
-            return False
-
-        return True
+        """Valida o formato e os dígitos verificadores do CNPJ (Módulo 11)"""
+        return validar_cnpj(cnpj)
 
     @staticmethod
     async def consultar_cnpj(cnpj: str) -> Optional[Dict[str, Any]]:
         """
         Consulta dados de CNPJ usando a API ReceitaWS.
 
+        Passa pelo motor de consultas (cache, single-flight e fila com limite
+        de taxa). Se a fila demorar mais que `cnpj_lookup_wait_seconds`, retorna
+        `pendente: true`; a consulta continua e o resultado fica em cache.
+
         Retorna:
         {
             "valido": true,
@@ -229,70 +208,37 @@ class CNPJService:
             "atividade_principal": "Atividade Econômica"
         }
         """
-        try:
-            cnpj_limpo = re.sub(r"\D", "", cnpj)
-
-            if not CNPJService.validar_cnpj_formato(cnpj_limpo):
-                logger.warning(f"CNPJ inválido: {cnpj}")
-                return {
-                    "valido": False,
-                    "mensagem": "CNPJ inválido",
-                }
-
-            # Usar API ReceitaWS (gratuita e sem autenticação)
-            url = f"https://www.receitaws.com.br/v1/cnpj/{cnpj_limpo}"
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url, timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        if data.get("status") == "ERROR":
-                            logger.warning(f"CNPJ não encontrado na RF: {cnpj_limpo}")
-                            return {
-                                "valido": True,
-                                "cnpj": cnpj_limpo,
-                                "mensagem": "Formato válido, mas não encontrado. Preencha os dados manualmente.",
-                            }
-
-                        logger.info(f"CNPJ consultado com sucesso: {cnpj_limpo}")
-                        return {
-                            "valido": True,
-                            "cnpj": cnpj_limpo,
-                            "nome": data.get("nome", ""),
-                            "nome_fantasia": data.get("fantasia", ""),
-                            "logradouro": data.get("logradouro", ""),
-                            "numero": data.get("numero", ""),
-                            "complemento": data.get("complemento", ""),
-                            "bairro": data.get("bairro", ""),
-                            "municipio": data.get("municipio", ""),
-                            "uf": data.get("uf", ""),
-                            "cep": data.get("cep", ""),
-                            "telefone": data.get("telefone", ""),
-                            "email": data.get("email", ""),
-                            "mensagem": "Dados carregados com sucesso",
-                        }
-                    else:
-                        logger.error(f"Erro na API ReceitaWS: {response.status}")
-                        return {
-                            "valido": True,
-                            "cnpj": cnpj_limpo,
-                            "mensagem": "Não foi possível consultar dados. Preencha manualmente.",
-                        }
+        cnpj_limpo = re.sub(r"\D", "", cnpj)
 
-        except asyncio.TimeoutError:
-            logger.error(f"Timeout ao consultar CNPJ: {cnpj}")
+        if not CNPJService.validar_cnpj_formato(cnpj_limpo):
+            logger.warning(f"CNPJ inválido: {cnpj}")
             return {
-                "valido": True,
-                "cnpj": cnpj_limpo,
-                "mensagem": "Timeout na consulta. Tente novamente.",
+                "valido": False,
+                "mensagem": "CNPJ inválido",
             }
-        except Exception as e:
-            logger.error(f"Erro ao consultar CNPJ: {str(e)}")
+
+        resultado = await cnpj_lookup.lookup(
+            cnpj_limpo, wait_seconds=settings.cnpj_lookup_wait_seconds
+        )
+        return CNPJService.resposta_consulta(cnpj_limpo, resultado)
+
+    @staticmethod
+    def resposta_consulta(
+        cnpj_limpo: str, resultado: Optional[CNPJLookupResult]
+    ) -> Dict[str, Any]:
+        """Converte o resultado do motor de consultas no formato da API"""
+        if resultado is None:
             return {
                 "valido": True,
                 "cnpj": cnpj_limpo,
-                "mensagem": f"Erro na consulta: {str(e)}",
+                "pendente": True,
+                "mensagem": "Consulta na fila da Receita. Tente novamente em instantes.",
             }
+
+        resposta = {"valido": True, "cnpj": cnpj_limpo}
+        if resultado.dados:
+            resposta.update(resultado.dados)
+        resposta["mensagem"] = resultado.mensagem
+        if resultado.stale:
+            resposta["stale"] = True
+        return resposta
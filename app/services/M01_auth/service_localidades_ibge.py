@@ -0,0 +1,609 @@
+"""
+Base offline de localidades do IBGE (UFs e municípios) com busca por prefixo
+
+A base empacotada (data/ibge_localidades.json, gerada por
+scripts/build_ibge_dataset.py) é carregada em estruturas compactas: array de
+códigos, tuplas de nomes/UFs e índices ordenados de chaves normalizadas (sem
+acento, minúsculas) consultados com bisect. A busca por prefixo
+("sao jo" -> São João del-Rei, São José dos Campos...) não faz I/O.
+
+Quando existe a cópia local (settings.ibge_dataset_path), gravada pela
+atualização em segundo plano, ela tem prioridade sobre a base empacotada e
+serve de snapshot compartilhado entre os workers. No startup, UFs sem
+municípios são baixadas em paralelo (aquecimento); depois, uma verificação
+periódica recarrega o snapshot gravado por outro worker ou consulta a API do
+IBGE se a base tem mais de settings.ibge_refresh_max_age_days.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+import aiohttp
+
+from app.config import settings
+from app.http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+IBGE_LOCALIDADES_URL = settings.ibge_localidades_url.rstrip("/")
+BUNDLED_PATH = os.path.join(os.path.dirname(__file__), "data", "ibge_localidades.json")
+FONTE = "IBGE - API de Localidades (servicodados.ibge.gov.br/api/v1/localidades)"
+
+# 5.570 municípios em 2024; abaixo disso a base está incompleta
+MUNICIPIOS_MINIMO = 5500
+TOTAL_UFS = 27
+
+_NAO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+# Palavras que não iniciam busca por palavra ("do" casaria todo "... do Sul")
+_CONECTIVOS = {"d", "da", "das", "de", "do", "dos", "e"}
+
+
+def normalize_nome(value: str) -> str:
+    """Chave de busca: sem acentos, minúscula, separadores viram um espaço"""
+    decomposed = unicodedata.normalize("NFKD", value)
+    sem_acento = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(_NAO_ALFANUMERICO.sub(" ", sem_acento.casefold()).split())
+
+
+def _sufixos_de_palavra(chave: str) -> Iterator[str]:
+    """'sao jose dos campos' -> 'jose dos campos', 'campos'"""
+    palavras = chave.split(" ")
+    for i in range(1, len(palavras)):
+        if palavras[i] not in _CONECTIVOS:
+            yield " ".join(palavras[i:])
+
+
+def _sorted_index(pares: Iterable[tuple[str, int]]) -> tuple[list[str], array]:
+    pares = sorted(pares)
+    return [chave for chave, _ in pares], array("I", (pos for _, pos in pares))
+
+
+class LocalidadesIndex:
+    """Base imutável: municípios ordenados por (UF, nome) + índices de prefixo"""
+
+    def __init__(
+        self, ufs: Iterable, municipios: Iterable, gerado_em: Optional[str] = None
+    ):
+        """
+        Args:
+            ufs: [codigo, sigla, nome, regiao]
+            municipios: [codigo, nome, sigla_uf]
+            gerado_em: Data ISO da extração do IBGE (None = nunca atualizada)
+        """
+        self.gerado_em = gerado_em
+        self.ufs = tuple(
+            (int(codigo), sigla, nome, regiao) for codigo, sigla, nome, regiao in ufs
+        )
+        rows = sorted(
+            (uf, normalize_nome(nome), int(codigo), nome)
+            for codigo, nome, uf in municipios
+        )
+
+        self.ids = array("I", (row[2] for row in rows))
+        self.nomes = tuple(row[3] for row in rows)
+        self.uf_de = tuple(sys.intern(row[0]) for row in rows)
+
+        # Faixa contígua [início, fim) de cada UF
+        self.faixas: dict[str, tuple[int, int]] = {}
+        for pos, uf in enumerate(self.uf_de):
+            inicio = self.faixas.get(uf, (pos, pos))[0]
+            self.faixas[uf] = (inicio, pos + 1)
+
+        self._nome_keys, self._nome_refs = _sorted_index(
+            (row[1], pos) for pos, row in enumerate(rows)
+        )
+        self._palavra_keys, self._palavra_refs = _sorted_index(
+            (sufixo, pos)
+            for pos, row in enumerate(rows)
+            for sufixo in _sufixos_de_palavra(row[1])
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LocalidadesIndex":
+        return cls(data.get("ufs", []), data.get("municipios", []), data.get("gerado_em"))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rows(self) -> Iterator[tuple[int, str, str]]:
+        for pos in range(len(self.ids)):
+            yield self.ids[pos], self.nomes[pos], self.uf_de[pos]
+
+    def to_dict(self) -> dict:
+        return {
+            "fonte": FONTE,
+            "gerado_em": self.gerado_em,
+            "ufs": [list(uf) for uf in self.ufs],
+            "municipios": [list(row) for row in self.rows()],
+        }
+
+    def listar_ufs(self) -> list[dict]:
+        ufs = sorted(self.ufs, key=lambda uf: uf[1])
+        return [{"sigla": sigla, "nome": nome} for _, sigla, nome, _ in ufs]
+
+    def listar_municipios(self, uf: str) -> Optional[list[dict]]:
+        """Municípios da UF em ordem alfabética, ou None se a UF não está na base"""
+        faixa = self.faixas.get(uf)
+        if faixa is None:
+            return None
+        return [{"id": self.ids[pos], "nome": self.nomes[pos]} for pos in range(*faixa)]
+
+    def com_uf(self, uf: str, municipios: list[dict]) -> "LocalidadesIndex":
+        """Nova base com os municípios de uma UF obtidos ao vivo"""
+        return self.com_ufs({uf: municipios})
+
+    def com_ufs(
+        self, municipios_por_uf: dict[str, list[dict]], gerado_em: Optional[str] = None
+    ) -> "LocalidadesIndex":
+        """Nova base substituindo os municípios das UFs informadas"""
+        rows = [row for row in self.rows() if row[2] not in municipios_por_uf]
+        for uf, municipios in municipios_por_uf.items():
+            rows.extend((int(m["id"]), m["nome"], uf) for m in municipios)
+        return LocalidadesIndex(self.ufs, rows, gerado_em or self.gerado_em)
+
+    def buscar(self, termo: str, uf: Optional[str] = None, limite: int = 10) -> list[dict]:
+        """
+        Municípios cujo nome (ou uma palavra do nome) começa com o termo
+
+        Primeiro os que começam pelo termo, depois os que têm uma palavra
+        começando pelo termo; cada grupo em ordem alfabética.
+        """
+        chave = normalize_nome(termo)
+        if not chave or limite <= 0:
+            return []
+
+        encontrados: list[int] = []
+        vistos: set[int] = set()
+        for keys, refs in (
+            (self._nome_keys, self._nome_refs),
+            (self._palavra_keys, self._palavra_refs),
+        ):
+            i = bisect_left(keys, chave)
+            while i < len(keys) and keys[i].startswith(chave):
+                pos = refs[i]
+                i += 1
+                if pos in vistos or (uf and self.uf_de[pos] != uf):
+                    continue
+                vistos.add(pos)
+                encontrados.append(pos)
+                if len(encontrados) >= limite:
+                    break
+            if len(encontrados) >= limite:
+                break
+
+        return [
+            {"id": self.ids[pos], "nome": self.nomes[pos], "uf": self.uf_de[pos]}
+            for pos in encontrados
+        ]
+
+
+# =====================================================
+# ARQUIVO E API DO IBGE
+# =====================================================
+
+
+def load_dataset(path: str) -> LocalidadesIndex:
+    with open(path, encoding="utf-8") as handle:
+        return LocalidadesIndex.from_dict(json.load(handle))
+
+
+def pendencias_base(index: LocalidadesIndex) -> list[str]:
+    """Motivos pelos quais a base não atende o modo offline (vazia = completa)"""
+    pendencias = []
+    if len(index.ufs) < TOTAL_UFS:
+        pendencias.append(f"{len(index.ufs)} de {TOTAL_UFS} UFs")
+    sem_municipios = [sigla for _, sigla, _, _ in index.ufs if sigla not in index.faixas]
+    if sem_municipios:
+        pendencias.append(f"UFs sem municípios: {', '.join(sorted(sem_municipios))}")
+    if len(index) < MUNICIPIOS_MINIMO:
+        pendencias.append(f"{len(index)} municípios (mínimo {MUNICIPIOS_MINIMO})")
+    return pendencias
+
+
+def dump_dataset(index: LocalidadesIndex, path: str):
+    """Grava a base com uma linha por registro (diffs legíveis no git)"""
+    data = index.to_dict()
+    linhas = ["{"]
+    linhas.append(f'"fonte": {json.dumps(data["fonte"], ensure_ascii=False)},')
+    linhas.append(f'"gerado_em": {json.dumps(data["gerado_em"])},')
+    for chave, fim in (("ufs", ","), ("municipios", "")):
+        registros = [json.dumps(r, ensure_ascii=False) for r in data[chave]]
+        linhas.append(f'"{chave}": [')
+        if registros:
+            linhas.append(",\n".join(registros))
+        linhas.append(f"]{fim}")
+    linhas.append("}")
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write("\n".join(linhas) + "\n")
+    os.replace(tmp_path, path)
+
+
+async def _get_json(url: str):
+    timeout = aiohttp.ClientTimeout(total=settings.ibge_refresh_timeout_seconds)
+    async with http_client.get("ibge", url, timeout=timeout) as response:
+        if response.status != 200:
+            raise RuntimeError(f"IBGE respondeu {response.status} para {url}")
+        return await response.json()
+
+
+async def fetch_ibge() -> LocalidadesIndex:
+    """Baixa todas as UFs e os ~5.570 municípios em duas requisições"""
+    estados = await _get_json(f"{IBGE_LOCALIDADES_URL}/estados")
+    ufs = [
+        [e["id"], e["sigla"], e["nome"], (e.get("regiao") or {}).get("nome", "")]
+        for e in estados
+    ]
+    # Os dois primeiros dígitos do código do município são o código da UF
+    sigla_por_codigo = {uf[0]: uf[1] for uf in ufs}
+    municipios = await _get_json(f"{IBGE_LOCALIDADES_URL}/municipios")
+    rows = [
+        [m["id"], m["nome"], sigla_por_codigo[int(m["id"]) // 100000]]
+        for m in municipios
+        if int(m["id"]) // 100000 in sigla_por_codigo
+    ]
+    return LocalidadesIndex(ufs, rows, datetime.utcnow().replace(microsecond=0).isoformat())
+
+
+# =====================================================
+# BASE EM USO
+# =====================================================
+
+
+class LocalidadesIBGE:
+    """
+    Base carregada no processo, com aquecimento e atualização em segundo plano
+
+    A cópia local (`local_path`) é o snapshot compartilhado entre workers: quem
+    baixa do IBGE grava o arquivo (troca atômica) e os demais apenas o
+    recarregam. Um arquivo `.lock` ao lado do snapshot garante que só um worker
+    consulte o IBGE por vez.
+    """
+
+    def __init__(
+        self,
+        local_path: Optional[str] = None,
+        bundled_path: str = BUNDLED_PATH,
+        max_age_days: float = 30,
+        lock_timeout_seconds: float = 120,
+    ):
+        """
+        Args:
+            local_path: Snapshot local compartilhado (None: sem cópia em disco)
+            bundled_path: Base empacotada com o código
+            max_age_days: Idade máxima da base antes de atualizar
+            lock_timeout_seconds: Idade a partir da qual um `.lock` é considerado
+                abandonado (worker encerrado durante o download)
+        """
+        self.local_path = local_path
+        self.bundled_path = bundled_path
+        self.max_age = timedelta(days=max_age_days)
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self._index: Optional[LocalidadesIndex] = None
+        self.origem: Optional[str] = None
+        self.carregado_em: Optional[datetime] = None
+        self._snapshot_mtime: Optional[float] = None
+        self.warmup_task: Optional[asyncio.Task] = None
+        self.loop_task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.last_refresh_error: Optional[str] = None
+        self.snapshot_reloads = 0
+        self.warmup: dict = {}
+        self.ufs_ao_vivo: set[str] = set()
+        self.versao = 0  # muda a cada troca da base (cache HTTP das rotas)
+
+    @classmethod
+    def from_settings(cls) -> "LocalidadesIBGE":
+        return cls(
+            local_path=settings.ibge_dataset_path or None,
+            max_age_days=settings.ibge_refresh_max_age_days,
+            lock_timeout_seconds=settings.ibge_refresh_timeout_seconds * 2,
+        )
+
+    @property
+    def index(self) -> LocalidadesIndex:
+        if self._index is None:
+            self.load()
+        return self._index
+
+    def load(self) -> LocalidadesIndex:
+        """Carrega a cópia local (se existir e for válida) ou a base empacotada"""
+        candidatos = [("local", self.local_path), ("empacotada", self.bundled_path)]
+        for origem, path in candidatos:
+            if not path or not os.path.exists(path):
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+                index = load_dataset(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"⚠️ Base IBGE {origem} inválida ({path}): {e}")
+                continue
+            self._swap(index, origem)
+            if origem == "local":
+                self._snapshot_mtime = mtime
+            logger.info(
+                f"✅ Base IBGE {origem}: {len(index.ufs)} UFs, {len(index)} municípios"
+            )
+            pendencias = pendencias_base(index)
+            if pendencias:
+                logger.warning(
+                    f"⚠️ Base IBGE {origem} incompleta ({'; '.join(pendencias)}); "
+                    "sem acesso ao IBGE as consultas dessas UFs não terão resultado"
+                )
+            return index
+
+        self._swap(LocalidadesIndex([], []), "vazia")
+        return self._index
+
+    def _swap(self, index: LocalidadesIndex, origem: str):
+        self._index = index
+        self.origem = origem
+        self.carregado_em = datetime.utcnow()
+        self.versao += 1
+
+    def ufs_sem_municipios(self) -> list[str]:
+        index = self.index
+        return [sigla for _, sigla, _, _ in index.ufs if sigla not in index.faixas]
+
+    def precisa_atualizar(self) -> bool:
+        index = self.index
+        if len(index) == 0 or not index.gerado_em:
+            return True
+        try:
+            gerado_em = datetime.fromisoformat(index.gerado_em)
+        except ValueError:
+            return True
+        return datetime.utcnow() - gerado_em > self.max_age
+
+    # -------------------------------------------------
+    # Snapshot compartilhado entre workers
+    # -------------------------------------------------
+
+    @property
+    def lock_path(self) -> Optional[str]:
+        return f"{self.local_path}.lock" if self.local_path else None
+
+    def _adquirir_lock(self) -> bool:
+        """Reserva o download do IBGE para este worker (False: outro está baixando)"""
+        if not self.lock_path:
+            return True
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    idade = time.time() - os.path.getmtime(self.lock_path)
+                except OSError:
+                    continue  # removido entre as chamadas
+                if idade < self.lock_timeout_seconds:
+                    return False
+                logger.warning(f"⚠️ Removendo lock abandonado: {self.lock_path}")
+                try:
+                    os.remove(self.lock_path)
+                except OSError:
+                    return False
+                continue
+            with os.fdopen(fd, "w") as handle:
+                handle.write(str(os.getpid()))
+            return True
+        return False
+
+    def _liberar_lock(self):
+        if self.lock_path:
+            try:
+                os.remove(self.lock_path)
+            except OSError:
+                pass
+
+    def recarregar_se_mudou(self) -> bool:
+        """Recarrega o snapshot se outro worker gravou uma versão mais nova"""
+        if not self.local_path:
+            return False
+        try:
+            mtime = os.path.getmtime(self.local_path)
+        except OSError:
+            return False
+        if self._snapshot_mtime is not None and mtime <= self._snapshot_mtime:
+            return False
+        self.load()
+        if self.origem != "local":
+            return False
+        self.snapshot_reloads += 1
+        return True
+
+    async def _aguardar_snapshot(self, timeout: float) -> bool:
+        """Espera o worker que tem o lock gravar o snapshot"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if self.recarregar_se_mudou():
+                return True
+            if not os.path.exists(self.lock_path):
+                return self.recarregar_se_mudou()
+            await asyncio.sleep(0.25)
+        return False
+
+    async def _gravar_snapshot(self, index: LocalidadesIndex):
+        if not self.local_path:
+            return
+        try:
+            await asyncio.to_thread(dump_dataset, index, self.local_path)
+            self._snapshot_mtime = os.path.getmtime(self.local_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível gravar {self.local_path}: {e}")
+
+    # -------------------------------------------------
+    # Aquecimento e atualização
+    # -------------------------------------------------
+
+    async def aquecer(self, concorrencia: int = 6) -> dict:
+        """
+        Baixa em paralelo (no máximo `concorrencia` por vez) os municípios das
+        UFs que a base não tem e troca a base uma única vez
+        """
+        faltando = self.ufs_sem_municipios()
+        if not faltando:
+            return {"ufs": 0}
+        if not self._adquirir_lock():
+            recarregado = await self._aguardar_snapshot(self.lock_timeout_seconds)
+            self.warmup = {"ufs": 0, "snapshot_de_outro_worker": recarregado}
+            return self.warmup
+
+        started = time.perf_counter()
+        semaforo = asyncio.Semaphore(max(1, concorrencia))
+
+        async def baixar(sigla: str):
+            async with semaforo:
+                dados = await _get_json(f"{IBGE_LOCALIDADES_URL}/estados/{sigla}/municipios")
+            return sigla, [{"id": m["id"], "nome": m["nome"]} for m in dados]
+
+        try:
+            resultados = await asyncio.gather(
+                *(baixar(sigla) for sigla in faltando), return_exceptions=True
+            )
+            obtidos = dict(r for r in resultados if not isinstance(r, BaseException))
+            erros = [r for r in resultados if isinstance(r, BaseException)]
+            if obtidos:
+                index = self.index  # inclui UFs obtidas ao vivo durante o aquecimento
+                completa = not erros and len(index) == 0
+                gerado_em = datetime.utcnow().replace(microsecond=0).isoformat()
+                novo = index.com_ufs(obtidos, gerado_em if completa else index.gerado_em)
+                self._swap(novo, "ibge")
+                await self._gravar_snapshot(novo)
+        finally:
+            self._liberar_lock()
+
+        if erros:
+            self.last_refresh_error = str(erros[0])
+            logger.warning(f"⚠️ Aquecimento IBGE: {len(erros)} UFs falharam ({erros[0]})")
+        self.warmup = {
+            "ufs": len(obtidos),
+            "erros": len(erros),
+            "duracao_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        logger.info(f"✅ Aquecimento IBGE: {len(obtidos)}/{len(faltando)} UFs")
+        return self.warmup
+
+    async def warm_up(self, timeout: float, concorrencia: int = 6) -> bool:
+        """
+        Aquecimento no startup: espera até `timeout` segundos; depois disso o
+        download continua em segundo plano
+
+        Returns:
+            True se a base ficou completa dentro do prazo
+        """
+        if not self.ufs_sem_municipios():
+            return True
+        if self.warmup_task is None or self.warmup_task.done():
+            self.warmup_task = asyncio.create_task(self.aquecer(concorrencia))
+        try:
+            await asyncio.wait_for(asyncio.shield(self.warmup_task), timeout)
+        except asyncio.TimeoutError:
+            logger.info("ℹ️ Aquecimento IBGE continua em segundo plano")
+        except Exception as e:
+            logger.warning(f"⚠️ Aquecimento IBGE falhou: {e}")
+        return not self.ufs_sem_municipios()
+
+    async def refresh(self) -> dict:
+        """Baixa a base do IBGE, troca a base em uso e grava a cópia local"""
+        if not self._adquirir_lock():
+            return {"atualizado": False, "erro": "Atualização em andamento em outro worker"}
+        try:
+            try:
+                index = await fetch_ibge()
+            except Exception as e:
+                self.refresh_errors += 1
+                self.last_refresh_error = str(e)
+                logger.warning(f"⚠️ Atualização da base IBGE falhou: {e}")
+                return {"atualizado": False, "erro": str(e)}
+
+            self._swap(index, "ibge")
+            self.ufs_ao_vivo.clear()
+            self.refreshes += 1
+            await self._gravar_snapshot(index)
+        finally:
+            self._liberar_lock()
+        logger.info(f"✅ Base IBGE atualizada: {len(index)} municípios")
+        return {"atualizado": True, "municipios": len(index)}
+
+    async def verificar(self) -> dict:
+        """Uma rodada da verificação periódica"""
+        if self.warmup_task and not self.warmup_task.done():
+            return {"acao": "aquecimento_em_andamento"}
+        if self.recarregar_se_mudou():
+            return {"acao": "snapshot_recarregado", "municipios": len(self.index)}
+        if self.precisa_atualizar():
+            return {"acao": "atualizacao", **(await self.refresh())}
+        return {"acao": None}
+
+    async def _run_loop(self, interval_seconds: float):
+        while True:
+            try:
+                await self.verificar()
+            except Exception as e:
+                logger.warning(f"⚠️ Verificação da base IBGE falhou: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    def start(self, interval_minutes: float):
+        """Verificação periódica: recarrega o snapshot ou atualiza se vencida"""
+        if self.loop_task is None or self.loop_task.done():
+            self.loop_task = asyncio.create_task(self._run_loop(interval_minutes * 60))
+
+    async def stop(self):
+        for task in (self.warmup_task, self.loop_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.warmup_task = None
+        self.loop_task = None
+
+    def incluir_uf(self, uf: str, municipios: list[dict]):
+        """Inclui na base uma UF consultada ao vivo (ausente da base carregada)"""
+        self._index = self.index.com_uf(uf, municipios)
+        self.ufs_ao_vivo.add(uf)
+        self.versao += 1
+
+    def stats(self) -> dict:
+        index = self.index
+        return {
+            "origem": self.origem,
+            "versao": self.versao,
+            "gerado_em": index.gerado_em,
+            "carregado_em": self.carregado_em.isoformat() if self.carregado_em else None,
+            "ufs": len(index.ufs),
+            "ufs_com_municipios": len(index.faixas),
+            "ufs_ao_vivo": sorted(self.ufs_ao_vivo),
+            "municipios": len(index),
+            "chaves_indice": len(index._nome_keys) + len(index._palavra_keys),
+            "aquecimento": self.warmup,
+            "aquecimento_pendente": bool(self.warmup_task and not self.warmup_task.done()),
+            "snapshot": self.local_path,
+            "snapshot_reloads": self.snapshot_reloads,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "last_refresh_error": self.last_refresh_error,
+        }
+
+
+# Instância global
+localidades_ibge = LocalidadesIBGE.from_settings()
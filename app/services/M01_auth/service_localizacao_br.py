@@ -2,15 +2,23 @@
 Service para consultar dados de localização brasileira
 via API pública do IBGE (Instituto Brasileiro de Geografia e Estatística)
 
+UFs e municípios vêm da base offline do IBGE carregada em memória
+(service_localidades_ibge); a API só é consultada para uma UF ausente da base.
+
 APIs utilizadas:
 - UFs: https://servicodados.ibge.gov.br/api/v1/localidades/estados
 - Municípios por UF: https://servicodados.ibge.gov.br/api/v1/localidades/estados/{uf}/municipios
 """
 
-import aiohttp
 from typing import List, Dict, Optional
 import logging
 
+from app.http_client import http_client
+from app.services.M01_auth.service_localidades_ibge import (
+    IBGE_LOCALIDADES_URL,
+    localidades_ibge,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,13 +26,12 @@ class LocalizacaoBRService:
     """Serviço para consultar UFs e Municípios brasileiros"""
 
     # URLs da API IBGE (pública, sem autenticação)
-    IBGE_BASE_URL = "https://servicodados.ibge.gov.br/api/v1/localidades"
+    IBGE_BASE_URL = IBGE_LOCALIDADES_URL
     IBGE_UFS_URL = f"{IBGE_BASE_URL}/estados"
     IBGE_MUNICIPIOS_URL = f"{IBGE_BASE_URL}/estados/{{uf}}/municipios"
 
-    # Cache em memória para evitar requisições repetidas
+    # Cache em memória (UFs consultadas ao vivo quando a base não tem UFs)
     _cache_ufs: Optional[List[Dict]] = None
-    _cache_municipios: Dict[str, List[Dict]] = {}
 
     @classmethod
     async def obter_ufs(cls) -> List[Dict[str, str]]:
@@ -38,38 +45,40 @@ class LocalizacaoBRService:
                 ...
             ]
         """
+        # Base offline
+        ufs = localidades_ibge.index.listar_ufs()
+        if ufs:
+            return ufs
+
         # Usar cache se disponível
         if cls._cache_ufs is not None:
             return cls._cache_ufs
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    cls.IBGE_UFS_URL, timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        dados = await response.json()
-
-                        # Transformar dados: API retorna com 'sigla' e 'nome'
-                        ufs = [
-                            {
-                                "sigla": item.get("sigla", ""),
-                                "nome": item.get("nome", ""),
-                            }
-                            for item in dados
-                        ]
-
-                        # Ordenar por sigla
-                        ufs.sort(key=lambda x: x["sigla"])
-
-                        # Armazenar em cache
-                        cls._cache_ufs = ufs
-
-                        logger.info(f"✅ Carregados {len(ufs)} UFs do IBGE")
-                        return ufs
-                    else:
-                        logger.error(f"❌ Erro ao consultar IBGE: {response.status}")
-                        return cls._get_ufs_fallback()
+            async with http_client.get("ibge", cls.IBGE_UFS_URL) as response:
+                if response.status == 200:
+                    dados = await response.json()
+
+                    # Transformar dados: API retorna com 'sigla' e 'nome'
+                    ufs = [
+                        {
+                            "sigla": item.get("sigla", ""),
+                            "nome": item.get("nome", ""),
+                        }
+                        for item in dados
+                    ]
+
+                    # Ordenar por sigla
+                    ufs.sort(key=lambda x: x["sigla"])
+
+                    # Armazenar em cache
+                    cls._cache_ufs = ufs
+
+                    logger.info(f"✅ Carregados {len(ufs)} UFs do IBGE")
+                    return ufs
+                else:
+                    logger.error(f"❌ Erro ao consultar IBGE: {response.status}")
+                    return cls._get_ufs_fallback()
 
         except Exception as e:
             logger.error(f"❌ Erro ao conectar IBGE: {str(e)}")
@@ -96,48 +105,65 @@ class LocalizacaoBRService:
         if len(uf) != 2:
             return []
 
-        # Usar cache se disponível
-        if uf in cls._cache_municipios:
-            return cls._cache_municipios[uf]
+        # Base offline (inclui UFs já consultadas ao vivo)
+        municipios = localidades_ibge.index.listar_municipios(uf)
+        if municipios is not None:
+            return municipios
 
         try:
             url = cls.IBGE_MUNICIPIOS_URL.format(uf=uf)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url, timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        dados = await response.json()
-
-                        # Transformar dados: API retorna com 'id' e 'nome'
-                        municipios = [
-                            {
-                                "id": item.get("id", ""),
-                                "nome": item.get("nome", ""),
-                            }
-                            for item in dados
-                        ]
-
-                        # Ordenar por nome
-                        municipios.sort(key=lambda x: x["nome"])
-
-                        # Armazenar em cache
-                        cls._cache_municipios[uf] = municipios
-
-                        logger.info(
-                            f"✅ Carregados {len(municipios)} municípios de {uf}"
-                        )
-                        return municipios
-                    else:
-                        logger.error(
-                            f"❌ Erro ao consultar IBGE para {uf}: {response.status}"
-                        )
-                        return []
+            async with http_client.get("ibge", url) as response:
+                if response.status == 200:
+                    dados = await response.json()
+
+                    # Transformar dados: API retorna com 'id' e 'nome'
+                    municipios = [
+                        {
+                            "id": item.get("id", ""),
+                            "nome": item.get("nome", ""),
+                        }
+                        for item in dados
+                    ]
+
+                    # Ordenar por nome
+                    municipios.sort(key=lambda x: x["nome"])
+
+                    # Incluir na base (listagem e busca por prefixo)
+                    if municipios:
+                        localidades_ibge.incluir_uf(uf, municipios)
+
+                    logger.info(
+                        f"✅ Carregados {len(municipios)} municípios de {uf}"
+                    )
+                    return municipios
+                else:
+                    logger.error(
+                        f"❌ Erro ao consultar IBGE para {uf}: {response.status}"
+                    )
+                    return []
 
         except Exception as e:
             logger.error(f"❌ Erro ao conectar IBGE: {str(e)}")
             return []
 
+    @staticmethod
+    def buscar_municipios(
+        termo: str, uf: Optional[str] = None, limite: int = 10
+    ) -> List[Dict]:
+        """
+        Autocompletar de municípios pela base offline (sem acento/caixa)
+
+        Args:
+            termo: Início do nome ou de uma palavra do nome (ex: "sao jo", "campos")
+            uf: Restringe a um UF (opcional)
+            limite: Máximo de resultados
+
+        Returns:
+            [{"id": 3549904, "nome": "São José dos Campos", "uf": "SP"}, ...]
+        """
+        uf = uf.upper().strip() if uf else None
+        return localidades_ibge.index.buscar(termo, uf=uf, limite=limite)
+
     @staticmethod
     def _get_ufs_fallback() -> List[Dict[str, str]]:
         """Lista hardcoded de UFs como fallback"""
@@ -7,7 +7,7 @@ from typing import Optional
 from datetime import date
 import uuid
 
-from app.database import get_postgres_connection
+from app.database import postgres_connection
 from app.services.M01_auth.service_cadastro_pessoa import (
     CadastroPessoaService,
 )
@@ -104,8 +104,7 @@ class PessoaService:
         Returns:
             UUID da instituição criada
         """
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             pessoa_id = uuid.uuid4()
 
             # Inserção mínima e compatível com o DDL atual de cadastro.instituicao
@@ -132,36 +131,28 @@ class PessoaService:
             )
 
             return pessoa_id
-        finally:
-            await conn.close()
 
     @staticmethod
     async def get_pessoa_by_cpf(cpf: str) -> Optional[dict]:
         """Buscar pessoa física por CPF"""
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             query = """
                 SELECT * FROM cadastro.pessoa
                 WHERE cpf = $1
             """
             row = await conn.fetchrow(query, cpf)
             return dict(row) if row else None
-        finally:
-            await conn.close()
 
     @staticmethod
     async def get_pessoa_by_cnpj(cnpj: str) -> Optional[dict]:
         """Buscar instituição por CNPJ"""
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             query = """
                 SELECT * FROM cadastro.instituicao
                 WHERE cnpj = $1
             """
             row = await conn.fetchrow(query, cnpj)
             return dict(row) if row else None
-        finally:
-            await conn.close()
 
     @staticmethod
     async def get_instituicao_by_cnpj(cnpj: str) -> Optional[dict]:
@@ -171,8 +162,7 @@ class PessoaService:
     @staticmethod
     async def get_pessoa_by_email(email: str) -> Optional[dict]:
         """Buscar pessoa por email"""
-        conn = await get_postgres_connection()
-        try:
+        async with postgres_connection() as conn:
             # Primeiro procura em cadastro.pessoa (PF)
             row = await conn.fetchrow(
                 "SELECT * FROM cadastro.pessoa WHERE email = $1",
@@ -186,5 +176,3 @@ class PessoaService:
                 email,
             )
             return dict(row) if row else None
-        finally:
-            await conn.close()
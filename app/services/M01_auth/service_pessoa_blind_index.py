@@ -0,0 +1,207 @@
+"""
+Índice cego de CPF/telefone em cadastro.pessoa (migration 013)
+
+- Cálculo dos índices (HMAC, via CryptographyManager.blind_index)
+- Backfill em lotes das linhas sem índice (tarefa de manutenção)
+- Busca em lote por igualdade (uma consulta `= ANY($1)`), para deduplicar
+  importações sem descriptografar nada
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Optional, Sequence
+from uuid import UUID
+
+from app.config import settings
+from app.database import postgres_connection
+from app.query_registry import queries
+from app.security.crypto import CryptographyManager, get_crypto_manager
+
+logger = logging.getLogger(__name__)
+
+_FIRST_ID = UUID(int=0)
+
+# pg_try_advisory_lock: cada worker agenda o backfill; só um percorre a tabela
+BACKFILL_LOCK_KEY = 4_013_001
+
+PENDING_BLIND_INDEX = queries.register(
+    "pessoa.pending_blind_index",
+    """
+    SELECT id, cpf, telefone
+    FROM cadastro.pessoa
+    WHERE id > $1
+      AND ((cpf_bidx IS NULL AND regexp_replace(cpf, '[^0-9]', '', 'g') <> '')
+           OR (telefone_bidx IS NULL AND regexp_replace(telefone, '[^0-9]', '', 'g') <> ''))
+    ORDER BY id
+    LIMIT $2
+    """,
+)
+
+UPDATE_BLIND_INDEX = queries.register(
+    "pessoa.update_blind_index",
+    """
+    UPDATE cadastro.pessoa p
+    SET cpf_bidx = COALESCE(v.cpf_bidx, p.cpf_bidx),
+        telefone_bidx = COALESCE(v.telefone_bidx, p.telefone_bidx)
+    FROM unnest($1::uuid[], $2::bytea[], $3::bytea[]) AS v(id, cpf_bidx, telefone_bidx)
+    WHERE p.id = v.id
+    """,
+)
+
+MATCH_CPF_BLIND_INDEX = queries.register(
+    "pessoa.match_cpf_blind_index",
+    "SELECT id, cpf_bidx AS bidx FROM cadastro.pessoa WHERE cpf_bidx = ANY($1::bytea[])",
+)
+
+MATCH_TELEFONE_BLIND_INDEX = queries.register(
+    "pessoa.match_telefone_blind_index",
+    """
+    SELECT id, telefone_bidx AS bidx
+    FROM cadastro.pessoa
+    WHERE telefone_bidx = ANY($1::bytea[])
+    """,
+)
+
+_MATCH_BY_KIND = {
+    "cpf": MATCH_CPF_BLIND_INDEX,
+    "telefone": MATCH_TELEFONE_BLIND_INDEX,
+}
+
+
+def get_blind_indexer() -> Optional[CryptographyManager]:
+    """Gerenciador de criptografia, ou None se MASTER_KEY não estiver configurada"""
+    try:
+        return get_crypto_manager()
+    except ValueError:
+        return None
+
+
+def blind_index_pair(
+    cpf: Optional[str], telefone: Optional[str]
+) -> tuple[Optional[bytes], Optional[bytes]]:
+    """
+    Índices de CPF e telefone para gravação junto com o cadastro
+
+    Sem chave configurada retorna (None, None); o backfill preenche depois.
+    """
+    indexer = get_blind_indexer()
+    if indexer is None:
+        return None, None
+    return indexer.blind_index(cpf, "cpf"), indexer.blind_index(telefone, "telefone")
+
+
+async def backfill_blind_index(batch_size: Optional[int] = None) -> dict:
+    """
+    Preenche cpf_bidx/telefone_bidx das linhas que ainda não os têm
+
+    Percorre a tabela por id (keyset), um lote por vez, sem transação longa:
+    não segura locks de linha entre lotes. Valores sem dígitos não geram
+    índice e ficam fora da consulta, senão seriam relidos a cada execução.
+    Um advisory lock garante um único worker por vez.
+    """
+    indexer = get_blind_indexer()
+    if indexer is None:
+        return {"rows_updated": 0, "skipped": "MASTER_KEY não configurada"}
+
+    batch_size = batch_size or settings.blind_index_batch_size
+    started = time.perf_counter()
+    last_id = _FIRST_ID
+    updated = 0
+    batches = 0
+
+    async with postgres_connection(standalone=True) as conn:
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", BACKFILL_LOCK_KEY):
+            logger.info("Backfill do índice cego em andamento em outro worker")
+            return {"rows_updated": 0, "skipped": "em andamento em outro worker"}
+        try:
+            while True:
+                rows = await PENDING_BLIND_INDEX.fetch(conn, last_id, batch_size)
+                if not rows:
+                    break
+
+                ids = [row["id"] for row in rows]
+                await UPDATE_BLIND_INDEX.execute(
+                    conn,
+                    ids,
+                    indexer.blind_index_many((row["cpf"] for row in rows), "cpf"),
+                    indexer.blind_index_many((row["telefone"] for row in rows), "telefone"),
+                )
+
+                updated += len(rows)
+                batches += 1
+                last_id = ids[-1]
+                if len(rows) < batch_size:
+                    break
+        finally:
+            await conn.fetchval("SELECT pg_advisory_unlock($1)", BACKFILL_LOCK_KEY)
+
+    if updated:
+        logger.info(f"Índice cego preenchido em {updated} pessoas ({batches} lotes)")
+
+    return {
+        "rows_updated": updated,
+        "batches": batches,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+async def match_by_blind_index(values: Sequence[str], kind: str = "cpf") -> dict:
+    """
+    Localiza em cadastro.pessoa os documentos informados, numa única consulta
+
+    Args:
+        values: CPFs (ou telefones), com ou sem máscara
+        kind: "cpf" ou "telefone"
+
+    Returns:
+        dict com totais, correspondências (índice na entrada, valor e ids das
+        pessoas) e índices não encontrados. Valores sem dígitos são contados
+        como inválidos.
+    """
+    if kind not in _MATCH_BY_KIND:
+        raise ValueError(f"Tipo de busca não suportado: {kind}")
+    indexer = get_blind_indexer()
+    if indexer is None:
+        raise RuntimeError("MASTER_KEY não configurada: índice cego indisponível")
+
+    indexes = indexer.blind_index_many(values, kind)
+    positions: dict[bytes, list[int]] = {}
+    invalid = []
+    for position, bidx in enumerate(indexes):
+        if bidx is None:
+            invalid.append(position)
+        else:
+            positions.setdefault(bidx, []).append(position)
+
+    found: dict[bytes, list[str]] = {}
+    if positions:
+        async with postgres_connection() as conn:
+            rows = await _MATCH_BY_KIND[kind].fetch(conn, list(positions))
+        for row in rows:
+            found.setdefault(bytes(row["bidx"]), []).append(str(row["id"]))
+
+    matches = []
+    not_found = []
+    for bidx, entry_positions in positions.items():
+        pessoa_ids = found.get(bidx)
+        for position in entry_positions:
+            if pessoa_ids:
+                matches.append(
+                    {"indice": position, "valor": values[position], "pessoa_ids": pessoa_ids}
+                )
+            else:
+                not_found.append(position)
+
+    matches.sort(key=lambda m: m["indice"])
+    not_found.sort()
+    return {
+        "tipo": kind,
+        "total": len(values),
+        "distintos": len(positions),
+        "encontrados": len(matches),
+        "invalidos": invalid,
+        "nao_encontrados": not_found,
+        "correspondencias": matches,
+    }
@@ -0,0 +1,186 @@
+"""
+Validação em lote de CPF, CNPJ e CEP
+
+- Dígitos verificadores calculados localmente, uma vez por valor distinto,
+  pelo caminho vetorizado de app.security.validators
+- Consultas remotas (ViaCEP, ReceitaWS) com no máximo N em andamento,
+  passando pelos caches de CEP e CNPJ; valores repetidos consultam uma vez
+- Resultados gerados na ordem de entrada, à medida que ficam prontos, para
+  o router transmitir como NDJSON
+
+CNPJs dependem da fila da ReceitaWS (poucas consultas por minuto): o lote
+espera no máximo `validacao_lote_cnpj_wait_seconds` no total; os CNPJs que
+não couberem nessa janela saem como `pendente` e seguem na fila, ficando
+disponíveis no cache (ou em /cnpj/consultas/{cnpj}) quando concluídos.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Optional, Sequence
+
+from app.config import settings
+from app.database import context_without_request_lease
+from app.security.validators import validar_cnpjs, validar_cpfs
+from app.services.M01_auth.service_cnpj_lookup import cnpj_lookup
+from app.services.M01_auth.service_external_apis import CEPService
+
+TIPOS = ("cpf", "cnpj", "cep")
+
+_VALIDADORES: dict[str, Callable[[list[str]], Sequence[bool]]] = {
+    "cpf": validar_cpfs,
+    "cnpj": validar_cnpjs,
+    "cep": lambda documentos: [len(doc) == 8 for doc in documentos],
+}
+
+
+async def em_ordem(
+    chaves: Sequence[str],
+    consultar: Callable[[str], Awaitable[dict]],
+    limite: int,
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Executa `consultar` para cada chave com no máximo `limite` em andamento
+    e devolve (chave, resultado) na ordem das chaves
+
+    Ao interromper a iteração (cliente desconectou), as consultas em
+    andamento são canceladas. Cada consulta roda fora do lease de conexão do
+    request: as leituras de cache concorrentes usam conexões próprias do pool
+    em vez de disputar a mesma.
+    """
+    pendentes: deque[tuple[str, asyncio.Task]] = deque()
+    proxima = 0
+    try:
+        while proxima < len(chaves) or pendentes:
+            while proxima < len(chaves) and len(pendentes) < max(1, limite):
+                chave = chaves[proxima]
+                task = asyncio.create_task(
+                    consultar(chave), context=context_without_request_lease()
+                )
+                pendentes.append((chave, task))
+                proxima += 1
+            chave, task = pendentes[0]
+            resultado = await task
+            pendentes.popleft()
+            yield chave, resultado
+    finally:
+        for _, task in pendentes:
+            task.cancel()
+
+
+async def _consultar_cep(cep: str) -> dict:
+    resultado = await CEPService.consultar_cep(cep) or {"erro": True}
+    if resultado.get("erro"):
+        return {
+            "encontrado": False,
+            "mensagem": resultado.get("mensagem", "CEP não encontrado"),
+        }
+    return {"encontrado": True, "dados": resultado}
+
+
+class _ConsultaCNPJ:
+    """Consulta pela fila da ReceitaWS dentro da janela de espera do lote"""
+
+    def __init__(self, wait_seconds: float):
+        self.deadline = time.monotonic() + wait_seconds
+
+    async def __call__(self, cnpj: str) -> dict:
+        restante = max(0.0, self.deadline - time.monotonic())
+        resultado = await cnpj_lookup.lookup(cnpj, wait_seconds=restante)
+        if resultado is None:
+            return {
+                "encontrado": None,
+                "pendente": True,
+                "mensagem": "Consulta na fila da Receita",
+            }
+        return {
+            "encontrado": resultado.status == "encontrado",
+            "dados": resultado.dados,
+            "mensagem": resultado.mensagem,
+        }
+
+
+def _consulta_remota(tipo: str) -> Optional[Callable[[str], Awaitable[dict]]]:
+    if tipo == "cep":
+        return _consultar_cep
+    if tipo == "cnpj":
+        return _ConsultaCNPJ(settings.validacao_lote_cnpj_wait_seconds)
+    return None  # CPF: sem consulta remota
+
+
+def _concorrencia(tipo: str) -> int:
+    if tipo == "cnpj":
+        return settings.validacao_lote_concorrencia_cnpj
+    return settings.validacao_lote_concorrencia_cep
+
+
+async def validar_lote(
+    tipo: str,
+    valores: Sequence[str],
+    consultar: bool = True,
+    concorrencia: Optional[int] = None,
+    resumo: Optional[dict] = None,
+) -> AsyncIterator[dict]:
+    """
+    Valida (e opcionalmente consulta) uma lista de documentos
+
+    Args:
+        tipo: "cpf", "cnpj" ou "cep"
+        valores: Documentos com ou sem formatação
+        consultar: Consulta ViaCEP/ReceitaWS para os válidos (CPF não tem consulta)
+        concorrencia: Máximo de consultas remotas em andamento (padrão por tipo)
+        resumo: Dicionário preenchido com os totais ao final da iteração
+
+    Yields:
+        {"indice": 0, "valor": "01310-100", "documento": "01310100",
+         "valido": true, "encontrado": true, "dados": {...}}
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo inválido: {tipo}")
+
+    started = time.perf_counter()
+    documentos = [re.sub(r"[^0-9]", "", valor or "") for valor in valores]
+    distintos = list(dict.fromkeys(documentos))
+    validos = dict(zip(distintos, map(bool, _VALIDADORES[tipo](distintos))))
+
+    consulta = _consulta_remota(tipo) if consultar else None
+    chaves = [doc for doc, ok in validos.items() if ok] if consulta else []
+    consultas = em_ordem(chaves, consulta, concorrencia or _concorrencia(tipo))
+    resultados: dict[str, dict] = {}
+    totais = dict.fromkeys(
+        ("validos", "invalidos", "encontrados", "nao_encontrados", "pendentes"), 0
+    )
+    totais["total"] = len(documentos)
+
+    try:
+        for indice, (valor, doc) in enumerate(zip(valores, documentos)):
+            item = {"indice": indice, "valor": valor, "documento": doc, "valido": validos[doc]}
+            if not item["valido"]:
+                totais["invalidos"] += 1
+                item["mensagem"] = f"{tipo.upper()} inválido"
+                yield item
+                continue
+
+            totais["validos"] += 1
+            if consulta is not None:
+                if doc not in resultados:
+                    chave, resultado = await consultas.__anext__()
+                    resultados[chave] = resultado
+                item.update(resultados[doc])
+                if item.get("pendente"):
+                    totais["pendentes"] += 1
+                elif item["encontrado"]:
+                    totais["encontrados"] += 1
+                else:
+                    totais["nao_encontrados"] += 1
+            yield item
+    finally:
+        await consultas.aclose()
+        if resumo is not None:
+            totais["distintos"] = len(validos)
+            totais["consultas"] = len(resultados)
+            totais["duracao_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            resumo.update(totais)
@@ -1,11 +1,30 @@
 """
 SIGMA-PLI - M04: Calendário
 Serviço de gerenciamento de eventos
+
+Duas implementações com a mesma interface (assíncrona):
+
+- PostgresCalendarioEventosService: calendario.evento (migration 016), com
+  busca, próximos eventos, eventos do dia e estatísticas resolvidos no SQL
+  pelos índices (data, hora_inicio), tipo, módulo e responsável
+- CalendarioEventosService: memória por processo (IndiceEventos: ordenado por
+  data/hora com bisect + índices por tipo, módulo e vínculo), com dados de
+  exemplo (desenvolvimento sem PostgreSQL e dublê nos testes)
+
+`calendario_eventos_store` escolhe a implementação usada pelas rotas.
 """
 
-from typing import List, Optional, Dict, Any
-from datetime import datetime, date, timedelta
+import base64
+import bisect
+import itertools
+import json
+import logging
+from collections import defaultdict
+from typing import Iterator, List, Optional, Dict, Any
+from datetime import datetime, date, time, timedelta
 import uuid
+from app.config import settings
+from app.database import postgres_connection
 from app.models.schemas.calendario import (
     EventoCreate,
     EventoUpdate,
@@ -13,19 +32,227 @@ from app.models.schemas.calendario import (
     EventType,
     EventoSearchParams,
 )
+from app.query_registry import queries
+from app.services.M04_calendario.service_calendario_ics import fragmentos_ics
 
+logger = logging.getLogger(__name__)
 
-class CalendarioEventosService:
-    """Serviço para gerenciamento de eventos do calendário"""
+
+def _novo_id() -> str:
+    return f"evt-{uuid.uuid4().hex[:8]}-{int(datetime.now().timestamp())}"
+
+
+def _lembrete_homeoffice(ho_event_id: str, ho_event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Lembrete de confirmação de Home Office (2 dias antes), se ainda for futuro"""
+    ho_date = (
+        datetime.fromisoformat(ho_event["date"])
+        if isinstance(ho_event["date"], str)
+        else datetime.combine(ho_event["date"], time())
+    )
+    reminder_date = ho_date - timedelta(days=2)
+
+    # Só cria se a data do lembrete for futura
+    if reminder_date.date() < datetime.now().date():
+        return None
+
+    now = datetime.now()
+    ho_date_str = ho_date.date().isoformat()
+    return {
+        "id": _novo_id(),
+        "created_at": now,
+        "updated_at": now,
+        "type": "homeoffice",
+        "title": f"Confirmação Home Office - {ho_event['user']}",
+        "user": ho_event["user"],
+        "date": reminder_date.date().isoformat(),
+        "startTime": "09:00",
+        "endTime": "09:30",
+        "location": "Notificação",
+        "notes": f"Confirmação automática do HO marcado para {ho_date_str}",
+        "module": ho_event.get("module"),
+        "isHomeOfficeReminder": True,
+        "linkedEventId": ho_event_id,
+    }
+
+
+def encode_cursor(evento: EventoResponse) -> str:
+    """Cursor opaco com a chave (data, startTime, id) do último evento da página"""
+    chave = [evento.date.isoformat(), evento.startTime, evento.id]
+    return base64.urlsafe_b64encode(json.dumps(chave).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(data, startTime, id) do cursor; ValueError se inválido"""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data, hora, evento_id = json.loads(bruto)
+        time.fromisoformat(hora)
+        return date.fromisoformat(data), hora, str(evento_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginação inválido") from e
+
+
+def _cursor_de(params: EventoSearchParams) -> Optional[tuple]:
+    return decode_cursor(params.cursor) if params.cursor else None
+
+
+def _pagina(eventos: List[EventoResponse], limit: int) -> tuple:
+    """(eventos, next_cursor) a partir de limit + 1 eventos buscados"""
+    if len(eventos) > limit:
+        return eventos[:limit], encode_cursor(eventos[limit - 1])
+    return eventos, None
+
+
+class IndiceEventos:
+    """
+    Eventos em memória ordenados por (data, hora de início)
+
+    - `_ordem`: lista ordenada de (data, startTime, id); períodos saem por
+      bisect em O(log n + k), sem varrer nem reordenar os eventos
+    - Índices secundários (hash) por tipo, módulo e evento vinculado
+    - Datas guardadas como `date` (sem reparse de string) e o EventoResponse
+      de cada evento montado uma vez, até a próxima alteração
+    """
 
     def __init__(self):
+        self._eventos: Dict[str, Dict[str, Any]] = {}
+        self._ordem: List[tuple] = []
+        self._por_tipo: Dict[str, set] = defaultdict(set)
+        self._por_modulo: Dict[Optional[str], set] = defaultdict(set)
+        self._vinculados: Dict[str, set] = defaultdict(set)
+        self._lembretes: set = set()
+        self._respostas: Dict[str, EventoResponse] = {}
+
+    def __len__(self) -> int:
+        return len(self._eventos)
+
+    def __contains__(self, evento_id: str) -> bool:
+        return evento_id in self._eventos
+
+    @staticmethod
+    def _chave(evento: Dict[str, Any]) -> tuple:
+        return (evento["date"], evento["startTime"], evento["id"])
+
+    def adicionar(self, evento: Dict[str, Any]) -> Dict[str, Any]:
+        """Indexa o evento (data em string ISO é convertida para `date`)"""
+        evento = dict(evento)
+        if isinstance(evento["date"], str):
+            evento["date"] = date.fromisoformat(evento["date"])
+        evento["type"] = getattr(evento["type"], "value", evento["type"])
+
+        evento_id = evento["id"]
+        self._eventos[evento_id] = evento
+        bisect.insort(self._ordem, self._chave(evento))
+        self._por_tipo[evento["type"]].add(evento_id)
+        self._por_modulo[evento.get("module")].add(evento_id)
+        if evento.get("linkedEventId"):
+            self._vinculados[evento["linkedEventId"]].add(evento_id)
+        if evento.get("isHomeOfficeReminder"):
+            self._lembretes.add(evento_id)
+        return evento
+
+    def remover(self, evento_id: str) -> Optional[Dict[str, Any]]:
+        evento = self._eventos.pop(evento_id, None)
+        if evento is None:
+            return None
+        chave = self._chave(evento)
+        del self._ordem[bisect.bisect_left(self._ordem, chave)]
+        self._descartar(self._por_tipo, evento["type"], evento_id)
+        self._descartar(self._por_modulo, evento.get("module"), evento_id)
+        if evento.get("linkedEventId"):
+            self._descartar(self._vinculados, evento["linkedEventId"], evento_id)
+        self._lembretes.discard(evento_id)
+        self._respostas.pop(evento_id, None)
+        return evento
+
+    @staticmethod
+    def _descartar(indice: Dict[Any, set], chave: Any, evento_id: str):
+        ids = indice.get(chave)
+        if ids is not None:
+            ids.discard(evento_id)
+            if not ids:
+                del indice[chave]
+
+    def atualizar(self, evento_id: str, campos: Dict[str, Any]) -> Dict[str, Any]:
+        """Reindexa o evento com os campos alterados"""
+        evento = self.remover(evento_id)
+        evento.update(campos)
+        return self.adicionar(evento)
+
+    def resposta(self, evento_id: str) -> EventoResponse:
+        resposta = self._respostas.get(evento_id)
+        if resposta is None:
+            resposta = EventoResponse(**self._eventos[evento_id])
+            self._respostas[evento_id] = resposta
+        return resposta
+
+    def _limites(
+        self, inicio: Optional[date], fim: Optional[date], apos: Optional[tuple] = None
+    ) -> tuple:
+        lo = 0 if inicio is None else bisect.bisect_left(self._ordem, (inicio,))
+        if apos is not None:
+            lo = max(lo, bisect.bisect_right(self._ordem, apos))
+        if fim is None or fim >= date.max:
+            hi = len(self._ordem)
+        else:
+            hi = bisect.bisect_left(self._ordem, (fim + timedelta(days=1),))
+        return lo, max(lo, hi)
+
+    def periodo(
+        self,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        apos: Optional[tuple] = None,
+    ) -> Iterator[str]:
+        """
+        IDs dos eventos entre `inicio` e `fim` (inclusive), em ordem de data e hora
+
+        `apos`: chave (data, startTime, id) de um cursor; começa logo depois dela
+        """
+        lo, hi = self._limites(inicio, fim, apos)
+        ordem = self._ordem
+        return (ordem[i][2] for i in range(lo, hi))
+
+    def contar_periodo(self, inicio: Optional[date] = None, fim: Optional[date] = None) -> int:
+        lo, hi = self._limites(inicio, fim)
+        return hi - lo
+
+    def ids_por_tipo(self, tipo: str) -> set:
+        return self._por_tipo.get(tipo, set())
+
+    def ids_por_modulo(self, modulo: Optional[str]) -> set:
+        return self._por_modulo.get(modulo, set())
+
+    def ids_vinculados(self, evento_id: str) -> set:
+        return self._vinculados.get(evento_id, set())
+
+    def obter(self, evento_id: str) -> Optional[Dict[str, Any]]:
+        return self._eventos.get(evento_id)
+
+    def eh_lembrete(self, evento_id: str) -> bool:
+        return evento_id in self._lembretes
+
+    def ids_lembretes(self) -> set:
+        return self._lembretes
+
+
+class CalendarioEventosService:
+    """Serviço para gerenciamento de eventos do calendário (em memória)"""
+
+    def __init__(self, sample_data: bool = True):
         """
         Inicializa o serviço.
-        Por enquanto usa armazenamento em memória.
-        TODO: Integrar com PostgreSQL quando a tabela for criada.
+        Armazenamento em memória, por processo: sem PostgreSQL e nos testes.
+
+        Args:
+            sample_data: Carrega eventos de exemplo
         """
-        self._eventos: Dict[str, Dict[str, Any]] = {}
-        self._init_sample_data()
+        self._indice = IndiceEventos()
+        # Versão do calendário (ETag do feed ICS): muda a cada alteração
+        self._instancia = uuid.uuid4().hex[:8]
+        self._versao = 0
+        if sample_data:
+            self._init_sample_data()
 
     def _init_sample_data(self):
         """Inicializa com alguns eventos de exemplo"""
@@ -72,229 +299,500 @@ class CalendarioEventosService:
         ]
 
         for evento_data in sample_eventos:
-            evento_id = f"evt-{uuid.uuid4().hex[:8]}-{int(datetime.now().timestamp())}"
             now = datetime.now()
 
-            self._eventos[evento_id] = {
-                "id": evento_id,
-                "created_at": now,
-                "updated_at": now,
-                **evento_data,
-            }
+            self._indice.adicionar(
+                {
+                    "id": _novo_id(),
+                    "created_at": now,
+                    "updated_at": now,
+                    **evento_data,
+                }
+            )
 
-    def create_evento(self, evento_data: EventoCreate) -> EventoResponse:
+    def _respostas(self, ids) -> List[EventoResponse]:
+        return [self._indice.resposta(evento_id) for evento_id in ids]
+
+    async def create_evento(self, evento_data: EventoCreate) -> EventoResponse:
         """Cria um novo evento"""
-        evento_id = f"evt-{uuid.uuid4().hex[:8]}-{int(datetime.now().timestamp())}"
+        evento_id = _novo_id()
         now = datetime.now()
 
-        evento_dict = {
-            "id": evento_id,
-            "created_at": now,
-            "updated_at": now,
-            **evento_data.model_dump(),
-        }
-
-        # Converte date para string para armazenamento
-        if isinstance(evento_dict["date"], date):
-            evento_dict["date"] = evento_dict["date"].isoformat()
-
-        self._eventos[evento_id] = evento_dict
+        evento_dict = self._indice.adicionar(
+            {
+                "id": evento_id,
+                "created_at": now,
+                "updated_at": now,
+                **evento_data.model_dump(),
+            }
+        )
 
         # Se for Home Office, cria lembrete automaticamente
         if (
             evento_data.type == EventType.HOMEOFFICE
             and not evento_data.isHomeOfficeReminder
         ):
-            self._create_homeoffice_reminder(evento_id, evento_dict)
-
-        return EventoResponse(**evento_dict)
-
-    def _create_homeoffice_reminder(self, ho_event_id: str, ho_event: Dict[str, Any]):
-        """Cria lembrete automático de confirmação de Home Office (2 dias antes)"""
-        ho_date = (
-            datetime.fromisoformat(ho_event["date"])
-            if isinstance(ho_event["date"], str)
-            else ho_event["date"]
-        )
-        reminder_date = ho_date - timedelta(days=2)
-
-        # Só cria se a data do lembrete for futura
-        if reminder_date.date() >= datetime.now().date():
-            reminder_id = (
-                f"evt-{uuid.uuid4().hex[:8]}-{int(datetime.now().timestamp())}"
-            )
-            now = datetime.now()
-
-            reminder_dict = {
-                "id": reminder_id,
-                "created_at": now,
-                "updated_at": now,
-                "type": "homeoffice",
-                "title": f"Confirmação Home Office - {ho_event['user']}",
-                "user": ho_event["user"],
-                "date": reminder_date.date().isoformat(),
-                "startTime": "09:00",
-                "endTime": "09:30",
-                "location": "Notificação",
-                "notes": f"Confirmação automática do HO marcado para {ho_event['date']}",
-                "module": ho_event.get("module"),
-                "isHomeOfficeReminder": True,
-                "linkedEventId": ho_event_id,
-            }
-
-            self._eventos[reminder_id] = reminder_dict
-
-    def get_all_eventos(self) -> List[EventoResponse]:
-        """Retorna todos os eventos"""
-        eventos_list = [EventoResponse(**evento) for evento in self._eventos.values()]
-        # Ordena por data
-        eventos_list.sort(key=lambda e: (e.date, e.startTime))
-        return eventos_list
-
-    def get_evento_by_id(self, evento_id: str) -> Optional[EventoResponse]:
+            reminder = _lembrete_homeoffice(evento_id, evento_dict)
+            if reminder:
+                self._indice.adicionar(reminder)
+
+        self._versao += 1
+        return self._indice.resposta(evento_id)
+
+    async def get_all_eventos(self) -> List[EventoResponse]:
+        """Retorna todos os eventos (ordenados por data e hora)"""
+        return self._respostas(self._indice.periodo())
+
+    async def versao_calendario(self) -> str:
+        """Versão dos eventos (muda a cada criação, alteração ou remoção)"""
+        return f"memoria-{self._instancia}-{self._versao}"
+
+    async def count_eventos(self, params: Optional[EventoSearchParams] = None) -> tuple:
+        """(total, filtrados): total é O(1); filtrados percorre só o período buscado"""
+        total = len(self._indice)
+        if params is None or not params.has_filters:
+            return total, total
+        if not (params.type or params.user or (params.module and params.module != "all")):
+            return total, self._indice.contar_periodo(params.date_start, params.date_end)
+        return total, sum(1 for _ in self._filtrar(params, apos=None))
+
+    async def get_evento_by_id(self, evento_id: str) -> Optional[EventoResponse]:
         """Retorna um evento específico por ID"""
-        evento = self._eventos.get(evento_id)
-        if evento:
-            return EventoResponse(**evento)
+        if evento_id in self._indice:
+            return self._indice.resposta(evento_id)
         return None
 
-    def update_evento(
+    async def update_evento(
         self, evento_id: str, evento_update: EventoUpdate
     ) -> Optional[EventoResponse]:
         """Atualiza um evento existente"""
-        if evento_id not in self._eventos:
+        if evento_id not in self._indice:
             return None
 
-        evento = self._eventos[evento_id]
         update_data = evento_update.model_dump(exclude_unset=True)
+        update_data["updated_at"] = datetime.now()
+        self._indice.atualizar(evento_id, update_data)
+        fragmentos_ics.invalidar(evento_id)
+        self._versao += 1
 
-        # Converte date para string se presente
-        if "date" in update_data and isinstance(update_data["date"], date):
-            update_data["date"] = update_data["date"].isoformat()
-
-        # Atualiza campos
-        for field, value in update_data.items():
-            evento[field] = value
+        return self._indice.resposta(evento_id)
 
-        evento["updated_at"] = datetime.now()
-
-        return EventoResponse(**evento)
-
-    def delete_evento(self, evento_id: str) -> bool:
+    async def delete_evento(self, evento_id: str) -> bool:
         """Remove um evento"""
-        if evento_id not in self._eventos:
+        evento = self._indice.obter(evento_id)
+        if evento is None:
             return False
 
-        evento = self._eventos[evento_id]
-
         # Se for Home Office, remove lembretes vinculados
-        if evento.get("type") == "homeoffice" and not evento.get(
-            "isHomeOfficeReminder"
-        ):
+        if evento["type"] == "homeoffice" and not evento.get("isHomeOfficeReminder"):
             self._delete_homeoffice_reminders(evento_id)
 
         # Se for lembrete, remove apenas ele
-        del self._eventos[evento_id]
+        self._indice.remover(evento_id)
+        fragmentos_ics.invalidar(evento_id)
+        self._versao += 1
         return True
 
     def _delete_homeoffice_reminders(self, ho_event_id: str):
         """Remove lembretes vinculados a um evento de Home Office"""
-        reminders_to_delete = [
-            evt_id
-            for evt_id, evt in self._eventos.items()
-            if evt.get("isHomeOfficeReminder")
-            and evt.get("linkedEventId") == ho_event_id
-        ]
+        for reminder_id in list(self._indice.ids_vinculados(ho_event_id)):
+            if self._indice.eh_lembrete(reminder_id):
+                self._indice.remover(reminder_id)
+                fragmentos_ics.invalidar(reminder_id)
 
-        for reminder_id in reminders_to_delete:
-            del self._eventos[reminder_id]
-
-    def search_eventos(self, params: EventoSearchParams) -> List[EventoResponse]:
-        """Busca eventos com filtros"""
-        eventos = list(self._eventos.values())
+    def _filtrar(self, params: EventoSearchParams, apos: Optional[tuple]) -> Iterator[str]:
+        """IDs que atendem aos filtros (período pelo índice ordenado, demais por hash)"""
+        ids = self._indice.periodo(params.date_start, params.date_end, apos)
 
         # Aplica filtros
         if params.type:
-            eventos = [e for e in eventos if e["type"] == params.type]
+            tipo_ids = self._indice.ids_por_tipo(params.type.value)
+            ids = (i for i in ids if i in tipo_ids)
+
+        if params.module and params.module != "all":
+            modulo_ids = self._indice.ids_por_modulo(params.module)
+            ids = (i for i in ids if i in modulo_ids)
 
         if params.user:
             user_lower = params.user.lower()
-            eventos = [e for e in eventos if user_lower in e["user"].lower()]
-
-        if params.module:
-            if params.module == "all":
-                pass  # Não filtra
-            else:
-                eventos = [e for e in eventos if e.get("module") == params.module]
-
-        if params.date_start:
-            date_start_str = params.date_start.isoformat()
-            eventos = [e for e in eventos if e["date"] >= date_start_str]
+            ids = (i for i in ids if user_lower in self._indice.obter(i)["user"].lower())
 
-        if params.date_end:
-            date_end_str = params.date_end.isoformat()
-            eventos = [e for e in eventos if e["date"] <= date_end_str]
+        return ids
 
-        # Ordena
-        eventos.sort(key=lambda e: (e["date"], e["startTime"]))
+    def _buscar(self, params: EventoSearchParams, limite: int) -> List[EventoResponse]:
+        ids = self._filtrar(params, _cursor_de(params))
+        # Paginação: após o cursor (keyset) e/ou offset
+        return self._respostas(itertools.islice(ids, params.offset, params.offset + limite))
 
-        # Paginação
-        start = params.offset
-        end = start + params.limit
-        eventos_paginated = eventos[start:end]
+    async def search_eventos(self, params: EventoSearchParams) -> List[EventoResponse]:
+        """Busca eventos com filtros"""
+        return self._buscar(params, params.limit)
 
-        return [EventoResponse(**e) for e in eventos_paginated]
+    async def page_eventos(self, params: EventoSearchParams) -> tuple:
+        """(eventos, next_cursor) da página pedida"""
+        return _pagina(self._buscar(params, params.limit + 1), params.limit)
 
-    def get_eventos_by_date(self, target_date: date) -> List[EventoResponse]:
+    async def get_eventos_by_date(self, target_date: date) -> List[EventoResponse]:
         """Retorna eventos de uma data específica"""
-        date_str = target_date.isoformat()
-        eventos = [
-            EventoResponse(**e) for e in self._eventos.values() if e["date"] == date_str
-        ]
-        eventos.sort(key=lambda e: e.startTime)
-        return eventos
+        return self._respostas(self._indice.periodo(target_date, target_date))
 
-    def get_upcoming_eventos(self, days: int = 3) -> List[EventoResponse]:
+    async def get_upcoming_eventos(self, days: int = 3) -> List[EventoResponse]:
         """Retorna eventos próximos (nos próximos N dias)"""
         today = datetime.now().date()
-        end_date = today + timedelta(days=days)
-
-        eventos = [
-            EventoResponse(**e)
-            for e in self._eventos.values()
-            if today <= datetime.fromisoformat(e["date"]).date() <= end_date
-        ]
-        eventos.sort(key=lambda e: (e.date, e.startTime))
-        return eventos
+        return self._respostas(self._indice.periodo(today, today + timedelta(days=days)))
 
-    def get_statistics(self) -> Dict[str, int]:
+    async def get_statistics(self) -> Dict[str, int]:
         """Retorna estatísticas dos eventos"""
-        today = datetime.now().date()
-        current_month = today.month
-        current_year = today.year
-
-        total = len(self._eventos)
-        entregas = sum(1 for e in self._eventos.values() if e["type"] == "entrega")
-        reunioes = sum(1 for e in self._eventos.values() if e["type"] == "reuniao")
-        homeoffice = sum(
-            1
-            for e in self._eventos.values()
-            if e["type"] == "homeoffice" and not e.get("isHomeOfficeReminder")
-        )
+        inicio_mes = datetime.now().date().replace(day=1)
+        fim_mes = (inicio_mes + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
-        this_month = sum(
-            1
-            for e in self._eventos.values()
-            if datetime.fromisoformat(e["date"]).month == current_month
-            and datetime.fromisoformat(e["date"]).year == current_year
-        )
+        homeoffice = self._indice.ids_por_tipo("homeoffice")
+        lembretes = len(homeoffice & self._indice.ids_lembretes())
 
         return {
-            "total": total,
-            "entregas": entregas,
-            "reunioes": reunioes,
-            "homeOffice": homeoffice,
-            "thisMonth": this_month,
+            "total": len(self._indice),
+            "entregas": len(self._indice.ids_por_tipo("entrega")),
+            "reunioes": len(self._indice.ids_por_tipo("reuniao")),
+            "homeOffice": len(homeoffice) - lembretes,
+            "thisMonth": self._indice.contar_periodo(inicio_mes, fim_mes),
+        }
+
+
+# =====================================================
+# POSTGRESQL (calendario.evento, migration 016)
+# =====================================================
+
+_COLUNAS = """
+    id, tipo, titulo, responsavel, data, hora_inicio, hora_fim, localizacao,
+    observacoes, modulo, lembrete_homeoffice, evento_vinculado_id, criado_em,
+    atualizado_em
+"""
+
+# Limites do período quando a busca não informa datas: o filtro por data fica
+# sempre presente e a consulta usa os índices (..., data, hora_inicio)
+_DATA_MIN = date(1, 1, 1)
+_DATA_MAX = date(9999, 12, 31)
+
+EVENTO_INSERT = queries.register(
+    "calendario.evento_insert",
+    f"""
+    INSERT INTO calendario.evento (
+        id, tipo, titulo, responsavel, data, hora_inicio, hora_fim, localizacao,
+        observacoes, modulo, lembrete_homeoffice, evento_vinculado_id
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+    RETURNING {_COLUNAS}
+    """,
+)
+
+EVENTO_GET = queries.register(
+    "calendario.evento_get",
+    f"SELECT {_COLUNAS} FROM calendario.evento WHERE id = $1",
+)
+
+EVENTO_GET_FOR_UPDATE = queries.register(
+    "calendario.evento_get_for_update",
+    f"SELECT {_COLUNAS} FROM calendario.evento WHERE id = $1 FOR UPDATE",
+)
+
+EVENTO_UPDATE = queries.register(
+    "calendario.evento_update",
+    f"""
+    UPDATE calendario.evento SET
+        tipo = $2,
+        titulo = $3,
+        responsavel = $4,
+        data = $5,
+        hora_inicio = $6,
+        hora_fim = $7,
+        localizacao = $8,
+        observacoes = $9,
+        modulo = $10,
+        atualizado_em = NOW()
+    WHERE id = $1
+    RETURNING {_COLUNAS}
+    """,
+)
+
+# Remove o evento e seus lembretes de Home Office (a FK ON DELETE CASCADE
+# garante o mesmo; aqui os ids voltam para invalidar o cache do ICS)
+EVENTO_DELETE = queries.register(
+    "calendario.evento_delete",
+    """
+    DELETE FROM calendario.evento
+    WHERE id = $1 OR (evento_vinculado_id = $1 AND lembrete_homeoffice)
+    RETURNING id
+    """,
+)
+
+# Contador incrementado por trigger a cada INSERT/UPDATE/DELETE (migration 018)
+EVENTO_VERSAO = queries.register(
+    "calendario.evento_versao",
+    "SELECT versao FROM calendario.versao",
+)
+
+EVENTO_ALL = queries.register(
+    "calendario.evento_all",
+    f"SELECT {_COLUNAS} FROM calendario.evento ORDER BY data, hora_inicio, id",
+)
+
+# Filtros $1..$5 iguais aos de calendario.evento_search
+_FILTROS = """
+    data BETWEEN $1 AND $2
+    AND ($3::varchar IS NULL OR tipo = $3)
+    AND ($4::varchar IS NULL OR responsavel ILIKE $4)
+    AND ($5::varchar IS NULL OR modulo = $5)
+"""
+
+# Total e filtrados na mesma varredura
+EVENTO_COUNT = queries.register(
+    "calendario.evento_count",
+    f"""
+    SELECT count(*) AS total, count(*) FILTER (WHERE {_FILTROS}) AS filtrados
+    FROM calendario.evento
+    """,
+)
+
+EVENTO_PERIODO = queries.register(
+    "calendario.evento_periodo",
+    f"""
+    SELECT {_COLUNAS}
+    FROM calendario.evento
+    WHERE data BETWEEN $1 AND $2
+    ORDER BY data, hora_inicio, id
+    """,
+)
+
+EVENTO_SEARCH = queries.register(
+    "calendario.evento_search",
+    f"""
+    SELECT {_COLUNAS}
+    FROM calendario.evento
+    WHERE {_FILTROS}
+    ORDER BY data, hora_inicio, id
+    LIMIT $6 OFFSET $7
+    """,
+)
+
+# Statement à parte para o keyset: sem o "$8 IS NULL OR", a comparação de
+# linha continua condição do índice (data, hora_inicio, id) no plano genérico
+EVENTO_SEARCH_APOS = queries.register(
+    "calendario.evento_search_apos",
+    f"""
+    SELECT {_COLUNAS}
+    FROM calendario.evento
+    WHERE {_FILTROS}
+      AND (data, hora_inicio, id) > ($8::date, $9::time, $10::varchar)
+    ORDER BY data, hora_inicio, id
+    LIMIT $6 OFFSET $7
+    """,
+)
+
+EVENTO_STATS = queries.register(
+    "calendario.evento_stats",
+    """
+    SELECT
+        count(*) AS total,
+        count(*) FILTER (WHERE tipo = 'entrega') AS entregas,
+        count(*) FILTER (WHERE tipo = 'reuniao') AS reunioes,
+        count(*) FILTER (WHERE tipo = 'homeoffice' AND NOT lembrete_homeoffice) AS homeoffice,
+        count(*) FILTER (WHERE data >= $1 AND data < $2) AS this_month
+    FROM calendario.evento
+    """,
+)
+
+
+def _hora(valor: str) -> time:
+    return time.fromisoformat(valor)
+
+
+def _like_parcial(texto: str) -> str:
+    """Padrão ILIKE de busca parcial (curingas do usuário escapados)"""
+    escapado = texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escapado}%"
+
+
+def _evento(row) -> EventoResponse:
+    """
+    Linha de calendario.evento → EventoResponse
+
+    Sem revalidar: os dados foram validados na gravação, e eventos com mais de
+    1 ano (recusados na criação) continuam legíveis.
+    """
+    return EventoResponse.model_construct(
+        id=row["id"],
+        type=EventType(row["tipo"]),
+        title=row["titulo"],
+        user=row["responsavel"],
+        date=row["data"],
+        startTime=row["hora_inicio"].strftime("%H:%M"),
+        endTime=row["hora_fim"].strftime("%H:%M"),
+        location=row["localizacao"],
+        notes=row["observacoes"],
+        module=row["modulo"],
+        isHomeOfficeReminder=row["lembrete_homeoffice"],
+        linkedEventId=row["evento_vinculado_id"],
+        created_at=row["criado_em"],
+        updated_at=row["atualizado_em"],
+    )
+
+
+def _filtros(params: Optional[EventoSearchParams]) -> list:
+    """Parâmetros $1..$5 dos filtros de busca (sem filtros: período inteiro)"""
+    if params is None:
+        return [_DATA_MIN, _DATA_MAX, None, None, None]
+    module = None if params.module == "all" else params.module
+    return [
+        params.date_start or _DATA_MIN,
+        params.date_end or _DATA_MAX,
+        params.type.value if params.type else None,
+        _like_parcial(params.user) if params.user else None,
+        module or None,
+    ]
+
+
+def _parametros(evento: Dict[str, Any]) -> list:
+    """Colunas editáveis ($2..$10 de insert/update) a partir do dicionário do evento"""
+    data = evento["date"]
+    return [
+        getattr(evento["type"], "value", evento["type"]),
+        evento["title"],
+        evento["user"],
+        date.fromisoformat(data) if isinstance(data, str) else data,
+        _hora(evento["startTime"]),
+        _hora(evento["endTime"]),
+        evento.get("location"),
+        evento.get("notes"),
+        evento.get("module"),
+    ]
+
+
+class PostgresCalendarioEventosService:
+    """Eventos do calendário em calendario.evento (mesma interface do serviço em memória)"""
+
+    async def create_evento(self, evento_data: EventoCreate) -> EventoResponse:
+        """Cria um novo evento (e o lembrete de Home Office, na mesma transação)"""
+        evento_dict = {"id": _novo_id(), **evento_data.model_dump()}
+        reminder = None
+        if (
+            evento_data.type == EventType.HOMEOFFICE
+            and not evento_data.isHomeOfficeReminder
+        ):
+            reminder = _lembrete_homeoffice(evento_dict["id"], evento_dict)
+
+        async with postgres_connection() as conn:
+            async with conn.transaction():
+                row = await EVENTO_INSERT.fetchrow(
+                    conn,
+                    evento_dict["id"],
+                    *_parametros(evento_dict),
+                    evento_data.isHomeOfficeReminder,
+                    evento_data.linkedEventId,
+                )
+                if reminder:
+                    await EVENTO_INSERT.fetchrow(
+                        conn,
+                        reminder["id"],
+                        *_parametros(reminder),
+                        True,
+                        reminder["linkedEventId"],
+                    )
+        return _evento(row)
+
+    async def get_all_eventos(self) -> List[EventoResponse]:
+        async with postgres_connection() as conn:
+            rows = await EVENTO_ALL.fetch(conn)
+        return [_evento(row) for row in rows]
+
+    async def count_eventos(self, params: Optional[EventoSearchParams] = None) -> tuple:
+        """(total, filtrados) em uma única varredura"""
+        async with postgres_connection() as conn:
+            row = await EVENTO_COUNT.fetchrow(conn, *_filtros(params))
+        return row["total"], row["filtrados"]
+
+    async def get_evento_by_id(self, evento_id: str) -> Optional[EventoResponse]:
+        async with postgres_connection() as conn:
+            row = await EVENTO_GET.fetchrow(conn, evento_id)
+        return _evento(row) if row else None
+
+    async def update_evento(
+        self, evento_id: str, evento_update: EventoUpdate
+    ) -> Optional[EventoResponse]:
+        """Atualização parcial: mescla os campos enviados com a linha bloqueada"""
+        update_data = evento_update.model_dump(exclude_unset=True)
+        async with postgres_connection() as conn:
+            async with conn.transaction():
+                row = await EVENTO_GET_FOR_UPDATE.fetchrow(conn, evento_id)
+                if row is None:
+                    return None
+                evento = {**_evento(row).model_dump(), **update_data}
+                if evento["endTime"] <= evento["startTime"]:
+                    raise ValueError("Horário de término deve ser posterior ao de início")
+                row = await EVENTO_UPDATE.fetchrow(conn, evento_id, *_parametros(evento))
+        fragmentos_ics.invalidar(evento_id)
+        return _evento(row)
+
+    async def delete_evento(self, evento_id: str) -> bool:
+        async with postgres_connection() as conn:
+            rows = await EVENTO_DELETE.fetch(conn, evento_id)
+        for row in rows:
+            fragmentos_ics.invalidar(row["id"])
+        return bool(rows)
+
+    async def versao_calendario(self) -> str:
+        """Versão dos eventos (contador da tabela calendario.versao)"""
+        async with postgres_connection() as conn:
+            return f"postgres-{await EVENTO_VERSAO.fetchval(conn)}"
+
+    async def _buscar(self, params: EventoSearchParams, limite: int) -> List[EventoResponse]:
+        apos = _cursor_de(params)
+        async with postgres_connection() as conn:
+            if apos is None:
+                rows = await EVENTO_SEARCH.fetch(conn, *_filtros(params), limite, params.offset)
+            else:
+                rows = await EVENTO_SEARCH_APOS.fetch(
+                    conn,
+                    *_filtros(params),
+                    limite,
+                    params.offset,
+                    apos[0],
+                    _hora(apos[1]),
+                    apos[2],
+                )
+        return [_evento(row) for row in rows]
+
+    async def search_eventos(self, params: EventoSearchParams) -> List[EventoResponse]:
+        """Busca com filtros e paginação no SQL (ordenado por data e hora)"""
+        return await self._buscar(params, params.limit)
+
+    async def page_eventos(self, params: EventoSearchParams) -> tuple:
+        """(eventos, next_cursor): keyset (data, hora_inicio, id) > cursor"""
+        return _pagina(await self._buscar(params, params.limit + 1), params.limit)
+
+    async def _periodo(self, inicio: date, fim: date) -> List[EventoResponse]:
+        async with postgres_connection() as conn:
+            rows = await EVENTO_PERIODO.fetch(conn, inicio, fim)
+        return [_evento(row) for row in rows]
+
+    async def get_eventos_by_date(self, target_date: date) -> List[EventoResponse]:
+        return await self._periodo(target_date, target_date)
+
+    async def get_upcoming_eventos(self, days: int = 3) -> List[EventoResponse]:
+        today = datetime.now().date()
+        return await self._periodo(today, today + timedelta(days=days))
+
+    async def get_statistics(self) -> Dict[str, int]:
+        today = datetime.now().date()
+        inicio_mes = today.replace(day=1)
+        proximo_mes = (inicio_mes + timedelta(days=32)).replace(day=1)
+        async with postgres_connection() as conn:
+            row = await EVENTO_STATS.fetchrow(conn, inicio_mes, proximo_mes)
+        return {
+            "total": row["total"],
+            "entregas": row["entregas"],
+            "reunioes": row["reunioes"],
+            "homeOffice": row["homeoffice"],
+            "thisMonth": row["this_month"],
         }
 
 
@@ -302,9 +800,15 @@ class CalendarioEventosService:
 _service_instance = None
 
 
-def get_calendario_service() -> CalendarioEventosService:
-    """Retorna instância singleton do serviço"""
+def get_calendario_service():
+    """Retorna instância singleton do serviço (PostgreSQL ou memória, ver settings)"""
     global _service_instance
     if _service_instance is None:
-        _service_instance = CalendarioEventosService()
+        if settings.calendario_eventos_store == "postgres" and settings.enable_postgres:
+            _service_instance = PostgresCalendarioEventosService()
+        else:
+            _service_instance = CalendarioEventosService()
+        logger.info(
+            "📅 Eventos do calendário: %s", type(_service_instance).__name__
+        )
     return _service_instance
@@ -0,0 +1,233 @@
+"""
+SIGMA-PLI - M04: Calendário
+Exportação iCalendar (RFC 5545) para assinatura no Outlook/Thunderbird
+
+- Cada evento vira um VEVENT renderizado uma vez e guardado em memória
+  (FragmentosICS, LRU por id + updated_at); alterações e remoções invalidam
+- Feriados (FeriadoService) entram como eventos de dia inteiro, renderizados
+  uma vez por ano
+- O corpo é gerado em partes (página de eventos por vez, via cursor) para
+  StreamingResponse; o ETag vem da versão do calendário + filtros
+"""
+
+import functools
+import hashlib
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, Optional
+
+from app.config import settings
+from app.models.schemas.calendario import EventoResponse, EventoSearchParams
+from app.services.service_feriados import FeriadoService
+
+PRODID = "-//SIGMA-PLI//Calendario PLI-SP 2050//PT-BR"
+TZID = "America/Sao_Paulo"
+UID_DOMINIO = "sigma-pli.sp.gov.br"
+PAGINA_EVENTOS = 500
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+# Sem horário de verão desde 2019: offset fixo -03:00
+VTIMEZONE = (
+    "BEGIN:VTIMEZONE\r\n"
+    f"TZID:{TZID}\r\n"
+    "BEGIN:STANDARD\r\n"
+    "DTSTART:19700101T000000\r\n"
+    "TZOFFSETFROM:-0300\r\n"
+    "TZOFFSETTO:-0300\r\n"
+    "TZNAME:-03\r\n"
+    "END:STANDARD\r\n"
+    "END:VTIMEZONE\r\n"
+)
+
+
+def escapar(texto: str) -> str:
+    """Escapa TEXT do iCalendar (barra, ponto e vírgula, vírgula, quebra de linha)"""
+    return (
+        texto.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def linha(conteudo: str) -> str:
+    """Linha com dobra em 75 octetos (continuações começam com espaço)"""
+    dados = conteudo.encode("utf-8")
+    if len(dados) <= 75:
+        return conteudo + "\r\n"
+
+    partes, atual, limite = [], b"", 75
+    for caractere in conteudo:
+        codificado = caractere.encode("utf-8")
+        if len(atual) + len(codificado) > limite:
+            partes.append(atual.decode("utf-8"))
+            atual, limite = b"", 74  # o espaço inicial ocupa 1 octeto
+        atual += codificado
+    partes.append(atual.decode("utf-8"))
+    return "\r\n ".join(partes) + "\r\n"
+
+
+def _utc(momento: datetime) -> str:
+    """Data/hora em UTC (naive = horário local do servidor)"""
+    return momento.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _local(dia: date, hora: str) -> str:
+    return f"{dia.strftime('%Y%m%d')}T{hora.replace(':', '')}00"
+
+
+def render_evento(evento: EventoResponse) -> str:
+    """VEVENT de um evento do calendário"""
+    descricao = f"Responsável: {evento.user}"
+    if evento.module:
+        descricao += f"\nMódulo: {evento.module}"
+    if evento.notes:
+        descricao += f"\n\n{evento.notes}"
+
+    linhas = [
+        "BEGIN:VEVENT",
+        f"UID:{evento.id}@{UID_DOMINIO}",
+        f"DTSTAMP:{_utc(evento.updated_at)}",
+        f"LAST-MODIFIED:{_utc(evento.updated_at)}",
+        f"CREATED:{_utc(evento.created_at)}",
+        f"DTSTART;TZID={TZID}:{_local(evento.date, evento.startTime)}",
+        f"DTEND;TZID={TZID}:{_local(evento.date, evento.endTime)}",
+        f"SUMMARY:{escapar(evento.title)}",
+        f"DESCRIPTION:{escapar(descricao)}",
+        f"CATEGORIES:{escapar(getattr(evento.type, 'value', evento.type))}",
+    ]
+    if evento.location:
+        linhas.append(f"LOCATION:{escapar(evento.location)}")
+    if evento.linkedEventId:
+        linhas.append(f"RELATED-TO:{evento.linkedEventId}@{UID_DOMINIO}")
+    linhas.append("END:VEVENT")
+    return "".join(linha(item) for item in linhas)
+
+
+@functools.lru_cache(maxsize=16)
+def render_feriados(ano: int) -> str:
+    """VEVENTs de dia inteiro com os feriados do ano"""
+    dtstamp = f"{ano}0101T000000Z"
+    partes = []
+    for feriado in FeriadoService.obter_todos_feriados(ano):
+        dia = feriado["data"]
+        partes.append(
+            "".join(
+                linha(item)
+                for item in (
+                    "BEGIN:VEVENT",
+                    f"UID:feriado-{dia.isoformat()}@{UID_DOMINIO}",
+                    f"DTSTAMP:{dtstamp}",
+                    f"DTSTART;VALUE=DATE:{dia.strftime('%Y%m%d')}",
+                    f"DTEND;VALUE=DATE:{(dia + timedelta(days=1)).strftime('%Y%m%d')}",
+                    f"SUMMARY:{escapar(feriado['nome'])}",
+                    f"CATEGORIES:Feriado,{feriado['tipo']}",
+                    "TRANSP:TRANSPARENT",
+                    "END:VEVENT",
+                )
+            )
+        )
+    return "".join(partes)
+
+
+class FragmentosICS:
+    """Cache LRU dos VEVENTs renderizados (id → updated_at, texto)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[datetime, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def render(self, evento: EventoResponse) -> str:
+        entry = self._entries.get(evento.id)
+        if entry is not None and entry[0] == evento.updated_at:
+            self._entries.move_to_end(evento.id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        texto = render_evento(evento)
+        if self.max_entries > 0:
+            self._entries[evento.id] = (evento.updated_at, texto)
+            self._entries.move_to_end(evento.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return texto
+
+    def invalidar(self, evento_id: str) -> None:
+        """Evento alterado ou removido"""
+        if self._entries.pop(evento_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def anos_feriados(hoje: Optional[date] = None) -> range:
+    """Anos com feriados no feed: anterior, atual e próximo"""
+    ano = (hoje or date.today()).year
+    return range(ano - 1, ano + 2)
+
+
+def etag_calendario(
+    versao: str, params: EventoSearchParams, feriados: bool, anos: Iterable[int]
+) -> str:
+    """ETag forte da versão do calendário + filtros do feed"""
+    chave = "|".join(
+        [
+            versao,
+            getattr(params.type, "value", params.type) or "",
+            params.user or "",
+            params.module or "",
+            ",".join(str(ano) for ano in anos) if feriados else "-",
+        ]
+    )
+    return '"' + hashlib.blake2b(chave.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+
+async def gerar_ics(
+    service, params: EventoSearchParams, anos: Iterable[int] = ()
+) -> AsyncIterator[bytes]:
+    """Corpo do VCALENDAR em partes: cabeçalho, feriados e uma página de eventos por vez"""
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        f"PRODID:{PRODID}\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n"
+        + linha("X-WR-CALNAME:Calendário PLI | SIGMA-PLI")
+        + f"X-WR-TIMEZONE:{TZID}\r\n"
+        + VTIMEZONE
+    ).encode("utf-8")
+
+    for ano in anos:
+        yield render_feriados(ano).encode("utf-8")
+
+    pagina = params.model_copy(update={"limit": PAGINA_EVENTOS, "offset": 0, "cursor": None})
+    while True:
+        eventos, cursor = await service.page_eventos(pagina)
+        if eventos:
+            yield "".join(fragmentos_ics.render(e) for e in eventos).encode("utf-8")
+        if cursor is None:
+            break
+        pagina = pagina.model_copy(update={"cursor": cursor})
+
+    yield b"END:VCALENDAR\r\n"
+
+
+# Instância global (por worker)
+fragmentos_ics = FragmentosICS(max_entries=settings.calendario_ics_cache_max_entries)
@@ -1,22 +1,118 @@
 """SIGMA-PLI - Service de Instituição"""
 
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
+import re
 import asyncpg
-from app.database import get_pg_pool
+from app.database import postgres_connection
+from app.query_registry import queries
+from app.services.M01_auth.service_cnpj_lookup import cnpj_lookup
 from app.schemas.schema_cadastro_instituicao import InstituicaoCreate, InstituicaoDetail
 
+_INSTITUICAO_COLUMNS = """
+    id, nome, razao_social, nome_fantasia, sigla, cnpj, tipo,
+    porte_empresa, data_abertura, inscricao_estadual, inscricao_municipal,
+    situacao_receita_federal, natureza_juridica, regime_tributario,
+    email, email_secundario, telefone, telefone_secundario, site,
+    cep, logradouro, numero, complemento, bairro, cidade, uf, pais,
+    ativa, created_at
+"""
+
+INSTITUICAO_ID_BY_CNPJ = queries.register(
+    "instituicao.id_by_cnpj",
+    "SELECT id FROM cadastro.instituicao WHERE cnpj = $1",
+)
+
+INSERT_INSTITUICAO = queries.register(
+    "instituicao.insert",
+    f"""
+    INSERT INTO cadastro.instituicao (
+        nome, razao_social, nome_fantasia, sigla, cnpj, tipo,
+        porte_empresa, data_abertura, inscricao_estadual, inscricao_municipal,
+        situacao_receita_federal, natureza_juridica, regime_tributario,
+        email, email_secundario, telefone, telefone_secundario, site,
+        cep, logradouro, numero, complemento, bairro, cidade, uf, pais,
+        ativa
+    ) VALUES (
+        $1, $2, $3, $4, $5, $6, $7, $8, $9, $10,
+        $11, $12, $13, $14, $15, $16, $17, $18,
+        $19, $20, $21, $22, $23, $24, $25, $26, $27
+    )
+    RETURNING {_INSTITUICAO_COLUMNS}
+    """,
+)
+
+INSTITUICAO_BY_ID = queries.register(
+    "instituicao.by_id",
+    f"""
+    SELECT {_INSTITUICAO_COLUMNS}
+    FROM cadastro.instituicao
+    WHERE id = $1
+    """,
+)
+
+INSTITUICAO_BY_CNPJ = queries.register(
+    "instituicao.by_cnpj",
+    f"""
+    SELECT {_INSTITUICAO_COLUMNS}
+    FROM cadastro.instituicao
+    WHERE cnpj = $1
+    """,
+)
+
+
+# Campo da consulta de CNPJ (ReceitaWS) -> campo de InstituicaoCreate
+_PREFILL_FIELDS = {
+    "nome": "razao_social",
+    "nome_fantasia": "nome_fantasia",
+    "porte": "porte_empresa",
+    "natureza_juridica": "natureza_juridica",
+}
+
 
 class InstituicaoService:
     """Service para gerenciamento de instituições"""
 
     @staticmethod
-    async def create_instituicao(data: InstituicaoCreate) -> InstituicaoDetail:
+    async def prefill_from_cnpj(data: InstituicaoCreate) -> InstituicaoCreate:
+        """
+        Completa campos vazios com a consulta de CNPJ já feita pelo usuário
+
+        Usa apenas o cache do motor de consultas (nenhuma chamada nova à
+        ReceitaWS). Campos informados no formulário têm prioridade.
+        """
+        resultado = await cnpj_lookup.cached(re.sub(r"\D", "", data.cnpj))
+        if resultado is None or not resultado.dados:
+            return data
+
+        dados = resultado.dados
+        update = {
+            campo: dados[origem]
+            for origem, campo in _PREFILL_FIELDS.items()
+            if dados.get(origem) and getattr(data, campo) is None
+        }
+        if data.data_abertura is None and dados.get("abertura"):
+            try:
+                update["data_abertura"] = datetime.strptime(dados["abertura"], "%d/%m/%Y").date()
+            except ValueError:
+                pass
+        if dados.get("situacao") and "situacao_receita_federal" not in data.model_fields_set:
+            update["situacao_receita_federal"] = dados["situacao"][:50]
+
+        return data.model_copy(update=update) if update else data
+
+    @staticmethod
+    async def create_instituicao(
+        data: InstituicaoCreate, usar_consulta_cnpj: bool = True
+    ) -> InstituicaoDetail:
         """
         Cria uma nova instituição no banco de dados
 
         Args:
             data: Dados da instituição a ser criada
+            usar_consulta_cnpj: Completa campos vazios com a consulta de CNPJ
+                em cache (ver prefill_from_cnpj)
 
         Returns:
             InstituicaoDetail: Instituição criada com ID gerado
@@ -25,43 +121,20 @@ class InstituicaoService:
             ValueError: Se CNPJ já existe
             RuntimeError: Se houver erro ao inserir
         """
-        pool = await get_pg_pool()
+        if usar_consulta_cnpj:
+            data = await InstituicaoService.prefill_from_cnpj(data)
 
-        async with pool.acquire() as conn:
+        async with postgres_connection() as conn:
             # Verifica se CNPJ já existe
-            existing = await conn.fetchrow(
-                "SELECT id FROM cadastro.instituicao WHERE cnpj = $1", data.cnpj
-            )
+            existing = await INSTITUICAO_ID_BY_CNPJ.fetchrow(conn, data.cnpj)
 
             if existing:
                 raise ValueError(f"CNPJ {data.cnpj} já está cadastrado")
 
             # Insere a instituição
-            query = """
-                INSERT INTO cadastro.instituicao (
-                    nome, razao_social, nome_fantasia, sigla, cnpj, tipo,
-                    porte_empresa, data_abertura, inscricao_estadual, inscricao_municipal,
-                    situacao_receita_federal, natureza_juridica, regime_tributario,
-                    email, email_secundario, telefone, telefone_secundario, site,
-                    cep, logradouro, numero, complemento, bairro, cidade, uf, pais,
-                    ativa
-                ) VALUES (
-                    $1, $2, $3, $4, $5, $6, $7, $8, $9, $10,
-                    $11, $12, $13, $14, $15, $16, $17, $18,
-                    $19, $20, $21, $22, $23, $24, $25, $26, $27
-                )
-                RETURNING 
-                    id, nome, razao_social, nome_fantasia, sigla, cnpj, tipo,
-                    porte_empresa, data_abertura, inscricao_estadual, inscricao_municipal,
-                    situacao_receita_federal, natureza_juridica, regime_tributario,
-                    email, email_secundario, telefone, telefone_secundario, site,
-                    cep, logradouro, numero, complemento, bairro, cidade, uf, pais,
-                    ativa, created_at
-            """
-
             try:
-                row = await conn.fetchrow(
-                    query,
+                row = await INSERT_INSTITUICAO.fetchrow(
+                    conn,
                     data.nome,
                     data.razao_social,
                     data.nome_fantasia,
@@ -94,7 +167,7 @@ class InstituicaoService:
                 if not row:
                     raise RuntimeError("Falha ao criar instituição")
 
-                return InstituicaoDetail(**dict(row))
+                return InstituicaoDetail(**row)
 
             except asyncpg.UniqueViolationError:
                 raise ValueError(f"CNPJ {data.cnpj} já está cadastrado")
@@ -114,26 +187,11 @@ class InstituicaoService:
         Returns:
             InstituicaoDetail ou None se não encontrada
         """
-        pool = await get_pg_pool()
-
-        async with pool.acquire() as conn:
-            row = await conn.fetchrow(
-                """
-                SELECT 
-                    id, nome, razao_social, nome_fantasia, sigla, cnpj, tipo,
-                    porte_empresa, data_abertura, inscricao_estadual, inscricao_municipal,
-                    situacao_receita_federal, natureza_juridica, regime_tributario,
-                    email, email_secundario, telefone, telefone_secundario, site,
-                    cep, logradouro, numero, complemento, bairro, cidade, uf, pais,
-                    ativa, created_at
-                FROM cadastro.instituicao
-                WHERE id = $1
-                """,
-                instituicao_id,
-            )
+        async with postgres_connection() as conn:
+            row = await INSTITUICAO_BY_ID.fetchrow(conn, instituicao_id)
 
             if row:
-                return InstituicaoDetail(**dict(row))
+                return InstituicaoDetail(**row)
             return None
 
     @staticmethod
@@ -147,24 +205,9 @@ class InstituicaoService:
         Returns:
             InstituicaoDetail ou None se não encontrada
         """
-        pool = await get_pg_pool()
-
-        async with pool.acquire() as conn:
-            row = await conn.fetchrow(
-                """
-                SELECT 
-                    id, nome, razao_social, nome_fantasia, sigla, cnpj, tipo,
-                    porte_empresa, data_abertura, inscricao_estadual, inscricao_municipal,
-                    situacao_receita_federal, natureza_juridica, regime_tributario,
-                    email, email_secundario, telefone, telefone_secundario, site,
-                    cep, logradouro, numero, complemento, bairro, cidade, uf, pais,
-                    ativa, created_at
-                FROM cadastro.instituicao
-                WHERE cnpj = $1
-                """,
-                cnpj,
-            )
+        async with postgres_connection() as conn:
+            row = await INSTITUICAO_BY_CNPJ.fetchrow(conn, cnpj)
 
             if row:
-                return InstituicaoDetail(**dict(row))
+                return InstituicaoDetail(**row)
             return None
@@ -1,12 +1,70 @@
 """
 SIGMA-PLI - Serviço de Feriados
 Feriados Nacionais, Estaduais (SP) e Municipais (São Paulo)
+
+Cada ano vira uma TabelaFeriados (calculada uma vez, LRU por ano): feriados
+ordenados, dicionário por data e o acumulado de dias úteis do ano, que
+responde contagens e somas de dias úteis (prazos de entregas do PLI) em O(1)
+por ano percorrido.
 """
 
+import bisect
+import functools
+from array import array
 from datetime import date, datetime, timedelta
 from typing import List, Dict, Optional
+
 from dateutil.easter import easter
 
+from app.config import settings
+
+
+class TabelaFeriados:
+    """
+    Feriados e dias úteis de um ano (não alterar: compartilhada pelo cache)
+
+    - `por_data`: feriado de cada data
+    - `datas`: datas dos feriados, ordenadas (bisect)
+    - `acumulado[i]`: dias úteis entre 1º de janeiro e o dia i - 1 do ano
+    - `uteis[k]`: dia do ano (0 = 1º de janeiro) do k-ésimo dia útil
+    """
+
+    def __init__(self, ano: int, feriados: List[Dict]):
+        self.ano = ano
+        self.inicio = date(ano, 1, 1)
+        self.feriados = tuple(sorted(feriados, key=lambda f: f["data"]))
+        self.por_data = {f["data"]: f for f in self.feriados}
+        self.datas = [f["data"] for f in self.feriados]
+
+        dias = (date(ano + 1, 1, 1) - self.inicio).days
+        self.acumulado = array("i", [0]) * (dias + 1)
+        self.uteis = array("i")
+        for i in range(dias):
+            dia = self.inicio + timedelta(days=i)
+            util = dia.weekday() < 5 and dia not in self.por_data
+            self.acumulado[i + 1] = self.acumulado[i] + util
+            if util:
+                self.uteis.append(i)
+
+    @property
+    def total_uteis(self) -> int:
+        return len(self.uteis)
+
+    def indice(self, data: date) -> int:
+        return (data - self.inicio).days
+
+    def eh_util(self, data: date) -> bool:
+        i = self.indice(data)
+        return self.acumulado[i + 1] > self.acumulado[i]
+
+    def uteis_antes(self, data: date) -> int:
+        """Dias úteis do ano antes de `data`"""
+        return self.acumulado[self.indice(data)]
+
+    def dia_util(self, k: int) -> date:
+        """k-ésimo dia útil do ano (0 = primeiro)"""
+        return self.inicio + timedelta(days=self.uteis[k])
+
 
 class FeriadoService:
     """Serviço para gerenciar feriados nacionais, estaduais e municipais"""
@@ -130,32 +188,34 @@ class FeriadoService:
         ]
 
     @classmethod
-    def obter_todos_feriados(cls, ano: int) -> List[Dict]:
-        """Retorna todos os feriados (nacionais, estaduais e municipais)"""
+    def tabela(cls, ano: int) -> TabelaFeriados:
+        """Tabela do ano, calculada uma vez (LRU de `feriados_cache_anos` anos)"""
+        return _tabela_ano(ano)
+
+    @classmethod
+    def _calcular_tabela(cls, ano: int) -> TabelaFeriados:
         feriados = []
         feriados.extend(cls.obter_feriados_nacionais(ano))
         feriados.extend(cls.obter_feriados_estaduais_sp(ano))
         feriados.extend(cls.obter_feriados_municipais_sp(ano))
+        return TabelaFeriados(ano, feriados)
 
-        # Ordena por data
-        feriados.sort(key=lambda x: x["data"])
-
-        return feriados
+    @classmethod
+    def obter_todos_feriados(cls, ano: int) -> List[Dict]:
+        """Retorna todos os feriados (nacionais, estaduais e municipais), ordenados por data"""
+        return list(cls.tabela(ano).feriados)
 
     @classmethod
     def obter_feriados_mes(cls, ano: int, mes: int) -> List[Dict]:
         """Retorna feriados de um mês específico"""
-        todos_feriados = cls.obter_todos_feriados(ano)
-        return [f for f in todos_feriados if f["data"].month == mes]
+        return cls.obter_feriados_intervalo(
+            date(ano, mes, 1), date(ano + mes // 12, mes % 12 + 1, 1) - timedelta(days=1)
+        )
 
     @classmethod
     def eh_feriado(cls, data: date) -> Optional[Dict]:
         """Verifica se uma data é feriado e retorna suas informações"""
-        feriados = cls.obter_todos_feriados(data.year)
-        for feriado in feriados:
-            if feriado["data"] == data:
-                return feriado
-        return None
+        return cls.tabela(data.year).por_data.get(data)
 
     @classmethod
     def obter_proximo_feriado(
@@ -165,17 +225,14 @@ class FeriadoService:
         if data_referencia is None:
             data_referencia = date.today()
 
-        feriados = cls.obter_todos_feriados(data_referencia.year)
+        tabela = cls.tabela(data_referencia.year)
+        i = bisect.bisect_right(tabela.datas, data_referencia)
+        if i < len(tabela.feriados):
+            return tabela.feriados[i]
 
-        # Adiciona feriados do próximo ano se necessário
-        if data_referencia.month >= 11:
-            feriados.extend(cls.obter_todos_feriados(data_referencia.year + 1))
-
-        for feriado in feriados:
-            if feriado["data"] > data_referencia:
-                return feriado
-
-        return None
+        # Depois do último feriado do ano: primeiro do ano seguinte
+        seguinte = cls.tabela(data_referencia.year + 1).feriados
+        return seguinte[0] if seguinte else None
 
     @classmethod
     def contar_feriados_mes(cls, ano: int, mes: int) -> int:
@@ -188,7 +245,70 @@ class FeriadoService:
         feriados = []
 
         for ano in range(data_inicio.year, data_fim.year + 1):
-            feriados.extend(cls.obter_todos_feriados(ano))
+            tabela = cls.tabela(ano)
+            lo = bisect.bisect_left(tabela.datas, data_inicio)
+            hi = bisect.bisect_right(tabela.datas, data_fim)
+            feriados.extend(tabela.feriados[lo:hi])
+
+        return feriados
+
+    # =====================================================
+    # DIAS ÚTEIS (segunda a sexta, exceto feriados)
+    # =====================================================
+
+    @classmethod
+    def eh_dia_util(cls, data: date) -> bool:
+        return cls.tabela(data.year).eh_util(data)
+
+    @classmethod
+    def dias_uteis_entre(cls, data_inicio: date, data_fim: date) -> int:
+        """Dias úteis de `data_inicio` a `data_fim` (inclusive); 0 se o fim for anterior"""
+        if data_fim < data_inicio:
+            return 0
+
+        inicio = cls.tabela(data_inicio.year)
+        fim = cls.tabela(data_fim.year)
+        uteis_ate_fim = fim.uteis_antes(data_fim) + fim.eh_util(data_fim)
+        if inicio is fim:
+            return uteis_ate_fim - inicio.uteis_antes(data_inicio)
+
+        total = inicio.total_uteis - inicio.uteis_antes(data_inicio)
+        for ano in range(data_inicio.year + 1, data_fim.year):
+            total += cls.tabela(ano).total_uteis
+        return total + uteis_ate_fim
+
+    @classmethod
+    def adicionar_dias_uteis(cls, data: date, dias: int) -> date:
+        """
+        Data `dias` dias úteis depois de `data` (antes, se negativo)
+
+        Prazo de N dias úteis a partir de uma data: a própria data não conta.
+        Com `dias=0` retorna a data, ou o próximo dia útil se ela não for útil.
+        """
+        tabela = cls.tabela(data.year)
+        if dias == 0:
+            return data if tabela.eh_util(data) else cls.adicionar_dias_uteis(data, 1)
+
+        if dias > 0:
+            # Posição (em `uteis`) do dia útil procurado, contando do início do ano
+            k = tabela.uteis_antes(data) + tabela.eh_util(data) + dias - 1
+            while k >= tabela.total_uteis:
+                k -= tabela.total_uteis
+                tabela = cls.tabela(tabela.ano + 1)
+            return tabela.dia_util(k)
+
+        k = tabela.uteis_antes(data) + dias
+        while k < 0:
+            tabela = cls.tabela(tabela.ano - 1)
+            k += tabela.total_uteis
+        return tabela.dia_util(k)
+
+    @classmethod
+    def proximo_dia_util(cls, data: Optional[date] = None) -> date:
+        """Primeiro dia útil depois de `data` (padrão: hoje)"""
+        return cls.adicionar_dias_uteis(data or date.today(), 1)
+
 
-        # Filtra apenas os feriados dentro do intervalo
-        return [f for f in feriados if data_inicio <= f["data"] <= data_fim]
+@functools.lru_cache(maxsize=settings.feriados_cache_anos)
+def _tabela_ano(ano: int) -> TabelaFeriados:
+    return FeriadoService._calcular_tabela(ano)
@@ -4,10 +4,11 @@ Mantém o servidor ativo no Render fazendo auto-ping periódico
 """
 
 import asyncio
-import httpx
 from datetime import datetime
 from typing import Optional
 
+from app.http_client import http_client
+
 
 class KeepAliveService:
     """
@@ -37,10 +38,8 @@ class KeepAliveService:
             bool: True se o ping foi bem-sucedido, False caso contrário
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(f"{self.base_url}/health")
-
-                if response.status_code == 200:
+            async with http_client.get("keepalive", f"{self.base_url}/health") as response:
+                if response.status == 200:
                     self.last_ping_time = datetime.now()
                     self.ping_count += 1
                     print(
@@ -49,7 +48,7 @@ class KeepAliveService:
                     return True
                 else:
                     self.failed_pings += 1
-                    print(f"⚠️ Keep-Alive ping falhou com status {response.status_code}")
+                    print(f"⚠️ Keep-Alive ping falhou com status {response.status}")
                     return False
 
         except Exception as e:
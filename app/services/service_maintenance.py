@@ -0,0 +1,148 @@
+"""
+SIGMA-PLI - Agendador de Manutenção
+Executa periodicamente tarefas de manutenção do banco (limpeza de sessões etc.)
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+MaintenanceJob = Callable[[], Awaitable[dict]]
+
+
+class MaintenanceScheduler:
+    """
+    Executa em background, a cada intervalo, as tarefas registradas.
+
+    Cada tarefa é uma coroutine sem argumentos que retorna um dict de resultado
+    (com `rows_pruned` quando aplicável). Falhas de uma tarefa não interrompem
+    as demais nem o loop.
+    """
+
+    def __init__(self, interval_minutes: int = 60, initial_delay_seconds: int = 30):
+        """
+        Args:
+            interval_minutes: Intervalo entre execuções em minutos (padrão: 60)
+            initial_delay_seconds: Espera antes da primeira execução
+        """
+        self.interval_seconds = interval_minutes * 60
+        self.initial_delay_seconds = initial_delay_seconds
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+        self._jobs: dict[str, MaintenanceJob] = {}
+        self._stats: dict[str, dict] = {}
+
+    def register_job(self, name: str, job: MaintenanceJob):
+        """Registra uma tarefa de manutenção."""
+        self._jobs[name] = job
+        self._stats[name] = {
+            "runs": 0,
+            "failures": 0,
+            "rows_pruned_total": 0,
+            "last_run": None,
+            "last_duration_ms": None,
+            "last_result": None,
+            "last_error": None,
+        }
+
+    async def run_job(self, name: str) -> Optional[dict]:
+        """Executa uma tarefa agora e atualiza as estatísticas."""
+        stats = self._stats[name]
+        stats["runs"] += 1
+        stats["last_run"] = datetime.now().isoformat()
+        started = time.perf_counter()
+        try:
+            result = await self._jobs[name]()
+        except Exception as e:
+            stats["failures"] += 1
+            stats["last_error"] = str(e)
+            stats["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            print(f"❌ Manutenção '{name}' falhou: {str(e)}")
+            return None
+
+        duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        rows_pruned = result.get("rows_pruned", 0)
+        stats["last_duration_ms"] = duration_ms
+        stats["last_result"] = result
+        stats["last_error"] = None
+        stats["rows_pruned_total"] += rows_pruned
+        print(
+            f"🧹 Manutenção '{name}': {rows_pruned} linhas removidas em {duration_ms:.0f}ms"
+        )
+        return result
+
+    async def run_all(self):
+        for name in list(self._jobs):
+            await self.run_job(name)
+
+    async def _run_loop(self):
+        """Loop interno que executa as tarefas periodicamente."""
+        print(
+            f"🚀 Manutenção iniciada - {len(self._jobs)} tarefa(s) "
+            f"a cada {self.interval_seconds // 60} minutos"
+        )
+
+        await asyncio.sleep(self.initial_delay_seconds)
+
+        while self.is_running:
+            try:
+                await self.run_all()
+                await asyncio.sleep(self.interval_seconds)
+            except asyncio.CancelledError:
+                print("⏹️ Loop de manutenção cancelado")
+                break
+            except Exception as e:
+                print(f"❌ Erro no loop de manutenção: {str(e)}")
+                await asyncio.sleep(60)
+
+    def start(self):
+        """Inicia o agendador em background."""
+        if not self.is_running:
+            self.is_running = True
+            self._task = asyncio.create_task(self._run_loop())
+            print(f"✅ Agendador de manutenção ativado")
+
+    async def stop(self):
+        """Para o agendador."""
+        if self.is_running:
+            self.is_running = False
+            if self._task:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            print(f"⏹️ Agendador de manutenção desativado")
+
+    def get_stats(self) -> dict:
+        """Retorna estatísticas por tarefa."""
+        return {
+            "is_running": self.is_running,
+            "interval_minutes": self.interval_seconds // 60,
+            "jobs": self._stats,
+        }
+
+
+# Instância global (será configurada no startup)
+maintenance_scheduler: Optional[MaintenanceScheduler] = None
+
+
+def get_maintenance_scheduler() -> Optional[MaintenanceScheduler]:
+    """Retorna a instância global do agendador."""
+    return maintenance_scheduler
+
+
+def init_maintenance_scheduler(interval_minutes: int = 60) -> MaintenanceScheduler:
+    """
+    Inicializa o agendador global de manutenção.
+
+    Args:
+        interval_minutes: Intervalo entre execuções
+
+    Returns:
+        MaintenanceScheduler: Instância configurada
+    """
+    global maintenance_scheduler
+    maintenance_scheduler = MaintenanceScheduler(interval_minutes)
+    return maintenance_scheduler
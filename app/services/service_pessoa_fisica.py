@@ -4,11 +4,11 @@ Serviço de Pessoa Física com Criptografia de Dados Sensíveis (LGPD)
 Responsabilidades:
 - Encriptar/Descriptografar dados sensíveis (CPF, Telefone)
 - Validar dados de entrada
-- Gerenciar buscas usando hashes (sem descriptografia)
+- Gerenciar buscas usando índice cego HMAC (sem descriptografia)
 - Auditar acessos e modificações
 - Retornar schemas seguros (sem expor dados sensíveis)
 
-Padrão: Envelope Encryption com buscas por hash SHA256
+Padrão: Envelope Encryption com buscas por índice cego (HMAC-SHA256, *_bidx)
 """
 
 import uuid
@@ -61,7 +61,7 @@ class PessoaFisicaService:
         usuario_id="admin-uuid"
     )
 
-    # Buscar por CPF (usa hash, não descriptografa)
+    # Buscar por CPF (usa índice cego, não descriptografa)
     resultado = await service.buscar_por_cpf(sessao_db, "123.456.789-00")
 
     # Retorna schema seguro (CPF mascarado, sem dados sensíveis)
@@ -118,6 +118,10 @@ class PessoaFisicaService:
                 else (None, None)
             )
 
+            # Índices cegos (colunas cpf_bidx/telefone_bidx, B-tree)
+            cpf_bidx = self.crypto.blind_index(dados.cpf, "cpf")
+            telefone_bidx = self.crypto.blind_index(dados.telefone, "telefone")
+
             # TODO: Implementar salvamento no banco
             # pessoa_db = await self._salvar_no_banco(
             #     sessao_db,
@@ -125,8 +129,10 @@ class PessoaFisicaService:
             #     nome=dados.nome,
             #     cpf_criptografado=cpf_criptografado,
             #     cpf_hash=cpf_hash,
+            #     cpf_bidx=cpf_bidx,
             #     telefone_criptografado=telefone_criptografado,
             #     telefone_hash=telefone_hash,
+            #     telefone_bidx=telefone_bidx,
             #     email=dados.email,
             #     data_criacao=datetime.utcnow()
             # )
@@ -139,7 +145,7 @@ class PessoaFisicaService:
                 usuario_id=usuario_id,
                 usuario_ip=usuario_ip,
                 descricao=f"Criação de Pessoa Física: {dados.nome}",
-                dados_sensíveis={"cpf_hash": cpf_hash},
+                dados_sensíveis={"cpf_bidx": cpf_bidx.hex()},
             )
 
             # Retornar schema seguro (CPF mascarado)
@@ -175,17 +181,17 @@ class PessoaFisicaService:
         usuario_ip: str = "127.0.0.1",
     ) -> Optional[PessoaFisicaResponse]:
         """
-        Busca Pessoa Física por CPF usando hash (não descriptografa)
+        Busca Pessoa Física por CPF usando índice cego (não descriptografa)
 
         Padrão de Segurança:
-        - Calcula hash do CPF buscado
-        - Compara com hash armazenado no banco
+        - Calcula o HMAC (chave própria) do CPF buscado
+        - Compara com cpf_bidx armazenado no banco (índice B-tree)
         - NUNCA descriptografa (não precisa!)
         - Reduz risco de vazamento em logs
 
         Args:
             sessao_db: Sessão do banco de dados
-            cpf: CPF a buscar (será hasheado)
+            cpf: CPF a buscar (com ou sem máscara)
             usuario_id: ID do usuário que faz a busca (auditoria)
             usuario_ip: IP do usuário
 
@@ -193,13 +199,13 @@ class PessoaFisicaService:
             PessoaFisicaResponse ou None se não encontrado
         """
         try:
-            # Gerar hash do CPF para comparação
-            cpf_hash = self.crypto.hash_data(cpf)
+            # Índice cego do CPF para comparação
+            cpf_bidx = self.crypto.blind_index(cpf, "cpf")
 
-            # TODO: Implementar busca no banco por cpf_hash
+            # TODO: Implementar busca no banco por cpf_bidx
             # resultado = await sessao_db.execute(
             #     select(PessoaFisica).where(
-            #         PessoaFisica.cpf_hash == cpf_hash
+            #         PessoaFisica.cpf_bidx == cpf_bidx
             #     )
             # )
             # pessoa_db = resultado.scalar_one_or_none()
@@ -213,7 +219,9 @@ class PessoaFisicaService:
                     usuario_id=usuario_id,
                     usuario_ip=usuario_ip,
                     descricao="Busca por CPF realizada",
-                    dados_sensíveis={"cpf_hash_buscado": cpf_hash},
+                    dados_sensíveis={
+                        "cpf_bidx_buscado": cpf_bidx.hex() if cpf_bidx else None
+                    },
                 )
 
             # TODO: Retornar schema seguro se encontrado
@@ -8,32 +8,74 @@ from typing import Optional
 import asyncpg
 from fastapi import HTTPException, Request, status
 
-from app.database import get_postgres_connection, postgres_pool
+from app.database import postgres_connection
+from app.query_registry import Row, queries
 from app.schemas.M01_auth.schema_auth import AuthenticatedUser, SessionInfo
 from app.services.M01_auth import service_auth_sessions
+from app.utils.auth_session_cache import session_cache
 from app.utils.auth_tokens import decode_token
 
 
+ACCOUNT_SUMMARY = queries.register(
+    "auth.account_summary",
+    """
+    SELECT
+        cu.id AS conta_id,
+        cu.username,
+        cu.email,
+        cu.ultimo_login,
+        p.nome_completo,
+        COALESCE(p.nome_completo, '') AS primeiro_nome,
+        COALESCE(p.nome_completo, '') AS ultimo_nome
+    FROM usuarios.usuario cu
+    LEFT JOIN cadastro.pessoa p ON p.id = cu.pessoa_id
+    WHERE cu.id = $1
+    """,
+)
+
+
 async def _fetch_account_summary(
     conn: asyncpg.Connection,
     conta_id: str,
-) -> Optional[asyncpg.Record]:
-    return await conn.fetchrow(
-        """
-        SELECT
-            cu.id AS conta_id,
-            cu.username,
-            cu.email,
-            cu.ultimo_login,
-            p.nome_completo,
-            COALESCE(p.nome_completo, '') AS primeiro_nome,
-            COALESCE(p.nome_completo, '') AS ultimo_nome
-        FROM usuarios.usuario cu
-        LEFT JOIN cadastro.pessoa p ON p.id = cu.pessoa_id
-        WHERE cu.id = $1
-    """,
-        conta_id,
+) -> Optional[Row]:
+    return await ACCOUNT_SUMMARY.fetchrow(conn, conta_id)
+
+
+async def _resolve_authenticated_user(
+    conta_id: str,
+    session_id: str,
+    session_token: str,
+) -> Optional[AuthenticatedUser]:
+    """Resolve usuário da sessão, consultando o cache antes do banco."""
+
+    cached = session_cache.get(session_id, session_token)
+    if cached is not None and cached.conta_id == str(conta_id):
+        return cached
+
+    async with postgres_connection() as conn:
+        session_row = await service_auth_sessions.get_active_session(
+            conn,
+            session_id,
+            session_token,
+        )
+        if not session_row:
+            return None
+
+        account_row = await _fetch_account_summary(conn, conta_id)
+        if not account_row:
+            return None
+
+    user = AuthenticatedUser(
+        conta_id=str(account_row["conta_id"]),
+        username=account_row["username"],
+        nome_completo=account_row["nome_completo"] or "Usuário",
+        email=account_row["email"],
+        primeiro_nome=account_row["primeiro_nome"],
+        ultimo_nome=account_row["ultimo_nome"],
+        ultimo_login=account_row["ultimo_login"],
     )
+    session_cache.set(session_id, session_token, user, session_row["expires_at"])
+    return user
 
 
 async def require_authenticated_user(
@@ -57,32 +99,11 @@ async def require_authenticated_user(
     if not (conta_id and session_id and session_token):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    conn = await get_postgres_connection()
-    try:
-        session_row = await service_auth_sessions.get_active_session(
-            conn,
-            session_id,
-            session_token,
-        )
-        if not session_row:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-
-        account_row = await _fetch_account_summary(conn, conta_id)
-        if not account_row:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    user = await _resolve_authenticated_user(conta_id, session_id, session_token)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-        return AuthenticatedUser(
-            conta_id=str(account_row["conta_id"]),
-            username=account_row["username"],
-            nome_completo=account_row["nome_completo"] or "Usuário",
-            email=account_row["email"],
-            primeiro_nome=account_row["primeiro_nome"],
-            ultimo_nome=account_row["ultimo_nome"],
-            ultimo_login=account_row["ultimo_login"],
-        )
-    finally:
-        if postgres_pool and conn:
-            await postgres_pool.release(conn)
+    return user
 
 
 async def require_active_session(
@@ -106,8 +127,13 @@ async def require_active_session(
     if not (session_id and session_token and expires_at_raw):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-    conn = await get_postgres_connection()
-    try:
+    expires_at = datetime.fromtimestamp(expires_at_raw, tz=timezone.utc)
+
+    # Sessão presente no cache já foi validada como ativa
+    if session_cache.get(session_id, session_token) is not None:
+        return SessionInfo(session_id=str(session_id), expires_at=expires_at)
+
+    async with postgres_connection() as conn:
         session_row = await service_auth_sessions.get_active_session(
             conn,
             session_id,
@@ -116,15 +142,10 @@ async def require_active_session(
         if not session_row:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
-        expires_at = datetime.fromtimestamp(expires_at_raw, tz=timezone.utc)
-
         return SessionInfo(
             session_id=str(session_row["id"]),
             expires_at=expires_at,
         )
-    finally:
-        if postgres_pool and conn:
-            await postgres_pool.release(conn)
 
 
 async def get_optional_authenticated_user(
@@ -148,29 +169,4 @@ async def get_optional_authenticated_user(
     if not (conta_id and session_id and session_token):
         return None
 
-    conn = await get_postgres_connection()
-    try:
-        session_row = await service_auth_sessions.get_active_session(
-            conn,
-            session_id,
-            session_token,
-        )
-        if not session_row:
-            return None
-
-        account_row = await _fetch_account_summary(conn, conta_id)
-        if not account_row:
-            return None
-
-        return AuthenticatedUser(
-            conta_id=str(account_row["conta_id"]),
-            username=account_row["username"],
-            nome_completo=account_row["nome_completo"] or "Usuário",
-            email=account_row["email"],
-            primeiro_nome=account_row["primeiro_nome"],
-            ultimo_nome=account_row["ultimo_nome"],
-            ultimo_login=account_row["ultimo_login"],
-        )
-    finally:
-        if postgres_pool and conn:
-            await postgres_pool.release(conn)
+    return await _resolve_authenticated_user(conta_id, session_id, session_token)
@@ -0,0 +1,157 @@
+"""Cache em processo das sessões autenticadas (TTL + LRU)."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.config import settings
+from app.schemas.M01_auth.schema_auth import AuthenticatedUser
+
+
+def _seconds_until(expires_at: Optional[datetime]) -> Optional[float]:
+    """Segundos até `expires_at` (colunas TIMESTAMP são UTC sem tzinfo)."""
+
+    if expires_at is None:
+        return None
+    if expires_at.tzinfo is None:
+        return (expires_at - datetime.utcnow()).total_seconds()
+    return (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+
+class AuthSessionCache:
+    """
+    Cache LRU limitado de `AuthenticatedUser` indexado por `(sid, stk)`.
+
+    Cada entrada expira no menor entre o TTL configurado e o `expires_at` da
+    sessão. Índices secundários por sid, token e conta permitem invalidar
+    imediatamente quando a sessão é revogada.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[AuthenticatedUser, float]]
+        self._entries = OrderedDict()
+        self._by_sid: dict[str, tuple[str, str]] = {}
+        self._by_token: dict[str, tuple[str, str]] = {}
+        self._by_conta: dict[str, set[tuple[str, str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, session_id: Any, token: str) -> Optional[AuthenticatedUser]:
+        """Retorna usuário em cache ou None (miss/expirado)."""
+
+        key = (str(session_id), token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        user, deadline = entry
+        if deadline <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+
+    def set(
+        self,
+        session_id: Any,
+        token: str,
+        user: AuthenticatedUser,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        """Armazena usuário resolvido respeitando o vencimento da sessão."""
+
+        if not self.enabled:
+            return
+
+        lifetime = self.ttl_seconds
+        remaining = _seconds_until(expires_at)
+        if remaining is not None:
+            lifetime = min(lifetime, remaining)
+        if lifetime <= 0:
+            return
+
+        key = (str(session_id), token)
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (user, time.monotonic() + lifetime)
+        self._by_sid[key[0]] = key
+        self._by_token[token] = key
+        self._by_conta.setdefault(user.conta_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_session(self, session_id: Any) -> None:
+        key = self._by_sid.get(str(session_id))
+        if key is not None:
+            self._remove(key)
+            self.invalidations += 1
+
+    def invalidate_token(self, token: str) -> None:
+        key = self._by_token.get(token)
+        if key is not None:
+            self._remove(key)
+            self.invalidations += 1
+
+    def invalidate_account(self, conta_id: Any) -> None:
+        for key in list(self._by_conta.get(str(conta_id), ())):
+            self._remove(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_sid.clear()
+        self._by_token.clear()
+        self._by_conta.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if self._by_sid.get(key[0]) == key:
+            del self._by_sid[key[0]]
+        if self._by_token.get(key[1]) == key:
+            del self._by_token[key[1]]
+        if entry is not None:
+            keys = self._by_conta.get(entry[0].conta_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_conta[entry[0].conta_id]
+
+
+# Instância global (por worker)
+session_cache = AuthSessionCache(
+    max_entries=settings.auth_session_cache_max_entries,
+    ttl_seconds=settings.auth_session_cache_ttl_seconds,
+)
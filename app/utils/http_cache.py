@@ -0,0 +1,221 @@
+"""Cache HTTP de respostas de dados de referência (ETag forte, 304 e bytes em memória)."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.config import settings
+
+_REQUEST_PARAM = "_http_cache_request"
+
+
+class CachedResponse(NamedTuple):
+    """Corpo JSON já serializado e seus validadores HTTP."""
+
+    body: bytes
+    etag: str
+    last_modified: float  # epoch (segundos inteiros)
+
+    def headers(self, cache_control: str) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": cache_control,
+        }
+
+
+def serialize(payload: Any) -> bytes:
+    """JSON compacto igual ao do JSONResponse do FastAPI."""
+
+    if isinstance(payload, BaseModel):
+        return payload.model_dump_json().encode("utf-8")
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_match(request: Request, etag: str) -> bool:
+    """
+    `If-None-Match` casa com o ETag (comparação fraca, RFC 9110).
+
+    `W/"x"` casa com `"x"`.
+    """
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def not_modified(request: Request, entry: CachedResponse) -> bool:
+    """Valida `If-None-Match` (prioritário) ou `If-Modified-Since`."""
+
+    if request.headers.get("if-none-match") is not None:
+        return etag_match(request, entry.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return entry.last_modified <= since
+    return False
+
+
+class ResponseCache:
+    """
+    Cache LRU das respostas serializadas, por rota + URL + versão dos dados.
+
+    Acertos devolvem os bytes guardados sem executar o endpoint nem serializar
+    o modelo Pydantic de novo. A versão (callable do decorator) muda quando os
+    dados de origem mudam, o que descarta implicitamente as entradas antigas.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: tuple, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body, strong_etag(body), float(int(time.time())))
+        if not self.enabled:
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": sum(len(entry.body) for entry in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def cache_response(
+    max_age: int,
+    *,
+    versao: Optional[Callable[[], Any]] = None,
+    cache: Optional[ResponseCache] = None,
+):
+    """
+    Decorator de rotas GET com dados de referência (raramente mudam).
+
+    - `Cache-Control: public, max-age=...`, `ETag` forte e `Last-Modified`
+    - `If-None-Match`/`If-Modified-Since` válidos → 304 sem corpo
+    - O corpo serializado fica em memória: acertos não chamam o endpoint
+
+    Respostas `Response` devolvidas pelo endpoint e exceções (HTTPException)
+    passam direto, sem cache. Deve ficar abaixo do `@router.get(...)`.
+
+    Args:
+        max_age: Segundos de validade no navegador
+        versao: Versão atual dos dados de origem (entra na chave do cache)
+        cache: Cache de respostas (padrão: `response_cache` global)
+    """
+
+    cache_control = f"public, max-age={int(max_age)}"
+
+    def decorator(endpoint: Callable):
+        signature = inspect.signature(endpoint)
+        request_param = next(
+            (name for name, p in signature.parameters.items() if p.annotation is Request),
+            None,
+        )
+        if request_param is None:
+            # FastAPI injeta o Request pelo parâmetro extra da assinatura
+            request_param = _REQUEST_PARAM
+            signature = signature.replace(
+                parameters=[
+                    *signature.parameters.values(),
+                    inspect.Parameter(
+                        _REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+                    ),
+                ]
+            )
+            repassar_request = False
+        else:
+            repassar_request = True
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = (
+                kwargs[request_param] if repassar_request else kwargs.pop(request_param)
+            )
+            store = cache if cache is not None else response_cache
+            key = (
+                endpoint.__module__,
+                endpoint.__qualname__,
+                request.url.path,
+                request.url.query,
+                versao() if versao else None,
+            )
+
+            entry = store.get(key)
+            if entry is None:
+                result = await endpoint(*args, **kwargs)
+                if isinstance(result, Response):
+                    return result
+                entry = store.put(key, serialize(result))
+
+            headers = entry.headers(cache_control)
+            if not_modified(request, entry):
+                store.not_modified += 1
+                return Response(status_code=304, headers=headers)
+            return Response(entry.body, media_type="application/json", headers=headers)
+
+        wrapper.__signature__ = signature
+        return wrapper
+
+    return decorator
+
+
+# Instância global (por worker)
+response_cache = ResponseCache(max_entries=settings.http_response_cache_max_entries)
@@ -0,0 +1,95 @@
+"""Cache em processo do nível de acesso dos usuários (hierarquia M08)."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+from app.config import settings
+
+
+class PermissionEntry(NamedTuple):
+    """Nível de acesso e status de um usuário."""
+
+    nivel_acesso: Optional[int]
+    ativo: bool
+
+
+class PermissionCache:
+    """
+    Cache LRU com TTL curto de `nivel_acesso`/`ativo` por usuário.
+
+    Deve ser invalidado explicitamente sempre que o tipo de usuário ou o
+    status ativo forem alterados (endpoints do M08).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[PermissionEntry, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, usuario_id: Any) -> Optional[PermissionEntry]:
+        key = str(usuario_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        permission, deadline = entry
+        if deadline <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return permission
+
+    def set(self, usuario_id: Any, nivel_acesso: Optional[int], ativo: bool) -> None:
+        if not self.enabled:
+            return
+
+        key = str(usuario_id)
+        self._entries[key] = (
+            PermissionEntry(nivel_acesso, bool(ativo)),
+            time.monotonic() + self.ttl_seconds,
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, usuario_id: Any) -> None:
+        if self._entries.pop(str(usuario_id), None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# Instância global (por worker)
+permission_cache = PermissionCache(
+    max_entries=settings.permission_cache_max_entries,
+    ttl_seconds=settings.permission_cache_ttl_seconds,
+)
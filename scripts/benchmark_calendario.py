@@ -0,0 +1,186 @@
+"""
+Benchmark das consultas do calendário em memória (CalendarioEventosService).
+
+Compara ms por chamada de:
+  - legado:  varredura linear do dicionário de eventos (datas em string ISO,
+             reparse com fromisoformat, sort e EventoResponse a cada chamada)
+  - indexado: IndiceEventos (bisect sobre (data, hora) + índices por tipo/módulo)
+
+Consultas: próximos 3 dias, eventos de um dia, busca por período + tipo
+(30 dias, 50 por página) e estatísticas.
+
+Uso:
+    python -m scripts.benchmark_calendario [eventos]
+"""
+
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from app.models.schemas.calendario import EventoResponse, EventoSearchParams, EventType
+from app.services.M04_calendario.service_calendario_eventos import CalendarioEventosService
+
+USUARIOS = ("André Silva", "Antonio Costa", "Cristina Santos", "Maria Souza", "João Lima")
+MODULOS = ("M00_home", "M02_cadastros", "M05_relatorios", None)
+
+
+def gerar(n: int, seed: int = 42) -> list[dict]:
+    """Eventos espalhados por ±180 dias a partir de hoje"""
+    rng = random.Random(seed)
+    hoje = date.today()
+    agora = datetime.now()
+    eventos = []
+    for _ in range(n):
+        hora = rng.randrange(7, 18)
+        eventos.append(
+            {
+                "id": f"evt-{uuid.UUID(int=rng.getrandbits(128)).hex[:12]}",
+                "created_at": agora,
+                "updated_at": agora,
+                "type": rng.choice(("entrega", "reuniao", "homeoffice")),
+                "title": "Evento de carga",
+                "user": rng.choice(USUARIOS),
+                "date": (hoje + timedelta(days=rng.randrange(-180, 180))).isoformat(),
+                "startTime": f"{hora:02d}:{rng.choice(('00', '30'))}",
+                "endTime": f"{hora + 1:02d}:00",
+                "location": None,
+                "notes": None,
+                "module": rng.choice(MODULOS),
+                "isHomeOfficeReminder": False,
+                "linkedEventId": None,
+            }
+        )
+    return eventos
+
+
+# =====================================================
+# IMPLEMENTAÇÃO ANTERIOR (varredura linear)
+# =====================================================
+
+
+class LegacyCalendario:
+    """Consultas do CalendarioEventosService antes do IndiceEventos"""
+
+    def __init__(self, eventos: list[dict]):
+        self._eventos = {e["id"]: dict(e) for e in eventos}
+
+    def get_eventos_by_date(self, target_date: date):
+        date_str = target_date.isoformat()
+        eventos = [
+            EventoResponse(**e) for e in self._eventos.values() if e["date"] == date_str
+        ]
+        eventos.sort(key=lambda e: e.startTime)
+        return eventos
+
+    def get_upcoming_eventos(self, days: int = 3):
+        today = datetime.now().date()
+        end_date = today + timedelta(days=days)
+        eventos = [
+            EventoResponse(**e)
+            for e in self._eventos.values()
+            if today <= datetime.fromisoformat(e["date"]).date() <= end_date
+        ]
+        eventos.sort(key=lambda e: (e.date, e.startTime))
+        return eventos
+
+    def search_eventos(self, params: EventoSearchParams):
+        eventos = list(self._eventos.values())
+        if params.type:
+            eventos = [e for e in eventos if e["type"] == params.type]
+        if params.date_start:
+            eventos = [e for e in eventos if e["date"] >= params.date_start.isoformat()]
+        if params.date_end:
+            eventos = [e for e in eventos if e["date"] <= params.date_end.isoformat()]
+        eventos.sort(key=lambda e: (e["date"], e["startTime"]))
+        pagina = eventos[params.offset : params.offset + params.limit]
+        return [EventoResponse(**e) for e in pagina]
+
+    def get_statistics(self):
+        today = datetime.now().date()
+        return {
+            "total": len(self._eventos),
+            "entregas": sum(1 for e in self._eventos.values() if e["type"] == "entrega"),
+            "thisMonth": sum(
+                1
+                for e in self._eventos.values()
+                if datetime.fromisoformat(e["date"]).month == today.month
+                and datetime.fromisoformat(e["date"]).year == today.year
+            ),
+        }
+
+
+def measure(repeticoes: int, fn) -> tuple[float, object]:
+    resultado = fn()  # aquecimento
+    started = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = fn()
+    return (time.perf_counter() - started) * 1000 / repeticoes, resultado
+
+
+async def measure_async(repeticoes: int, fn) -> tuple[float, object]:
+    resultado = await fn()  # aquecimento (monta os EventoResponse do índice)
+    started = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = await fn()
+    return (time.perf_counter() - started) * 1000 / repeticoes, resultado
+
+
+async def main_async(total: int):
+    eventos = gerar(total)
+
+    started = time.perf_counter()
+    service = CalendarioEventosService(sample_data=False)
+    for evento in eventos:
+        service._indice.adicionar(evento)
+    print(f"{total} eventos indexados em {time.perf_counter() - started:.2f}s")
+
+    legado = LegacyCalendario(eventos)
+    hoje = date.today()
+    busca = EventoSearchParams(
+        type=EventType.REUNIAO, date_start=hoje, date_end=hoje + timedelta(days=30), limit=50
+    )
+    consultas = (
+        ("proximos 3 dias", legado.get_upcoming_eventos, lambda: service.get_upcoming_eventos(3)),
+        (
+            "eventos do dia",
+            lambda: legado.get_eventos_by_date(hoje),
+            lambda: service.get_eventos_by_date(hoje),
+        ),
+        (
+            "busca 30d+tipo",
+            lambda: legado.search_eventos(busca),
+            lambda: service.search_eventos(busca),
+        ),
+        ("estatisticas", legado.get_statistics, service.get_statistics),
+    )
+
+    print(f"\n{'consulta':<18}{'eventos':>9}{'legado ms':>12}{'indexado ms':>14}{'ganho':>9}")
+    for nome, antes, depois in consultas:
+        ms_legado, esperado = measure(3, antes)
+        ms_indice, obtido = await measure_async(50, depois)
+        if isinstance(esperado, list):
+            # empates de (data, hora) podem sair em outra ordem: compara o conjunto
+            chave = lambda e: (e.date, e.startTime)  # noqa: E731
+            assert [chave(e) for e in obtido] == [chave(e) for e in esperado], nome
+            if nome != "busca 30d+tipo":
+                assert {e.id for e in obtido} == {e.id for e in esperado}, nome
+            tamanho = len(obtido)
+        else:
+            assert obtido["thisMonth"] == esperado["thisMonth"], nome
+            tamanho = obtido["total"]
+        print(
+            f"{nome:<18}{tamanho:>9}{ms_legado:>12.2f}{ms_indice:>14.3f}"
+            f"{ms_legado / ms_indice:>8.0f}x"
+        )
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    asyncio.run(main_async(total))
+
+
+if __name__ == "__main__":
+    main()
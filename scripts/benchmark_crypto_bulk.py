@@ -0,0 +1,84 @@
+"""
+Benchmark de criptografia em lote (CPF/telefone de cadastro.pessoa).
+
+Compara linhas/s de encrypt_and_hash para:
+  - derivacao_por_chamada: comportamento antigo, PBKDF2 (100k) a cada valor
+  - cache:                 chave/Fernet derivados uma vez (encrypt_and_hash_many)
+  - threads:               idem, dividido em blocos num ThreadPoolExecutor
+  - processos:             idem, num ProcessPoolExecutor
+
+Uso:
+    python -m scripts.benchmark_crypto_bulk [linhas] [workers]
+"""
+
+import base64
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from app.security import crypto
+
+MASTER_KEY = "benchmark-master-key-32-caracteres!"
+
+
+def legacy_encrypt_and_hash(value: str) -> tuple[str, str]:
+    """Equivalente ao CryptographyManager anterior: deriva a chave a cada chamada"""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=crypto.KDF_SALT,
+        iterations=crypto.KDF_ITERATIONS,
+    )
+    key = base64.urlsafe_b64encode(kdf.derive(MASTER_KEY.encode()))
+    token = Fernet(key).encrypt(value.encode()).decode()
+    return token, crypto.CryptographyManager(MASTER_KEY, 1).hash_data(value)
+
+
+def measure(label: str, rows: int, func) -> None:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24}{rows:>8}{elapsed:>10.3f}s{rows / elapsed:>14,.0f}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+    values = [f"{i:011d}" for i in range(rows)]
+    manager = crypto.CryptographyManager(MASTER_KEY, key_version=1)
+
+    print(f"{'modo':<24}{'linhas':>8}{'tempo':>11}{'linhas/s':>14}")
+
+    # O modo antigo é ordens de grandeza mais lento: mede numa amostra
+    legacy_rows = min(rows, 50)
+    measure(
+        "derivacao_por_chamada",
+        legacy_rows,
+        lambda: [legacy_encrypt_and_hash(v) for v in values[:legacy_rows]],
+    )
+    measure("cache", rows, lambda: manager.encrypt_and_hash_many(values))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        measure(
+            f"threads ({workers})",
+            rows,
+            lambda: manager.encrypt_and_hash_many(values, executor=pool),
+        )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Aquece os processos (uma derivação por worker) fora da medição
+        manager.encrypt_many(values[: workers * 2048], executor=pool)
+        measure(
+            f"processos ({workers})",
+            rows,
+            lambda: manager.encrypt_and_hash_many(values, executor=pool),
+        )
+
+
+if __name__ == "__main__":
+    main()
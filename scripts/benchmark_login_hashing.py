@@ -0,0 +1,119 @@
+"""
+Benchmark do hash de senhas no login: event loop bloqueado vs executor.
+
+Sobe uma aplicação FastAPI em memória com dois endpoints:
+  - POST /login: verifica uma senha PBKDF2 (100k iterações), como AuthService
+  - GET  /ping:  endpoint "não relacionado", sem custo
+
+Dispara uma rajada de logins concorrentes enquanto mede continuamente a
+latência do /ping. Reporta logins/s e p50/p99 do /ping para cada modo.
+
+Uso:
+    python -m scripts.benchmark_login_hashing [logins] [concorrencia]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.security import password_hashing
+
+SENHA = "senha-benchmark-123"
+HASH, SALT = password_hashing.pbkdf2_hash(SENHA)
+
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if mode == "sync":
+            ok = password_hashing.verify_password_sync(SENHA, HASH, SALT)
+        else:
+            ok = await password_hashing.verify_password_async(SENHA, HASH, SALT)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping():
+        return {"pong": True}
+
+    return app
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(mode: str, total_logins: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=build_app(mode))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ping_latencies: list[float] = []
+        done = asyncio.Event()
+
+        async def pinger():
+            # Um ping agendado a cada 5ms. Pings que não puderam sair no horário
+            # (event loop travado) contam a espera até a próxima resposta, para
+            # não esconder o travamento ("coordinated omission").
+            interval = 0.005
+            next_slot = time.perf_counter()
+            while True:
+                await client.get("/ping")
+                now = time.perf_counter()
+                while next_slot <= now:
+                    ping_latencies.append((now - next_slot) * 1000)
+                    next_slot += interval
+                if done.is_set():
+                    break
+                await asyncio.sleep(max(0.0, next_slot - time.perf_counter()))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_login():
+            async with semaphore:
+                response = await client.post("/login")
+                assert response.json()["ok"]
+
+        ping_task = asyncio.create_task(pinger())
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await asyncio.gather(*(one_login() for _ in range(total_logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ping_task
+
+    return {
+        "mode": mode,
+        "logins_per_s": total_logins / elapsed,
+        "ping_samples": len(ping_latencies),
+        "ping_p50_ms": statistics.median(ping_latencies),
+        "ping_p99_ms": percentile(ping_latencies, 99),
+        "ping_max_ms": max(ping_latencies),
+    }
+
+
+async def main():
+    total_logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    print(f"Rajada de {total_logins} logins, concorrência {concurrency}")
+    print(
+        f"{'modo':<10}{'logins/s':>10}{'pings':>8}"
+        f"{'ping p50':>12}{'ping p99':>12}{'ping max':>12}"
+    )
+    for mode in ("sync", "executor"):
+        r = await run(mode, total_logins, concurrency)
+        print(
+            f"{r['mode']:<10}{r['logins_per_s']:>10.1f}{r['ping_samples']:>8}"
+            f"{r['ping_p50_ms']:>10.1f}ms{r['ping_p99_ms']:>10.1f}ms{r['ping_max_ms']:>10.1f}ms"
+        )
+    password_hashing.shutdown_password_hashing()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
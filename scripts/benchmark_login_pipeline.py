@@ -0,0 +1,137 @@
+"""
+Benchmark do pipeline de login contra um PostgreSQL local: antes vs depois.
+
+  - antes:  fluxo legado, um checkout de conexão por etapa (busca, bloqueio,
+            último login, sessão e auditoria síncrona)
+  - depois: AuthService.authenticate (uma conexão, busca com bloqueio,
+            sessão + último login num statement, auditoria em lote)
+
+Usa o banco configurado em Settings (DATABASE_URL / POSTGRES_*) e uma conta
+existente. Por padrão a verificação de senha é substituída por uma comparação
+trivial para medir apenas o custo de banco; use --com-hash para incluir o
+PBKDF2/bcrypt real. As sessões e auditorias geradas são removidas ao final.
+
+Uso:
+    python -m scripts.benchmark_login_pipeline <identificador> <senha> \\
+        [logins] [concorrencia] [--com-hash]
+"""
+
+import asyncio
+import sys
+import time
+
+from app.database import close_db, init_db, pool_metrics, postgres_connection
+from app.services.M01_auth.service_auth import AuthService
+from app.services.M01_auth.service_auth_audit import (
+    LoginAuditService,
+    login_audit_sink,
+)
+from app.services.M01_auth.service_auth_session import SessionService
+from app.services.M01_auth.service_auth_user import UserService
+
+USER_AGENT = "benchmark-login-pipeline"
+IP = "127.0.0.1"
+
+
+async def legacy_authenticate(identifier: str, password: str) -> bool:
+    """Fluxo de login anterior ao pipeline (mantido apenas para comparação)"""
+    user_data = await UserService.get_user_by_identifier(identifier)
+    if not user_data:
+        return False
+    conta_id = user_data["conta_id"]
+    if await UserService.is_account_locked(conta_id):
+        return False
+    if not await AuthService.verify_password_async(
+        password, user_data["password_hash"], user_data["salt"]
+    ):
+        await UserService.increment_failed_attempts(conta_id)
+        return False
+    await UserService.update_last_login(conta_id, IP)
+    await SessionService.create_session(conta_id, ip_address=IP, user_agent=USER_AGENT)
+    await LoginAuditService.log_login_attempt(
+        username=identifier,
+        ip_address=IP,
+        user_agent=USER_AGENT,
+        sucesso=True,
+        conta_usuario_id=conta_id,
+        durable=True,
+    )
+    return True
+
+
+async def pipeline_authenticate(identifier: str, password: str) -> bool:
+    result = await AuthService.authenticate(identifier, password, IP, USER_AGENT)
+    return result is not None
+
+
+async def run(mode: str, identifier: str, password: str, total: int, concurrency: int):
+    login = legacy_authenticate if mode == "antes" else pipeline_authenticate
+    semaphore = asyncio.Semaphore(concurrency)
+    pool_metrics.reset()
+
+    if mode == "depois":
+        login_audit_sink.start()
+
+    async def one_login():
+        async with semaphore:
+            assert await login(identifier, password), "login falhou"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    if mode == "depois":
+        await login_audit_sink.stop()
+
+    return {
+        "mode": mode,
+        "logins_per_s": total / elapsed,
+        "checkouts_per_login": pool_metrics.acquire_count / total,
+        "acquire_avg_ms": pool_metrics.snapshot()["acquire"]["avg_ms"],
+    }
+
+
+async def cleanup():
+    async with postgres_connection() as conn:
+        await conn.execute(
+            "DELETE FROM usuarios.sessao WHERE user_agent = $1", USER_AGENT
+        )
+        await conn.execute(
+            "DELETE FROM usuarios.tentativa_login WHERE user_agent = $1", USER_AGENT
+        )
+
+
+async def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    identifier, password = args[0], args[1]
+    total = int(args[2]) if len(args) > 2 else 500
+    concurrency = int(args[3]) if len(args) > 3 else 16
+
+    if "--com-hash" not in sys.argv:
+
+        async def cheap_verify(senha, password_hash, salt):
+            return senha == password
+
+        AuthService.verify_password_async = staticmethod(cheap_verify)
+
+    await init_db()
+    try:
+        print(f"{total} logins, concorrência {concurrency}")
+        print(f"{'modo':<8}{'logins/s':>10}{'checkouts/login':>18}{'acquire avg':>14}")
+        for mode in ("antes", "depois"):
+            r = await run(mode, identifier, password, total, concurrency)
+            print(
+                f"{r['mode']:<8}{r['logins_per_s']:>10.1f}"
+                f"{r['checkouts_per_login']:>18.2f}{r['acquire_avg_ms']:>12.2f}ms"
+            )
+    finally:
+        await cleanup()
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
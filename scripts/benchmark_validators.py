@@ -0,0 +1,152 @@
+"""
+Benchmark da validação de CPF/CNPJ (importações de CSV).
+
+Compara documentos/s de:
+  - legado:     implementações anteriores (laço em Python por caractere)
+  - escalar:    validar_cpf / validar_cnpj atuais, um documento por chamada
+  - vetorizado: validar_cpfs / validar_cnpjs (matriz uint8 + NumPy)
+
+Metade dos documentos é válida e metade vem formatada (XXX.XXX.XXX-XX).
+
+Uso:
+    python -m scripts.benchmark_validators [documentos]
+"""
+
+import random
+import re
+import sys
+import time
+
+from app.security.validators import (
+    formatar_cnpj,
+    formatar_cpf,
+    validar_cnpj,
+    validar_cnpjs,
+    validar_cpf,
+    validar_cpfs,
+)
+
+# =====================================================
+# IMPLEMENTAÇÕES ANTERIORES (referência de equivalência)
+# =====================================================
+
+
+def legacy_validar_cpf(cpf: str) -> bool:
+    """app.security.validators.validar_cpf antes da unificação"""
+    cpf = re.sub(r"\D", "", cpf)
+    if len(cpf) != 11 or not cpf.isdigit():
+        return False
+    if cpf in [str(d) * 11 for d in range(10)]:
+        return False
+    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
+    resto = soma % 11
+    dv1 = 0 if resto < 2 else 11 - resto
+    if int(cpf[9]) != dv1:
+        return False
+    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
+    resto = soma % 11
+    dv2 = 0 if resto < 2 else 11 - resto
+    return int(cpf[10]) == dv2
+
+
+def legacy_cpf_service(cpf: str) -> bool:
+    """CPFService.validar_cpf_formato antes da unificação"""
+    cpf_limpo = re.sub(r"\D", "", cpf)
+    if len(cpf_limpo) != 11:
+        return False
+    if cpf_limpo == cpf_limpo[0] * 11:
+        return False
+    soma = sum(int(d) * (10 - i) for i, d in enumerate(cpf_limpo[:9]))
+    primeiro_verificador = 11 - (soma % 11)
+    if primeiro_verificador >= 10:
+        primeiro_verificador = 0
+    if int(cpf_limpo[9]) != primeiro_verificador:
+        return False
+    soma = sum(int(d) * (11 - i) for i, d in enumerate(cpf_limpo[:10]))
+    segundo_verificador = 11 - (soma % 11)
+    if segundo_verificador >= 10:
+        segundo_verificador = 0
+    return int(cpf_limpo[10]) == segundo_verificador
+
+
+def legacy_validar_cnpj(cnpj: str) -> bool:
+    """app.security.validators.validar_cnpj antes da unificação"""
+    cnpj = re.sub(r"\D", "", cnpj)
+    if len(cnpj) != 14 or not cnpj.isdigit():
+        return False
+    if cnpj in [str(d) * 14 for d in range(10)]:
+        return False
+    multiplicador = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    soma = sum(int(cnpj[i]) * multiplicador[i] for i in range(12))
+    resto = soma % 11
+    dv1 = 0 if resto < 2 else 11 - resto
+    if int(cnpj[12]) != dv1:
+        return False
+    multiplicador = [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3]
+    soma = sum(int(cnpj[i]) * multiplicador[i] for i in range(12))
+    resto = (soma + dv1 * 2) % 11
+    dv2 = 0 if resto < 2 else 11 - resto
+    return int(cnpj[13]) == dv2
+
+
+# =====================================================
+# GERAÇÃO DE DOCUMENTOS
+# =====================================================
+
+
+def _com_verificadores(base: str, pesos_dv1, pesos_dv2) -> str:
+    for pesos in (pesos_dv1, pesos_dv2):
+        resto = sum(int(d) * p for d, p in zip(base, pesos)) % 11
+        base += str(0 if resto < 2 else 11 - resto)
+    return base
+
+
+def gerar_cpf(rng: random.Random, valido: bool) -> str:
+    base = "".join(rng.choice("0123456789") for _ in range(9))
+    cpf = _com_verificadores(base, range(10, 1, -1), range(11, 1, -1))
+    if not valido:
+        cpf = cpf[:10] + str((int(cpf[10]) + 1) % 10)
+    return cpf
+
+
+def gerar_cnpj(rng: random.Random, valido: bool) -> str:
+    base = "".join(rng.choice("0123456789") for _ in range(12))
+    cnpj = _com_verificadores(
+        base, (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+    )
+    if not valido:
+        cnpj = cnpj[:13] + str((int(cnpj[13]) + 1) % 10)
+    return cnpj
+
+
+def gerar(documentos: int, gerador, formatar, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    valores = [gerador(rng, i % 2 == 0) for i in range(documentos)]
+    return [formatar(v) if i % 4 < 2 else v for i, v in enumerate(valores)]
+
+
+def measure(label: str, documentos: int, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24}{documentos:>10}{elapsed:>10.3f}s{documentos / elapsed:>16,.0f}")
+    return result
+
+
+def main():
+    documentos = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    for tipo, gerador, formatar, legado, escalar, vetorizado in (
+        ("cpf", gerar_cpf, formatar_cpf, legacy_validar_cpf, validar_cpf, validar_cpfs),
+        ("cnpj", gerar_cnpj, formatar_cnpj, legacy_validar_cnpj, validar_cnpj, validar_cnpjs),
+    ):
+        valores = gerar(documentos, gerador, formatar)
+        print(f"\n{tipo.upper():<24}{'docs':>10}{'tempo':>11}{'docs/s':>16}")
+        esperado = measure("legado", documentos, lambda: [legado(v) for v in valores])
+        measure("escalar", documentos, lambda: [escalar(v) for v in valores])
+        obtido = measure("vetorizado", documentos, lambda: vetorizado(valores))
+        assert obtido.tolist() == esperado, "resultado vetorizado diverge do legado"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Gera a base offline de UFs e municípios a partir da API de Localidades do IBGE.
+
+Por padrão regrava a base empacotada com a aplicação
+(app/services/M01_auth/data/ibge_localidades.json); com --saida grava em
+outro arquivo (ex.: a cópia local de settings.ibge_dataset_path).
+
+Com --verificar apenas confere a base (todas as UFs, com municípios) e sai
+com código 1 se estiver incompleta; use antes de publicar uma versão.
+
+Uso:
+    python -m scripts.build_ibge_dataset [--saida caminho.json]
+    python -m scripts.build_ibge_dataset --verificar [--saida caminho.json]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from app.http_client import http_client
+from app.services.M01_auth.service_localidades_ibge import (
+    BUNDLED_PATH,
+    dump_dataset,
+    fetch_ibge,
+    load_dataset,
+    pendencias_base,
+)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Gera a base offline do IBGE")
+    parser.add_argument("--saida", default=BUNDLED_PATH)
+    parser.add_argument("--verificar", action="store_true", help="só confere a base")
+    args = parser.parse_args()
+
+    if args.verificar:
+        index = load_dataset(args.saida)
+        pendencias = pendencias_base(index)
+        for pendencia in pendencias:
+            print(f"❌ {pendencia}")
+        if pendencias:
+            sys.exit(1)
+        print(f"✅ {len(index.ufs)} UFs e {len(index)} municípios em {args.saida}")
+        return
+
+    started = time.perf_counter()
+    try:
+        index = await fetch_ibge()
+    finally:
+        await http_client.close()
+
+    dump_dataset(index, args.saida)
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ {len(index.ufs)} UFs e {len(index)} municípios gravados em "
+        f"{args.saida} ({elapsed:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
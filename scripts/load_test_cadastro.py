@@ -0,0 +1,236 @@
+"""
+Teste de carga dos endpoints usados no fluxo de cadastro.
+
+Dispara requisições concorrentes (mistura ponderada de cenários) e reporta,
+por cenário e no total: vazão (req/s), status HTTP, erros e latências
+p50/p95/p99. Com os provedores apontados para scripts/mock_providers.py o
+resultado é repetível e mede apenas a API (cache, pool, cliente HTTP).
+
+Cenários (peso padrão):
+  ufs        GET  /api/v1/localizacao/ufs                      (2)
+  municipios GET  /api/v1/localizacao/municipios/{uf}          (2)
+  buscar     GET  /api/v1/localizacao/municipios/buscar?q=...  (3)
+  cpf        POST /api/v1/externas/cpf/validar                 (2)
+  cep        POST /api/v1/externas/cep/consultar               (3)
+  cnpj       POST /api/v1/externas/cnpj/consultar              (1)
+
+`--distintos` define quantos CEPs/CNPJs/CPFs diferentes são sorteados:
+poucos valores medem o caminho em cache, muitos medem o provedor.
+
+Uso:
+    python -m scripts.mock_providers --latency-ms 80 &
+    VIACEP_BASE_URL=... RECEITAWS_BASE_URL=... IBGE_LOCALIDADES_URL=... \\
+        uvicorn app.main:app --port 8000 &
+    python -m scripts.load_test_cadastro [--base-url http://127.0.0.1:8000] \\
+        [--requisicoes 2000] [--concorrencia 50] [--distintos 200] \\
+        [--cenarios cep=3,buscar=3] [--json]
+
+Com --in-process a API roda no próprio processo (httpx + ASGI, com os eventos
+de startup/shutdown), sem uvicorn.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from typing import Callable, Optional
+
+import httpx
+
+from scripts.benchmark_validators import gerar_cnpj, gerar_cpf
+
+UFS = ("SP", "RJ", "MG", "BA", "PR", "RS", "PE", "CE", "DF", "GO")
+PREFIXOS_BUSCA = ("sao", "santa", "nova", "bom", "campo", "porto", "rio", "vila", "alto", "serra")
+
+PESOS_PADRAO = {"ufs": 2, "municipios": 2, "buscar": 3, "cpf": 2, "cep": 3, "cnpj": 1}
+
+
+class Valores:
+    """CEPs/CPFs/CNPJs sorteados de um conjunto fixo (mesma semente, mesma carga)"""
+
+    def __init__(self, distintos: int, seed: int):
+        rng = random.Random(seed)
+        self.rng = rng
+        self.ceps = [f"{rng.randrange(1000000, 99999999):08d}" for _ in range(distintos)]
+        self.cpfs = [gerar_cpf(rng, True) for _ in range(distintos)]
+        self.cnpjs = [gerar_cnpj(rng, True) for _ in range(distintos)]
+
+
+def _requisicao(cenario: str, valores: Valores) -> tuple[str, str, Optional[dict]]:
+    """(método, caminho, corpo JSON) de uma requisição do cenário"""
+    rng = valores.rng
+    if cenario == "ufs":
+        return "GET", "/api/v1/localizacao/ufs", None
+    if cenario == "municipios":
+        return "GET", f"/api/v1/localizacao/municipios/{rng.choice(UFS)}", None
+    if cenario == "buscar":
+        return "GET", f"/api/v1/localizacao/municipios/buscar?q={rng.choice(PREFIXOS_BUSCA)}", None
+    if cenario == "cpf":
+        return "POST", "/api/v1/externas/cpf/validar", {"cpf": rng.choice(valores.cpfs)}
+    if cenario == "cep":
+        return "POST", "/api/v1/externas/cep/consultar", {"cep": rng.choice(valores.ceps)}
+    if cenario == "cnpj":
+        return "POST", "/api/v1/externas/cnpj/consultar", {"cnpj": rng.choice(valores.cnpjs)}
+    raise ValueError(f"Cenário desconhecido: {cenario}")
+
+
+def percentil(ordenados: list[float], p: float) -> float:
+    """Percentil por posição mais próxima (lista já ordenada)"""
+    if not ordenados:
+        return 0.0
+    posicao = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[posicao]
+
+
+def resumo(latencias_ms: list[float], status: dict, erros: int, segundos: float) -> dict:
+    ordenados = sorted(latencias_ms)
+    total = len(ordenados)
+    return {
+        "requisicoes": total,
+        "req_por_segundo": round(total / segundos, 1) if segundos else 0.0,
+        "erros": erros,
+        "status": dict(sorted(status.items(), key=lambda item: str(item[0]))),
+        "media_ms": round(sum(ordenados) / total, 2) if total else 0.0,
+        "p50_ms": round(percentil(ordenados, 50), 2),
+        "p95_ms": round(percentil(ordenados, 95), 2),
+        "p99_ms": round(percentil(ordenados, 99), 2),
+        "max_ms": round(ordenados[-1], 2) if total else 0.0,
+    }
+
+
+async def executar(
+    client: httpx.AsyncClient,
+    requisicoes: int,
+    concorrencia: int,
+    pesos: Optional[dict[str, int]] = None,
+    distintos: int = 200,
+    seed: int = 42,
+    relogio: Callable[[], float] = time.perf_counter,
+) -> dict:
+    """
+    Executa a carga com `concorrencia` requisições simultâneas
+
+    Erros são exceções de transporte e respostas 5xx; 202 (CNPJ na fila) e
+    4xx de validação contam como respostas da API.
+
+    Returns:
+        {"total": resumo, "cenarios": {cenario: resumo}}
+    """
+    pesos = pesos or PESOS_PADRAO
+    valores = Valores(distintos, seed)
+    cenarios = valores.rng.choices(list(pesos), weights=list(pesos.values()), k=requisicoes)
+    fila = iter([(c, *_requisicao(c, valores)) for c in cenarios])
+
+    medidas: dict[str, list[float]] = {c: [] for c in pesos}
+    status: dict[str, dict] = {c: {} for c in pesos}
+    erros: dict[str, int] = {c: 0 for c in pesos}
+
+    async def trabalhador():
+        for cenario, metodo, caminho, corpo in fila:
+            started = relogio()
+            try:
+                response = await client.request(metodo, caminho, json=corpo)
+                codigo = response.status_code
+            except httpx.HTTPError as e:
+                codigo = type(e).__name__
+            medidas[cenario].append((relogio() - started) * 1000)
+            status[cenario][codigo] = status[cenario].get(codigo, 0) + 1
+            if not isinstance(codigo, int) or codigo >= 500:
+                erros[cenario] += 1
+
+    started = relogio()
+    await asyncio.gather(*(trabalhador() for _ in range(max(1, concorrencia))))
+    segundos = relogio() - started
+
+    status_total: dict = {}
+    for contagem in status.values():
+        for codigo, n in contagem.items():
+            status_total[codigo] = status_total.get(codigo, 0) + n
+    return {
+        "total": resumo(
+            [ms for lista in medidas.values() for ms in lista],
+            status_total,
+            sum(erros.values()),
+            segundos,
+        ),
+        "cenarios": {
+            c: resumo(medidas[c], status[c], erros[c], segundos) for c in pesos if medidas[c]
+        },
+    }
+
+
+def imprimir(resultado: dict):
+    colunas = ("req", "req/s", "erros", "p50", "p95", "p99", "max")
+    print(f"\n{'cenário':<12}" + "".join(f"{c:>10}" for c in colunas))
+    linhas = [*resultado["cenarios"].items(), ("TOTAL", resultado["total"])]
+    for nome, r in linhas:
+        valores = (
+            r["requisicoes"],
+            r["req_por_segundo"],
+            r["erros"],
+            r["p50_ms"],
+            r["p95_ms"],
+            r["p99_ms"],
+            r["max_ms"],
+        )
+        print(f"{nome:<12}" + "".join(f"{v:>10}" for v in valores))
+    print(f"\nstatus: {resultado['total']['status']} (latências em ms)")
+
+
+def _pesos(texto: Optional[str]) -> dict[str, int]:
+    if not texto:
+        return dict(PESOS_PADRAO)
+    pesos = {}
+    for parte in texto.split(","):
+        nome, _, peso = parte.partition("=")
+        if nome not in PESOS_PADRAO:
+            raise SystemExit(f"Cenário desconhecido: {nome} (use {', '.join(PESOS_PADRAO)})")
+        pesos[nome] = int(peso or 1)
+    return pesos
+
+
+async def main_async(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concorrencia)
+    timeout = httpx.Timeout(args.timeout)
+    kwargs = dict(pesos=_pesos(args.cenarios), distintos=args.distintos, seed=args.seed)
+
+    if not args.in_process:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+            return await executar(client, args.requisicoes, args.concorrencia, **kwargs)
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://sigma-pli", timeout=timeout
+        ) as client:
+            return await executar(client, args.requisicoes, args.concorrencia, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do fluxo de cadastro")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, default=50)
+    parser.add_argument("--distintos", type=int, default=200)
+    parser.add_argument("--cenarios", help="ex.: cep=3,buscar=2 (padrão: todos)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(main_async(args))
+    if args.json:
+        json.dump(resultado, sys.stdout, indent=2, default=str)
+        print()
+    else:
+        imprimir(resultado)
+
+
+if __name__ == "__main__":
+    main()
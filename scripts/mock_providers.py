@@ -0,0 +1,334 @@
+"""
+Servidor local que imita ViaCEP, ReceitaWS e IBGE (testes de carga sem rede).
+
+Respostas determinísticas: os registros de scripts/fixtures/mock_providers.json
+e, para os demais valores, dados sintéticos derivados do próprio CEP/CNPJ:
+
+  - ViaCEP:    CEPs terminados em 9 não existem ({"erro": "true"})
+  - ReceitaWS: CNPJs com raiz terminada em 9 não existem (status ERROR)
+  - IBGE:      UFs da base empacotada + `municipios_por_uf` municípios
+               sintéticos por UF (códigos IBGE válidos por UF)
+
+Comportamento configurável (linha de comando ou POST /__config):
+latência média e variação, taxa de erro 503 por provedor e limite de
+consultas por minuto da ReceitaWS (acima dele: 429, como a API gratuita).
+
+Uso:
+    python -m scripts.mock_providers [--port 8099] [--latency-ms 80] \\
+        [--jitter-ms 40] [--error-rate 0.0] [--receitaws-rate-per-minute 3]
+
+Depois, suba a API apontando para o mock (o servidor imprime as variáveis):
+    VIACEP_BASE_URL=http://127.0.0.1:8099/viacep/ws
+    RECEITAWS_BASE_URL=http://127.0.0.1:8099/receitaws/v1
+    IBGE_LOCALIDADES_URL=http://127.0.0.1:8099/ibge/api/v1/localidades
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from typing import Optional
+
+from aiohttp import web
+
+from app.services.M01_auth.service_localidades_ibge import BUNDLED_PATH
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "mock_providers.json")
+PROVEDORES = ("viacep", "receitaws", "ibge")
+
+# Primeiro dígito do CEP → cidade/UF (faixas aproximadas dos Correios)
+_FAIXA_CEP = [
+    ("São Paulo", "SP"),
+    ("São Paulo", "SP"),
+    ("Rio de Janeiro", "RJ"),
+    ("Belo Horizonte", "MG"),
+    ("Salvador", "BA"),
+    ("Recife", "PE"),
+    ("Fortaleza", "CE"),
+    ("Brasília", "DF"),
+    ("Curitiba", "PR"),
+    ("Porto Alegre", "RS"),
+]
+_PREFIXOS = ("São", "Santa", "Nova", "Bom", "Campo", "Porto", "Rio", "Vila", "Alto", "Serra")
+_SUFIXOS = ("Verde", "Alegre", "Grande", "do Sul", "da Serra", "Novo", "dos Campos", "das Flores")
+
+
+class MockConfig:
+    """Comportamento do mock (alterável em execução por POST /__config)"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_providers: tuple = PROVEDORES,
+        receitaws_rate_per_minute: float = 0.0,
+        municipios_por_uf: int = 20,
+        seed: int = 42,
+    ):
+        """
+        Args:
+            latency_ms: Latência média de cada resposta
+            jitter_ms: Variação uniforme (±) da latência
+            error_rate: Fração de respostas 503 (0-1)
+            error_providers: Provedores sujeitos à taxa de erro
+            receitaws_rate_per_minute: Limite da ReceitaWS (0: sem limite)
+            municipios_por_uf: Municípios sintéticos por UF
+            seed: Semente da latência/erros (execuções repetíveis)
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_providers = tuple(error_providers)
+        self.receitaws_rate_per_minute = receitaws_rate_per_minute
+        self.municipios_por_uf = municipios_por_uf
+        self.seed = seed
+
+    def update(self, valores: dict):
+        for chave, valor in valores.items():
+            if not hasattr(self, chave):
+                raise KeyError(chave)
+            setattr(self, chave, tuple(valor) if chave == "error_providers" else valor)
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+# =====================================================
+# DADOS DETERMINÍSTICOS
+# =====================================================
+
+
+def load_fixtures(path: str = FIXTURES_PATH) -> dict:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def endereco_sintetico(cep: str) -> dict:
+    """Endereço derivado do CEP (mesmo CEP, mesma resposta)"""
+    if cep.endswith("9"):
+        return {"erro": "true"}
+    localidade, uf = _FAIXA_CEP[int(cep[0])]
+    return {
+        "cep": f"{cep[:5]}-{cep[5:]}",
+        "logradouro": f"Rua Sintética {int(cep[5:])}",
+        "complemento": "",
+        "bairro": f"Bairro {cep[2:5]}",
+        "localidade": localidade,
+        "uf": uf,
+        "ibge": "",
+        "ddd": "",
+    }
+
+
+def empresa_sintetica(cnpj: str) -> dict:
+    """Empresa derivada do CNPJ no formato da ReceitaWS"""
+    if cnpj[7] == "9":
+        return {"status": "ERROR", "message": "CNPJ inválido"}
+    localidade, uf = _FAIXA_CEP[int(cnpj[0])]
+    return {
+        "status": "OK",
+        "cnpj": f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}",
+        "nome": f"EMPRESA SINTETICA {cnpj[:8]} LTDA",
+        "fantasia": f"SINTETICA {cnpj[:8]}",
+        "logradouro": f"RUA SINTETICA {int(cnpj[8:12])}",
+        "numero": str(int(cnpj[:3]) + 1),
+        "complemento": "",
+        "bairro": "CENTRO",
+        "municipio": localidade.upper(),
+        "uf": uf,
+        "cep": "01.310-100",
+        "telefone": "",
+        "email": "",
+        "abertura": "01/01/2000",
+        "porte": "DEMAIS",
+        "natureza_juridica": "206-2 - Sociedade Empresária Limitada",
+        "situacao": "ATIVA",
+        "atividade_principal": [{"code": "00.00-0-00", "text": "Atividade sintética"}],
+    }
+
+
+def ibge_sintetico(municipios_por_uf: int, path: str = BUNDLED_PATH) -> tuple[list, list]:
+    """(estados, municípios) no formato da API de localidades do IBGE"""
+    with open(path, encoding="utf-8") as handle:
+        base = json.load(handle)
+
+    estados = [
+        {"id": codigo, "sigla": sigla, "nome": nome, "regiao": {"nome": regiao}}
+        for codigo, sigla, nome, regiao in base["ufs"]
+    ]
+    municipios = [{"id": mid, "nome": nome} for mid, nome, _ in base["municipios"]]
+    existentes = {m["id"] for m in municipios}
+    for codigo, *_ in base["ufs"]:
+        rng = random.Random(codigo)
+        for i in range(municipios_por_uf):
+            mid = codigo * 100000 + (i + 1) * 10
+            if mid in existentes:
+                continue
+            nome = f"{rng.choice(_PREFIXOS)} {rng.choice(_SUFIXOS)} {i + 1}"
+            municipios.append({"id": mid, "nome": nome})
+    municipios.sort(key=lambda m: m["id"])
+    return estados, municipios
+
+
+# =====================================================
+# SERVIDOR
+# =====================================================
+
+
+class MockProviders:
+    """Handlers aiohttp + estado (contadores, janela de limite da ReceitaWS)"""
+
+    def __init__(self, config: MockConfig, fixtures: Optional[dict] = None):
+        self.config = config
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+        self._rng = random.Random(config.seed)
+        self._receitaws_calls: deque[float] = deque()
+        self._ibge: Optional[tuple[int, tuple[list, list]]] = None
+        self.requests = {p: 0 for p in PROVEDORES}
+        self.status: dict[str, dict[int, int]] = {p: {} for p in PROVEDORES}
+
+    def ibge(self) -> tuple[list, list]:
+        quantidade = self.config.municipios_por_uf
+        if self._ibge is None or self._ibge[0] != quantidade:
+            self._ibge = (quantidade, ibge_sintetico(quantidade))
+        return self._ibge[1]
+
+    async def _responder(self, provedor: str, gerar) -> web.Response:
+        """Aplica latência, erros e limite de taxa antes de gerar a resposta"""
+        config = self.config
+        self.requests[provedor] += 1
+        atraso = config.latency_ms + self._rng.uniform(-config.jitter_ms, config.jitter_ms)
+        if atraso > 0:
+            await asyncio.sleep(atraso / 1000)
+
+        if provedor in config.error_providers and self._rng.random() < config.error_rate:
+            response = web.json_response({"erro": "indisponível"}, status=503)
+        elif provedor == "receitaws" and not self._dentro_do_limite():
+            response = web.json_response(
+                {"status": "ERROR", "message": "Too many requests, please try again later."},
+                status=429,
+                headers={"Retry-After": "60"},
+            )
+        else:
+            response = web.json_response(gerar())
+
+        contagem = self.status[provedor]
+        contagem[response.status] = contagem.get(response.status, 0) + 1
+        return response
+
+    def _dentro_do_limite(self) -> bool:
+        limite = self.config.receitaws_rate_per_minute
+        if limite <= 0:
+            return True
+        now = time.monotonic()
+        while self._receitaws_calls and now - self._receitaws_calls[0] >= 60:
+            self._receitaws_calls.popleft()
+        if len(self._receitaws_calls) >= limite:
+            return False
+        self._receitaws_calls.append(now)
+        return True
+
+    async def viacep(self, request: web.Request) -> web.Response:
+        cep = request.match_info["cep"]
+        if len(cep) != 8 or not cep.isdigit():
+            return web.Response(status=400, text="CEP inválido")
+        return await self._responder(
+            "viacep", lambda: self.fixtures["viacep"].get(cep) or endereco_sintetico(cep)
+        )
+
+    async def receitaws(self, request: web.Request) -> web.Response:
+        cnpj = request.match_info["cnpj"]
+        if len(cnpj) != 14 or not cnpj.isdigit():
+            return web.json_response({"status": "ERROR", "message": "CNPJ inválido"})
+        return await self._responder(
+            "receitaws", lambda: self.fixtures["receitaws"].get(cnpj) or empresa_sintetica(cnpj)
+        )
+
+    async def ibge_estados(self, request: web.Request) -> web.Response:
+        return await self._responder("ibge", lambda: self.ibge()[0])
+
+    async def ibge_municipios(self, request: web.Request) -> web.Response:
+        return await self._responder("ibge", lambda: self.ibge()[1])
+
+    async def ibge_municipios_uf(self, request: web.Request) -> web.Response:
+        sigla = request.match_info["uf"].upper()
+        estados, municipios = self.ibge()
+        codigo = next((e["id"] for e in estados if e["sigla"] == sigla), None)
+        return await self._responder(
+            "ibge", lambda: [m for m in municipios if m["id"] // 100000 == codigo]
+        )
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"config": self.config.to_dict(), "requests": self.requests, "status": self.status}
+        )
+
+    async def post_config(self, request: web.Request) -> web.Response:
+        try:
+            self.config.update(await request.json())
+        except (KeyError, ValueError) as e:
+            return web.json_response({"erro": f"Campo inválido: {e}"}, status=400)
+        return web.json_response(self.config.to_dict())
+
+
+MOCK_KEY = web.AppKey("mock", MockProviders)
+
+
+def create_app(
+    config: Optional[MockConfig] = None, fixtures: Optional[dict] = None
+) -> web.Application:
+    mock = MockProviders(config or MockConfig(), fixtures)
+    app = web.Application()
+    app[MOCK_KEY] = mock
+    app.router.add_get("/viacep/ws/{cep}/json/", mock.viacep)
+    app.router.add_get("/receitaws/v1/cnpj/{cnpj}", mock.receitaws)
+    app.router.add_get("/ibge/api/v1/localidades/estados", mock.ibge_estados)
+    app.router.add_get("/ibge/api/v1/localidades/estados/{uf}/municipios", mock.ibge_municipios_uf)
+    app.router.add_get("/ibge/api/v1/localidades/municipios", mock.ibge_municipios)
+    app.router.add_get("/__stats", mock.get_stats)
+    app.router.add_post("/__config", mock.post_config)
+    return app
+
+
+def env_vars(base_url: str) -> dict[str, str]:
+    """Variáveis de ambiente que apontam a API para o mock"""
+    return {
+        "VIACEP_BASE_URL": f"{base_url}/viacep/ws",
+        "RECEITAWS_BASE_URL": f"{base_url}/receitaws/v1",
+        "IBGE_LOCALIDADES_URL": f"{base_url}/ibge/api/v1/localidades",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock local de ViaCEP, ReceitaWS e IBGE")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-providers", default=",".join(PROVEDORES))
+    parser.add_argument("--receitaws-rate-per-minute", type=float, default=0.0)
+    parser.add_argument("--municipios-por-uf", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_providers=tuple(p for p in args.error_providers.split(",") if p),
+        receitaws_rate_per_minute=args.receitaws_rate_per_minute,
+        municipios_por_uf=args.municipios_por_uf,
+        seed=args.seed,
+    )
+    for chave, valor in env_vars(f"http://{args.host}:{args.port}").items():
+        print(f"{chave}={valor}")
+    web.run_app(create_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Carga inicial do cache de CEP a partir de uma base (dump) em CSV.
+
+O arquivo precisa de cabeçalho com a coluna "cep" e, opcionalmente,
+logradouro, complemento, bairro, localidade (ou cidade/municipio), uf e ibge.
+Aceita .csv ou .csv.gz, separado por vírgula ou ponto e vírgula. Por padrão
+carrega apenas os CEPs de SP.
+
+As entradas vão para o armazenamento persistente do cache (cadastro.cep_cache,
+ou o SQLite local com ENABLE_POSTGRES=false) com o TTL de CEPs encontrados.
+
+Uso:
+    python -m scripts.preload_cep_cache <arquivo.csv> [--uf SP|TODAS] \\
+        [--lote 5000] [--provedor dump]
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import re
+import time
+
+from app.config import settings
+from app.database import close_db, init_db
+from app.services.M01_auth.service_cep_cache import cep_cache
+
+CIDADE_ALIASES = ("localidade", "cidade", "municipio")
+CAMPOS = ("logradouro", "complemento", "bairro", "uf", "ibge")
+
+
+def open_dump(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def read_dump(path: str, uf: str):
+    """Gera (cep, dados) no formato de resposta do ViaCEP"""
+    with open_dump(path) as handle:
+        sample = handle.read(4096)
+        handle.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;")
+        for row in csv.DictReader(handle, dialect=dialect):
+            row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+            cep = re.sub(r"\D", "", row.get("cep", ""))
+            if len(cep) != 8:
+                continue
+            if uf != "TODAS" and row.get("uf", "").upper() != uf:
+                continue
+
+            dados = {"cep": f"{cep[:5]}-{cep[5:]}"}
+            dados.update({campo: row.get(campo, "") for campo in CAMPOS})
+            dados["uf"] = dados["uf"].upper()
+            dados["localidade"] = next(
+                (row[alias] for alias in CIDADE_ALIASES if row.get(alias)), ""
+            )
+            yield cep, dados
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Carga inicial do cache de CEP")
+    parser.add_argument("arquivo")
+    parser.add_argument("--uf", default="SP", help="UF a carregar (TODAS para todas)")
+    parser.add_argument("--lote", type=int, default=5000)
+    parser.add_argument("--provedor", default="dump")
+    args = parser.parse_args()
+
+    if settings.enable_postgres:
+        await init_db()
+
+    started = time.perf_counter()
+    total = 0
+    lote = []
+    try:
+        for cep, dados in read_dump(args.arquivo, args.uf.upper()):
+            lote.append(cep_cache.entry(cep, dados, True, args.provedor))
+            if len(lote) >= args.lote:
+                total += await cep_cache.put_many(lote)
+                lote = []
+                print(f"  {total} CEPs gravados...")
+        total += await cep_cache.put_many(lote)
+    finally:
+        if settings.enable_postgres:
+            await close_db()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ {total} CEPs carregados em {elapsed:.1f}s "
+        f"({cep_cache.store.name}, falhas: {cep_cache.store_errors})"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
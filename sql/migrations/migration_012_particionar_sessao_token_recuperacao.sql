@@ -0,0 +1,114 @@
+-- Migration 012: Particionamento mensal de usuarios.sessao e usuarios.token_recuperacao
+--
+-- As tabelas passam a ser particionadas por RANGE (expires_at), uma partição por
+-- mês (<tabela>_pAAAA_MM). Consultas com "expires_at > agora" (get_session_by_token,
+-- fetch_valid_recovery_token) ignoram as partições antigas, e registros vencidos
+-- são removidos destacando a partição inteira em vez de DELETE linha a linha.
+--
+-- Partições futuras e a remoção das antigas ficam a cargo do agendador de
+-- manutenção da aplicação (app/services/M01_auth/service_auth_maintenance.py).
+-- A migration já cria 12 meses à frente e, se ainda assim faltar partição
+-- (agendador desligado ou falhando), os INSERTs da aplicação criam a do mês
+-- (insert_partitioned) em vez de falhar.
+--
+-- Observações:
+--   * Em tabela particionada a chave de partição precisa fazer parte de PK/UNIQUE:
+--     PK passa a ser (id, expires_at) e a unicidade de token passa a ser
+--     (token, expires_at). Os tokens são aleatórios (256 bits).
+--   * Todos os registros ainda não vencidos (expires_at >= now()) são copiados,
+--     com as partições dos meses que eles ocupam; os vencidos ficam em
+--     <tabela>_legado para conferência e podem ser removidos manualmente.
+--   * Não há partição DEFAULT: ela impediria criar partições novas sobre faixas
+--     que já tivessem linhas nela.
+
+BEGIN;
+
+-- =====================================================
+-- usuarios.sessao
+-- =====================================================
+ALTER TABLE usuarios.sessao RENAME TO sessao_legado;
+
+CREATE TABLE usuarios.sessao
+(
+    LIKE usuarios.sessao_legado INCLUDING DEFAULTS,
+    PRIMARY KEY (id, expires_at),
+    UNIQUE (token, expires_at)
+)
+PARTITION BY RANGE (expires_at);
+
+ALTER TABLE usuarios.sessao
+    ADD CONSTRAINT sessao_conta_usuario_id_part_fkey
+    FOREIGN KEY (conta_usuario_id) REFERENCES usuarios.usuario(id) ON DELETE CASCADE;
+
+CREATE INDEX idx_sessao_part_refresh_token ON usuarios.sessao (refresh_token);
+CREATE INDEX idx_sessao_part_conta_ativa ON usuarios.sessao (conta_usuario_id)
+    WHERE revoked = FALSE;
+
+-- =====================================================
+-- usuarios.token_recuperacao
+-- =====================================================
+ALTER TABLE usuarios.token_recuperacao RENAME TO token_recuperacao_legado;
+
+CREATE TABLE usuarios.token_recuperacao
+(
+    LIKE usuarios.token_recuperacao_legado INCLUDING DEFAULTS,
+    PRIMARY KEY (id, expires_at),
+    UNIQUE (token, expires_at)
+)
+PARTITION BY RANGE (expires_at);
+
+ALTER TABLE usuarios.token_recuperacao
+    ADD CONSTRAINT token_recuperacao_conta_usuario_id_part_fkey
+    FOREIGN KEY (conta_usuario_id) REFERENCES usuarios.usuario(id) ON DELETE CASCADE;
+
+CREATE INDEX idx_token_recuperacao_part_conta_tipo
+    ON usuarios.token_recuperacao (conta_usuario_id, tipo)
+    WHERE usado = FALSE;
+
+-- =====================================================
+-- Partições iniciais: mês corrente + 12 meses à frente, mais os meses
+-- ocupados pelos registros ainda válidos
+-- =====================================================
+DO $$
+DECLARE
+    v_tabela TEXT;
+    v_mes DATE;
+BEGIN
+    FOREACH v_tabela IN ARRAY ARRAY['sessao', 'token_recuperacao']
+    LOOP
+        FOR v_mes IN EXECUTE format(
+            'SELECT generate_series(
+                    date_trunc(''month'', CURRENT_DATE),
+                    date_trunc(''month'', CURRENT_DATE) + INTERVAL ''12 months'',
+                    INTERVAL ''1 month''
+                )::date
+             UNION
+             SELECT DISTINCT date_trunc(''month'', expires_at)::date
+             FROM usuarios.%I
+             WHERE expires_at >= now()',
+            v_tabela || '_legado'
+        )
+        LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS usuarios.%I PARTITION OF usuarios.%I FOR VALUES FROM (%L) TO (%L)',
+                v_tabela || '_p' || to_char(v_mes, 'YYYY_MM'),
+                v_tabela,
+                v_mes,
+                (v_mes + INTERVAL '1 month')::date
+            );
+        END LOOP;
+    END LOOP;
+END $$;
+
+-- =====================================================
+-- Cópia dos registros ainda válidos
+-- =====================================================
+INSERT INTO usuarios.sessao
+SELECT * FROM usuarios.sessao_legado
+WHERE expires_at >= now();
+
+INSERT INTO usuarios.token_recuperacao
+SELECT * FROM usuarios.token_recuperacao_legado
+WHERE expires_at >= now();
+
+COMMIT;
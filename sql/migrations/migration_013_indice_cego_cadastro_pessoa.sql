@@ -0,0 +1,22 @@
+-- Migration 013: Índice cego (blind index) de CPF e telefone em cadastro.pessoa
+--
+-- cpf_bidx / telefone_bidx guardam HMAC-SHA256 (32 bytes) dos dígitos do
+-- documento, calculado pela aplicação com chave própria (BLIND_INDEX_KEY,
+-- ver app/security/crypto.py). Permitem buscar e deduplicar por igualdade,
+-- inclusive em lote (cpf_bidx = ANY($1)), sem descriptografar nada.
+--
+-- As linhas existentes são preenchidas pela tarefa de manutenção
+-- "pessoa_indice_cego" (app/services/M01_auth/service_pessoa_blind_index.py),
+-- em lotes. Cadastros novos já gravam os índices.
+
+ALTER TABLE IF EXISTS cadastro.pessoa
+    ADD COLUMN IF NOT EXISTS cpf_bidx BYTEA,
+    ADD COLUMN IF NOT EXISTS telefone_bidx BYTEA;
+
+CREATE INDEX IF NOT EXISTS idx_pessoa_cpf_bidx
+    ON cadastro.pessoa (cpf_bidx)
+    WHERE cpf_bidx IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_pessoa_telefone_bidx
+    ON cadastro.pessoa (telefone_bidx)
+    WHERE telefone_bidx IS NOT NULL;
@@ -0,0 +1,21 @@
+-- Migration 014: Cache persistente de consultas de CEP (cadastro.cep_cache)
+--
+-- Segundo nível do cache de CEP da aplicação (o primeiro é um LRU em memória,
+-- ver app/services/M01_auth/service_cep_cache.py). Guarda também os CEPs não
+-- encontrados ("cache negativo"), com validade menor. Entradas vencidas são
+-- removidas pela tarefa de manutenção "cep_cache".
+--
+-- Carga inicial (ex.: base de CEPs de SP):
+--   python -m scripts.preload_cep_cache <arquivo.csv> --uf SP
+
+CREATE TABLE IF NOT EXISTS cadastro.cep_cache
+(
+    cep CHAR(8) PRIMARY KEY,
+    dados JSONB,
+    encontrado BOOLEAN NOT NULL,
+    provedor VARCHAR(30) NOT NULL,
+    consultado_em TIMESTAMP NOT NULL DEFAULT NOW(),
+    expira_em TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_cep_cache_expira_em ON cadastro.cep_cache (expira_em);
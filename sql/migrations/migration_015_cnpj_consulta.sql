@@ -0,0 +1,19 @@
+-- Migration 015: Cache persistente de consultas de CNPJ (cadastro.cnpj_consulta)
+--
+-- Resultados da ReceitaWS guardados pelo motor de consultas da aplicação
+-- (app/services/M01_auth/service_cnpj_lookup.py), que também agrupa consultas
+-- simultâneas e respeita o limite de consultas por minuto do plano gratuito.
+-- CNPJs não encontrados são guardados com validade menor. Entradas vencidas
+-- são removidas pela tarefa de manutenção "cnpj_cache".
+
+CREATE TABLE IF NOT EXISTS cadastro.cnpj_consulta
+(
+    cnpj CHAR(14) PRIMARY KEY,
+    dados JSONB,
+    encontrado BOOLEAN NOT NULL,
+    provedor VARCHAR(30) NOT NULL,
+    consultado_em TIMESTAMP NOT NULL DEFAULT NOW(),
+    expira_em TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_cnpj_consulta_expira_em ON cadastro.cnpj_consulta (expira_em);
@@ -0,0 +1,44 @@
+-- Migration 016: Eventos do calendário (calendario.evento)
+--
+-- Armazenamento persistente do CalendarioEventosService
+-- (app/services/M04_calendario/service_calendario_eventos.py), que antes
+-- guardava os eventos apenas na memória de cada processo. As tabelas antigas
+-- usuarios.evento/usuarios.homeoffice não têm horário, módulo nem vínculo de
+-- lembrete e ficam como estão.
+--
+-- Índices seguem as consultas da API: período ordenado por (data, hora),
+-- filtros por tipo e módulo dentro do período, busca parcial por responsável
+-- (ILIKE '%...%', trigramas) e remoção em cascata dos lembretes de Home Office.
+
+CREATE SCHEMA IF NOT EXISTS calendario;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS calendario.evento
+(
+    id VARCHAR(40) PRIMARY KEY,
+    tipo VARCHAR(20) NOT NULL CHECK (tipo IN ('entrega', 'reuniao', 'homeoffice')),
+    titulo VARCHAR(200) NOT NULL,
+    responsavel VARCHAR(100) NOT NULL,
+    data DATE NOT NULL,
+    hora_inicio TIME NOT NULL,
+    hora_fim TIME NOT NULL,
+    localizacao VARCHAR(200),
+    observacoes VARCHAR(1000),
+    modulo VARCHAR(100),
+    lembrete_homeoffice BOOLEAN NOT NULL DEFAULT FALSE,
+    evento_vinculado_id VARCHAR(40) REFERENCES calendario.evento (id) ON DELETE CASCADE,
+    criado_em TIMESTAMP NOT NULL DEFAULT NOW(),
+    atualizado_em TIMESTAMP NOT NULL DEFAULT NOW(),
+    CHECK (hora_fim > hora_inicio)
+);
+
+CREATE INDEX IF NOT EXISTS idx_evento_data_hora
+    ON calendario.evento (data, hora_inicio);
+CREATE INDEX IF NOT EXISTS idx_evento_tipo_data_hora
+    ON calendario.evento (tipo, data, hora_inicio);
+CREATE INDEX IF NOT EXISTS idx_evento_modulo_data_hora
+    ON calendario.evento (modulo, data, hora_inicio) WHERE modulo IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_evento_responsavel_trgm
+    ON calendario.evento USING gin (responsavel gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_evento_vinculado
+    ON calendario.evento (evento_vinculado_id) WHERE evento_vinculado_id IS NOT NULL;
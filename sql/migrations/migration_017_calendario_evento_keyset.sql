@@ -0,0 +1,11 @@
+-- Migration 017: Paginação por cursor em calendario.evento
+--
+-- GET /api/v1/calendario/eventos pagina por keyset: a página seguinte começa
+-- depois da chave (data, hora_inicio, id) do último evento devolvido. O índice
+-- passa a incluir o id para que a comparação de linha e o ORDER BY sejam
+-- resolvidos inteiramente pelo índice, sem ordenação extra nos empates.
+
+CREATE INDEX IF NOT EXISTS idx_evento_data_hora_id
+    ON calendario.evento (data, hora_inicio, id);
+
+DROP INDEX IF EXISTS calendario.idx_evento_data_hora;
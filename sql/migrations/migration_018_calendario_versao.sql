@@ -0,0 +1,28 @@
+-- Migration 018: Versão do calendário (feed iCalendar com GET condicional)
+--
+-- GET /api/v1/calendario/ics responde 304 enquanto o ETag do cliente
+-- corresponder à versão atual dos eventos. A versão é um contador de linha
+-- única incrementado por trigger (por statement) a cada INSERT/UPDATE/DELETE
+-- em calendario.evento: a checagem não precisa varrer a tabela.
+
+CREATE TABLE IF NOT EXISTS calendario.versao
+(
+    unica BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (unica),
+    versao BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO calendario.versao (unica, versao) VALUES (TRUE, 0)
+ON CONFLICT (unica) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION calendario.incrementar_versao()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE calendario.versao SET versao = versao + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_evento_versao ON calendario.evento;
+CREATE TRIGGER trg_evento_versao
+    AFTER INSERT OR UPDATE OR DELETE ON calendario.evento
+    FOR EACH STATEMENT EXECUTE FUNCTION calendario.incrementar_versao();
@@ -0,0 +1,68 @@
+"""
+SIGMA-PLI - Testes do cache de sessões autenticadas
+"""
+
+from datetime import datetime, timedelta
+
+from app.schemas.M01_auth.schema_auth import AuthenticatedUser
+from app.utils.auth_session_cache import AuthSessionCache
+
+
+def _user(conta_id: str = "conta-1") -> AuthenticatedUser:
+    return AuthenticatedUser(conta_id=conta_id, username="joao", nome_completo="João")
+
+
+class TestAuthSessionCache:
+    """Testes do AuthSessionCache"""
+
+    def test_hit_e_miss(self):
+        cache = AuthSessionCache(max_entries=10, ttl_seconds=60)
+        assert cache.get("sid", "stk") is None
+
+        cache.set("sid", "stk", _user())
+        assert cache.get("sid", "stk").username == "joao"
+        assert cache.get("sid", "outro") is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    def test_respeita_expiracao_da_sessao(self):
+        cache = AuthSessionCache(max_entries=10, ttl_seconds=60)
+        expirada = datetime.utcnow() - timedelta(seconds=1)
+
+        cache.set("sid", "stk", _user(), expirada)
+
+        assert cache.get("sid", "stk") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_limita_entradas(self):
+        cache = AuthSessionCache(max_entries=2, ttl_seconds=60)
+        cache.set("s1", "t1", _user())
+        cache.set("s2", "t2", _user())
+        cache.get("s1", "t1")
+        cache.set("s3", "t3", _user())
+
+        assert cache.get("s2", "t2") is None
+        assert cache.get("s1", "t1") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidacao_por_sid_token_e_conta(self):
+        cache = AuthSessionCache(max_entries=10, ttl_seconds=60)
+        cache.set("s1", "t1", _user("a"))
+        cache.set("s2", "t2", _user("a"))
+        cache.set("s3", "t3", _user("b"))
+
+        cache.invalidate_session("s1")
+        cache.invalidate_token("t3")
+        assert cache.get("s1", "t1") is None
+        assert cache.get("s3", "t3") is None
+
+        cache.invalidate_account("a")
+        assert cache.get("s2", "t2") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_ttl_zero_desativa(self):
+        cache = AuthSessionCache(max_entries=10, ttl_seconds=0)
+        cache.set("sid", "stk", _user())
+        assert cache.get("sid", "stk") is None
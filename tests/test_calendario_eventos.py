@@ -0,0 +1,386 @@
+"""
+SIGMA-PLI - Testes dos eventos do calendário (memória e calendario.evento)
+"""
+
+import random
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.schemas.calendario import (
+    EventoCreate,
+    EventoResponse,
+    EventoSearchParams,
+    EventoUpdate,
+)
+from app.routers.M04_calendario.router_calendario_eventos import router as calendario_router
+from app.services.M04_calendario import service_calendario_eventos as service_eventos
+from app.services.M04_calendario.service_calendario_eventos import (
+    CalendarioEventosService,
+    IndiceEventos,
+    PostgresCalendarioEventosService,
+    decode_cursor,
+    encode_cursor,
+)
+
+HOJE = date.today()
+
+
+def evento(**campos):
+    dados = {
+        "type": "reuniao",
+        "title": "Reunião semanal",
+        "user": "Maria Souza",
+        "date": (HOJE + timedelta(days=5)).isoformat(),
+        "startTime": "10:00",
+        "endTime": "11:00",
+        "module": "M00_home",
+    }
+    dados.update(campos)
+    return dados
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    """Conexão que simula calendario.evento e registra os parâmetros das consultas"""
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+        self.calls: list[tuple[str, tuple]] = []
+
+    def get_server_pid(self):
+        return 1
+
+    def transaction(self):
+        return FakeTransaction()
+
+    def _ordenados(self, rows):
+        return sorted(rows, key=lambda r: (r["data"], r["hora_inicio"], r["id"]))
+
+    async def fetchrow(self, query, *args, record_class=None):
+        self.calls.append((query, args))
+        if "INSERT INTO calendario.evento" in query:
+            agora = datetime.now()
+            colunas = (
+                "id tipo titulo responsavel data hora_inicio hora_fim localizacao "
+                "observacoes modulo lembrete_homeoffice evento_vinculado_id"
+            ).split()
+            row = dict(zip(colunas, args), criado_em=agora, atualizado_em=agora)
+            self.rows[row["id"]] = row
+            return row
+        if "UPDATE calendario.evento" in query:
+            row = self.rows[args[0]]
+            colunas = (
+                "tipo titulo responsavel data hora_inicio hora_fim localizacao observacoes modulo"
+            ).split()
+            row.update(zip(colunas, args[1:]))
+            return row
+        if "AS filtrados" in query:
+            return {"total": len(self.rows), "filtrados": len(self.rows)}
+        if "count(*) AS total" in query:
+            return {
+                "total": len(self.rows),
+                "entregas": 0,
+                "reunioes": len(self.rows),
+                "homeoffice": 0,
+                "this_month": 0,
+            }
+        return self.rows.get(args[0])
+
+    async def fetch(self, query, *args, record_class=None):
+        self.calls.append((query, args))
+        if "DELETE FROM calendario.evento" in query:
+            removidos = [
+                r for r in self.rows.values()
+                if r["id"] == args[0] or r["evento_vinculado_id"] == args[0]
+            ]
+            for row in removidos:
+                del self.rows[row["id"]]
+            return [{"id": row["id"]} for row in removidos]
+        rows = self.rows.values()
+        if "WHERE data BETWEEN" in query:
+            inicio, fim = args[:2]
+            rows = [r for r in rows if inicio <= r["data"] <= fim]
+        return self._ordenados(rows)
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = FakeConnection()
+
+    @asynccontextmanager
+    async def fake_connection():
+        yield conn
+
+    monkeypatch.setattr(service_eventos, "postgres_connection", fake_connection)
+    return conn
+
+
+@pytest.fixture
+def client(monkeypatch):
+    service = CalendarioEventosService(sample_data=False)
+    monkeypatch.setattr(service_eventos, "_service_instance", service)
+    app = FastAPI()
+    app.include_router(calendario_router)
+    return TestClient(app)
+
+
+class TestRotasComServicoEmMemoria:
+    """O serviço em memória é o dublê das rotas (mesma interface do PostgreSQL)"""
+
+    def test_crud_e_filtros(self, client):
+        criado = client.post("/api/v1/calendario/eventos", json=evento())
+        assert criado.status_code == 201
+        evento_id = criado.json()["id"]
+        client.post(
+            "/api/v1/calendario/eventos",
+            json=evento(type="entrega", user="João Lima", module="M05_relatorios"),
+        )
+
+        filtrado = client.get("/api/v1/calendario/eventos", params={"user": "souza"}).json()
+        assert [e["id"] for e in filtrado["eventos"]] == [evento_id]
+        assert filtrado["total"] == 2 and filtrado["filtered"] == 1
+
+        atualizado = client.put(
+            f"/api/v1/calendario/eventos/{evento_id}", json={"title": "Reunião mensal"}
+        )
+        assert atualizado.json()["title"] == "Reunião mensal"
+        assert client.delete(f"/api/v1/calendario/eventos/{evento_id}").status_code == 204
+        assert client.get(f"/api/v1/calendario/eventos/{evento_id}").status_code == 404
+
+    def test_homeoffice_cria_e_remove_lembrete(self, client):
+        ho = client.post(
+            "/api/v1/calendario/eventos", json=evento(type="homeoffice", title="Home Office")
+        ).json()
+        eventos = client.get("/api/v1/calendario/eventos").json()["eventos"]
+        assert [e["linkedEventId"] for e in eventos if e["isHomeOfficeReminder"]] == [ho["id"]]
+        assert client.get("/api/v1/calendario/stats").json()["homeOffice"] == 1
+
+        client.delete(f"/api/v1/calendario/eventos/{ho['id']}")
+        assert client.get("/api/v1/calendario/eventos").json()["total"] == 0
+
+
+class TestPaginacaoPorCursor:
+    """next_cursor percorre a lista sem repetir nem pular; total/filtered independem da página"""
+
+    def test_percorre_todas_as_paginas(self, client):
+        for dia in (3, 1, 2, 1, 3, 2, 1):
+            client.post(
+                "/api/v1/calendario/eventos",
+                json=evento(date=(HOJE + timedelta(days=dia)).isoformat()),
+            )
+        client.post("/api/v1/calendario/eventos", json=evento(user="Outra Pessoa"))
+
+        vistos, cursor, paginas = [], None, 0
+        while True:
+            params = {"limit": 3, "user": "souza"}
+            if cursor:
+                params["cursor"] = cursor
+            pagina = client.get("/api/v1/calendario/eventos", params=params).json()
+            assert (pagina["total"], pagina["filtered"]) == (8, 7)
+            vistos += [(e["date"], e["startTime"], e["id"]) for e in pagina["eventos"]]
+            paginas += 1
+            cursor = pagina["next_cursor"]
+            if cursor is None:
+                break
+
+        assert paginas == 3
+        assert vistos == sorted(vistos) and len(set(vistos)) == 7
+
+    def test_sem_filtros_respeita_limit(self, client):
+        for _ in range(3):
+            client.post("/api/v1/calendario/eventos", json=evento())
+        pagina = client.get("/api/v1/calendario/eventos", params={"limit": 2}).json()
+        assert len(pagina["eventos"]) == 2
+        assert pagina["total"] == 3 and pagina["filtered"] is None
+        assert decode_cursor(pagina["next_cursor"])[2] == pagina["eventos"][1]["id"]
+
+    def test_cursor_invalido(self, client):
+        for cursor in ("nao-e-cursor", encode_cursor.__name__):
+            response = client.get("/api/v1/calendario/eventos", params={"cursor": cursor})
+            assert response.status_code == 400
+
+
+def registro(n, dia, hora="10:00", **campos):
+    return {
+        "id": f"evt-{n:04d}",
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+        **evento(date=dia.isoformat(), startTime=hora, endTime="23:00", **campos),
+    }
+
+
+class TestIndiceEventos:
+    """Período por bisect sobre (data, hora) e índices por tipo/módulo/vínculo"""
+
+    def test_periodo_inclusivo_e_ordenado(self):
+        indice = IndiceEventos()
+        indice.adicionar(registro(1, HOJE + timedelta(days=2), "15:00"))
+        indice.adicionar(registro(2, HOJE, "09:00"))
+        indice.adicionar(registro(3, HOJE + timedelta(days=2), "08:00"))
+        indice.adicionar(registro(4, HOJE + timedelta(days=3)))
+
+        assert list(indice.periodo()) == ["evt-0002", "evt-0003", "evt-0001", "evt-0004"]
+        fim = HOJE + timedelta(days=2)
+        assert list(indice.periodo(HOJE + timedelta(days=1), fim)) == ["evt-0003", "evt-0001"]
+        assert indice.contar_periodo(HOJE, HOJE) == 1
+        assert indice.contar_periodo(HOJE + timedelta(days=5), HOJE) == 0
+        assert indice.obter("evt-0002")["date"] == HOJE  # guardado como date
+
+    def test_atualizar_e_remover_mantem_indices(self):
+        indice = IndiceEventos()
+        indice.adicionar(registro(1, HOJE, type="homeoffice"))
+        indice.adicionar(registro(2, HOJE, isHomeOfficeReminder=True, linkedEventId="evt-0001"))
+        resposta = indice.resposta("evt-0002")
+        assert indice.resposta("evt-0002") is resposta
+
+        indice.atualizar("evt-0002", {"date": HOJE - timedelta(days=1), "module": "M05"})
+        assert list(indice.periodo()) == ["evt-0002", "evt-0001"]
+        assert indice.ids_por_modulo("M05") == {"evt-0002"}
+        assert indice.resposta("evt-0002") is not resposta
+
+        assert indice.ids_vinculados("evt-0001") == {"evt-0002"}
+        indice.remover("evt-0002")
+        assert indice.ids_vinculados("evt-0001") == set()
+        assert indice.ids_lembretes() == set()
+        assert list(indice.periodo()) == ["evt-0001"]
+
+    @pytest.mark.asyncio
+    async def test_busca_equivale_a_varredura(self):
+        rng = random.Random(7)
+        service = CalendarioEventosService(sample_data=False)
+        registros = [
+            registro(
+                n,
+                HOJE + timedelta(days=rng.randrange(60)),
+                f"{rng.randrange(8, 18):02d}:{rng.choice(('00', '30'))}",
+                type=rng.choice(("entrega", "reuniao")),
+                user=rng.choice(("Ana Lima", "Bruno Souza", "Carla Souza")),
+                module=rng.choice(("M00_home", "M05_relatorios", None)),
+            )
+            for n in range(300)
+        ]
+        for r in registros:
+            service._indice.adicionar(r)
+
+        inicio, fim = HOJE + timedelta(days=10), HOJE + timedelta(days=40)
+        params = EventoSearchParams(
+            type="reuniao", user="souza", module="M00_home",
+            date_start=inicio, date_end=fim, limit=7, offset=3,
+        )
+        esperado = sorted(
+            (
+                r for r in registros
+                if r["type"] == "reuniao" and "souza" in r["user"].lower()
+                and r["module"] == "M00_home"
+                and inicio.isoformat() <= r["date"] <= fim.isoformat()
+            ),
+            key=lambda r: (r["date"], r["startTime"], r["id"]),
+        )[3:10]
+        obtido = await service.search_eventos(params)
+        assert [e.id for e in obtido] == [r["id"] for r in esperado]
+
+        proximos = await service.get_upcoming_eventos(3)
+        assert all(HOJE <= e.date <= HOJE + timedelta(days=3) for e in proximos)
+        assert len(proximos) == sum(
+            1 for r in registros if r["date"] <= (HOJE + timedelta(days=3)).isoformat()
+        )
+
+
+class TestPostgresCalendarioEventosService:
+    @pytest.mark.asyncio
+    async def test_criacao_com_lembrete_e_leitura(self, conn):
+        service = PostgresCalendarioEventosService()
+        ho = await service.create_evento(
+            EventoCreate(**evento(type="homeoffice", title="Home Office", module=None))
+        )
+        assert ho.startTime == "10:00" and ho.date == HOJE + timedelta(days=5)
+
+        inserts = [args for query, args in conn.calls if "INSERT" in query]
+        assert len(inserts) == 2  # evento + lembrete, na mesma transação
+        assert inserts[0][5] == time(10, 0)
+        assert inserts[1][4] == HOJE + timedelta(days=3)
+        assert inserts[1][10:] == (True, ho.id)
+
+        todos = await service.get_all_eventos()
+        assert [e.isHomeOfficeReminder for e in todos] == [True, False]
+        assert await service.count_eventos() == (2, 2)
+
+        assert await service.delete_evento(ho.id) is True
+        assert await service.count_eventos() == (0, 0)  # lembrete removido em cascata
+        assert await service.delete_evento(ho.id) is False
+
+    @pytest.mark.asyncio
+    async def test_busca_resolvida_no_sql(self, conn):
+        service = PostgresCalendarioEventosService()
+        await service.search_eventos(
+            EventoSearchParams(
+                type="entrega", user="50%_silva", module="all", date_start=HOJE, limit=20, offset=40
+            )
+        )
+        query, args = conn.calls[-1]
+        assert "LIMIT $6 OFFSET $7" in query
+        assert "(data, hora_inicio, id) >" not in query
+        assert args == (HOJE, date(9999, 12, 31), "entrega", "%50\\%\\_silva%", None, 20, 40)
+
+        cursor = encode_cursor(EventoResponse(**registro(7, HOJE, "14:30")))
+        eventos, next_cursor = await service.page_eventos(
+            EventoSearchParams(limit=10, cursor=cursor)
+        )
+        query, args = conn.calls[-1]
+        assert "(data, hora_inicio, id) >" in query
+        assert args[5] == 11  # limit + 1: sabe se há próxima página
+        assert args[7:] == (HOJE, time(14, 30), "evt-0007")
+        assert (eventos, next_cursor) == ([], None)
+
+        await service.get_upcoming_eventos(7)
+        assert conn.calls[-1][1] == (HOJE, HOJE + timedelta(days=7))
+
+    @pytest.mark.asyncio
+    async def test_atualizacao_parcial(self, conn):
+        service = PostgresCalendarioEventosService()
+        criado = await service.create_evento(EventoCreate(**evento()))
+
+        atualizado = await service.update_evento(
+            criado.id, EventoUpdate(endTime="12:30", location=None)
+        )
+        assert atualizado.endTime == "12:30"
+        assert atualizado.title == "Reunião semanal"
+        assert "FOR UPDATE" in conn.calls[-2][0]
+
+        with pytest.raises(ValueError):
+            await service.update_evento(criado.id, EventoUpdate(endTime="09:00"))
+        assert await service.update_evento("evt-inexistente", EventoUpdate(title="Nada")) is None
+
+    @pytest.mark.asyncio
+    async def test_eventos_antigos_continuam_legiveis(self, conn):
+        service = PostgresCalendarioEventosService()
+        antigo = {
+            "id": "evt-antigo",
+            "tipo": "entrega",
+            "titulo": "Entrega antiga",
+            "responsavel": "Maria Souza",
+            "data": HOJE - timedelta(days=800),
+            "hora_inicio": time(9, 0),
+            "hora_fim": time(10, 0),
+            "localizacao": None,
+            "observacoes": None,
+            "modulo": None,
+            "lembrete_homeoffice": False,
+            "evento_vinculado_id": None,
+            "criado_em": datetime.now(),
+            "atualizado_em": datetime.now(),
+        }
+        conn.rows["evt-antigo"] = antigo
+        lido = await service.get_evento_by_id("evt-antigo")
+        assert lido.title == "Entrega antiga" and lido.startTime == "09:00"
@@ -0,0 +1,130 @@
+"""
+SIGMA-PLI - Testes do feed iCalendar do calendário (streaming, ETag/304, cache de VEVENTs)
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers.M04_calendario.router_calendario_eventos import router as calendario_router
+from app.services.M04_calendario import service_calendario_eventos as service_eventos
+from app.services.M04_calendario import service_calendario_ics as ics
+from app.services.M04_calendario.service_calendario_eventos import CalendarioEventosService
+from app.services.M04_calendario.service_calendario_ics import FragmentosICS, escapar, linha
+
+AMANHA = date.today() + timedelta(days=1)
+
+
+def evento(**campos):
+    dados = {
+        "type": "reuniao",
+        "title": "Reunião de acompanhamento",
+        "user": "Maria Souza",
+        "date": AMANHA.isoformat(),
+        "startTime": "10:00",
+        "endTime": "11:00",
+        "module": "M00_home",
+    }
+    dados.update(campos)
+    return dados
+
+
+def desdobrar(corpo: str) -> list[str]:
+    return corpo.replace("\r\n ", "").split("\r\n")
+
+
+@pytest.fixture
+def fragmentos(monkeypatch):
+    fragmentos = FragmentosICS(max_entries=100)
+    monkeypatch.setattr(ics, "fragmentos_ics", fragmentos)
+    monkeypatch.setattr(service_eventos, "fragmentos_ics", fragmentos)
+    return fragmentos
+
+
+@pytest.fixture
+def client(monkeypatch, fragmentos):
+    service = CalendarioEventosService(sample_data=False)
+    monkeypatch.setattr(service_eventos, "_service_instance", service)
+    app = FastAPI()
+    app.include_router(calendario_router)
+    return TestClient(app)
+
+
+class TestFormatoICS:
+    def test_escape_e_dobra_de_linhas(self):
+        assert escapar("a,b;c\\d\ne") == "a\\,b\\;c\\\\d\\ne"
+
+        texto = "DESCRIPTION:" + "Reunião de planejamento ção " * 8
+        dobrada = linha(texto)
+        fisicas = dobrada[:-2].split("\r\n")
+        assert len(fisicas) > 1
+        assert all(len(f.encode("utf-8")) <= 75 for f in fisicas)
+        assert all(f.startswith(" ") for f in fisicas[1:])
+        assert desdobrar(dobrada)[0] == texto
+
+
+class TestFeedICS:
+    def test_feed_com_eventos_e_feriados(self, client):
+        criado = client.post("/api/v1/calendario/eventos", json=evento(notes="Pauta: a, b")).json()
+
+        response = client.get("/api/v1/calendario/ics")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/calendar; charset=utf-8"
+        linhas = desdobrar(response.text)
+        assert linhas[0] == "BEGIN:VCALENDAR" and linhas[-2] == "END:VCALENDAR"
+        assert f"UID:{criado['id']}@{ics.UID_DOMINIO}" in linhas
+        inicio = AMANHA.strftime("%Y%m%d")
+        assert f"DTSTART;TZID=America/Sao_Paulo:{inicio}T100000" in linhas
+        assert "DESCRIPTION:Responsável: Maria Souza\\nMódulo: M00_home\\n\\nPauta: a\\, b" in linhas
+        assert f"UID:feriado-{date.today().year}-12-25@{ics.UID_DOMINIO}" in linhas
+        assert linhas.count("BEGIN:VEVENT") == linhas.count("END:VEVENT")
+
+        sem_feriados = client.get("/api/v1/calendario/ics", params={"feriados": False}).text
+        assert "feriado-" not in sem_feriados
+
+    def test_etag_304_e_invalidacao(self, client, fragmentos):
+        criado = client.post("/api/v1/calendario/eventos", json=evento()).json()
+
+        first = client.get("/api/v1/calendario/ics")
+        etag = first.headers["etag"]
+        assert "max-age=" in first.headers["cache-control"]
+        again = client.get("/api/v1/calendario/ics", headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b""
+
+        # Outro filtro, outro ETag; o VEVENT sai do cache
+        filtrado = client.get("/api/v1/calendario/ics", params={"user": "souza"})
+        assert filtrado.headers["etag"] != etag
+        assert fragmentos.stats()["hits"] == 1
+
+        client.put(f"/api/v1/calendario/eventos/{criado['id']}", json={"title": "Novo título"})
+        assert fragmentos.stats()["invalidations"] == 1
+        changed = client.get("/api/v1/calendario/ics", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert "SUMMARY:Novo título" in desdobrar(changed.text)
+
+        client.delete(f"/api/v1/calendario/eventos/{criado['id']}")
+        assert fragmentos.stats()["entries"] == 0
+        removido = client.get(
+            "/api/v1/calendario/ics", headers={"If-None-Match": changed.headers["etag"]}
+        )
+        assert removido.status_code == 200
+        assert criado["id"] not in removido.text
+
+    def test_filtros_e_paginas(self, client, monkeypatch):
+        monkeypatch.setattr(ics, "PAGINA_EVENTOS", 2)
+        ids = [
+            client.post(
+                "/api/v1/calendario/eventos", json=evento(startTime=f"0{h}:00", endTime=f"0{h}:30")
+            ).json()["id"]
+            for h in range(5)
+        ]
+        outro = client.post("/api/v1/calendario/eventos", json=evento(user="João Lima")).json()["id"]
+
+        corpo = client.get(
+            "/api/v1/calendario/ics", params={"user": "souza", "feriados": False}
+        ).text
+        uids = [item[4:].split("@")[0] for item in desdobrar(corpo) if item.startswith("UID:")]
+        assert uids == ids
+        assert outro not in corpo
@@ -0,0 +1,195 @@
+"""
+SIGMA-PLI - Testes do cache de CEP (memória + SQLite) e da leitura pelo CEPService
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import database
+from app.services.M01_auth import service_external_apis
+from app.services.M01_auth.service_cep_cache import (
+    CEPCache,
+    CEPCacheEntry,
+    PostgresCEPStore,
+    SQLiteCEPStore,
+)
+from scripts.preload_cep_cache import read_dump
+
+PAULISTA = {"cep": "01310-100", "logradouro": "Avenida Paulista", "uf": "SP"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CEPCache(SQLiteCEPStore(str(tmp_path / "cep.sqlite3")), max_entries=2)
+
+
+class FailingStore:
+    name = "falha"
+
+    async def get(self, cep, valido_apos):
+        raise ConnectionError("sem banco")
+
+    async def put_many(self, entries):
+        raise ConnectionError("sem banco")
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.status = 200
+        self.data = data
+
+    async def json(self):
+        return self.data
+
+
+class FakeHTTPClient:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    @asynccontextmanager
+    async def get(self, provider, url, **kwargs):
+        self.calls += 1
+        yield FakeResponse(self.data)
+
+
+class TestCEPCache:
+    """Níveis, TTL positivo/negativo e falhas do armazenamento"""
+
+    @pytest.mark.asyncio
+    async def test_memoria_e_persistente(self, cache):
+        await cache.put("01310100", PAULISTA, True, "viacep")
+        assert (await cache.get("01310100")).dados == PAULISTA
+        assert cache.memory_hits == 1
+
+        cache.clear_memory()
+        entry = await cache.get("01310100")
+        assert entry.provedor == "viacep"
+        assert cache.store_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_ttl_negativo_menor(self, cache):
+        found = cache.entry("01310100", PAULISTA, True, "viacep")
+        missing = cache.entry("99999999", None, False, "viacep")
+        assert missing.expira_em < found.expira_em
+
+    @pytest.mark.asyncio
+    async def test_vencido_nao_retorna(self, cache):
+        vencido = CEPCacheEntry(
+            "01310100",
+            PAULISTA,
+            True,
+            "viacep",
+            datetime.utcnow() - cache.stale_grace - timedelta(seconds=1),
+        )
+        await cache.put_many([vencido])
+        assert await cache.get("01310100") is None
+        assert (await cache.purge_expired())["rows_pruned"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_limitado(self, cache):
+        for cep in ("00000001", "00000002", "00000003"):
+            await cache.put(cep, {"cep": cep}, True, "viacep")
+        assert cache.stats()["memory_entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_falha_no_armazenamento_nao_propaga(self):
+        cache = CEPCache(FailingStore())
+        assert await cache.get("01310100") is None
+        await cache.put("01310100", PAULISTA, True, "viacep")
+        assert cache.store_errors == 2
+        assert (await cache.get("01310100")).dados == PAULISTA
+
+
+class TestCEPServiceComCache:
+    """Consultas repetidas (inclusive de CEP inexistente) não vão ao provedor"""
+
+    @pytest.mark.asyncio
+    async def test_hit_e_miss_cacheados(self, cache, monkeypatch):
+        monkeypatch.setattr(service_external_apis, "cep_cache", cache)
+
+        client = FakeHTTPClient(PAULISTA)
+        monkeypatch.setattr(service_external_apis, "http_client", client)
+        for _ in range(3):
+            result = await service_external_apis.CEPService.consultar_cep("01310-100")
+        assert result["logradouro"] == "Avenida Paulista"
+        assert client.calls == 1
+
+        client = FakeHTTPClient({"erro": True})
+        monkeypatch.setattr(service_external_apis, "http_client", client)
+        for _ in range(3):
+            result = await service_external_apis.AddressService.validar_e_consultar_endereco(
+                "99999-999"
+            )
+        assert result["sucesso"] is False
+        assert client.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_chamada_ao_viacep_nao_prende_conexao(self, monkeypatch):
+        class Conexao:
+            def get_server_pid(self):
+                return 1
+
+            async def fetchrow(self, *args, **kwargs):
+                return None
+
+            async def execute(self, *args, **kwargs):
+                return "INSERT 0 1"
+
+        class Pool:
+            acquired = released = 0
+
+            async def acquire(self):
+                Pool.acquired += 1
+                return Conexao()
+
+            async def release(self, conn):
+                Pool.released += 1
+
+        class ViaCEPLento(FakeHTTPClient):
+            @asynccontextmanager
+            async def get(self, provider, url, **kwargs):
+                self.em_uso = Pool.acquired - Pool.released
+                async with super().get(provider, url, **kwargs) as response:
+                    yield response
+
+        monkeypatch.setattr(database, "postgres_pool", Pool())
+        monkeypatch.setattr(service_external_apis, "cep_cache", CEPCache(PostgresCEPStore()))
+        client = ViaCEPLento(PAULISTA)
+        monkeypatch.setattr(service_external_apis, "http_client", client)
+
+        async with database.request_connection_scope() as lease:
+            result = await service_external_apis.CEPService.consultar_cep("01310-100")
+            assert result["logradouro"] == "Avenida Paulista"
+            assert lease.conn is None
+
+        assert client.em_uso == 0
+        assert Pool.acquired == Pool.released == 2  # leitura + gravação
+        database.pool_metrics.reset()
+
+
+def test_read_dump_filtra_uf(tmp_path):
+    dump = tmp_path / "ceps.csv"
+    dump.write_text(
+        "CEP;Logradouro;Bairro;Cidade;UF\n"
+        "01310-100;Avenida Paulista;Bela Vista;São Paulo;SP\n"
+        "20040-020;Avenida Rio Branco;Centro;Rio de Janeiro;RJ\n",
+        encoding="utf-8",
+    )
+    rows = list(read_dump(str(dump), "SP"))
+    assert rows == [
+        (
+            "01310100",
+            {
+                "cep": "01310-100",
+                "logradouro": "Avenida Paulista",
+                "complemento": "",
+                "bairro": "Bela Vista",
+                "uf": "SP",
+                "ibge": "",
+                "localidade": "São Paulo",
+            },
+        )
+    ]
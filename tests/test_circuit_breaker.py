@@ -0,0 +1,196 @@
+"""
+SIGMA-PLI - Testes do circuit breaker por provedor e das respostas stale do cache
+"""
+
+from datetime import datetime, timedelta
+
+import aiohttp
+import pytest
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from app.http_client import SharedHTTPClient
+from app.services.M01_auth import service_cnpj_lookup, service_external_apis
+from app.services.M01_auth.service_cep_cache import CEPCache, CEPCacheEntry, SQLiteCEPStore
+from app.services.M01_auth.service_cnpj_lookup import CNPJLookupEngine
+
+PAULISTA = {"cep": "01310100", "logradouro": "Avenida Paulista", "uf": "SP"}
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio():
+    return Relogio()
+
+
+@pytest.fixture
+def breaker(relogio):
+    return CircuitBreaker(
+        "viacep", window_seconds=60, min_requests=4, error_rate=0.5, open_seconds=30, clock=relogio
+    )
+
+
+class TestCircuitBreaker:
+    """Fechado → aberto → semiaberto (uma chamada de teste) → fechado/aberto"""
+
+    def test_abre_pela_taxa_de_falhas(self, breaker):
+        for ok in (True, False, True):
+            breaker.acquire()
+            breaker.record(ok)
+        assert breaker.state == CLOSED  # abaixo do mínimo de chamadas
+
+        breaker.acquire()
+        breaker.record(False)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError) as exc:
+            breaker.acquire()
+        assert exc.value.retry_after == pytest.approx(30)
+        assert breaker.rejected == 1
+
+    def test_falhas_antigas_saem_da_janela(self, breaker, relogio):
+        for _ in range(3):
+            breaker.acquire()
+            breaker.record(False)
+        relogio.agora += 61
+        for _ in range(3):
+            breaker.acquire()
+            breaker.record(True)
+        assert breaker.state == CLOSED
+        assert breaker.stats()["window_requests"] == 3
+
+    def test_chamada_lenta_conta_como_falha(self, breaker):
+        for _ in range(4):
+            breaker.acquire()
+            breaker.record(True, elapsed_ms=5000)
+        assert breaker.state == OPEN
+
+    def test_semiaberto_permite_um_teste(self, breaker, relogio):
+        breaker._transition(OPEN)
+        relogio.agora += 30
+        assert breaker.state == HALF_OPEN
+
+        breaker.acquire()
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire()  # teste em andamento
+
+        breaker.record(True)
+        assert breaker.state == CLOSED
+        assert breaker.stats()["transitions"] == {
+            "closed->open": 1,
+            "half_open->closed": 1,
+            "open->half_open": 1,
+        }
+
+    def test_teste_com_falha_reabre(self, breaker, relogio):
+        breaker._transition(OPEN)
+        relogio.agora += 30
+        breaker.acquire()
+        breaker.record(False)
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == pytest.approx(30)
+
+    def test_chamada_cancelada_libera_o_teste(self, breaker, relogio):
+        breaker._transition(OPEN)
+        relogio.agora += 30
+        breaker.acquire()
+        breaker.record(None)
+        assert breaker.state == HALF_OPEN
+        breaker.acquire()
+
+
+class TestSharedHTTPClientComBreaker:
+    @pytest.mark.asyncio
+    async def test_circuito_aberto_nao_chama_a_rede(self):
+        client = SharedHTTPClient(
+            breakers={"viacep": CircuitBreaker("viacep", min_requests=2, error_rate=0.5)}
+        )
+        try:
+            for _ in range(2):
+                with pytest.raises(aiohttp.ClientError):
+                    async with client.get("viacep", "http://127.0.0.1:1/"):
+                        pass
+            with pytest.raises(CircuitOpenError):
+                async with client.get("viacep", "http://127.0.0.1:1/"):
+                    pass
+        finally:
+            await client.close()
+
+        stats = client.get_stats()
+        assert stats["providers"]["viacep"]["errors"] == 2
+        assert stats["circuit_breakers"]["viacep"]["state"] == OPEN
+        assert stats["circuit_breakers"]["viacep"]["rejected"] == 1
+
+
+class CircuitoAberto:
+    """Cliente HTTP com o circuito do provedor aberto"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def check_circuit(self, provider):
+        raise CircuitOpenError(provider, 30)
+
+    def get(self, provider, url, **kwargs):
+        self.calls += 1
+        raise CircuitOpenError(provider, 30)
+
+
+class TestRespostasStale:
+    """Com o circuito aberto, entradas vencidas (dentro da carência) são servidas"""
+
+    @pytest.mark.asyncio
+    async def test_cep_vencido_servido_como_stale(self, tmp_path, monkeypatch):
+        cache = CEPCache(SQLiteCEPStore(str(tmp_path / "cep.sqlite3")), stale_grace_hours=24)
+        vencido = CEPCacheEntry(
+            "01310100", PAULISTA, True, "viacep", datetime.utcnow() - timedelta(hours=1)
+        )
+        await cache.put_many([vencido])
+        monkeypatch.setattr(service_external_apis, "cep_cache", cache)
+        monkeypatch.setattr(service_external_apis, "http_client", CircuitoAberto())
+
+        resultado = await service_external_apis.CEPService.consultar_cep("01310-100")
+        assert resultado["logradouro"] == "Avenida Paulista"
+        assert resultado["stale"] is True
+        assert cache.stats()["stale_hits"] == 1
+
+        semdado = await service_external_apis.CEPService.consultar_cep("04538-133")
+        assert semdado == {"erro": True, "mensagem": "Serviço de CEP indisponível"}
+
+    @pytest.mark.asyncio
+    async def test_carencia_vencida_e_removida(self, tmp_path):
+        cache = CEPCache(SQLiteCEPStore(str(tmp_path / "cep.sqlite3")), stale_grace_hours=1)
+        antigo = CEPCacheEntry(
+            "01310100", PAULISTA, True, "viacep", datetime.utcnow() - timedelta(hours=2)
+        )
+        recente = antigo._replace(cep="04538133", expira_em=datetime.utcnow())
+        await cache.put_many([antigo, recente])
+
+        assert await cache.get("01310100", stale=True) is None
+        assert (await cache.purge_expired())["rows_pruned"] == 1
+        assert (await cache.get("04538133", stale=True)).cep == "04538133"
+
+    @pytest.mark.asyncio
+    async def test_cnpj_vencido_servido_como_stale(self, monkeypatch):
+        fake = CircuitoAberto()
+        monkeypatch.setattr(service_cnpj_lookup, "http_client", fake)
+        engine = CNPJLookupEngine(rate_per_minute=60, burst=1)
+        resultado = engine._result("11222333000181", {"nome": "EMPRESA"}, "cache")
+        engine._remember(resultado, datetime.utcnow() - timedelta(hours=1))
+
+        stale = await engine.lookup("11222333000181")
+        assert stale.stale is True
+        assert stale.dados == {"nome": "EMPRESA"}
+        assert fake.calls == 0
+        assert engine.bucket.acquired == 0  # circuito aberto não ocupa a fila
+        assert engine.stats()["stale_served"] == 1
+        assert engine.stats()["failures"] == 0
+        assert await engine.poll("11222333000181") == ("concluida", stale)
+
+        resposta = service_external_apis.CNPJService.resposta_consulta("11222333000181", stale)
+        assert resposta["stale"] is True
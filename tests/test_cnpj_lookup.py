@@ -0,0 +1,237 @@
+"""
+SIGMA-PLI - Testes do motor de consultas de CNPJ (cache, single-flight e fila)
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app import database
+from app.schemas.schema_cadastro_instituicao import InstituicaoCreate
+from app.services import service_cadastro_instituicao
+from app.services.M01_auth import service_cnpj_lookup
+from app.services.M01_auth.service_cnpj_lookup import CNPJLookupEngine, TokenBucket
+from app.services.M01_auth.service_external_apis import CNPJService
+
+CNPJ = "11222333000181"
+RECEITA = {
+    "status": "OK",
+    "nome": "EMPRESA TESTE LTDA",
+    "fantasia": "TESTE",
+    "abertura": "02/01/2001",
+    "porte": "DEMAIS",
+    "situacao": "ATIVA",
+    "atividade_principal": [{"text": "Consultoria"}],
+}
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self.data = data
+
+    async def json(self, **kwargs):
+        return self.data
+
+
+class FakeReceitaWS:
+    """Responde em sequência os (status, corpo) informados, com atraso"""
+
+    def __init__(self, *responses, delay=0.05):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = 0
+
+    @asynccontextmanager
+    async def get(self, provider, url, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        status, data = self.responses[min(self.calls, len(self.responses)) - 1]
+        yield FakeResponse(status, data)
+
+    def check_circuit(self, provider):
+        pass
+
+
+@pytest.fixture
+def receita(monkeypatch):
+    def install(*responses, delay=0.05):
+        fake = FakeReceitaWS(*responses, delay=delay)
+        monkeypatch.setattr(service_cnpj_lookup, "http_client", fake)
+        return fake
+
+    return install
+
+
+class TestTokenBucket:
+    """Enfileira em vez de recusar"""
+
+    @pytest.mark.asyncio
+    async def test_espera_pelo_token(self):
+        bucket = TokenBucket(rate_per_minute=1200, burst=1)  # 1 token a cada 50ms
+        started = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+        assert time.monotonic() - started >= 0.09
+        assert bucket.acquired == 3
+        assert bucket.waiting == 0
+
+
+class TestCNPJLookupEngine:
+    """Single-flight, cache negativo, 429 e modo pendente"""
+
+    @pytest.mark.asyncio
+    async def test_consultas_simultaneas_compartilham_requisicao(self, receita):
+        fake = receita((200, RECEITA))
+        engine = CNPJLookupEngine(rate_per_minute=60, burst=5)
+
+        results = await asyncio.gather(*(engine.lookup(CNPJ) for _ in range(5)))
+
+        assert fake.calls == 1
+        assert engine.coalesced == 4
+        assert {r.status for r in results} == {"encontrado"}
+        assert results[0].dados["atividade_principal"] == "Consultoria"
+
+        again = await engine.lookup(CNPJ)
+        assert again.origem == "cache"
+        assert fake.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_nao_encontrado_e_cacheado(self, receita):
+        fake = receita((200, {"status": "ERROR", "message": "CNPJ inválido"}))
+        engine = CNPJLookupEngine(rate_per_minute=60, burst=5)
+
+        assert (await engine.lookup(CNPJ)).status == "nao_encontrado"
+        assert (await engine.lookup(CNPJ)).status == "nao_encontrado"
+        assert fake.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_429_volta_para_a_fila(self, receita):
+        fake = receita((429, {}), (200, RECEITA), delay=0)
+        engine = CNPJLookupEngine(rate_per_minute=1200, burst=1)
+
+        result = await engine.lookup(CNPJ)
+
+        assert result.status == "encontrado"
+        assert fake.calls == 2
+        assert engine.rate_limited == 1
+
+    @pytest.mark.asyncio
+    async def test_erro_nao_e_cacheado(self, receita):
+        fake = receita((500, {}), (200, RECEITA), delay=0)
+        engine = CNPJLookupEngine(rate_per_minute=1200, burst=5)
+
+        assert (await engine.lookup(CNPJ)).status == "erro"
+        assert (await engine.poll(CNPJ))[1].status == "erro"
+        assert (await engine.lookup(CNPJ)).status == "encontrado"
+        assert fake.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_pendente_quando_a_fila_demora(self, receita):
+        receita((200, RECEITA), delay=0)
+        engine = CNPJLookupEngine(rate_per_minute=1200, burst=1)
+        await engine.lookup("00000000000191")  # consome o único token
+
+        assert await engine.lookup(CNPJ, wait_seconds=0.001) is None
+        assert await engine.poll(CNPJ) == ("pendente", None)
+        assert engine.queue_position()["fila"] == 1
+
+        await asyncio.sleep(0.1)
+        situacao, result = await engine.poll(CNPJ)
+        assert situacao == "concluida"
+        assert result.status == "encontrado"
+
+        resposta = CNPJService.resposta_consulta(CNPJ, None)
+        assert resposta["pendente"] is True
+
+    @pytest.mark.asyncio
+    async def test_consulta_em_background_nao_herda_lease_do_request(self, receita):
+        receita((200, RECEITA), delay=0.02)
+
+        class Store:
+            lease = "nao gravado"
+
+            async def get(self, cnpj, valido_apos):
+                return None
+
+            async def put(self, *args):
+                Store.lease = database._request_lease.get()
+
+        engine = CNPJLookupEngine(rate_per_minute=1200, burst=1, store=Store())
+        async with database.request_connection_scope():
+            assert await engine.lookup(CNPJ, wait_seconds=0.001) is None  # 202
+
+        await asyncio.sleep(0.05)
+        assert (await engine.poll(CNPJ))[0] == "concluida"
+        assert Store.lease is None
+
+    @pytest.mark.asyncio
+    async def test_consulta_pendente_nao_prende_conexao(self, receita, monkeypatch):
+        receita((200, RECEITA), delay=0.05)
+
+        class Conexao:
+            def get_server_pid(self):
+                return 1
+
+            async def fetchrow(self, *args, **kwargs):
+                return None
+
+            async def execute(self, *args, **kwargs):
+                return "INSERT 0 1"
+
+        class Pool:
+            acquired = released = 0
+
+            async def acquire(self):
+                Pool.acquired += 1
+                return Conexao()
+
+            async def release(self, conn):
+                Pool.released += 1
+
+        monkeypatch.setattr(database, "postgres_pool", Pool())
+        engine = CNPJLookupEngine(
+            rate_per_minute=1200, burst=1, store=service_cnpj_lookup.PostgresCNPJStore()
+        )
+        async with database.request_connection_scope() as lease:
+            consulta = asyncio.create_task(engine.lookup(CNPJ, wait_seconds=1))
+            await asyncio.sleep(0.02)  # na fila da ReceitaWS
+            assert Pool.acquired == Pool.released == 1  # só a leitura do cache
+            assert lease.conn is None
+            assert (await consulta).status == "encontrado"
+
+        assert Pool.acquired == Pool.released == 2  # + gravação do resultado
+        database.pool_metrics.reset()
+
+
+class TestPrefillInstituicao:
+    """Cadastro de instituição reaproveita a consulta já feita"""
+
+    @pytest.mark.asyncio
+    async def test_prefill_sem_nova_consulta(self, receita, monkeypatch):
+        fake = receita((200, RECEITA), delay=0)
+        engine = CNPJLookupEngine(rate_per_minute=60, burst=5)
+        monkeypatch.setattr(service_cadastro_instituicao, "cnpj_lookup", engine)
+        await engine.lookup(CNPJ)
+
+        data = InstituicaoCreate(
+            nome="Empresa Teste",
+            cnpj="11.222.333/0001-81",
+            email="contato@teste.com.br",
+            telefone="1133334444",
+            nome_fantasia="Nome do formulário",
+            cep="01310100",
+            logradouro="Avenida Paulista",
+            numero="1000",
+            bairro="Bela Vista",
+            cidade="São Paulo",
+            uf="SP",
+        )
+        filled = await service_cadastro_instituicao.InstituicaoService.prefill_from_cnpj(data)
+
+        assert filled.razao_social == "EMPRESA TESTE LTDA"
+        assert filled.nome_fantasia == "Nome do formulário"
+        assert filled.porte_empresa == "DEMAIS"
+        assert filled.data_abertura.isoformat() == "2001-01-02"
+        assert fake.calls == 1
@@ -0,0 +1,166 @@
+"""
+SIGMA-PLI - Testes do lease de conexões PostgreSQL (app.database)
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+
+import app.database as database
+
+
+class FakePool:
+    """Pool mínimo compatível com a API usada por app.database"""
+
+    def __init__(self):
+        self.acquired = 0
+        self.released = 0
+        self.closed = 0
+
+    async def acquire(self):
+        self.acquired += 1
+        await asyncio.sleep(0)
+        return object()
+
+    async def release(self, conn):
+        self.released += 1
+
+    def get_min_size(self):
+        return 2
+
+    def get_max_size(self):
+        return 10
+
+    def get_size(self):
+        return 2
+
+    def get_idle_size(self):
+        return 2 - (self.acquired - self.released)
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(database, "postgres_pool", pool)
+    database.pool_metrics.reset()
+    yield pool
+    database.pool_metrics.reset()
+
+
+class TestPostgresLease:
+    """Testes do escopo de lease por request"""
+
+    @pytest.mark.asyncio
+    async def test_lease_avulso_sempre_devolve(self, fake_pool):
+        """Fora de um request cada bloco faz seu próprio lease"""
+        with pytest.raises(RuntimeError):
+            async with database.postgres_connection():
+                raise RuntimeError("falha")
+
+        assert fake_pool.acquired == 1
+        assert fake_pool.released == 1
+
+    @pytest.mark.asyncio
+    async def test_escopo_reutiliza_conexao(self, fake_pool):
+        """Dentro do escopo todas as chamadas usam a mesma conexão"""
+        async with database.request_connection_scope():
+            async with database.postgres_connection() as conn1:
+                pass
+            async with database.postgres_connection() as conn2:
+                pass
+            assert conn1 is conn2
+            assert fake_pool.released == 0
+
+        assert fake_pool.acquired == 1
+        assert fake_pool.released == 1
+
+    @pytest.mark.asyncio
+    async def test_escopo_sem_uso_nao_adquire(self, fake_pool):
+        """Requests que não usam o banco não ocupam conexão"""
+        async with database.request_connection_scope():
+            pass
+
+        assert fake_pool.acquired == 0
+
+    @pytest.mark.asyncio
+    async def test_tasks_concorrentes_nao_sobrepoem_operacoes(self, fake_pool):
+        """Outras tasks do request recebem leases avulsos enquanto a conexão está em uso"""
+        em_uso = set()
+
+        async def usar():
+            async with database.postgres_connection() as conn:
+                assert id(conn) not in em_uso  # asyncpg: uma operação por vez
+                em_uso.add(id(conn))
+                await asyncio.sleep(0.001)
+                em_uso.discard(id(conn))
+                return conn
+
+        async with database.request_connection_scope() as lease:
+            conexoes = await asyncio.gather(*(usar() for _ in range(4)))
+            assert sum(conn is lease.conn for conn in conexoes) == 1
+
+            # Blocos aninhados na mesma task continuam na conexão do request
+            async with database.postgres_connection() as externa:
+                async with database.postgres_connection() as interna:
+                    assert externa is interna is lease.conn
+
+        assert fake_pool.acquired == fake_pool.released == 4
+        assert database.get_pool_stats()["active_leases"] == 0
+
+    @pytest.mark.asyncio
+    async def test_lease_encerrado_nao_retem_conexao(self, fake_pool):
+        """Tarefas que sobrevivem ao request fazem leases avulsos"""
+        async with database.request_connection_scope() as lease:
+            herdado = database._request_lease.get()
+            isolado = database.context_without_request_lease()
+
+        assert lease.closed and herdado is lease
+        assert isolado.run(database._request_lease.get) is None
+
+        async def depois_do_request():
+            async with database.postgres_connection():
+                pass
+
+        await asyncio.create_task(depois_do_request(), context=isolado)
+        # Contexto herdado com o lease já encerrado: também não fica preso nele
+        token = database._request_lease.set(lease)
+        try:
+            await depois_do_request()
+        finally:
+            database._request_lease.reset(token)
+
+        assert lease.conn is None
+        assert fake_pool.acquired == fake_pool.released == 2
+        assert database.get_pool_stats()["active_leases"] == 0
+
+    @pytest.mark.asyncio
+    async def test_alerta_de_vazamento(self, fake_pool, monkeypatch):
+        """Leases acima do limite são contabilizados como possível vazamento"""
+        monkeypatch.setattr(database.settings, "postgres_lease_warn_seconds", 0.0)
+
+        async with database.postgres_connection():
+            pass
+
+        stats = database.get_pool_stats()
+        assert stats["lease"]["leak_warnings"] == 1
+        assert stats["acquire"]["count"] == 1
+        assert stats["active_leases"] == 0
+
+    def test_middleware_compartilha_conexao_no_request(self, fake_pool):
+        """Middleware + dependency: uma única conexão por request HTTP"""
+        app = FastAPI()
+        app.add_middleware(database.PostgresLeaseMiddleware)
+
+        @app.get("/teste")
+        async def rota(conn=Depends(database.get_db_connection)):
+            async with database.postgres_connection() as outra:
+                return {"mesma": outra is conn}
+
+        client = TestClient(app)
+        response = client.get("/teste")
+
+        assert response.json() == {"mesma": True}
+        assert fake_pool.acquired == 1
+        assert fake_pool.released == 1
@@ -0,0 +1,112 @@
+"""
+SIGMA-PLI - Testes das tabelas de feriados por ano e dos cálculos de dias úteis
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers.M04_calendario.router_calendario_eventos import router as calendario_router
+from app.services.service_feriados import FeriadoService
+from app.utils import http_cache
+from app.utils.http_cache import ResponseCache
+
+
+def util_por_varredura(dia: date) -> bool:
+    """Referência: recalcula a lista de feriados do ano a cada dia"""
+    feriados = (
+        FeriadoService.obter_feriados_nacionais(dia.year)
+        + FeriadoService.obter_feriados_estaduais_sp(dia.year)
+        + FeriadoService.obter_feriados_municipais_sp(dia.year)
+    )
+    return dia.weekday() < 5 and all(f["data"] != dia for f in feriados)
+
+
+class TestTabelaFeriados:
+    def test_tabela_memoizada_por_ano(self):
+        assert FeriadoService.tabela(2026) is FeriadoService.tabela(2026)
+        assert FeriadoService.eh_feriado(date(2026, 4, 3))["nome"] == "Sexta-feira Santa"
+        assert FeriadoService.eh_feriado(date(2026, 4, 4)) is None
+
+        feriados = FeriadoService.obter_todos_feriados(2026)
+        assert [f["data"] for f in feriados] == sorted(f["data"] for f in feriados)
+        feriados.clear()  # cópia: não altera a tabela
+        assert len(FeriadoService.obter_todos_feriados(2026)) == 14
+
+    def test_intervalo_mes_e_proximo(self):
+        intervalo = FeriadoService.obter_feriados_intervalo(date(2026, 12, 20), date(2027, 1, 31))
+        assert [f["nome"] for f in intervalo] == [
+            "Natal",
+            "Confraternização Universal",
+            "Aniversário de São Paulo",
+        ]
+        assert [f["data"].day for f in FeriadoService.obter_feriados_mes(2026, 11)] == [2, 15, 20]
+        assert FeriadoService.obter_proximo_feriado(date(2026, 4, 3))["nome"] == "Tiradentes"
+        assert FeriadoService.obter_proximo_feriado(date(2026, 12, 25))["data"] == date(2027, 1, 1)
+
+
+class TestDiasUteis:
+    def test_contagem(self):
+        # Abril/2026: 22 dias de semana, menos Sexta-feira Santa (3) e Tiradentes (21)
+        assert FeriadoService.dias_uteis_entre(date(2026, 4, 1), date(2026, 4, 30)) == 20
+        assert FeriadoService.dias_uteis_entre(date(2026, 4, 3), date(2026, 4, 3)) == 0
+        assert FeriadoService.dias_uteis_entre(date(2026, 4, 30), date(2026, 4, 1)) == 0
+
+    def test_prazos(self):
+        # Quinta antes da Sexta-feira Santa: +1 útil pula o feriado e o fim de semana
+        assert FeriadoService.adicionar_dias_uteis(date(2026, 4, 2), 1) == date(2026, 4, 6)
+        assert FeriadoService.adicionar_dias_uteis(date(2026, 4, 6), -1) == date(2026, 4, 2)
+        assert FeriadoService.adicionar_dias_uteis(date(2026, 4, 4), 0) == date(2026, 4, 6)
+        assert FeriadoService.proximo_dia_util(date(2026, 12, 31)) == date(2027, 1, 4)
+        assert FeriadoService.eh_dia_util(date(2026, 1, 25)) is False  # domingo e aniversário SP
+
+    def test_equivale_a_varredura_entre_anos(self):
+        rng = random.Random(3)
+        for _ in range(40):
+            inicio = date(2024, 1, 1) + timedelta(days=rng.randrange(1200))
+            fim = inicio + timedelta(days=rng.randrange(0, 900))
+            esperado = sum(
+                util_por_varredura(inicio + timedelta(days=i)) for i in range((fim - inicio).days + 1)
+            )
+            assert FeriadoService.dias_uteis_entre(inicio, fim) == esperado
+
+            dias = rng.randrange(-300, 300) or 1
+            passo = timedelta(days=1 if dias > 0 else -1)
+            dia, contados = inicio, 0
+            while contados < abs(dias):
+                dia += passo
+                contados += util_por_varredura(dia)
+            assert FeriadoService.adicionar_dias_uteis(inicio, dias) == dia
+
+
+class TestRotasDiasUteis:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(http_cache, "response_cache", ResponseCache(max_entries=16))
+        app = FastAPI()
+        app.include_router(calendario_router)
+        return TestClient(app)
+
+    def test_endpoints(self, client):
+        contar = client.get(
+            "/api/v1/calendario/dias-uteis/contar",
+            params={"inicio": "2026-04-01", "fim": "2026-04-30"},
+        )
+        assert contar.json()["dias_uteis"] == 20
+        assert "etag" in contar.headers
+
+        adicionar = client.get(
+            "/api/v1/calendario/dias-uteis/adicionar", params={"data": "2026-04-02", "dias": 1}
+        )
+        assert adicionar.json() == {"data": "2026-04-02", "dias": 1, "resultado": "2026-04-06"}
+
+        proximo = client.get("/api/v1/calendario/dias-uteis/proximo", params={"data": "2026-12-31"})
+        assert proximo.json()["proximo_dia_util"] == "2027-01-04"
+
+        fora = client.get(
+            "/api/v1/calendario/dias-uteis/adicionar", params={"data": "9999-12-30", "dias": 10}
+        )
+        assert fora.status_code == 400
@@ -0,0 +1,138 @@
+"""
+SIGMA-PLI - Testes do cache HTTP de dados de referência (ETag, 304, bytes em memória)
+"""
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.routers.M01_auth import router_localizacao_br
+from app.routers.M04_calendario.router_calendario_eventos import router as calendario_router
+from app.services.M01_auth import service_localizacao_br
+from app.services.M01_auth.service_localidades_ibge import LocalidadesIBGE, LocalidadesIndex
+from app.utils import http_cache
+from app.utils.http_cache import ResponseCache, cache_response
+
+UFS = [[35, "SP", "São Paulo", "Sudeste"], [33, "RJ", "Rio de Janeiro", "Sudeste"]]
+MUNICIPIOS = [[3550308, "São Paulo", "SP"], [3304557, "Rio de Janeiro", "RJ"]]
+
+
+class Item(BaseModel):
+    nome: str
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(max_entries=16)
+    monkeypatch.setattr(http_cache, "response_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def contador(cache):
+    """App com uma rota que conta as execuções do endpoint"""
+    app = FastAPI()
+    chamadas = {"n": 0}
+
+    @app.get("/itens/{nome}", response_model=Item)
+    @cache_response(600)
+    async def item(nome: str):
+        chamadas["n"] += 1
+        if nome == "erro":
+            raise HTTPException(status_code=404, detail="não existe")
+        return Item(nome=nome)
+
+    return TestClient(app), chamadas
+
+
+class TestCacheResponse:
+    def test_etag_e_304(self, contador, cache):
+        client, chamadas = contador
+        first = client.get("/itens/são")
+        assert first.status_code == 200
+        assert first.json() == {"nome": "são"}
+        assert first.headers["cache-control"] == "public, max-age=600"
+        etag = first.headers["etag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+        assert "last-modified" in first.headers
+
+        second = client.get("/itens/são", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+        weak = client.get("/itens/são", headers={"If-None-Match": f'"x", W/{etag}'})
+        assert weak.status_code == 304
+        since = client.get(
+            "/itens/são", headers={"If-Modified-Since": first.headers["last-modified"]}
+        )
+        assert since.status_code == 304
+
+        assert chamadas["n"] == 1  # acertos não executam o endpoint
+        assert cache.stats()["hits"] == 3
+        assert cache.stats()["not_modified"] == 3
+
+    def test_etag_diferente_devolve_corpo(self, contador):
+        client, _ = contador
+        response = client.get("/itens/a", headers={"If-None-Match": '"outro"'})
+        assert response.status_code == 200
+        assert response.json() == {"nome": "a"}
+
+    def test_erros_nao_sao_cacheados(self, contador, cache):
+        client, chamadas = contador
+        for _ in range(2):
+            assert client.get("/itens/erro").status_code == 404
+        assert chamadas["n"] == 2
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_limitado(self, contador, cache):
+        client, _ = contador
+        cache.max_entries = 2
+        for nome in ("a", "b", "c"):
+            client.get(f"/itens/{nome}")
+        assert cache.stats()["entries"] == 2
+
+
+class TestRotasDeReferencia:
+    def test_municipios_versao_da_base(self, cache, monkeypatch):
+        base = LocalidadesIBGE(local_path=None)
+        base._swap(LocalidadesIndex(UFS, MUNICIPIOS), "teste")
+        monkeypatch.setattr(service_localizacao_br, "localidades_ibge", base)
+        monkeypatch.setattr(router_localizacao_br, "localidades_ibge", base)
+        app = FastAPI()
+        app.include_router(router_localizacao_br.router)
+        client = TestClient(app)
+
+        first = client.get("/api/v1/localizacao/municipios/sp")
+        assert first.json()["municipios"] == [{"id": 3550308, "nome": "São Paulo"}]
+        etag = first.headers["etag"]
+        headers = {"If-None-Match": etag}
+        assert client.get("/api/v1/localizacao/municipios/sp", headers=headers).status_code == 304
+
+        # Base trocada (refresh do IBGE): nova versão, novo corpo
+        base._swap(LocalidadesIndex(UFS, MUNICIPIOS + [[3509502, "Campinas", "SP"]]), "ibge")
+        changed = client.get("/api/v1/localizacao/municipios/sp", headers=headers)
+        assert changed.status_code == 200
+        assert changed.json()["total"] == 2
+        assert changed.headers["etag"] != etag
+
+        ufs = client.get("/api/v1/localizacao/ufs")
+        assert ufs.json()["total"] == 2
+        assert "max-age=" in ufs.headers["cache-control"]
+
+    def test_feriados_do_ano(self, cache):
+        app = FastAPI()
+        app.include_router(calendario_router)
+        client = TestClient(app)
+
+        first = client.get("/api/v1/calendario/feriados/2026")
+        assert first.status_code == 200
+        assert {"data": "2026-04-03", "nome": "Sexta-feira Santa"}.items() <= next(
+            f for f in first.json()["feriados"] if f["nome"] == "Sexta-feira Santa"
+        ).items()
+        again = client.get(
+            "/api/v1/calendario/feriados/2026", headers={"If-None-Match": first.headers["etag"]}
+        )
+        assert again.status_code == 304
+        assert client.get("/api/v1/calendario/feriados/2026/13").status_code == 400
@@ -0,0 +1,102 @@
+"""
+SIGMA-PLI - Testes do cliente HTTP compartilhado (APIs externas)
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from app.http_client import SharedHTTPClient
+from app.services.M01_auth import service_external_apis
+from app.services.M01_auth.service_cep_cache import CEPCache
+
+
+class SemCache:
+    """Armazenamento vazio: toda consulta de CEP vai ao provedor"""
+
+    name = "vazio"
+
+    async def get(self, cep, valido_apos):
+        return None
+
+    async def put_many(self, entries):
+        return len(entries)
+
+
+async def _cep(request):
+    return web.json_response({"cep": request.match_info["cep"], "uf": "SP"})
+
+
+async def _lento(request):
+    await asyncio.sleep(0.5)
+    return web.json_response({})
+
+
+@pytest_asyncio.fixture
+async def servidor():
+    app = web.Application()
+    app.router.add_get("/ws/{cep}/json/", _cep)
+    app.router.add_get("/lento", _lento)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+class TestSharedHTTPClient:
+    """Reuso de conexões e métricas por provedor"""
+
+    @pytest.mark.asyncio
+    async def test_reaproveita_conexao(self, servidor):
+        client = SharedHTTPClient()
+        client.start()
+        try:
+            for _ in range(3):
+                async with client.get("viacep", f"{servidor}/ws/01310100/json/") as response:
+                    assert (await response.json())["uf"] == "SP"
+        finally:
+            await client.close()
+
+        stats = client.get_stats()
+        assert stats["connections_created"] == 1
+        assert stats["connections_reused"] == 2
+        assert stats["providers"]["viacep"]["requests"] == 3
+        assert stats["providers"]["viacep"]["status"] == {200: 3}
+
+    @pytest.mark.asyncio
+    async def test_timeout_por_provedor(self, servidor):
+        client = SharedHTTPClient(provider_timeouts={"lento": 0.1})
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                async with client.get("lento", f"{servidor}/lento"):
+                    pass
+        finally:
+            await client.close()
+
+        provider = client.get_stats()["providers"]["lento"]
+        assert provider["timeouts"] == 1
+        assert provider["errors"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cep_service_usa_cliente_compartilhado(self, servidor, monkeypatch):
+        client = SharedHTTPClient()
+        monkeypatch.setattr(service_external_apis, "http_client", client)
+        monkeypatch.setattr(service_external_apis, "cep_cache", CEPCache(SemCache(), max_entries=0))
+        monkeypatch.setattr(
+            service_external_apis.CEPService, "VIACEP_BASE_URL", f"{servidor}/ws"
+        )
+        try:
+            first = await service_external_apis.CEPService.consultar_cep("01310-100")
+            await service_external_apis.CEPService.consultar_cep("01310-100")
+        finally:
+            await client.close()
+
+        assert first["cep"] == "01310100"
+        assert client.sessions_created == 1
+        assert client.get_stats()["connections_created"] == 1
+        assert client.get_stats()["connections_reused"] == 1
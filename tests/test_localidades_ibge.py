@@ -0,0 +1,237 @@
+"""
+SIGMA-PLI - Testes da base offline de localidades do IBGE e da busca por prefixo
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services.M01_auth import service_localidades_ibge, service_localizacao_br
+from app.services.M01_auth.service_localidades_ibge import (
+    BUNDLED_PATH,
+    LocalidadesIBGE,
+    LocalidadesIndex,
+    dump_dataset,
+    load_dataset,
+    normalize_nome,
+    pendencias_base,
+)
+from app.services.M01_auth.service_localizacao_br import LocalizacaoBRService
+
+UFS = [[35, "SP", "São Paulo", "Sudeste"], [33, "RJ", "Rio de Janeiro", "Sudeste"]]
+MUNICIPIOS = [
+    [3550308, "São Paulo", "SP"],
+    [3549904, "São José dos Campos", "SP"],
+    [3547809, "Santo André", "SP"],
+    [3515103, "Embu-Guaçu", "SP"],
+    [3301009, "Campos dos Goytacazes", "RJ"],
+    [3304557, "Rio de Janeiro", "RJ"],
+]
+
+
+@pytest.fixture
+def index():
+    return LocalidadesIndex(UFS, MUNICIPIOS, "2026-01-01T00:00:00")
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.status = 200
+        self.data = data
+
+    async def json(self):
+        return self.data
+
+
+class FakeIBGE:
+    def __init__(self, routes):
+        self.routes = routes
+        self.urls = []
+
+    @asynccontextmanager
+    async def get(self, provider, url, **kwargs):
+        self.urls.append(url)
+        yield FakeResponse(next(v for k, v in self.routes.items() if url.endswith(k)))
+
+
+class TestLocalidadesIndex:
+    """Normalização, prefixo do nome e de palavras, filtros"""
+
+    def test_normaliza_acento_caixa_e_hifen(self):
+        assert normalize_nome("  Embu-GUAÇU ") == "embu guacu"
+        assert normalize_nome("Alta Floresta D'Oeste") == "alta floresta d oeste"
+
+    def test_prefixo_do_nome_antes_de_palavra(self, index):
+        nomes = [m["nome"] for m in index.buscar("SAO")]
+        assert nomes == ["São José dos Campos", "São Paulo"]
+
+        nomes = [m["nome"] for m in index.buscar("campos")]
+        assert nomes == ["Campos dos Goytacazes", "São José dos Campos"]
+
+    def test_filtro_uf_e_limite(self, index):
+        assert [m["id"] for m in index.buscar("campos", uf="SP")] == [3549904]
+        assert len(index.buscar("s", limite=1)) == 1
+        assert index.buscar("guacu")[0] == {"id": 3515103, "nome": "Embu-Guaçu", "uf": "SP"}
+        assert index.buscar("dos") == []  # conectivo não inicia busca por palavra
+        assert index.buscar("   ") == []
+
+    def test_listagem_por_uf(self, index):
+        assert [m["nome"] for m in index.listar_municipios("RJ")] == [
+            "Campos dos Goytacazes",
+            "Rio de Janeiro",
+        ]
+        assert index.listar_municipios("MG") is None
+
+    def test_pendencias_da_base(self, index):
+        pendencias = pendencias_base(index)
+        assert "2 de 27 UFs" in pendencias
+        assert "6 municípios (mínimo 5500)" in pendencias
+        sem_rj = LocalidadesIndex(UFS, MUNICIPIOS[:4])
+        assert "UFs sem municípios: RJ" in pendencias_base(sem_rj)
+
+    def test_arquivo_ida_e_volta(self, index, tmp_path):
+        path = str(tmp_path / "ibge.json")
+        dump_dataset(index, path)
+        loaded = load_dataset(path)
+        assert list(loaded.rows()) == list(index.rows())
+        assert loaded.gerado_em == index.gerado_em
+
+
+class TestLocalidadesIBGE:
+    """Base empacotada, UF ao vivo e atualização pelo IBGE"""
+
+    def test_base_empacotada_tem_todas_as_ufs(self):
+        index = load_dataset(BUNDLED_PATH)
+        assert len(index.ufs) == 27
+        assert {"sigla": "SP", "nome": "São Paulo"} in index.listar_ufs()
+
+    @pytest.mark.asyncio
+    async def test_uf_ausente_vem_do_ibge_uma_vez(self, monkeypatch, tmp_path):
+        base = LocalidadesIBGE(local_path=str(tmp_path / "local.json"))
+        fake = FakeIBGE({"/municipios": [{"id": 3106200, "nome": "Belo Horizonte"}]})
+        monkeypatch.setattr(service_localizacao_br, "localidades_ibge", base)
+        monkeypatch.setattr(service_localizacao_br, "http_client", fake)
+
+        for _ in range(2):
+            municipios = await LocalizacaoBRService.obter_municipios("mg")
+        assert municipios == [{"id": 3106200, "nome": "Belo Horizonte"}]
+        assert len(fake.urls) == 1
+        assert LocalizacaoBRService.buscar_municipios("belo", uf="mg")[0]["uf"] == "MG"
+
+    @pytest.mark.asyncio
+    async def test_refresh_grava_copia_local(self, monkeypatch, tmp_path):
+        local = str(tmp_path / "local.json")
+        fake = FakeIBGE(
+            {
+                "/estados": [{"id": 35, "sigla": "SP", "nome": "São Paulo", "regiao": {"nome": "Sudeste"}}],
+                "/municipios": [{"id": 3550308, "nome": "São Paulo"}, {"id": 3304557, "nome": "Rio"}],
+            }
+        )
+        monkeypatch.setattr(service_localidades_ibge, "http_client", fake)
+        base = LocalidadesIBGE(local_path=local)
+        assert base.precisa_atualizar()
+
+        assert (await base.refresh())["municipios"] == 1  # UF fora da lista é ignorada
+        assert not base.precisa_atualizar()
+
+        reloaded = LocalidadesIBGE(local_path=local)
+        reloaded.load()
+        assert reloaded.origem == "local"
+        assert reloaded.index.buscar("sao")[0]["id"] == 3550308
+
+
+class FakeIBGEPorUF:
+    """Municípios por UF com concorrência medida; UFs em `falhas` respondem erro"""
+
+    def __init__(self, falhas=()):
+        self.falhas = set(falhas)
+        self.chamadas = 0
+        self.em_andamento = 0
+        self.maximo = 0
+
+    @asynccontextmanager
+    async def get(self, provider, url, **kwargs):
+        sigla = url.rstrip("/").split("/")[-2]
+        self.chamadas += 1
+        self.em_andamento += 1
+        self.maximo = max(self.maximo, self.em_andamento)
+        try:
+            await asyncio.sleep(0.01)
+            if sigla in self.falhas:
+                yield FakeErro()
+            else:
+                codigo = next(c for c, s, _, _ in load_dataset(BUNDLED_PATH).ufs if s == sigla)
+                yield FakeResponse([{"id": codigo * 100000 + 1, "nome": f"Capital {sigla}"}])
+        finally:
+            self.em_andamento -= 1
+
+
+class FakeErro:
+    status = 503
+
+
+class TestAquecimentoESnapshot:
+    """Aquecimento paralelo limitado, snapshot compartilhado e lock entre workers"""
+
+    @pytest.mark.asyncio
+    async def test_aquecimento_paralelo_grava_snapshot(self, monkeypatch, tmp_path):
+        local = str(tmp_path / "local.json")
+        fake = FakeIBGEPorUF()
+        monkeypatch.setattr(service_localidades_ibge, "http_client", fake)
+        base = LocalidadesIBGE(local_path=local)
+        base.load()
+        versao = base.versao
+
+        assert await base.warm_up(timeout=5, concorrencia=4)
+        assert fake.chamadas == 27
+        assert fake.maximo == 4
+        assert len(base.index) == 27
+        assert base.versao == versao + 1  # uma única troca
+        assert not base.precisa_atualizar()
+        assert not os.path.exists(base.lock_path)
+
+        # Outro worker: carrega o snapshot sem consultar o IBGE
+        outro = LocalidadesIBGE(local_path=local)
+        assert await outro.warm_up(timeout=5)
+        assert outro.origem == "local"
+        assert fake.chamadas == 27
+
+    @pytest.mark.asyncio
+    async def test_falha_parcial_mantem_base_vencida(self, monkeypatch, tmp_path):
+        fake = FakeIBGEPorUF(falhas={"SP", "RJ"})
+        monkeypatch.setattr(service_localidades_ibge, "http_client", fake)
+        base = LocalidadesIBGE(local_path=str(tmp_path / "local.json"))
+
+        assert not await base.warm_up(timeout=5)
+        assert set(base.ufs_sem_municipios()) == {"SP", "RJ"}
+        assert base.stats()["aquecimento"]["erros"] == 2
+        assert base.precisa_atualizar()  # a verificação periódica tenta de novo
+
+    @pytest.mark.asyncio
+    async def test_lock_de_outro_worker(self, monkeypatch, tmp_path):
+        local = str(tmp_path / "local.json")
+        fake = FakeIBGEPorUF()
+        monkeypatch.setattr(service_localidades_ibge, "http_client", fake)
+        base = LocalidadesIBGE(local_path=local)
+        with open(base.lock_path, "w") as handle:
+            handle.write("12345")
+
+        assert (await base.refresh())["atualizado"] is False
+        assert fake.chamadas == 0
+
+        # O worker que tem o lock grava o snapshot; este apenas recarrega
+        dump_dataset(LocalidadesIndex(UFS, MUNICIPIOS, "2026-01-01T00:00:00"), local)
+        os.remove(base.lock_path)
+        assert (await base.verificar())["acao"] == "snapshot_recarregado"
+        assert base.stats()["snapshot_reloads"] == 1
+        assert base.index.buscar("campos")[0]["uf"] == "RJ"
+
+    def test_lock_abandonado_e_removido(self, tmp_path):
+        base = LocalidadesIBGE(local_path=str(tmp_path / "local.json"), lock_timeout_seconds=0)
+        with open(base.lock_path, "w") as handle:
+            handle.write("12345")
+        assert base._adquirir_lock()
+        base._liberar_lock()
+        assert not os.path.exists(base.lock_path)
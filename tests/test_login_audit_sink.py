@@ -0,0 +1,133 @@
+"""
+SIGMA-PLI - Testes do buffer de auditoria de login (LoginAuditSink)
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services.M01_auth import service_auth_audit as audit
+
+
+class FakeConnection:
+    """Conexão mínima que registra COPY e INSERT"""
+
+    def __init__(self, fail_copy: bool = False):
+        self.fail_copy = fail_copy
+        self.copy_delay = 0.0
+        self.copied = []
+        self.inserted = []
+
+    async def copy_records_to_table(self, table, schema_name, columns, records):
+        if self.fail_copy:
+            raise ValueError("registro inválido")
+        await asyncio.sleep(self.copy_delay)
+        self.copied.append(list(records))
+
+    async def execute(self, query, *args):
+        self.inserted.append(args)
+
+
+@pytest.fixture
+def fake_conn(monkeypatch):
+    conn = FakeConnection()
+
+    @asynccontextmanager
+    async def fake_postgres_connection():
+        yield conn
+
+    monkeypatch.setattr(audit, "postgres_connection", fake_postgres_connection)
+    return conn
+
+
+def _record(i: int) -> tuple:
+    return (f"user{i}", None, "127.0.0.1", "pytest", False, "Senha incorreta", None, None)
+
+
+class TestLoginAuditSink:
+    """Testes de lote, descarte e flush no shutdown"""
+
+    @pytest.mark.asyncio
+    async def test_grava_em_lote_ao_atingir_tamanho(self, fake_conn):
+        sink = audit.LoginAuditSink(batch_size=3, flush_interval_ms=5000, max_queue=10)
+        sink.start()
+        for i in range(3):
+            assert sink.offer(_record(i))
+        await asyncio.sleep(0.05)
+
+        assert fake_conn.copied == [[_record(0), _record(1), _record(2)]]
+        await sink.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_grava_pendentes(self, fake_conn):
+        sink = audit.LoginAuditSink(batch_size=100, flush_interval_ms=5000, max_queue=10)
+        sink.start()
+        sink.offer(_record(1))
+        sink.offer(_record(2))
+        await asyncio.sleep(0)
+        await sink.stop()
+
+        assert sum(len(b) for b in fake_conn.copied) == 2
+        assert sink.get_stats()["written"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_durante_copy_nao_perde_lote(self, fake_conn):
+        fake_conn.copy_delay = 0.05
+        sink = audit.LoginAuditSink(batch_size=2, flush_interval_ms=5000, max_queue=10)
+        sink.start()
+        for i in range(3):
+            sink.offer(_record(i))
+        await asyncio.sleep(0.01)  # primeiro lote em COPY
+
+        await sink.stop()
+        assert fake_conn.copied == [[_record(0), _record(1)], [_record(2)]]
+
+    @pytest.mark.asyncio
+    async def test_tarefa_cancelada_no_meio_do_copy(self, fake_conn):
+        fake_conn.copy_delay = 0.05
+        sink = audit.LoginAuditSink(batch_size=2, flush_interval_ms=5000, max_queue=10)
+        sink.start()
+        sink.offer(_record(1))
+        sink.offer(_record(2))
+        await asyncio.sleep(0.01)
+
+        sink._task.cancel()  # ex.: encerramento do event loop
+        await asyncio.sleep(0)
+        await sink.stop()
+        assert fake_conn.copied == [[_record(1), _record(2)]]
+        assert sink.get_stats()["written"] == 2
+
+    @pytest.mark.asyncio
+    async def test_fila_cheia_recusa(self, fake_conn):
+        sink = audit.LoginAuditSink(batch_size=100, flush_interval_ms=5000, max_queue=1)
+        sink.start()
+        assert sink.offer(_record(1))
+        assert not sink.offer(_record(2))
+        await sink.stop()
+
+    @pytest.mark.asyncio
+    async def test_falha_no_copy_regrava_linha_a_linha(self, fake_conn):
+        fake_conn.fail_copy = True
+        sink = audit.LoginAuditSink(batch_size=2, flush_interval_ms=5000, max_queue=10)
+        await sink._flush([_record(1), _record(2)])
+
+        assert len(fake_conn.inserted) == 2
+        assert sink.flush_errors == 1
+        assert sink.written == 2
+
+    @pytest.mark.asyncio
+    async def test_durable_grava_sincrono(self, fake_conn, monkeypatch):
+        sink = audit.LoginAuditSink(batch_size=100, flush_interval_ms=5000, max_queue=10)
+        monkeypatch.setattr(audit, "login_audit_sink", sink)
+        sink.start()
+
+        await audit.LoginAuditService.log_login_attempt(username="a", sucesso=False)
+        await audit.LoginAuditService.log_login_attempt(
+            username="b", sucesso=False, durable=True
+        )
+
+        assert len(fake_conn.inserted) == 1
+        assert fake_conn.inserted[0][0] == "b"
+        assert sink.get_stats()["queue_size"] == 1
+        await sink.stop()
@@ -0,0 +1,104 @@
+"""
+SIGMA-PLI - Testes do pipeline de login (AuthService.authenticate)
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services.M01_auth import service_auth
+from app.services.M01_auth.service_auth import AuthService
+
+
+class FakeConnection:
+    """Conexão que devolve um usuário fixo e registra os statements"""
+
+    def __init__(self, user: dict):
+        self.user = user
+        self.statements = []
+
+    def get_server_pid(self):
+        return 1
+
+    async def fetchrow(self, query, *args, **kwargs):
+        self.statements.append(query)
+        return self.user
+
+    async def fetchval(self, query, *args):
+        self.statements.append(query)
+        return 1
+
+    async def execute(self, query, *args):
+        self.statements.append(query)
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    user = {
+        "conta_id": uuid.uuid4(),
+        "username": "maria",
+        "email": "maria@example.com",
+        "password_hash": "hash",
+        "salt": "salt",
+        "ativo": True,
+        "bloqueado": False,
+        "nome_completo": "Maria",
+    }
+    conn = FakeConnection(user)
+    checkouts = []
+    audits = []
+
+    @asynccontextmanager
+    async def fake_postgres_connection():
+        checkouts.append(conn)
+        yield conn
+
+    async def fake_verify(password, password_hash, salt):
+        return password == "correta"
+
+    async def fake_audit(**kwargs):
+        audits.append(kwargs)
+
+    monkeypatch.setattr(service_auth, "postgres_connection", fake_postgres_connection)
+    monkeypatch.setattr(AuthService, "verify_password_async", staticmethod(fake_verify))
+    monkeypatch.setattr(
+        service_auth.LoginAuditService, "log_login_attempt", staticmethod(fake_audit)
+    )
+    monkeypatch.setattr(service_auth.password_hashing, "needs_rehash", lambda h, s: False)
+    return user, conn, checkouts, audits
+
+
+class TestLoginPipeline:
+    """Uma conexão e dois statements por login"""
+
+    @pytest.mark.asyncio
+    async def test_login_sucesso_um_checkout_dois_statements(self, pipeline):
+        user, conn, checkouts, audits = pipeline
+
+        result = await AuthService.authenticate("maria", "correta", "127.0.0.1")
+
+        assert result is not None
+        assert len(checkouts) == 1
+        assert len(conn.statements) == 2
+        assert "INSERT INTO usuarios.sessao" in conn.statements[1]
+        assert "UPDATE usuarios.usuario" in conn.statements[1]
+        assert audits[0]["sucesso"] is True
+
+    @pytest.mark.asyncio
+    async def test_senha_incorreta_incrementa_em_um_statement(self, pipeline):
+        user, conn, checkouts, audits = pipeline
+
+        assert await AuthService.authenticate("maria", "errada") is None
+        assert len(conn.statements) == 2
+        assert "bloqueado_ate = CASE" in conn.statements[1]
+        assert audits[0]["motivo_falha"] == "Senha incorreta"
+
+    @pytest.mark.asyncio
+    async def test_conta_bloqueada_nao_verifica_senha(self, pipeline):
+        user, conn, checkouts, audits = pipeline
+        user["bloqueado"] = True
+
+        assert await AuthService.authenticate("maria", "correta") is None
+        assert len(conn.statements) == 1
+        assert audits[0]["durable"] is True
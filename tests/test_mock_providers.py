@@ -0,0 +1,113 @@
+"""
+SIGMA-PLI - Testes do mock local de provedores externos e do teste de carga
+"""
+
+import httpx
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from fastapi import FastAPI
+
+from app.http_client import SharedHTTPClient
+from app.routers.M01_auth.router_externas_cpf_cep import router as externas_router
+from app.services.M01_auth import service_external_apis, service_localidades_ibge
+from app.services.M01_auth.service_cep_cache import CEPCache
+from scripts.load_test_cadastro import executar, percentil
+from scripts.mock_providers import MOCK_KEY, MockConfig, create_app, env_vars
+
+
+class SemCache:
+    name = "vazio"
+
+    async def get(self, cep, valido_apos):
+        return None
+
+    async def put_many(self, entries):
+        return len(entries)
+
+
+@pytest_asyncio.fixture
+async def mock():
+    """Sobe o mock numa porta livre; devolve (url base, estado do mock)"""
+    app = create_app(MockConfig(receitaws_rate_per_minute=2, municipios_por_uf=5))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", app[MOCK_KEY]
+    await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = SharedHTTPClient()
+    yield client
+    await client.close()
+
+
+class TestMockProviders:
+    @pytest.mark.asyncio
+    async def test_cep_fixture_sintetico_e_inexistente(self, mock, client, monkeypatch):
+        base, _ = mock
+        monkeypatch.setattr(service_external_apis, "http_client", client)
+        monkeypatch.setattr(service_external_apis, "cep_cache", CEPCache(SemCache(), max_entries=0))
+        monkeypatch.setattr(
+            service_external_apis.CEPService, "VIACEP_BASE_URL", env_vars(base)["VIACEP_BASE_URL"]
+        )
+        consultar = service_external_apis.CEPService.consultar_cep
+
+        assert (await consultar("01310-100"))["logradouro"] == "Avenida Paulista"
+        assert (await consultar("20040-120"))["uf"] == "RJ"
+        assert await consultar("20040-129") == {"erro": True, "mensagem": "CEP não encontrado"}
+
+    @pytest.mark.asyncio
+    async def test_base_ibge_completa(self, mock, client, monkeypatch):
+        base, _ = mock
+        monkeypatch.setattr(service_localidades_ibge, "http_client", client)
+        monkeypatch.setattr(
+            service_localidades_ibge, "IBGE_LOCALIDADES_URL", env_vars(base)["IBGE_LOCALIDADES_URL"]
+        )
+        index = await service_localidades_ibge.fetch_ibge()
+        assert len(index.ufs) == 27
+        assert len(index) == 27 * 5
+        assert len(index.listar_municipios("SP")) == 5
+
+    @pytest.mark.asyncio
+    async def test_limite_da_receitaws_e_taxa_de_erro(self, mock, client):
+        base, estado = mock
+        url = env_vars(base)["RECEITAWS_BASE_URL"] + "/cnpj/11222333000181"
+        codigos = []
+        for _ in range(3):
+            async with client.get("receitaws", url) as response:
+                codigos.append(response.status)
+        assert codigos == [200, 200, 429]
+
+        estado.config.update({"error_rate": 1.0, "error_providers": ["viacep"]})
+        async with client.get("viacep", env_vars(base)["VIACEP_BASE_URL"] + "/01310100/json/") as r:
+            assert r.status == 503
+        assert estado.status["viacep"] == {503: 1}
+
+
+class TestLoadTest:
+    def test_percentil(self):
+        valores = [float(v) for v in range(1, 101)]
+        assert percentil(valores, 50) == 50
+        assert percentil(valores, 95) == 95
+        assert percentil(valores, 99) == 99
+        assert percentil([], 99) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_executa_cenarios(self):
+        app = FastAPI()
+        app.include_router(externas_router)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://teste") as client:
+            resultado = await executar(client, 40, 8, pesos={"cpf": 1}, distintos=5)
+
+        total = resultado["total"]
+        assert total["requisicoes"] == 40
+        assert total["status"] == {200: 40}
+        assert total["erros"] == 0
+        assert total["p50_ms"] <= total["p95_ms"] <= total["p99_ms"] <= total["max_ms"]
+        assert list(resultado["cenarios"]) == ["cpf"]
@@ -0,0 +1,91 @@
+"""
+SIGMA-PLI - Testes do executor de hash de senhas
+"""
+
+import asyncio
+import hashlib
+import threading
+
+import pytest
+
+from app.security import password_hashing
+from app.security.password_hashing import (
+    PasswordHashingBusyError,
+    PasswordHashingExecutor,
+)
+from app.services.M01_auth.service_auth import AuthService
+
+
+class TestPasswordHashing:
+    """Testes de compatibilidade e backpressure"""
+
+    def test_pbkdf2_compativel_com_formato_legado(self):
+        """Hash gerado continua idêntico ao cálculo original do AuthService"""
+        password_hash, salt = AuthService.hash_password("Senha@123", "abc123")
+        esperado = hashlib.pbkdf2_hmac(
+            "sha256", b"Senha@123", b"abc123", 100000
+        ).hex()
+        assert password_hash == esperado
+        assert salt == "abc123"
+
+    @pytest.mark.asyncio
+    async def test_verify_async(self):
+        password_hash, salt = await AuthService.hash_password_async("Senha@123")
+        assert await AuthService.verify_password_async("Senha@123", password_hash, salt)
+        assert not await AuthService.verify_password_async(
+            "errada", password_hash, salt
+        )
+
+    def test_needs_rehash(self, monkeypatch):
+        legado_hash, legado_salt = password_hashing.pbkdf2_hash("Senha@123")
+        assert not password_hashing.needs_rehash(legado_hash, legado_salt)
+
+        monkeypatch.setattr(
+            password_hashing.settings, "password_hash_scheme", "bcrypt"
+        )
+        assert password_hashing.needs_rehash(legado_hash, legado_salt)
+        assert not password_hashing.needs_rehash("$2b$12$abc", None)
+
+    @pytest.mark.asyncio
+    async def test_backpressure_rejeita_quando_fila_cheia(self):
+        executor = PasswordHashingExecutor(max_workers=1, max_pending=1)
+        def bloqueante():
+            import time
+
+            time.sleep(0.05)
+            return True
+
+        primeira = asyncio.create_task(executor.run(bloqueante))
+        await asyncio.sleep(0)
+
+        with pytest.raises(PasswordHashingBusyError):
+            await executor.run(bloqueante)
+
+        assert await primeira
+        assert executor.get_stats()["rejected"] == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelar_quem_aguarda_nao_libera_vaga(self):
+        executor = PasswordHashingExecutor(max_workers=1, max_pending=1)
+        liberar = threading.Event()
+
+        tarefa = asyncio.create_task(executor.run(liberar.wait, 5))
+        await asyncio.sleep(0.01)
+        tarefa.cancel()  # ex.: cliente desconectou
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+
+        # O hash continua ocupando o pool: a vaga ainda não foi liberada
+        assert executor.pending == 1
+        with pytest.raises(PasswordHashingBusyError):
+            await executor.run(liberar.wait, 5)
+
+        liberar.set()
+        for _ in range(100):
+            if executor.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.get_stats()["pending"] == 0
+        assert executor.get_stats()["completed"] == 1
+        executor.shutdown()
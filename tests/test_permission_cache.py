@@ -0,0 +1,60 @@
+"""
+SIGMA-PLI - Testes do cache de permissões do PermissionChecker
+"""
+
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+import app.middleware.auth_middleware as auth_middleware
+from app.middleware.auth_middleware import PermissionChecker
+from app.utils.permission_cache import permission_cache
+
+
+@pytest.fixture(autouse=True)
+def limpar_cache():
+    permission_cache.clear()
+    yield
+    permission_cache.clear()
+
+
+class TestPermissionCache:
+    """Testes do nível de acesso em cache"""
+
+    @pytest.mark.asyncio
+    async def test_cache_evita_consulta(self, monkeypatch):
+        async def sem_banco():
+            raise AssertionError("não deveria consultar o banco")
+
+        monkeypatch.setattr(auth_middleware, "get_pg_pool", sem_banco)
+        usuario_id = uuid4()
+        permission_cache.set(usuario_id, 4, True)
+
+        assert await PermissionChecker.get_user_permission_level(usuario_id) == 4
+        assert await PermissionChecker.verify_permission(usuario_id, 5) is False
+
+    @pytest.mark.asyncio
+    async def test_usuario_inativo_em_cache(self):
+        usuario_id = uuid4()
+        permission_cache.set(usuario_id, 5, False)
+
+        with pytest.raises(HTTPException) as exc:
+            await PermissionChecker.get_user_permission_level(usuario_id)
+        assert exc.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_invalidacao_forca_nova_consulta(self, monkeypatch):
+        async def sem_pool():
+            return None
+
+        monkeypatch.setattr(auth_middleware, "get_pg_pool", sem_pool)
+        usuario_id = uuid4()
+        permission_cache.set(usuario_id, 5, True)
+
+        PermissionChecker.invalidate_user(usuario_id)
+
+        with pytest.raises(HTTPException) as exc:
+            await PermissionChecker.get_user_permission_level(usuario_id)
+        assert exc.value.status_code == 503
+        assert permission_cache.stats()["invalidations"] == 1
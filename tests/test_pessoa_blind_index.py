@@ -0,0 +1,191 @@
+"""
+SIGMA-PLI - Testes do índice cego de CPF/telefone (cadastro.pessoa)
+"""
+
+import re
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+import pytest
+
+from app.security.crypto import CryptographyManager
+from app.services.M01_auth import service_pessoa_blind_index as blind_index
+
+MASTER_KEY = "chave-mestra-de-teste-com-32-caracteres!"
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.delenv("BLIND_INDEX_KEY", raising=False)
+    manager = CryptographyManager(MASTER_KEY, key_version=1)
+    monkeypatch.setattr(blind_index, "get_blind_indexer", lambda: manager)
+    return manager
+
+
+class FakeConnection:
+    """Conexão que simula cadastro.pessoa (id, cpf, telefone, *_bidx)"""
+
+    def __init__(self, rows, locked=False):
+        self.rows = rows
+        self.locked = locked
+        self.queries = []
+
+    def get_server_pid(self):
+        return 1
+
+    async def fetch(self, query, *args, record_class=None):
+        self.queries.append(query)
+        if "ANY" in query:
+            wanted = set(args[0])
+            return [
+                {"id": row["id"], "bidx": row["cpf_bidx"]}
+                for row in self.rows
+                if row["cpf_bidx"] in wanted
+            ]
+        last_id, limit = args
+        pending = [
+            row
+            for row in sorted(self.rows, key=lambda r: r["id"])
+            if row["id"] > last_id
+            and row["cpf_bidx"] is None
+            and re.sub(r"[^0-9]", "", row["cpf"] or "")
+        ]
+        return pending[:limit]
+
+    async def fetchval(self, query, *args):
+        self.queries.append(query)
+        if "pg_try_advisory_lock" in query:
+            if self.locked:
+                return False
+            self.locked = True
+            return True
+        self.locked = False
+        return True
+
+    async def execute(self, query, *args):
+        self.queries.append(query)
+        by_id = {row["id"]: row for row in self.rows}
+        for pessoa_id, cpf_bidx, telefone_bidx in zip(*args):
+            by_id[pessoa_id]["cpf_bidx"] = cpf_bidx
+            by_id[pessoa_id]["telefone_bidx"] = telefone_bidx
+
+
+def patch_connection(monkeypatch, conn):
+    @asynccontextmanager
+    async def fake_connection(standalone=False):
+        yield conn
+
+    monkeypatch.setattr(blind_index, "postgres_connection", fake_connection)
+
+
+def pessoa(n, cpf, cpf_bidx=None):
+    return {
+        "id": UUID(int=n),
+        "cpf": cpf,
+        "telefone": None,
+        "cpf_bidx": cpf_bidx,
+        "telefone_bidx": None,
+    }
+
+
+class TestBlindIndex:
+    """HMAC determinístico, normalizado e separado por tipo"""
+
+    def test_normaliza_mascara(self, manager):
+        assert manager.blind_index("123.456.789-09", "cpf") == manager.blind_index(
+            "12345678909", "cpf"
+        )
+        assert len(manager.blind_index("12345678909", "cpf")) == 32
+
+    def test_tipos_e_chaves_diferentes(self, manager):
+        assert manager.blind_index("11987654321", "cpf") != manager.blind_index(
+            "11987654321", "telefone"
+        )
+        outra = CryptographyManager(MASTER_KEY, blind_index_key="outra-chave")
+        assert outra.blind_index("12345678909", "cpf") != manager.blind_index(
+            "12345678909", "cpf"
+        )
+
+    def test_rotacao_da_chave_mestra_preserva_indices(self, manager):
+        rotacionada = CryptographyManager(
+            "chave-mestra-v2", key_version=2, previous_keys={1: MASTER_KEY}
+        )
+        assert rotacionada.blind_index("12345678909", "cpf") == manager.blind_index(
+            "12345678909", "cpf"
+        )
+        with pytest.raises(ValueError):
+            CryptographyManager("chave-mestra-v2", key_version=2)
+
+    def test_nao_e_o_hash_sem_chave(self, manager):
+        assert manager.blind_index("12345678909", "cpf").hex() != manager.hash_data(
+            "12345678909"
+        )
+
+    def test_vazio_e_tipo_invalido(self, manager):
+        assert manager.blind_index(None, "cpf") is None
+        assert manager.blind_index("---", "cpf") is None
+        assert manager.blind_index("١٢٣", "cpf") is None  # mesmo critério do SQL
+        with pytest.raises(ValueError):
+            manager.blind_index("12345678909", "rg")
+
+
+class TestBackfillEMatch:
+    """Backfill em lotes (keyset) e busca em lote numa única consulta"""
+
+    @pytest.mark.asyncio
+    async def test_backfill_em_lotes(self, manager, monkeypatch):
+        rows = [pessoa(n, f"{n:011d}") for n in range(1, 6)]
+        rows.append(pessoa(6, None))
+        conn = FakeConnection(rows)
+        patch_connection(monkeypatch, conn)
+
+        result = await blind_index.backfill_blind_index(batch_size=2)
+
+        assert result["rows_updated"] == 5
+        assert result["batches"] == 3
+        assert rows[0]["cpf_bidx"] == manager.blind_index("00000000001", "cpf")
+        assert rows[5]["cpf_bidx"] is None
+        assert not conn.locked
+
+    @pytest.mark.asyncio
+    async def test_valores_sem_digitos_nao_sao_relidos(self, manager, monkeypatch):
+        rows = [pessoa(1, "---"), pessoa(2, "123.456.789-09"), pessoa(3, "")]
+        conn = FakeConnection(rows)
+        patch_connection(monkeypatch, conn)
+
+        assert (await blind_index.backfill_blind_index())["rows_updated"] == 1
+        assert (await blind_index.backfill_blind_index())["rows_updated"] == 0
+        assert "regexp_replace(cpf, '[^0-9]', '', 'g') <> ''" in blind_index.PENDING_BLIND_INDEX.sql
+
+    @pytest.mark.asyncio
+    async def test_backfill_em_outro_worker(self, manager, monkeypatch):
+        rows = [pessoa(1, "12345678909")]
+        conn = FakeConnection(rows, locked=True)
+        patch_connection(monkeypatch, conn)
+
+        result = await blind_index.backfill_blind_index()
+
+        assert result["skipped"] == "em andamento em outro worker"
+        assert rows[0]["cpf_bidx"] is None
+        assert conn.locked  # o lock é do outro worker
+
+    @pytest.mark.asyncio
+    async def test_match_uma_consulta(self, manager, monkeypatch):
+        rows = [
+            pessoa(1, "12345678909", manager.blind_index("12345678909", "cpf")),
+            pessoa(2, "98765432100", manager.blind_index("98765432100", "cpf")),
+        ]
+        conn = FakeConnection(rows)
+        patch_connection(monkeypatch, conn)
+
+        result = await blind_index.match_by_blind_index(
+            ["123.456.789-09", "11111111111", "", "12345678909"]
+        )
+
+        assert len(conn.queries) == 1
+        assert result["total"] == 4
+        assert result["distintos"] == 2
+        assert result["invalidos"] == [2]
+        assert result["nao_encontrados"] == [1]
+        assert [m["indice"] for m in result["correspondencias"]] == [0, 3]
+        assert result["correspondencias"][0]["pessoa_ids"] == [str(UUID(int=1))]
@@ -0,0 +1,98 @@
+"""
+SIGMA-PLI - Testes do registro de statements SQL (app.query_registry)
+"""
+
+import pytest
+
+from app.query_registry import QueryRegistry, Row
+
+
+class FakeConnection:
+    """Conexão mínima: registra o SQL e o record_class usados"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.calls = []
+        self.termination_listeners = []
+
+    def get_server_pid(self):
+        return self.pid
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    def terminate(self):
+        for callback in self.termination_listeners:
+            callback(self)
+
+    async def fetchrow(self, query, *args, record_class=None):
+        self.calls.append((query, args, record_class))
+        return None
+
+    async def execute(self, query, *args):
+        self.calls.append((query, args, None))
+        raise RuntimeError("falha")
+
+
+class TestQueryRegistry:
+    """Declaração única, preparo por conexão e métricas"""
+
+    def test_nome_duplicado(self):
+        registry = QueryRegistry()
+        registry.register("a", "SELECT 1")
+        with pytest.raises(ValueError):
+            registry.register("a", "SELECT 2")
+
+    @pytest.mark.asyncio
+    async def test_preparo_uma_vez_por_conexao(self):
+        registry = QueryRegistry()
+        stmt = registry.register("user.by_id", "SELECT * FROM t WHERE id = $1")
+        conn1, conn2 = FakeConnection(10), FakeConnection(11)
+
+        await stmt.fetchrow(conn1, 1)
+        await stmt.fetchrow(conn1, 2)
+        await stmt.fetchrow(conn2, 3)
+
+        assert stmt.calls == 3
+        assert stmt.prepares == 2
+        assert conn1.calls[0] == ("SELECT * FROM t WHERE id = $1", (1,), Row)
+
+    @pytest.mark.asyncio
+    async def test_init_hook_reinicia_conexao_com_pid_reutilizado(self):
+        registry = QueryRegistry()
+        stmt = registry.register("s", "SELECT 1")
+        conn = FakeConnection(42)
+
+        await stmt.fetchrow(conn)
+        await registry.init_connection(FakeConnection(42))
+        await stmt.fetchrow(conn)
+
+        assert stmt.prepares == 2
+        assert registry.stats()["connections_initialized"] == 1
+
+    @pytest.mark.asyncio
+    async def test_conexao_encerrada_sai_do_controle(self):
+        registry = QueryRegistry()
+        stmt = registry.register("s", "SELECT 1")
+        antiga, nova = FakeConnection(7), FakeConnection(7)
+
+        await registry.init_connection(antiga)
+        await stmt.fetchrow(antiga)
+        await registry.init_connection(nova)  # pid reutilizado antes do fechamento
+        antiga.terminate()
+        assert registry.stats()["connections_tracked"] == 1
+
+        nova.terminate()
+        assert registry.stats()["connections_tracked"] == 0
+
+    @pytest.mark.asyncio
+    async def test_erros_contabilizados(self):
+        registry = QueryRegistry()
+        stmt = registry.register("u", "UPDATE t SET x = 1")
+
+        with pytest.raises(RuntimeError):
+            await stmt.execute(FakeConnection(1))
+
+        stats = registry.stats()["statements"][0]
+        assert stats["calls"] == 1
+        assert stats["errors"] == 1
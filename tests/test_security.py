@@ -133,6 +133,49 @@ class TestCryptographyManager:
         assert crypto.decrypt(encrypted2) == cpf
         assert crypto.decrypt(encrypted3) == cpf
 
+    def test_chave_derivada_uma_vez(self):
+        """PBKDF2 roda uma vez por chave mestra, não a cada chamada"""
+        from app.security import crypto as crypto_module
+
+        crypto_module._derive_fernet_key.cache_clear()
+        crypto = crypto_module.CryptographyManager("chave-cache-teste", key_version=1)
+        for _ in range(5):
+            crypto.decrypt(crypto.encrypt("12345678900"))
+
+        assert crypto_module._derive_fernet_key.cache_info().misses == 1
+
+    def test_rotacao_de_versao(self):
+        """Tokens da versão antiga continuam legíveis e podem ser recifrados"""
+        from app.security.crypto import CryptographyManager
+
+        antiga = CryptographyManager("chave-v1", key_version=1)
+        token_v1 = antiga.encrypt("12345678900")
+
+        atual = CryptographyManager("chave-v2", key_version=2, previous_keys={1: "chave-v1"})
+        assert atual.decrypt(token_v1) == "12345678900"
+        assert atual.needs_rotation(token_v1)
+
+        token_v2 = atual.rotate(token_v1)
+        assert token_v2.startswith("v2:")
+        assert not atual.needs_rotation(token_v2)
+        assert atual.decrypt(token_v2) == "12345678900"
+
+    def test_lotes_preservam_ordem_e_none(self):
+        """encrypt_many/decrypt_many com e sem pool de workers"""
+        from concurrent.futures import ThreadPoolExecutor
+        from app.security.crypto import CryptographyManager
+
+        crypto = CryptographyManager("chave-lote", key_version=1)
+        valores = [f"{i:011d}" for i in range(4500)] + [None]
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            tokens = crypto.encrypt_many(valores, executor=pool)
+            assert crypto.decrypt_many(tokens, executor=pool) == valores
+
+        pares = crypto.encrypt_and_hash_many(["12345678900", None])
+        assert pares[1] is None
+        assert pares[0][1] == crypto.hash_data("12345678900")
+
 
 # ============================================
 # TESTES DE VALIDADORES (validators.py)
@@ -0,0 +1,172 @@
+"""
+SIGMA-PLI - Testes da manutenção de sessões (partições mensais e agendador)
+"""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+
+import asyncpg
+import pytest
+
+from app.services.M01_auth import service_auth_maintenance as maintenance
+from app.services.service_maintenance import MaintenanceScheduler
+
+
+class FakeConnection:
+    """Conexão que simula o catálogo de partições"""
+
+    def __init__(self, partitions):
+        self.partitions = list(partitions)
+        self.executed = []
+
+    async def fetch(self, query, *args):
+        return [{"relname": name} for name in self.partitions]
+
+    async def fetchval(self, query, *args):
+        return 10
+
+    async def execute(self, query, *args):
+        self.executed.append(query)
+
+
+class TestPartitionHelpers:
+    """Cálculo de meses e nomes de partição"""
+
+    def test_add_months_vira_o_ano(self):
+        assert maintenance.add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+        assert maintenance.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+
+    def test_parse_partition_month(self):
+        assert maintenance.parse_partition_month("sessao", "sessao_p2025_03") == date(
+            2025, 3, 1
+        )
+        assert maintenance.parse_partition_month("sessao", "token_recuperacao_p2025_03") is None
+        assert maintenance.parse_partition_month("sessao", "sessao_legado") is None
+
+    @pytest.mark.asyncio
+    async def test_ensure_cria_apenas_faltantes(self):
+        conn = FakeConnection(["sessao_p2025_10"])
+        created = await maintenance.ensure_partitions(
+            conn, "sessao", months_ahead=2, today=date(2025, 10, 17)
+        )
+        assert created == ["sessao_p2025_11", "sessao_p2025_12"]
+        assert "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')" in conn.executed[-1]
+
+    @pytest.mark.asyncio
+    async def test_prune_remove_apenas_vencidas(self):
+        conn = FakeConnection(["sessao_p2025_08", "sessao_p2025_09", "sessao_p2025_10"])
+        pruned = await maintenance.prune_partitions(
+            conn, "sessao", retention_months=1, today=date(2025, 10, 17)
+        )
+        assert pruned == 10
+        assert any("DETACH PARTITION usuarios.\"sessao_p2025_08\"" in q for q in conn.executed)
+        assert not any("sessao_p2025_09" in q for q in conn.executed)
+
+
+class LockingConnection(FakeConnection):
+    """Conexão de um worker: advisory lock compartilhado entre as instâncias"""
+
+    locks: set = set()
+
+    async def fetchval(self, query, *args):
+        if "pg_try_advisory_lock" in query:
+            if args[0] in self.locks:
+                return False
+            self.locks.add(args[0])
+            return True
+        if "pg_advisory_unlock" in query:
+            self.locks.discard(args[0])
+            return True
+        if "pg_partitioned_table" in query:
+            return True
+        return 10
+
+
+class TestSweepLock:
+    """Varredura coordenada entre workers por advisory lock"""
+
+    @pytest.mark.asyncio
+    async def test_segundo_worker_pula_a_varredura(self, monkeypatch):
+        conn = LockingConnection(["sessao_p2000_01"])
+
+        @asynccontextmanager
+        async def fake_connection():
+            yield conn
+
+        monkeypatch.setattr(maintenance, "postgres_connection", fake_connection)
+        LockingConnection.locks = {maintenance.SWEEP_LOCK_KEY}  # outro worker varrendo
+
+        result = await maintenance.sweep_table("sessao")
+        assert result["skipped"] is True and result["rows_pruned"] == 0
+        assert conn.executed == []
+
+        LockingConnection.locks = set()
+        result = await maintenance.sweep_table("sessao")
+        assert result["skipped"] is False and result["rows_pruned"] == 10
+        assert any("DETACH PARTITION" in q for q in conn.executed)
+        assert LockingConnection.locks == set()
+
+
+class TestInsertPartitioned:
+    """INSERT cria a partição que falta quando o agendador não a criou"""
+
+    @pytest.mark.asyncio
+    async def test_cria_particao_e_repete(self):
+        conn = FakeConnection([])
+        conn.is_in_transaction = lambda: False
+        tentativas = []
+
+        async def insert():
+            tentativas.append(len(conn.executed))
+            if not conn.executed:
+                raise asyncpg.CheckViolationError(
+                    'no partition of relation "sessao" found for row'
+                )
+            return "INSERT 0 1"
+
+        result = await maintenance.insert_partitioned(
+            conn, "sessao", datetime(2031, 3, 1, 2, 0), insert
+        )
+        assert result == "INSERT 0 1"
+        assert len(tentativas) == 2
+        # Início do mês: cria também o anterior (fuso do banco)
+        assert ["sessao_p2031_02", "sessao_p2031_03"] == [
+            q.split('"')[1] for q in conn.executed
+        ]
+
+    @pytest.mark.asyncio
+    async def test_outras_violacoes_sao_repassadas(self):
+        conn = FakeConnection([])
+        conn.is_in_transaction = lambda: False
+
+        async def insert():
+            raise asyncpg.CheckViolationError('violates check constraint "x"')
+
+        with pytest.raises(asyncpg.CheckViolationError):
+            await maintenance.insert_partitioned(conn, "sessao", datetime(2031, 3, 15), insert)
+        assert conn.executed == []
+
+
+class TestMaintenanceScheduler:
+    """Estatísticas e isolamento de falhas do agendador"""
+
+    @pytest.mark.asyncio
+    async def test_run_all_acumula_e_isola_falhas(self):
+        scheduler = MaintenanceScheduler(interval_minutes=60)
+
+        async def ok():
+            return {"rows_pruned": 7}
+
+        async def falha():
+            raise RuntimeError("sem banco")
+
+        scheduler.register_job("ok", ok)
+        scheduler.register_job("falha", falha)
+        await scheduler.run_all()
+        await scheduler.run_all()
+
+        jobs = scheduler.get_stats()["jobs"]
+        assert jobs["ok"]["rows_pruned_total"] == 14
+        assert jobs["ok"]["last_duration_ms"] is not None
+        assert jobs["falha"]["failures"] == 2
+        assert jobs["falha"]["last_error"] == "sem banco"
@@ -0,0 +1,186 @@
+"""
+SIGMA-PLI - Testes da validação em lote de CPF/CNPJ/CEP (NDJSON)
+"""
+
+import asyncio
+import json
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import database
+from app.config import settings
+from app.routers.M01_auth.router_externas_cpf_cep import router
+from app.services.M01_auth import service_validacao_lote
+from app.services.M01_auth.service_cnpj_lookup import CNPJLookupResult
+from app.services.M01_auth.service_external_apis import CEPService
+from app.services.M01_auth.service_validacao_lote import em_ordem, validar_lote
+
+
+async def coletar(aiter):
+    return [item async for item in aiter]
+
+
+@pytest.fixture
+def viacep(monkeypatch):
+    """ViaCEP falso: CEPs terminados em 0 existem; registra concorrência"""
+    estado = {"chamadas": [], "em_andamento": 0, "maximo": 0}
+
+    async def consultar_cep(cep):
+        estado["chamadas"].append(cep)
+        estado["em_andamento"] += 1
+        estado["maximo"] = max(estado["maximo"], estado["em_andamento"])
+        await asyncio.sleep(random.uniform(0, 0.01))
+        estado["em_andamento"] -= 1
+        if cep.endswith("0"):
+            return {"cep": cep, "localidade": "São Paulo"}
+        return {"erro": True, "mensagem": "CEP não encontrado"}
+
+    monkeypatch.setattr(CEPService, "consultar_cep", staticmethod(consultar_cep))
+    return estado
+
+
+class TestEmOrdem:
+    """Concorrência limitada com saída na ordem de entrada"""
+
+    @pytest.mark.asyncio
+    async def test_ordem_e_limite(self):
+        em_andamento = maximo = 0
+
+        async def consultar(chave):
+            nonlocal em_andamento, maximo
+            em_andamento += 1
+            maximo = max(maximo, em_andamento)
+            await asyncio.sleep(random.uniform(0, 0.005))
+            em_andamento -= 1
+            return {"chave": chave}
+
+        chaves = [str(i) for i in range(50)]
+        saida = await coletar(em_ordem(chaves, consultar, 5))
+        assert [c for c, _ in saida] == chaves
+        assert maximo <= 5
+
+    @pytest.mark.asyncio
+    async def test_interrupcao_cancela_pendentes(self):
+        iniciadas = []
+
+        async def consultar(chave):
+            iniciadas.append(chave)
+            await asyncio.sleep(10)
+
+        async def lenta(chave):
+            return {} if chave == "0" else await consultar(chave)
+
+        gen = em_ordem(["0", "1", "2"], lenta, 3)
+        assert (await gen.__anext__())[0] == "0"
+        await gen.aclose()
+        await asyncio.sleep(0)
+        assert iniciadas == ["1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_consultas_fora_do_lease_do_request(self, monkeypatch):
+        class Pool:
+            acquired = released = 0
+
+            async def acquire(self):
+                Pool.acquired += 1
+                await asyncio.sleep(0)
+                return object()
+
+            async def release(self, conn):
+                Pool.released += 1
+
+        monkeypatch.setattr(database, "postgres_pool", Pool())
+
+        async def consultar(chave):
+            async with database.postgres_connection():
+                await asyncio.sleep(0.001)
+            return {}
+
+        async with database.request_connection_scope() as lease:
+            await coletar(em_ordem([str(i) for i in range(6)], consultar, 3))
+            assert lease.conn is None
+
+        database.pool_metrics.reset()
+        # Uma conexão avulsa por consulta, todas devolvidas ao pool
+        assert Pool.acquired == Pool.released == 6
+
+
+class TestValidarLote:
+    """Validação local, deduplicação e consultas remotas"""
+
+    @pytest.mark.asyncio
+    async def test_cep_ordem_repetidos_e_resumo(self, viacep):
+        valores = ["01310-100", "123", "01310100", "99999-999", "04538-130"] * 4
+        resumo = {}
+        itens = await coletar(
+            validar_lote("cep", valores, concorrencia=2, resumo=resumo)
+        )
+
+        assert [i["indice"] for i in itens] == list(range(len(valores)))
+        assert itens[0]["dados"]["localidade"] == "São Paulo"
+        assert itens[1] == {
+            "indice": 1,
+            "valor": "123",
+            "documento": "123",
+            "valido": False,
+            "mensagem": "CEP inválido",
+        }
+        assert itens[3]["encontrado"] is False
+        assert sorted(viacep["chamadas"]) == ["01310100", "04538130", "99999999"]
+        assert viacep["maximo"] <= 2
+        assert resumo["invalidos"] == 4
+        assert resumo["encontrados"] == 12
+        assert resumo["consultas"] == 3
+
+    @pytest.mark.asyncio
+    async def test_cpf_so_local(self):
+        itens = await coletar(validar_lote("cpf", ["529.982.247-25", "111.111.111-11"]))
+        assert [i["valido"] for i in itens] == [True, False]
+        assert "encontrado" not in itens[0]
+
+    @pytest.mark.asyncio
+    async def test_cnpj_pendente_fora_da_janela(self, monkeypatch):
+        class FakeLookup:
+            async def lookup(self, cnpj, wait_seconds=None):
+                if cnpj == "11222333000181":
+                    return CNPJLookupResult(cnpj, "encontrado", {"nome": "X"}, "cache", "ok")
+                return None
+
+        monkeypatch.setattr(service_validacao_lote, "cnpj_lookup", FakeLookup())
+        resumo = {}
+        itens = await coletar(
+            validar_lote("cnpj", ["11.222.333/0001-81", "00000000000191"], resumo=resumo)
+        )
+        assert itens[0]["dados"] == {"nome": "X"}
+        assert itens[1]["pendente"] is True
+        assert resumo["pendentes"] == 1
+
+
+class TestEndpointLote:
+    """Resposta NDJSON e limite de itens"""
+
+    def test_ndjson_e_413(self, viacep, monkeypatch):
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+
+        response = client.post(
+            "/api/v1/externas/cep/validar-lote", json={"valores": ["01310-100", "x"]}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        linhas = [json.loads(l) for l in response.text.splitlines()]
+        assert [l.get("indice") for l in linhas[:2]] == [0, 1]
+        assert linhas[-1]["resumo"]["total"] == 2
+
+        monkeypatch.setattr(settings, "validacao_lote_max_itens", 1)
+        response = client.post(
+            "/api/v1/externas/cpf/validar-lote", json={"valores": ["1", "2"]}
+        )
+        assert response.status_code == 413
+        assert client.post(
+            "/api/v1/externas/rg/validar-lote", json={"valores": ["1"]}
+        ).status_code == 422
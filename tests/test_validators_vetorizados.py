@@ -0,0 +1,86 @@
+"""
+SIGMA-PLI - Equivalência entre a validação vetorizada e a escalar de CPF/CNPJ
+"""
+
+import random
+
+import numpy as np
+
+from app.security.validators import (
+    formatar_cnpj,
+    formatar_cpf,
+    matriz_digitos,
+    validar_cnpj,
+    validar_cnpjs,
+    validar_cpf,
+    validar_cpfs,
+)
+from app.services.M01_auth.service_external_apis import CNPJService, CPFService
+from scripts.benchmark_validators import (
+    gerar,
+    gerar_cnpj,
+    gerar_cpf,
+    legacy_cpf_service,
+    legacy_validar_cnpj,
+    legacy_validar_cpf,
+)
+
+
+def ruido(rng: random.Random, tamanho: int) -> list[str]:
+    """Entradas malformadas: tamanhos errados, letras, repetidos, vazios"""
+    alfabeto = "0123456789 .-/abcX\x00"
+    valores = ["", "1", "0" * 11, "9" * 14, "529.982.247-2", "a529.982.247-25b"]
+    valores += [str(d) * tamanho for d in range(10)]
+    valores += ["".join(rng.choice(alfabeto) for _ in range(rng.randint(0, 20))) for _ in range(500)]
+    return valores
+
+
+class TestEquivalenciaCPF:
+    def test_vetorizado_igual_ao_escalar_e_ao_legado(self):
+        rng = random.Random(7)
+        valores = gerar(2000, gerar_cpf, formatar_cpf) + ruido(rng, 11)
+
+        esperado = [legacy_validar_cpf(v) for v in valores]
+        assert [validar_cpf(v) for v in valores] == esperado
+        assert validar_cpfs(valores).tolist() == esperado
+
+    def test_service_usa_o_mesmo_validador(self):
+        valores = gerar(500, gerar_cpf, formatar_cpf)
+        assert [CPFService.validar_cpf_formato(v) for v in valores] == [
+            legacy_cpf_service(v) for v in valores
+        ]
+
+
+class TestEquivalenciaCNPJ:
+    def test_vetorizado_igual_ao_escalar_e_ao_legado(self):
+        rng = random.Random(11)
+        valores = gerar(2000, gerar_cnpj, formatar_cnpj) + ruido(rng, 14)
+
+        esperado = [legacy_validar_cnpj(v) for v in valores]
+        assert [validar_cnpj(v) for v in valores] == esperado
+        assert [CNPJService.validar_cnpj_formato(v) for v in valores] == esperado
+        assert validar_cnpjs(valores).tolist() == esperado
+
+
+def test_digitos_nao_ascii_sao_descartados_nos_dois_caminhos():
+    arabe = "٥٢٩٩٨٢٢٤٧٢٥"  # 529.982.247-25 em dígitos arábico-índicos
+    largura_total = "５２９.９８２.２４７-２５"
+    misto = "52998224725".replace("9", "٩")
+    cnpj = "".join(chr(ord("０") + int(d)) for d in "11222333000181")
+
+    cpfs = [arabe, largura_total, misto, "529.982.247-25"]
+    assert [validar_cpf(v) for v in cpfs] == [False, False, False, True]
+    assert validar_cpfs(cpfs).tolist() == [False, False, False, True]
+    assert validar_cnpj(cnpj) is False
+    assert validar_cnpjs([cnpj, "11.222.333/0001-81"]).tolist() == [False, True]
+
+
+def test_matriz_digitos():
+    matriz, mascara = matriz_digitos(["529.982.247-25", "123", "111.444.777-35"], 11)
+    assert mascara.tolist() == [True, False, True]
+    assert matriz.dtype == np.uint8
+    assert matriz[1].tolist() == [1, 1, 1, 4, 4, 4, 7, 7, 7, 3, 5]
+
+    vazia, mascara = matriz_digitos([], 14)
+    assert vazia.shape == (0, 14) and mascara.shape == (0,)
+    assert validar_cpfs(iter(["529.982.247-25"])).tolist() == [True]